@@ -3,22 +3,68 @@
 This application demonstrates parallel tool execution using LangGraph with real-world APIs.
 Extracted from 01_parallel_tool_use.ipynb for production deployment.
 """
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, TypedDict, Annotated
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypedDict, Annotated
+import asyncio
+import json
+import re
 import time
-import operator
+import uuid
+import weakref
 
-from langchain_core.messages import HumanMessage, BaseMessage
-from langchain_core.tools import tool
-from langchain_community.tools.tavily_search import TavilySearchResults
+from langchain_core.messages import AIMessage, HumanMessage, BaseMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langchain_core.tools import StructuredTool
+from langgraph.channels.delta import DeltaChannel
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
 import yfinance as yf
 
+try:
+    # Private module (pinned in requirements.txt); _fetch_stock_prices falls back to the public API without it
+    from yfinance.data import YfData
+except ImportError:
+    YfData = None
+
+from shared.agents import (
+    AdmissionController,
+    AdmissionRejected,
+    ContextCompactor,
+    ExecutionBudget,
+    Hedger,
+    JobManager,
+    JobQueueFull,
+    RulePredictor,
+    SpeculativeExecutor,
+    append_reducer,
+    checkpointer_from_config,
+)
 from shared.config import load_config
-from shared.llm import LLMFactory
-from shared.observability import init_sentry, HealthCheck
+from shared.llm import LLMFactory, ModelWarmPool
+from shared.observability import (
+    init_sentry,
+    export_trace,
+    HealthCheck,
+    MetricsRegistry,
+    Trace,
+    TraceMetrics,
+    TracingCallbackHandler,
+    trace_request,
+    track_call,
+)
+from shared.tools import (
+    HTTPClientPool,
+    MicroBatcher,
+    TavilySearchClient,
+    ToolCallTiming,
+    ToolExecutor,
+    ToolResultCache,
+    TAVILY_API_URL,
+)
 
 # Load configuration
 config = load_config()
@@ -31,69 +77,395 @@ init_sentry(
     traces_sample_rate=config.sentry_traces_sample_rate,
 )
 
+# Shared clients, created once per process so tool calls reuse warm connections
+http_pool = HTTPClientPool.from_config(config)
+tavily_client = TavilySearchClient(http_pool, api_key=config.tavily_api_key, max_results=5)
+
+
+def _warm_yfinance() -> None:
+    """Prime yfinance's process-wide session (cookie and crumb) before the first query."""
+    try:
+        yf.Ticker("SPY").fast_info.last_price
+    except Exception as e:
+        print(f"⚠️  Could not warm yfinance session: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start model loading and warm shared upstream clients on startup; close them on shutdown."""
+    model_pool.start()
+    # tiktoken may download its encoding on first use; do it off the event loop
+    tokenizer_warm = asyncio.create_task(asyncio.to_thread(context_compactor.tokens.warm))
+    if config.http_warm_on_startup:
+        await asyncio.gather(
+            http_pool.warm([TAVILY_API_URL]),
+            asyncio.to_thread(_warm_yfinance),
+        )
+    await job_manager.start()
+    yield
+    await job_manager.stop()
+    await tokenizer_warm
+    await http_pool.aclose()
+    if hasattr(checkpointer, "close"):
+        checkpointer.close()
+    tool_executor.shutdown(wait=False)
+
+
 # Initialize FastAPI
 app = FastAPI(
     title="App 01: Parallel Tool Use",
     description="Production-ready agent with parallel tool execution",
     version=config.version,
+    lifespan=lifespan,
 )
 
 # Initialize health check
 health_check = HealthCheck(app_name="parallel-tool-use", version=config.version)
 
+# Admission control: cap concurrent agent runs, queue a bounded number of
+# requests and reject the rest with 503 + Retry-After
+admission = AdmissionController.from_config(config)
+health_check.add_load_provider("admission", admission.get_stats)
+
+# Latency histograms of traced requests, served at /metrics
+trace_metrics = TraceMetrics()
+
+# Request, LLM and tool metrics, served at /metrics
+metrics_registry = MetricsRegistry()
+metrics_registry.register(trace_metrics.span_seconds)
+request_calls = metrics_registry.counter(
+    "agent_requests_total", "Agent runs by response mode and outcome.", ("mode", "status")
+)
+request_seconds = metrics_registry.histogram(
+    "agent_request_duration_seconds", "Agent run latency by response mode.", ("mode",)
+)
+graphs_in_flight = metrics_registry.gauge("agent_graphs_in_flight", "Graph executions currently running.")
+llm_calls = metrics_registry.counter("agent_llm_calls_total", "LLM calls by outcome.", ("status",))
+llm_seconds = metrics_registry.histogram("agent_llm_call_duration_seconds", "LLM call latency.")
+tool_calls = metrics_registry.counter(
+    "agent_tool_calls_total", "Tool calls by tool and outcome (ok, error, timeout, cancelled).", ("tool", "status")
+)
+tool_seconds = metrics_registry.histogram(
+    "agent_tool_call_duration_seconds", "Tool call run time, excluding executor queueing.", ("tool",)
+)
+metrics_registry.gauge("agent_admission_active", "Agent runs holding an admission slot.").set_function(
+    lambda: admission.active
+)
+metrics_registry.gauge("agent_admission_queue_depth", "Requests waiting for an admission slot.").set_function(
+    lambda: admission.queue_depth
+)
+admission_rejections = metrics_registry.counter(
+    "agent_admission_rejected_total", "Requests rejected with 503 by reason.", ("reason",)
+)
+for _reason in ("queue_full", "queue_timeout"):
+    admission_rejections.set_function(lambda reason=_reason: admission.get_stats()[reason], _reason)
+
+
+# Initialize tool result cache (prices go stale fast, news much slower)
+TOOL_CACHE_TTLS = {
+    "get_stock_price": 15.0,
+    "get_recent_company_news": 300.0,
+}
+tool_cache = ToolResultCache.from_config(config, ttls=TOOL_CACHE_TTLS)
+
+# Initialize hedging: slow upstream calls get a backup request after the
+# recent p95 latency, and the losing request is cancelled
+hedger = Hedger.from_config(config)
+
+
+
+def _cache_counter(tool_name: str, counter: str) -> Callable[[], float]:
+    """Read one of the tool cache's own counters at scrape time."""
+    return lambda: tool_cache.get_stats()["tools"].get(tool_name, {}).get(counter, 0)
+
+
+# The cache keeps its own counters; /metrics reads them on scrape
+tool_cache_lookups = metrics_registry.counter(
+    "agent_tool_cache_lookups_total", "Tool result cache lookups by tool and result.", ("tool", "result")
+)
+for _tool_name in TOOL_CACHE_TTLS:
+    for _result, _counter in (("hit", "hits"), ("miss", "misses"), ("coalesced", "coalesced")):
+        tool_cache_lookups.set_function(_cache_counter(_tool_name, _counter), _tool_name, _result)
+metrics_registry.gauge("agent_tool_cache_entries", "Entries in the tool result cache.").set_function(
+    lambda: tool_cache.get_stats().get("entries", 0)
+)
+
 
 # Define Tools
-@tool
-def get_stock_price(symbol: str) -> float:
+YAHOO_QUOTE_URL = "https://query1.finance.yahoo.com/v7/finance/quote"
+
+
+def _quote_price(quote: Dict[str, Any]) -> Optional[float]:
+    return quote.get('regularMarketPrice', quote.get('currentPrice'))
+
+
+def _fetch_stock_prices_one_by_one(symbols: List[str]) -> Dict[str, Optional[float]]:
+    """Fetch prices through yfinance's public API, one ``Ticker.info`` request per symbol."""
+    prices = {}
+    for symbol in symbols:
+        try:
+            prices[symbol] = _quote_price(yf.Ticker(symbol).info)
+        except Exception as e:
+            print(f"⚠️  Could not fetch quote for {symbol}: {e}")
+            prices[symbol] = None
+    return prices
+
+
+def _fetch_stock_prices(symbols: List[str]) -> Dict[str, Optional[float]]:
+    """Fetch current prices for many symbols in a single Yahoo Finance quote request."""
+    print(f"--- [Tool Call] Fetching quotes for {len(symbols)} symbol(s): {', '.join(symbols)} ---")
+    try:
+        # YfData is yfinance's process-wide session; it handles the cookie/crumb handshake
+        data = YfData().get_raw_json(YAHOO_QUOTE_URL, params={"symbols": ",".join(symbols), "formatted": "false"})
+        quotes = {quote["symbol"].upper(): _quote_price(quote) for quote in data["quoteResponse"]["result"] or []}
+    except (AttributeError, KeyError, TypeError) as e:
+        # yfinance internals or the response shape changed; network errors still propagate
+        print(f"⚠️  Bulk quote request unavailable ({type(e).__name__}: {e}); fetching symbols one by one")
+        return _fetch_stock_prices_one_by_one(symbols)
+    return {symbol: quotes.get(symbol.upper()) for symbol in symbols}
+
+
+# Concurrent get_stock_price calls (one ToolNode step, or overlapping
+# requests) are resolved together with one bulk quote fetch
+stock_quote_batcher = MicroBatcher(
+    _fetch_stock_prices,
+    max_batch_size=config.tool_batch_max_size,
+    max_wait=config.tool_batch_max_wait,
+)
+
+
+@tool_cache.cached("get_stock_price")
+def _get_stock_price(symbol: str) -> float:
     """Get the current stock price for a given stock symbol using Yahoo Finance."""
-    print(f"--- [Tool Call] Executing get_stock_price for symbol: {symbol} ---")
-    ticker = yf.Ticker(symbol)
-    price = ticker.info.get('regularMarketPrice', ticker.info.get('currentPrice'))
+    price = _fetch_stock_prices([symbol])[symbol]
+    if price is None:
+        # Raised, not returned, so the miss is not cached and ToolNode marks it an error
+        raise ValueError(f"Could not find price for symbol {symbol}")
+    return price
+
+
+@tool_cache.cached("get_stock_price")
+async def _aget_stock_price(symbol: str) -> float:
+    """Async variant of get_stock_price that joins the current quote batch."""
+    price = await stock_quote_batcher.submit(symbol)
     if price is None:
-        return f"Could not find price for symbol {symbol}"
+        raise ValueError(f"Could not find price for symbol {symbol}")
     return price
 
 
-@tool
-def get_recent_company_news(company_name: str) -> list:
+@tool_cache.cached("get_recent_company_news")
+def _get_recent_company_news(company_name: str) -> list:
     """Get recent news articles and summaries for a given company name using the Tavily search engine."""
     print(f"--- [Tool Call] Executing get_recent_company_news for: {company_name} ---")
-    tavily_search = TavilySearchResults(
-        max_results=5,
-        api_key=config.tavily_api_key
-    )
     query = f"latest news about {company_name}"
-    return tavily_search.invoke(query)
+    return tavily_client.search(query)
+
+
+@tool_cache.cached("get_recent_company_news")
+async def _aget_recent_company_news(company_name: str) -> list:
+    """Async variant of get_recent_company_news using the pooled async HTTP client."""
+    print(f"--- [Tool Call] Executing get_recent_company_news for: {company_name} ---")
+    query = f"latest news about {company_name}"
+    # Hedged below the cache so single-flight does not coalesce the backup request
+    return await hedger.run(lambda: tavily_client.asearch(query), key="get_recent_company_news")
+
+
+# Each tool carries a sync and an async implementation: ToolNode picks the
+# coroutine when the graph runs via astream/ainvoke, so tool I/O never blocks
+# the event loop.
+get_stock_price = StructuredTool.from_function(
+    func=_get_stock_price,
+    coroutine=_aget_stock_price,
+    name="get_stock_price",
+)
+
+get_recent_company_news = StructuredTool.from_function(
+    func=_get_recent_company_news,
+    coroutine=_aget_recent_company_news,
+    name="get_recent_company_news",
+)
 
 
-# Agent State
+# Agent State: both fields only ever grow, so checkpoints store each step's
+# additions (DeltaChannel) instead of re-serializing the whole history
 class AgentState(TypedDict):
     """State schema for the agent graph."""
-    messages: Annotated[List[BaseMessage], operator.add]
-    performance_log: Annotated[List[str], operator.add]
-
+    messages: Annotated[List[BaseMessage], DeltaChannel(append_reducer, snapshot_frequency=50)]
+    performance_log: Annotated[List[str], DeltaChannel(append_reducer, snapshot_frequency=50)]
 
-# Create LLM
-llm = LLMFactory.create(config=config)
 
 # Create tools list
 tools = [get_stock_price, get_recent_company_news]
 
-# Bind tools to LLM
-llm_with_tools = llm.bind_tools(tools)
 
-# Create tool node
-tool_node = ToolNode(tools)
+def _load_llm():
+    """Create the configured LLM with the tools bound."""
+    return LLMFactory.create(config=config).bind_tools(tools)
+
+
+# The LLM (and its provider SDK) loads in the background once the server
+# starts, so /health answers immediately; /ready reports when it is loaded
+model_pool = ModelWarmPool(max_attempts=config.model_load_max_attempts, retry_backoff=config.model_load_retry_backoff)
+model_pool.register("llm", _load_llm)
+health_check.add_readiness_check("llm", lambda: model_pool.is_ready("llm"))
+# A model that failed every load attempt will not recover on its own
+health_check.add_liveness_check("llm", lambda: not model_pool.has_failed("llm"))
+
+# Create the process-wide tool executor: bounds fan-out across all requests,
+# applies per-tool limits/timeouts and records per-call timings
+tool_executor = ToolExecutor.from_config(config)
+metrics_registry.gauge("agent_tool_calls_in_flight", "Tool calls running in the shared executor.").set_function(
+    lambda: tool_executor.in_flight
+)
+
+
+def _record_tool_metrics(call: ToolCallTiming) -> None:
+    """Count a finished tool call by outcome and record its run time."""
+    tool_calls.inc(call.tool, call.status)
+    tool_seconds.observe(call.run_seconds, call.tool)
+
+
+# Every executor call, including speculative prefetches outside the tools node
+tool_executor.add_listener(_record_tool_metrics)
+
+executor_tools = [tool_executor.wrap(t) for t in tools]
+
+
+# Speculative prefetch: tool calls predicted from the query start while the
+# first LLM turn is running, and are reused when the model makes the same call
+# Only "(NVDA)" and "$NVDA": bare capitalised words are mostly acronyms (CEO, AI, ETF)
+_TICKER_PATTERN = re.compile(r"\(([A-Z]{1,5})\)|\$([A-Z]{1,5})\b")
+_COMPANY_WITH_TICKER_PATTERN = re.compile(r"([A-Z][\w&.-]*(?:\s+[A-Z][\w&.-]*)*)\s*\([A-Z]{1,5}\)")
+_NOT_TICKERS = {"AI", "API", "CEO", "CFO", "EPS", "ETF", "GDP", "IPO", "NEWS", "US", "USA", "USD", "WHAT"}
+
+
+def _predict_stock_price_calls(query: str) -> List[tuple]:
+    """Predict a get_stock_price call per ticker symbol in a price question."""
+    if not re.search(r"\b(price|stock|shares?|quote|trading)\b", query, re.IGNORECASE):
+        return []
+    symbols = [paren or cashtag for paren, cashtag in _TICKER_PATTERN.findall(query)]
+    return [("get_stock_price", {"symbol": s}) for s in symbols if s not in _NOT_TICKERS]
+
+
+def _predict_company_news_calls(query: str) -> List[tuple]:
+    """Predict a get_recent_company_news call per "Company (TICKER)" mention in a news question."""
+    if not re.search(r"\bnews\b", query, re.IGNORECASE):
+        return []
+    return [
+        ("get_recent_company_news", {"company_name": name})
+        for name in _COMPANY_WITH_TICKER_PATTERN.findall(query)
+    ]
+
+
+speculator = SpeculativeExecutor.from_config(
+    config,
+    executor_tools,
+    RulePredictor([_predict_stock_price_calls, _predict_company_news_calls]),
+)
+
+# Create tool node; errors (including timeouts) are returned to the LLM as
+# tool messages instead of failing the request
+tool_node = ToolNode([speculator.wrap_tool(t) for t in executor_tools], handle_tool_errors=True)
+
+
+# Budget Enforcement
+BUDGET_NAMES = {
+    "llm_turns": "LLM turn",
+    "tool_calls": "tool call",
+    "tokens": "token",
+    "deadline": "time",
+}
+
+
+def _budget_of(config: Optional[RunnableConfig]) -> Optional[ExecutionBudget]:
+    """The request's execution budget from the run config, if one was set."""
+    return ((config or {}).get("configurable") or {}).get("budget")
+
+
+def _partial_answer(messages: List[BaseMessage], reason: str, max_result_chars: int = 300) -> str:
+    """Answer built from the tool results gathered before a budget ran out."""
+    answer = f"Stopped before finishing: the {BUDGET_NAMES[reason]} budget ran out."
+    results = [
+        f"- {message.name}: {str(message.content)[:max_result_chars]}"
+        for message in messages
+        # Error results carry retry instructions meant for the model, not the user
+        if isinstance(message, ToolMessage) and message.status != "error"
+    ]
+    if results:
+        answer += " Results gathered so far:\n" + "\n".join(results)
+    return answer
+
+
+def _stop_for_budget(state: AgentState, budget: ExecutionBudget, reason: str, log: List[str]) -> dict:
+    """End the agent loop with a partial answer instead of another LLM or tools step."""
+    budget.stop(reason)
+    log_entry = f"[BUDGET] Stopped early: {BUDGET_NAMES[reason]} budget exhausted."
+    print(log_entry)
+    return {
+        "messages": [AIMessage(content=_partial_answer(state["messages"], reason))],
+        "performance_log": log + [log_entry],
+    }
+
+
+def _agent_update(state: AgentState, response: BaseMessage, budget: Optional[ExecutionBudget], log: List[str]) -> dict:
+    """Record the LLM turn against the budget; stop if its tool calls no longer fit."""
+    if budget is not None:
+        budget.record_llm_turn(response)
+        num_calls = len(getattr(response, "tool_calls", None) or [])
+        if num_calls:
+            if not budget.allows_tool_calls(num_calls):
+                return _stop_for_budget(state, budget, "tool_calls", log)
+            budget.record_tool_calls(num_calls)
+    
+    return {
+        "messages": [response],
+        "performance_log": log
+    }
+
+
+# Prompt Context: the state keeps the full history, but each LLM call gets a
+# compacted copy (long and repeated tool results shortened, old turns dropped
+# beyond the token budget) so prompt size stops growing with every turn
+context_compactor = ContextCompactor.from_config(config)
+prompt_tokens = metrics_registry.counter(
+    "agent_llm_prompt_tokens_total", "Prompt tokens sent to the LLM after context compaction."
+)
+context_tokens_trimmed = metrics_registry.counter(
+    "agent_context_tokens_trimmed_total", "Prompt tokens removed by context compaction."
+)
+
+
+def _prompt(state: AgentState) -> Tuple[List[BaseMessage], List[str]]:
+    """Compact the history into this turn's prompt and log what was trimmed."""
+    context = context_compactor.compact(state["messages"])
+    prompt_tokens.inc(amount=context.tokens_after)
+    if not context.changed:
+        return context.messages, []
+    
+    context_tokens_trimmed.inc(amount=context.tokens_before - context.tokens_after)
+    log_entry = (
+        f"[CONTEXT] Prompt compacted from {context.tokens_before} to {context.tokens_after} tokens "
+        f"({context.truncated} truncated, {context.deduplicated} deduplicated, {context.dropped} dropped)."
+    )
+    print(log_entry)
+    return context.messages, [log_entry]
 
 
 # Define Graph Nodes
-def call_model(state: AgentState):
+def call_model(state: AgentState, config: RunnableConfig):
     """The agent node: calls the LLM, measures performance, and logs the result."""
+    budget = _budget_of(config)
+    reason = budget.exhausted() if budget is not None else None
+    if reason:
+        return _stop_for_budget(state, budget, reason, [])
+    
     print("--- AGENT: Invoking LLM --- ")
+    messages, log = _prompt(state)
+    llm_with_tools = model_pool.get("llm")
     start_time = time.time()
     
-    messages = state['messages']
-    response = llm_with_tools.invoke(messages)
+    with track_call(llm_calls, llm_seconds):
+        response = llm_with_tools.invoke(messages)
     
     end_time = time.time()
     execution_time = end_time - start_time
@@ -101,9 +473,73 @@ def call_model(state: AgentState):
     log_entry = f"[AGENT] LLM call took {execution_time:.2f} seconds."
     print(log_entry)
     
+    return _agent_update(state, response, budget, log + [log_entry])
+
+
+async def acall_model(state: AgentState, config: RunnableConfig):
+    """Async agent node: awaits the LLM so concurrent requests share the event loop."""
+    budget = _budget_of(config)
+    reason = budget.exhausted() if budget is not None else None
+    if reason:
+        return _stop_for_budget(state, budget, reason, [])
+    
+    print("--- AGENT: Invoking LLM --- ")
+    messages, log = _prompt(state)
+    llm_with_tools = await model_pool.aget("llm")
+    start_time = time.time()
+    
+    timeout = budget.remaining_seconds() if budget is not None else None
+    try:
+        with track_call(llm_calls, llm_seconds):
+            response = await asyncio.wait_for(llm_with_tools.ainvoke(messages), timeout=timeout)
+    except asyncio.TimeoutError:
+        if budget is None or budget.remaining_seconds() > 0:
+            raise
+        return _stop_for_budget(state, budget, "deadline", log)
+    
+    end_time = time.time()
+    execution_time = end_time - start_time
+    
+    log_entry = f"[AGENT] LLM call took {execution_time:.2f} seconds."
+    print(log_entry)
+    
+    return _agent_update(state, response, budget, log + [log_entry])
+
+
+def _tool_log(calls: List[ToolCallTiming], num_tools: int, execution_time: float) -> List[str]:
+    """Build performance log entries for one tools step."""
+    # Calls served by a speculative prefetch have no timing of their own
+    log = [call.as_log_entry() for call in calls]
+    log.append(f"[TOOLS] Executed {num_tools} tools in {execution_time:.2f} seconds.")
+    for entry in log:
+        print(entry)
+    return log
+
+
+def call_tools(state: AgentState, config: RunnableConfig):
+    """The tools node: runs the requested tool calls through the shared executor."""
+    start_time = time.time()
+    budget = _budget_of(config)
+    with tool_executor.track(budget.deadline if budget is not None else None) as calls:
+        result = tool_node.invoke(state, config)
+    
     return {
-        "messages": [response],
-        "performance_log": [log_entry]
+        "messages": result["messages"],
+        "performance_log": _tool_log(calls, len(result["messages"]), time.time() - start_time)
+    }
+
+
+async def acall_tools(state: AgentState, config: RunnableConfig):
+    """Async tools node: tool calls run concurrently, bounded by the shared executor."""
+    start_time = time.time()
+    budget = _budget_of(config)
+    # Tool timeouts are clipped to the request deadline
+    with tool_executor.track(budget.deadline if budget is not None else None) as calls:
+        result = await tool_node.ainvoke(state, config)
+    
+    return {
+        "messages": result["messages"],
+        "performance_log": _tool_log(calls, len(result["messages"]), time.time() - start_time)
     }
 
 
@@ -117,8 +553,8 @@ def should_continue(state: AgentState) -> str:
 
 # Build Graph
 workflow = StateGraph(AgentState)
-workflow.add_node("agent", call_model)
-workflow.add_node("tools", tool_node)
+workflow.add_node("agent", RunnableLambda(call_model, afunc=acall_model, name="agent"))
+workflow.add_node("tools", RunnableLambda(call_tools, afunc=acall_tools, name="tools"))
 workflow.set_entry_point("agent")
 workflow.add_conditional_edges("agent", should_continue, {"tools": "tools", END: END})
 workflow.add_edge("tools", "agent")
@@ -126,12 +562,24 @@ workflow.add_edge("tools", "agent")
 # Compile the graph
 agent_app = workflow.compile()
 
+# Runs given a thread_id are checkpointed after every step, so a retry after
+# a restart or client timeout resumes from the last completed node
+checkpointer = checkpointer_from_config(config)
+resumable_agent_app = workflow.compile(checkpointer=checkpointer) if checkpointer is not None else None
+
 
 # API Models
 class QueryRequest(BaseModel):
     """Request model for agent queries."""
     query: str
-    stream: Optional[bool] = False
+    stream: Optional[bool] = False  # Stream graph events as server-sent events
+    # Execution budgets; these can only tighten the server's agent_* limits
+    max_llm_turns: Optional[int] = None
+    max_tool_calls: Optional[int] = None
+    max_tokens: Optional[int] = None
+    deadline_seconds: Optional[float] = None
+    # Checkpoint the run under this id; repeating the request resumes it
+    thread_id: Optional[str] = None
 
 
 class QueryResponse(BaseModel):
@@ -139,58 +587,514 @@ class QueryResponse(BaseModel):
     result: str
     performance_log: List[str]
     total_time: float
+    spans: List[Dict[str, Any]] = []
+    budget: Dict[str, Any] = {}
+    thread_id: Optional[str] = None
+
+
+class JobResponse(BaseModel):
+    """Status of a background agent run; ``result`` is the QueryResponse once it succeeded."""
+    id: str
+    status: str
+    submitted_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[QueryResponse] = None
+    error: Optional[str] = None
 
 
 # API Endpoints
 @app.get("/health")
 async def health():
-    """Health check endpoint for monitoring."""
-    return health_check.get_health_status()
+    """Health check endpoint for monitoring: 503 once a liveness check fails (e.g. the LLM never loaded)."""
+    status = health_check.get_health_status()
+    return JSONResponse(status, status_code=503 if status["status"] == "unhealthy" else 200)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: request rate and latency quantiles, in-flight graphs, LLM/tool calls and cache lookups."""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 503 until background model loading has finished."""
+    status = {**health_check.get_readiness_status(), "models": model_pool.get_status()}
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+def _build_inputs(query: str) -> dict:
+    """Build the initial graph state for a user query."""
+    return {
+        "messages": [HumanMessage(content=query)],
+        "performance_log": []
+    }
+
+
+def _build_response(
+    final_state: Optional[dict],
+    start_time: float,
+    trace: Optional[Trace] = None,
+    budget: Optional[ExecutionBudget] = None,
+    thread_id: Optional[str] = None,
+) -> QueryResponse:
+    """Turn the final graph state (and the request trace, budget and thread, if any) into a QueryResponse."""
+    if final_state and 'messages' in final_state:
+        last_msg = final_state['messages'][-1]
+        result = last_msg.content if hasattr(last_msg, 'content') else str(last_msg)
+    else:
+        result = "No response generated"
+    
+    return QueryResponse(
+        result=result,
+        performance_log=final_state.get('performance_log', []) if final_state else [],
+        total_time=time.time() - start_time,
+        spans=trace.to_list() if trace is not None else [],
+        budget=budget.to_dict() if budget is not None else {},
+        thread_id=thread_id,
+    )
+
+
+@contextmanager
+def _traced_request(mode: str) -> Iterator[Trace]:
+    """Trace and count one agent run; the finished trace feeds /metrics and is exported to Sentry."""
+    trace = None
+    try:
+        with graphs_in_flight.track_in_progress(), track_call(request_calls, request_seconds, mode):
+            with trace_request("run_agent") as trace:
+                yield trace
+    finally:
+        if trace is not None:
+            trace_metrics.observe_trace(trace)
+            export_trace(trace)
+
+
+def _request_budget(request: QueryRequest) -> ExecutionBudget:
+    """Start the request's execution budget from the server limits and its overrides."""
+    return ExecutionBudget.from_config(
+        config,
+        max_llm_turns=request.max_llm_turns,
+        max_tool_calls=request.max_tool_calls,
+        max_tokens=request.max_tokens,
+        deadline_seconds=request.deadline_seconds,
+    )
+
+
+def _run_config(trace: Trace, budget: ExecutionBudget, thread_id: Optional[str] = None) -> RunnableConfig:
+    """Run config that records spans into ``trace``, hands ``budget`` to the graph nodes and names the thread."""
+    run_config: RunnableConfig = {
+        "callbacks": [TracingCallbackHandler(trace)],
+        "configurable": {"budget": budget},
+    }
+    if thread_id is not None:
+        run_config["configurable"]["thread_id"] = thread_id
+    if budget.max_llm_turns is not None:
+        # Agent and tools steps alternate, plus the final budget-stop step
+        run_config["recursion_limit"] = 2 * budget.max_llm_turns + 2
+    return run_config
+
+
+@dataclass
+class GraphRun:
+    """How a request runs the agent: which graph, and its inputs (None to resume a checkpointed thread)."""
+    graph: Any
+    inputs: Optional[dict]
+    thread_id: Optional[str] = None
+    # Set when the thread already answered this query; returned without running the graph
+    finished_state: Optional[dict] = None
+    log: Tuple[str, ...] = ()
+
+
+# Threads with a run in progress in this process; other replicas are excluded
+# by the checkpoint store's thread lease where it has one (SQLite)
+_active_threads: set = set()
+
+
+async def _claim_thread(thread_id: Optional[str]) -> Callable[[], None]:
+    """
+    Reserve a thread for one run at a time, so two runs never interleave its checkpoints.
+    
+    Returns:
+        Idempotent function releasing the thread
+    
+    Raises:
+        HTTPException: 409 if another run holds the thread
+    """
+    if thread_id is None:
+        return lambda: None
+    if thread_id in _active_threads:
+        raise HTTPException(status_code=409, detail=f"Thread {thread_id} has a run in progress")
+    _active_threads.add(thread_id)
+    owner = uuid.uuid4().hex
+    claim = getattr(checkpointer, "claim_thread", None)
+    try:
+        claimed = claim is None or await asyncio.to_thread(claim, thread_id, owner, config.checkpoint_lease_seconds)
+    except BaseException:
+        _active_threads.discard(thread_id)
+        raise
+    if not claimed:
+        _active_threads.discard(thread_id)
+        raise HTTPException(status_code=409, detail=f"Thread {thread_id} has a run in progress")
+    
+    released = False
+    
+    def release() -> None:
+        nonlocal released
+        if released:
+            return
+        released = True
+        _active_threads.discard(thread_id)
+        if claim is not None:
+            checkpointer.release_thread(thread_id, owner)
+    return release
+
+
+async def _plan_run(query: str, thread_id: Optional[str]) -> GraphRun:
+    """
+    Start a fresh run, or pick up a checkpointed thread where it stopped.
+    
+    A thread whose last run of this query was interrupted resumes from its
+    last completed node; one that already answered it returns the stored
+    result; otherwise the query starts a new turn on the thread.
+    
+    Raises:
+        HTTPException: 400 if checkpointing is disabled, 409 if the thread has
+            an unfinished run of a different query
+    """
+    if thread_id is None:
+        return GraphRun(agent_app, _build_inputs(query))
+    if resumable_agent_app is None:
+        raise HTTPException(status_code=400, detail="Checkpointing is disabled (CHECKPOINT_BACKEND=none)")
+    
+    snapshot = await resumable_agent_app.aget_state({"configurable": {"thread_id": thread_id}})
+    messages = snapshot.values.get("messages", [])
+    last_query = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), None)
+    if snapshot.next:
+        if last_query != query:
+            raise HTTPException(status_code=409, detail=f"Thread {thread_id} has an unfinished run of a different query")
+        log_entry = f"[CHECKPOINT] Resumed thread {thread_id} at {', '.join(snapshot.next)}."
+        print(log_entry)
+        return GraphRun(resumable_agent_app, None, thread_id, log=(log_entry,))
+    if messages and last_query == query:
+        log_entry = f"[CHECKPOINT] Thread {thread_id} already answered this query; returned the stored result."
+        print(log_entry)
+        return GraphRun(resumable_agent_app, None, thread_id, finished_state=snapshot.values, log=(log_entry,))
+    return GraphRun(resumable_agent_app, _build_inputs(query), thread_id)
+
+
+def _with_log(final_state: Optional[dict], entries: Sequence[str]) -> Optional[dict]:
+    """Append request-level entries to the final state's performance log."""
+    if not final_state or not entries:
+        return final_state
+    return {**final_state, "performance_log": list(final_state.get("performance_log", [])) + list(entries)}
+
+
+def _with_speculation_log(final_state: Optional[dict], summary: Dict[str, Any]) -> Optional[dict]:
+    """Add the request's speculative prefetch summary to the final state's performance log."""
+    if not summary["launched"]:
+        return final_state
+    entry = (
+        f"[SPECULATION] Launched {summary['launched']} tool calls, used {summary['used']}, "
+        f"wasted {summary['wasted']} ({summary['wasted_seconds']:.2f} seconds)."
+    )
+    return _with_log(final_state, [entry])
+
+
+def _sse(event: str, data: Any) -> str:
+    """Format a single server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _stream_agent_events(query: str, budget: ExecutionBudget, run: GraphRun) -> AsyncIterator[str]:
+    """
+    Run the agent and yield graph events as server-sent events.
+    
+    Emits ``node_start`` when a graph node begins, ``token`` for each LLM
+    content delta, ``tool_result`` when a tool returns, and a final ``result``
+    event carrying the QueryResponse payload. Failures after the stream has
+    started are reported as an ``error`` event since the status code is
+    already sent.
+    """
+    start_time = time.time()
+    final_state = None
+    if run.finished_state is not None:
+        final_state = _with_log(run.finished_state, run.log)
+        yield _sse("result", _build_response(final_state, start_time, budget=budget, thread_id=run.thread_id).model_dump())
+        return
+    
+    try:
+        with _traced_request("stream") as trace:
+            async with speculator.session(query) as speculation:
+                async for event in run.graph.astream_events(
+                    run.inputs, _run_config(trace, budget, run.thread_id), version="v2"
+                ):
+                    kind = event["event"]
+                    node = event.get("metadata", {}).get("langgraph_node")
+                    
+                    # Graph nodes are the direct children of the root run
+                    if kind == "on_chain_start" and node and len(event.get("parent_ids", [])) == 1:
+                        yield _sse("node_start", {"node": node})
+                    elif kind == "on_chat_model_stream":
+                        content = event["data"]["chunk"].content
+                        if isinstance(content, str) and content:
+                            yield _sse("token", {"node": node, "content": content})
+                    elif kind == "on_tool_end":
+                        output = event["data"].get("output")
+                        yield _sse("tool_result", {
+                            "tool": event["name"],
+                            "output": getattr(output, "content", output),
+                        })
+                    elif kind == "on_chain_end" and not event.get("parent_ids"):
+                        # The root run's output is the final graph state
+                        final_state = event["data"].get("output")
+        
+        final_state = _with_log(_with_speculation_log(final_state, speculation.summary), run.log)
+        yield _sse("result", _build_response(final_state, start_time, trace, budget, run.thread_id).model_dump())
+    
+    except Exception as e:
+        print(f"Error streaming agent: {e}")
+        yield _sse("error", {"detail": str(e)})
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Tool result cache hit/miss counters, quote batching, hedging and speculation stats."""
+    return {
+        **tool_cache.get_stats(),
+        "stock_quote_batches": stock_quote_batcher.get_stats(),
+        "hedging": hedger.get_stats(),
+        "speculation": speculator.get_stats(),
+        "jobs": await job_manager.get_stats(),
+    }
+
+
+class ClientDisconnected(Exception):
+    """Raised when the client goes away before the agent finishes."""
+
+
+def _overloaded(error: AdmissionRejected) -> HTTPException:
+    """503 response telling the client when to retry."""
+    return HTTPException(
+        status_code=503,
+        detail=str(error),
+        headers={"Retry-After": str(int(error.retry_after))},
+    )
+
+
+async def _release_after(events: AsyncIterator[str], *releases: Callable[[], None]) -> AsyncIterator[str]:
+    """Pass through a response stream, releasing its admission slot (and thread) when it ends."""
+    try:
+        async for event in events:
+            yield event
+    finally:
+        for release in releases:
+            release()
+
+
+async def _admitted(coro: Any) -> Any:
+    """Await ``coro`` once admitted; waiting in the queue is cancelled with the request."""
+    try:
+        async with admission.admit():
+            return await coro
+    finally:
+        # Not awaited if the wait for a slot was rejected or cancelled
+        coro.close()
+
+
+async def _run_graph(query: str, budget: ExecutionBudget, run: GraphRun) -> Tuple[Optional[dict], Optional[Trace]]:
+    """Execute the agent asynchronously within ``budget`` and return the final state and request trace."""
+    if run.finished_state is not None:
+        return _with_log(run.finished_state, run.log), None
+    
+    final_state = None
+    with _traced_request("json") as trace:
+        async with speculator.session(query) as speculation:
+            run_config = _run_config(trace, budget, run.thread_id)
+            async for output in run.graph.astream(run.inputs, run_config, stream_mode="values"):
+                final_state = output
+    return _with_log(_with_speculation_log(final_state, speculation.summary), run.log), trace
+
+
+async def _run_until_disconnected(coro: Any, http_request: Request, poll_interval: float = 0.5) -> Any:
+    """
+    Await ``coro`` while watching for client disconnect.
+    
+    If the client disconnects first, the task is cancelled, which propagates
+    into the in-flight LLM call and the tool executor's running tool calls.
+    
+    Raises:
+        ClientDisconnected: If the client disconnected before completion
+    """
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                task.cancel()
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
 
 
 @app.post("/run", response_model=QueryResponse)
-async def run_agent(request: QueryRequest) -> QueryResponse:
+async def run_agent(request: QueryRequest, http_request: Request):
     """
     Execute the agent with the given query.
     
+    When ``request.stream`` is true the response is a ``text/event-stream``
+    of graph events (see ``_stream_agent_events``) instead of a single JSON
+    body, so clients see node progress and LLM tokens as they are produced.
+    Either way, a client disconnect cancels the run.
+    
+    Each run gets an ExecutionBudget (LLM turns, tool calls, tokens and a
+    deadline counted from arrival); when one runs out the agent answers with
+    the results gathered so far, and the response reports the consumption.
+    
+    Runs with a ``thread_id`` are checkpointed after every step; repeating
+    the request after a restart or client timeout resumes from the last
+    completed node (see ``_plan_run``).
+    
+    Runs are admitted by ``admission``: beyond its concurrency limit
+    requests wait in a bounded queue, and once the queue is full (or the
+    wait times out) the request is rejected with 503 and Retry-After.
+    
     Args:
         request: QueryRequest containing the user's query
+        http_request: Raw request, watched for client disconnect
         
     Returns:
-        QueryResponse with the agent's result and performance metrics
+        QueryResponse with the agent's result and performance metrics, or a
+        StreamingResponse of server-sent events when streaming
     """
+    budget = _request_budget(request)
+    release_thread = await _claim_thread(request.thread_id)
+    streaming = False
     try:
-        start_time = time.time()
-        
-        # Prepare inputs
-        inputs = {
-            "messages": [HumanMessage(content=request.query)],
-            "performance_log": []
-        }
+        run = await _plan_run(request.query, request.thread_id)
+        if request.stream:
+            try:
+                slot = await admission.acquire()
+            except AdmissionRejected as e:
+                raise _overloaded(e)
+            events = _release_after(_stream_agent_events(request.query, budget, run), slot.release, release_thread)
+            # A stream abandoned before its first event never runs its finally block
+            weakref.finalize(events, slot.release)
+            weakref.finalize(events, release_thread)
+            streaming = True
+            return StreamingResponse(
+                events,
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
         
-        # Execute agent
-        final_state = None
-        for output in agent_app.stream(inputs, stream_mode="values"):
-            final_state = output
+        try:
+            start_time = time.time()
+            execution = _admitted(_run_graph(request.query, budget, run))
+            final_state, trace = await _run_until_disconnected(execution, http_request)
+            return _build_response(final_state, start_time, trace, budget, run.thread_id)
         
-        # Extract result
-        if final_state and 'messages' in final_state:
-            last_msg = final_state['messages'][-1]
-            result = last_msg.content if hasattr(last_msg, 'content') else str(last_msg)
-        else:
-            result = "No response generated"
+        except AdmissionRejected as e:
+            raise _overloaded(e)
         
-        total_time = time.time() - start_time
+        except ClientDisconnected:
+            print("Client disconnected; cancelled agent execution")
+            raise HTTPException(status_code=499, detail="Client closed request")
         
-        return QueryResponse(
-            result=result,
-            performance_log=final_state.get('performance_log', []) if final_state else [],
-            total_time=total_time
-        )
+        except Exception as e:
+            print(f"Error executing agent: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if not streaming:
+            release_thread()
+
+
+async def _run_job(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Job runner: execute a submitted QueryRequest and return its QueryResponse payload."""
+    query_request = QueryRequest(**request)
+    # The budget's deadline counts from when a worker picks the job up
+    budget = _request_budget(query_request)
+    release_thread = await _claim_thread(query_request.thread_id)
+    try:
+        run = await _plan_run(query_request.query, query_request.thread_id)
+        start_time = time.time()
+        final_state, trace = await _run_graph(query_request.query, budget, run)
+        return _build_response(final_state, start_time, trace, budget, run.thread_id).model_dump()
+    finally:
+        release_thread()
+
+
+# Background runs for queries that outlast an HTTP request; workers bypass
+# ``admission`` and are bounded by jobs_max_workers instead
+job_manager = JobManager.from_config(config, _run_job)
+metrics_registry.gauge("agent_jobs_running", "Background jobs executing in this process.").set_function(
+    lambda: job_manager.running
+)
+jobs_finished = metrics_registry.counter("agent_jobs_finished_total", "Background jobs finished by status.", ("status",))
+for _status in job_manager.finished:
+    jobs_finished.set_function(lambda status=_status: job_manager.finished[status], _status)
+
+
+def _job_response(job: Any) -> JobResponse:
+    """Public view of a job record (the submitted request is not echoed back)."""
+    return JobResponse(
+        id=job.id,
+        status=job.status,
+        submitted_at=job.submitted_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        result=job.result,
+        error=job.error,
+    )
+
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+async def submit_job(request: QueryRequest):
+    """
+    Queue an agent run and return at once; poll ``GET /jobs/{id}`` for the result.
     
-    except Exception as e:
-        print(f"Error executing agent: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    Jobs run on a pool of ``jobs_max_workers`` workers with the same
+    budgets and checkpointing as ``/run``. Once ``jobs_max_queue`` jobs are
+    waiting, submissions are rejected with 503 and Retry-After.
+    
+    Args:
+        request: QueryRequest to run; streaming is not supported
+        
+    Returns:
+        The queued job, with its URL in the Location header
+    """
+    if request.stream:
+        raise HTTPException(status_code=400, detail="Streaming is not supported for jobs; use /run")
+    try:
+        job = await job_manager.submit(request.model_dump())
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(e.retry_after))})
+    return JSONResponse(
+        _job_response(job).model_dump(),
+        status_code=202,
+        headers={"Location": f"/jobs/{job.id}"},
+    )
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Job status, and the QueryResponse once it has succeeded; 404 if unknown or expired."""
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return _job_response(job)
+
+
+@app.delete("/jobs/{job_id}", response_model=JobResponse)
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job, stopping its in-flight LLM and tool calls; 404 if unknown."""
+    job = await job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return _job_response(job)
 
 
 @app.get("/")
@@ -202,7 +1106,11 @@ async def root():
         "description": "Production-ready agent with parallel tool execution",
         "endpoints": {
             "health": "/health",
+            "ready": "/ready",
+            "metrics": "/metrics",
             "run": "/run (POST)",
+            "jobs": "/jobs (POST), /jobs/{id} (GET, DELETE)",
+            "cache_stats": "/cache/stats",
             "docs": "/docs"
         }
     }
@@ -0,0 +1,198 @@
+"""Deterministic offline stand-ins for the LLM, yfinance and Tavily, shared by the tests and the benchmarks.
+
+Latencies are drawn from a seeded distribution keyed by the request and
+step (for the LLM) or by the input and how often it was seen (for tools), so
+every run sees the same latencies regardless of how concurrent requests
+interleave.
+"""
+import asyncio
+import hashlib
+import math
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+# One agent turn: the tool calls (name, args) the model requests in parallel
+ToolCallPlan = List[Tuple[str, Dict[str, Any]]]
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    """
+    Latency distribution in seconds.
+
+    ``constant`` uses ``a``; ``uniform`` draws from [a, b]; ``lognormal`` has
+    median ``a`` and log-space sigma ``b`` (a heavy right tail like real
+    provider latencies).
+    """
+
+    kind: str = "constant"
+    a: float = 0.0
+    b: float = 0.0
+    seed: int = 0
+
+    @classmethod
+    def parse(cls, spec: str, seed: int = 0) -> "LatencyModel":
+        """
+        Parse ``constant:A``, ``uniform:A:B`` or ``lognormal:MEDIAN:SIGMA``.
+
+        Args:
+            spec: Distribution spec; a bare number means constant
+            seed: Seed mixed into every draw
+
+        Returns:
+            LatencyModel
+        """
+        parts = spec.split(":")
+        if len(parts) == 1:
+            return cls("constant", float(parts[0]), seed=seed)
+        kind, *values = parts
+        if kind not in ("constant", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        a = float(values[0])
+        b = float(values[1]) if len(values) > 1 else 0.0
+        return cls(kind, a, b, seed)
+
+    def sample(self, key: str) -> float:
+        """Draw the latency for ``key``; the same key always gets the same value."""
+        if self.kind == "constant":
+            return self.a
+        rng = random.Random(f"{self.seed}:{key}")
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        return self.a * math.exp(rng.gauss(0.0, self.b)) if self.a > 0 else 0.0
+
+    def __str__(self) -> str:
+        if self.kind == "constant":
+            return f"constant:{self.a:g}"
+        return f"{self.kind}:{self.a:g}:{self.b:g}"
+
+
+class _Occurrences:
+    """Thread-safe count of how often each key was seen, for per-call latency keys."""
+
+    def __init__(self) -> None:
+        self._seen: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def next_key(self, key: str) -> str:
+        with self._lock:
+            self._seen[key] += 1
+            return f"{key}:{self._seen[key]}"
+
+    @property
+    def total(self) -> int:
+        with self._lock:
+            return sum(self._seen.values())
+
+
+def _request_key(messages: List[BaseMessage]) -> str:
+    """The first human message identifies the request a conversation belongs to."""
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            return str(message.content)
+    return ""
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Tool-calling chat model that follows a fixed plan.
+
+    Turn ``n`` of a conversation (the number of AI messages so far) returns
+    the tool calls in ``plan[n]``; once the plan is exhausted it answers. The
+    sync path blocks the calling thread and the async path yields to the
+    event loop, like real provider clients.
+    """
+
+    plan: List[ToolCallPlan] = []
+    latency: LatencyModel = LatencyModel()
+    answer: str = "done"
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def bind_tools(self, tools: list, **kwargs: Any) -> "ScriptedChatModel":
+        return self
+
+    def _respond(self, messages: List[BaseMessage]) -> Tuple[float, ChatResult]:
+        self.calls += 1
+        turn = sum(isinstance(message, AIMessage) for message in messages)
+        key = _request_key(messages)
+        if turn < len(self.plan):
+            tool_calls = [
+                {"name": name, "args": dict(args), "id": f"call_{turn}_{index}", "type": "tool_call"}
+                for index, (name, args) in enumerate(self.plan[turn])
+            ]
+            message = AIMessage(content="", tool_calls=tool_calls)
+        else:
+            message = AIMessage(content=self.answer)
+        return self.latency.sample(f"llm:{key}:{turn}"), ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, **kwargs: Any) -> ChatResult:
+        delay, result = self._respond(messages)
+        time.sleep(delay)
+        return result
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, **kwargs: Any) -> ChatResult:
+        delay, result = self._respond(messages)
+        await asyncio.sleep(delay)
+        return result
+
+
+def _price(symbol: str) -> float:
+    digest = hashlib.sha256(symbol.upper().encode()).digest()
+    return round(10 + int.from_bytes(digest[:4], "big") % 100_000 / 100, 2)
+
+
+class FakeYfData:
+    """
+    Stand-in for ``yfinance.data.YfData`` answering quote requests offline.
+
+    Instances share the class-level ``latency`` and call counts, matching
+    YfData's process-wide singleton.
+    """
+
+    latency = LatencyModel()
+    requests = _Occurrences()
+
+    def get_raw_json(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs: Any) -> Dict[str, Any]:
+        symbols = [s for s in (params or {}).get("symbols", "").split(",") if s]
+        time.sleep(self.latency.sample(self.requests.next_key(f"quote:{','.join(symbols)}")))
+        return {"quoteResponse": {"result": [
+            {"symbol": symbol.upper(), "regularMarketPrice": _price(symbol)} for symbol in symbols
+        ]}}
+
+
+class FakeTavilyClient:
+    """Stand-in for ``TavilySearchClient`` returning canned results after a simulated latency."""
+
+    def __init__(self, latency: LatencyModel = LatencyModel(), max_results: int = 5):
+        self.latency = latency
+        self.max_results = max_results
+        self.requests = _Occurrences()
+
+    def _results(self, query: str) -> List[Dict[str, Any]]:
+        return [
+            {"title": f"{query} #{index}", "url": f"https://news.example.com/{index}", "content": f"Summary {index} of {query}."}
+            for index in range(self.max_results)
+        ]
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        time.sleep(self.latency.sample(self.requests.next_key(f"news:{query}")))
+        return self._results(query)
+
+    async def asearch(self, query: str) -> List[Dict[str, Any]]:
+        await asyncio.sleep(self.latency.sample(self.requests.next_key(f"news:{query}")))
+        return self._results(query)
+
+
+__all__ = ["FakeTavilyClient", "FakeYfData", "LatencyModel", "ScriptedChatModel", "ToolCallPlan"]
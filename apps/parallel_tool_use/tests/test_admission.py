@@ -0,0 +1,108 @@
+"""Unit tests for admission control and load-aware health reporting."""
+import asyncio
+
+import pytest
+
+from shared.agents import AdmissionController, AdmissionRejected
+from shared.observability import HealthCheck
+
+
+def test_admits_up_to_limit_then_hands_slots_to_waiters_in_order():
+    """Requests over the limit wait and are admitted FIFO as slots free up."""
+    controller = AdmissionController(max_concurrency=2, max_queue=4, queue_timeout=1.0)
+    order = []
+
+    async def request(name: str, hold: float):
+        async with controller.admit():
+            order.append(name)
+            await asyncio.sleep(hold)
+
+    async def run():
+        tasks = [asyncio.ensure_future(request(f"r{i}", 0.05)) for i in range(5)]
+        await asyncio.sleep(0.01)
+        assert controller.active == 2 and controller.queue_depth == 3
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+
+    assert order == ["r0", "r1", "r2", "r3", "r4"]
+    stats = controller.get_stats()
+    assert stats["active"] == 0 and stats["queue_depth"] == 0
+    assert stats["admitted"] == 5 and stats["queued"] == 3
+
+
+def test_full_queue_rejects_immediately_with_retry_after():
+    """Once the queue is full, new requests are rejected without waiting."""
+    controller = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout=5.0)
+
+    async def run():
+        slot = await controller.acquire()
+        waiter = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire()
+        slot.release()
+        (await waiter).release()
+        return rejected.value
+
+    error = asyncio.run(run())
+
+    assert error.reason == "queue_full"
+    assert error.retry_after >= 1
+    assert controller.get_stats()["queue_full"] == 1
+
+
+def test_queue_wait_is_bounded_by_timeout():
+    """A queued request gives up after queue_timeout and leaves the queue."""
+    controller = AdmissionController(max_concurrency=1, max_queue=4, queue_timeout=0.05)
+
+    async def run():
+        slot = await controller.acquire()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire()
+        slot.release()
+        return rejected.value
+
+    assert asyncio.run(run()).reason == "queue_timeout"
+    assert controller.queue_depth == 0 and controller.active == 0
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    """A client that goes away while queued frees its place; the slot stays usable."""
+    controller = AdmissionController(max_concurrency=1, max_queue=4, queue_timeout=5.0)
+
+    async def run():
+        slot = await controller.acquire()
+        waiter = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        slot.release()
+        slot.release()  # idempotent
+        (await controller.acquire()).release()
+
+    asyncio.run(run())
+    assert controller.active == 0 and controller.queue_depth == 0
+
+
+def test_health_reports_load_and_saturation():
+    """The health status carries queue depth and turns saturated past the threshold."""
+    controller = AdmissionController(max_concurrency=1, max_queue=2, queue_timeout=5.0, saturation_threshold=0.5)
+    health = HealthCheck(app_name="test", version="0")
+    health.add_load_provider("admission", controller.get_stats)
+
+    async def run():
+        slot = await controller.acquire()
+        assert health.get_health_status()["status"] == "healthy"
+        waiter = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        status = health.get_health_status()
+        slot.release()
+        (await waiter).release()
+        return status
+
+    status = asyncio.run(run())
+
+    assert status["status"] == "saturated"
+    assert status["load"]["admission"]["queue_depth"] == 1
+    assert status["load"]["admission"]["saturation"] == 0.5
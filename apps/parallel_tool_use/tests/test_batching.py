@@ -0,0 +1,59 @@
+"""Unit tests for the shared tool call micro-batcher."""
+import asyncio
+
+import pytest
+
+from shared.tools import MicroBatcher
+
+
+def test_concurrent_submits_form_one_batch_with_deduped_keys():
+    """Keys submitted in the same window go to batch_fn once, duplicates share a slot."""
+    seen = []
+    
+    def fetch(keys):
+        seen.append(list(keys))
+        return {key: key * 2 for key in keys}
+    
+    batcher = MicroBatcher(fetch, max_wait=0.01)
+    
+    async def scenario():
+        return await asyncio.gather(*(batcher.submit(k) for k in [1, 2, 2, 3]))
+    
+    assert asyncio.run(scenario()) == [2, 4, 4, 6]
+    assert seen == [[1, 2, 3]]
+    assert batcher.get_stats() == {"batches": 1, "requests": 4, "keys": 3, "avg_batch_size": 3.0}
+
+
+def test_full_batch_flushes_without_waiting():
+    """Reaching max_batch_size flushes immediately instead of waiting for the window."""
+    async def fetch(keys):
+        return {key: key for key in keys}
+    
+    batcher = MicroBatcher(fetch, max_batch_size=2, max_wait=10.0)
+    
+    async def scenario():
+        return await asyncio.wait_for(asyncio.gather(batcher.submit("a"), batcher.submit("b")), timeout=1.0)
+    
+    assert asyncio.run(scenario()) == ["a", "b"]
+
+
+def test_batch_errors_and_missing_keys_propagate():
+    """A failing batch fails every waiter; a key missing from the result raises KeyError."""
+    def failing(keys):
+        raise RuntimeError("upstream down")
+    
+    async def run(batcher, *keys):
+        return await asyncio.gather(*(batcher.submit(k) for k in keys), return_exceptions=True)
+    
+    results = asyncio.run(run(MicroBatcher(failing), "a", "b"))
+    assert all(isinstance(r, RuntimeError) for r in results)
+    
+    results = asyncio.run(run(MicroBatcher(lambda keys: {"a": 1}), "a", "b"))
+    assert results[0] == 1
+    assert isinstance(results[1], KeyError)
+
+
+def test_invalid_batch_size():
+    """max_batch_size must be positive."""
+    with pytest.raises(ValueError):
+        MicroBatcher(lambda keys: {}, max_batch_size=0)
@@ -0,0 +1,71 @@
+"""Unit tests for the offline benchmark fakes and suite runner."""
+import asyncio
+import sys
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from apps.parallel_tool_use.tests.fakes import FakeTavilyClient, FakeYfData, LatencyModel, ScriptedChatModel
+from benchmarks.bench_suite import SCENARIOS, load_app, run_case
+
+
+def test_latency_model_is_deterministic_per_key():
+    """The same key draws the same latency; different keys and seeds spread out."""
+    latency = LatencyModel.parse("lognormal:0.2:0.5", seed=1)
+
+    assert latency.sample("llm:q:0") == latency.sample("llm:q:0")
+    assert len({latency.sample(f"llm:q:{turn}") for turn in range(10)}) == 10
+    assert LatencyModel.parse("lognormal:0.2:0.5", seed=2).sample("llm:q:0") != latency.sample("llm:q:0")
+    assert LatencyModel.parse("0.3").sample("anything") == 0.3
+    assert 0.1 <= LatencyModel.parse("uniform:0.1:0.2").sample("k") <= 0.2
+    with pytest.raises(ValueError):
+        LatencyModel.parse("gamma:1:2")
+
+
+def test_scripted_model_follows_plan_then_answers():
+    """Each AI turn returns the next planned tool calls; after the plan it answers."""
+    model = ScriptedChatModel(plan=SCENARIOS["deep_loop"][:2], answer="final")
+    messages = [HumanMessage(content="q")]
+
+    for turn in range(2):
+        reply = model.invoke(messages)
+        assert [call["name"] for call in reply.tool_calls] == [SCENARIOS["deep_loop"][turn][0][0]]
+        messages += [reply, ToolMessage(content="1", tool_call_id=reply.tool_calls[0]["id"])]
+
+    final = asyncio.run(model.ainvoke(messages))
+    assert isinstance(final, AIMessage) and final.content == "final" and not final.tool_calls
+    assert model.calls == 3
+
+
+def test_fake_upstreams_answer_offline():
+    """Fake yfinance and Tavily return well-formed, stable payloads."""
+    quotes = FakeYfData().get_raw_json("url", params={"symbols": "NVDA,aapl"})["quoteResponse"]["result"]
+    assert [q["symbol"] for q in quotes] == ["NVDA", "AAPL"]
+    assert quotes[0]["regularMarketPrice"] == FakeYfData().get_raw_json("url", params={"symbols": "NVDA"})[
+        "quoteResponse"]["result"][0]["regularMarketPrice"]
+
+    tavily = FakeTavilyClient(max_results=2)
+    assert len(asyncio.run(tavily.asearch("latest news about NVIDIA"))) == 2
+    assert tavily.requests.total == 1
+
+
+def test_run_case_drives_the_full_app():
+    """A tiny suite case runs every planned tool call through /run without errors."""
+    sys.modules.pop("apps.parallel_tool_use.app", None)
+    model = ScriptedChatModel()
+    tavily = FakeTavilyClient()
+    app_module = load_app(model)
+    app_module.tavily_client = tavily
+    app_module.tool_cache.enabled = False
+
+    try:
+        with patch.object(app_module, "YfData", FakeYfData):
+            result = run_case(app_module, model, tavily, "parallel_tools", concurrency=2, requests=4)
+    finally:
+        sys.modules.pop("apps.parallel_tool_use.app", None)
+
+    assert result["errors"] == 0
+    assert result["llm_calls"] == 8
+    assert result["upstream_calls"] >= 2 * 4  # two news searches per request; quotes may batch
+    assert result["latency_seconds"]["p50"] <= result["latency_seconds"]["p99"]
@@ -0,0 +1,54 @@
+"""Unit tests for per-request execution budgets."""
+import time
+
+from langchain_core.messages import AIMessage
+
+from shared.agents import ExecutionBudget
+from shared.config import BaseConfig
+
+
+def test_request_overrides_only_tighten_config_limits():
+    """Overrides below the server limit apply; higher ones and None keep the server limit."""
+    config = BaseConfig(agent_max_llm_turns=8, agent_max_tool_calls=24, agent_max_tokens=None, agent_deadline_seconds=60.0)
+
+    budget = ExecutionBudget.from_config(config, max_llm_turns=3, max_tool_calls=100, max_tokens=5000)
+
+    assert budget.max_llm_turns == 3
+    assert budget.max_tool_calls == 24
+    assert budget.max_tokens == 5000
+    assert budget.deadline_seconds == 60.0
+
+
+def test_exhaustion_by_turns_tokens_and_deadline():
+    """Each limit reports itself once reached; unset limits are never exhausted."""
+    assert ExecutionBudget().exhausted() is None
+
+    turns = ExecutionBudget(max_llm_turns=1)
+    turns.record_llm_turn(AIMessage(content="x"))
+    assert turns.exhausted() == "llm_turns"
+
+    tokens = ExecutionBudget(max_tokens=100)
+    tokens.record_llm_turn(AIMessage(
+        content="x", usage_metadata={"input_tokens": 80, "output_tokens": 30, "total_tokens": 110}
+    ))
+    assert tokens.tokens == 110 and tokens.exhausted() == "tokens"
+
+    deadline = ExecutionBudget(deadline_seconds=0.01)
+    time.sleep(0.02)
+    assert deadline.exhausted() == "deadline" and deadline.remaining_seconds() == 0.0
+
+
+def test_tool_call_allowance_and_report():
+    """Tool calls are admitted per turn against the remaining allowance; the report shows usage."""
+    budget = ExecutionBudget(max_tool_calls=4)
+    assert budget.allows_tool_calls(3)
+    budget.record_tool_calls(3)
+    assert not budget.allows_tool_calls(2)
+
+    budget.stop("tool_calls")
+    budget.stop("deadline")
+    report = budget.to_dict()
+
+    assert report["exhausted"] == "tool_calls"
+    assert report["limits"]["tool_calls"] == 4
+    assert report["used"]["tool_calls"] == 3
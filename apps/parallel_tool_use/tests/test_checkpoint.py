@@ -0,0 +1,169 @@
+"""Unit tests for the persistent checkpoint stores."""
+import asyncio
+import os
+import time
+from typing import Annotated, List, TypedDict
+
+import pytest
+from langgraph.channels.delta import DeltaChannel
+from langgraph.graph import END, StateGraph
+
+from shared.agents import FileCheckpointSaver, SQLiteCheckpointSaver, append_reducer, checkpointer_from_config
+from shared.config import BaseConfig
+
+
+class _State(TypedDict):
+    items: Annotated[List[str], DeltaChannel(append_reducer)]
+
+
+def _graph(steps: List[int], fail_at: int = -1, length: int = 6):
+    """Graph appending one large item per step until ``length`` items; step ``fail_at`` raises."""
+    def step(state):
+        steps.append(len(state["items"]))
+        if len(steps) == fail_at:
+            raise RuntimeError("worker crashed")
+        return {"items": ["x" * 1000]}
+
+    builder = StateGraph(_State)
+    builder.add_node("step", step)
+    builder.set_entry_point("step")
+    builder.add_conditional_edges("step", lambda s: END if len(s["items"]) >= length else "step", {"step": "step", END: END})
+    return builder
+
+
+@pytest.fixture(params=["sqlite", "file"])
+def open_saver(request, tmp_path):
+    """Factory opening the same on-disk store again, as a restarted process would."""
+    if request.param == "sqlite":
+        return lambda: SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"))
+    return lambda: FileCheckpointSaver(str(tmp_path / "checkpoints"))
+
+
+def test_interrupted_run_resumes_after_restart(open_saver):
+    """Completed steps survive a crash and are not run again when the thread resumes."""
+    steps: List[int] = []
+    config = {"configurable": {"thread_id": "run-1"}}
+
+    with pytest.raises(RuntimeError):
+        _graph(steps, fail_at=3).compile(checkpointer=open_saver()).invoke({"items": ["q"]}, config)
+
+    restarted = _graph(steps).compile(checkpointer=open_saver())
+    assert restarted.get_state(config).next == ("step",)
+    final = asyncio.run(restarted.ainvoke(None, config))
+
+    assert len(final["items"]) == 6
+    assert steps == [1, 2, 3, 3, 4, 5]  # only the failed step ran twice
+
+
+def test_steps_store_only_their_own_writes(tmp_path):
+    """Append-only state is stored as per-step writes, not re-serialized each step."""
+    saver = SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"))
+    config = {"configurable": {"thread_id": "run-1"}}
+    _graph([], length=20).compile(checkpointer=saver).invoke({"items": ["q"]}, config)
+
+    stored_values = saver._conn.execute(
+        "SELECT COUNT(*) FROM blobs WHERE channel = 'items' AND type != 'empty'"
+    ).fetchone()[0]
+    write_bytes = saver._conn.execute("SELECT SUM(LENGTH(value)) FROM writes WHERE channel = 'items'").fetchone()[0]
+
+    assert stored_values == 0
+    # 19 steps of ~1 KB each: linear, where full snapshots would be ~190 KB
+    assert write_bytes < 19 * 1200
+
+
+def test_list_and_delete_thread(open_saver):
+    """Checkpoints are listed newest first and deleting a thread removes them."""
+    saver = open_saver()
+    graph = _graph([], length=3).compile(checkpointer=saver)
+    for thread_id in ("a", "b"):
+        graph.invoke({"items": ["q"]}, {"configurable": {"thread_id": thread_id}})
+
+    history = list(saver.list({"configurable": {"thread_id": "a"}}))
+    assert len(history) >= 3
+    assert [h.checkpoint["id"] for h in history] == sorted((h.checkpoint["id"] for h in history), reverse=True)
+    assert len(list(saver.list({"configurable": {"thread_id": "a"}}, limit=2))) == 2
+
+    saver.delete_thread("a")
+    assert open_saver().get_tuple({"configurable": {"thread_id": "a"}}) is None
+    assert open_saver().get_tuple({"configurable": {"thread_id": "b"}}) is not None
+
+
+def test_file_store_drops_a_torn_record(tmp_path):
+    """A record cut short by a crash mid-append is dropped; earlier steps still load."""
+    directory = str(tmp_path / "checkpoints")
+    config = {"configurable": {"thread_id": "run-1"}}
+    saver = FileCheckpointSaver(directory)
+    _graph([], length=4).compile(checkpointer=saver).invoke({"items": ["q"]}, config)
+    path = saver._path("run-1")
+    size = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write(b"\x80\x05\x95partial")
+
+    state = _graph([], length=4).compile(checkpointer=FileCheckpointSaver(directory)).get_state(config)
+
+    assert len(state.values["items"]) == 4
+    assert os.path.getsize(path) == size  # later appends are not hidden behind the torn bytes
+
+
+def test_file_store_keeps_similar_thread_ids_apart(tmp_path):
+    """Thread ids differing only in punctuation get their own files and are listed back exactly."""
+    directory = str(tmp_path / "checkpoints")
+    for thread_id, items in (("alice/1", ["secret"]), ("alice_1", ["public"])):
+        _graph([], length=2).compile(checkpointer=FileCheckpointSaver(directory)).invoke(
+            {"items": items}, {"configurable": {"thread_id": thread_id}}
+        )
+
+    saver = FileCheckpointSaver(directory)
+    graph = _graph([], length=2).compile(checkpointer=saver)
+
+    assert graph.get_state({"configurable": {"thread_id": "alice_1"}}).values["items"][0] == "public"
+    assert graph.get_state({"configurable": {"thread_id": "alice/1"}}).values["items"][0] == "secret"
+    assert graph.get_state({"configurable": {"thread_id": "alice 1"}}).values == {}
+    assert {t.config["configurable"]["thread_id"] for t in FileCheckpointSaver(directory).list(None)} == {"alice/1", "alice_1"}
+
+
+def test_one_run_at_a_time_holds_a_thread(open_saver):
+    """A thread's lease excludes other runs until released or expired, and each checkpoint renews it."""
+    saver, other = open_saver(), open_saver()
+    assert saver.claim_thread("t", "run-a", ttl=60)
+    assert saver.claim_thread("t", "run-a", ttl=60)  # re-entrant for the owner
+    if isinstance(saver, SQLiteCheckpointSaver):
+        # Another process sharing the database is excluded too
+        assert not other.claim_thread("t", "run-b", ttl=60)
+    assert not saver.claim_thread("t", "run-b", ttl=60)
+
+    saver.release_thread("t", "run-a")
+    assert saver.claim_thread("t", "run-b", ttl=0.05)
+    _graph([], length=3).compile(checkpointer=saver).invoke({"items": ["q"]}, {"configurable": {"thread_id": "t"}})
+    assert not saver.claim_thread("t", "run-c", ttl=60)  # renewed by the run's checkpoints
+    time.sleep(0.1)
+    assert saver.claim_thread("t", "run-c", ttl=60)  # a crashed run's lease runs out
+
+
+def test_idle_threads_are_pruned(open_saver, tmp_path):
+    """Threads with no checkpoint for longer than the retention period are deleted."""
+    saver = open_saver()
+    saver.retention = type(saver.retention)(60.0)
+    graph = _graph([], length=2).compile(checkpointer=saver)
+    for thread_id in ("old", "new"):
+        graph.invoke({"items": ["q"]}, {"configurable": {"thread_id": thread_id}})
+    if isinstance(saver, SQLiteCheckpointSaver):
+        saver._conn.execute("UPDATE threads SET updated_at = updated_at - 120 WHERE thread_id = 'old'")
+    else:
+        path = saver._path("old")
+        os.utime(path, (time.time() - 120, time.time() - 120))
+
+    assert saver.prune() == 1
+    assert graph.get_state({"configurable": {"thread_id": "old"}}).values == {}
+    assert graph.get_state({"configurable": {"thread_id": "new"}}).values["items"]
+
+
+def test_checkpointer_from_config(tmp_path):
+    """The backend setting selects the store; none disables checkpointing."""
+    assert checkpointer_from_config(BaseConfig(checkpoint_backend="none")) is None
+    # Nothing is written to disk unless a persistent store is configured
+    assert type(checkpointer_from_config(BaseConfig())).__name__ == "InMemorySaver"
+    saver = checkpointer_from_config(BaseConfig(checkpoint_backend="sqlite", checkpoint_path=str(tmp_path / "c.sqlite")))
+    assert isinstance(saver, SQLiteCheckpointSaver)
+    with pytest.raises(ValueError):
+        checkpointer_from_config(BaseConfig(checkpoint_backend="postgres"))
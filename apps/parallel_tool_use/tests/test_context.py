@@ -0,0 +1,125 @@
+"""Unit tests for prompt context compaction."""
+import json
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from shared.agents import ContextCompactor, TokenCounter
+from shared.agents.context import shorten_tool_output
+
+
+def _news(company: str, articles: int = 5, chars: int = 1500) -> str:
+    return json.dumps([
+        {"title": f"{company} headline {i}", "url": f"https://news.example.com/{i}", "content": "x" * chars}
+        for i in range(articles)
+    ])
+
+
+def _turn(turn: int, name: str, content: str) -> list:
+    call_id = f"call_{turn}"
+    return [
+        AIMessage(content="", tool_calls=[{"name": name, "args": {"turn": turn}, "id": call_id, "type": "tool_call"}]),
+        ToolMessage(content=content, tool_call_id=call_id, name=name),
+    ]
+
+
+def test_token_counter_memoizes_and_falls_back_to_estimate():
+    """The approximate counter charges a token per four characters and caches counts."""
+    counter = TokenCounter("approx")
+
+    assert counter.count("x" * 400) == 100
+    assert counter.count("x" * 400) == 100
+    assert list(counter._cache) == ["x" * 400]
+    assert counter.count_message(HumanMessage(content="abcd")) == 1 + 4
+
+    missing = TokenCounter("no-such-encoding")
+    assert missing.count("x" * 40) == 10
+
+
+def test_json_tool_output_keeps_every_item():
+    """Long search results are cut per field so every article survives."""
+    shortened = shorten_tool_output(_news("NVIDIA"), max_chars=2000)
+
+    articles = json.loads(shortened)
+    assert len(shortened) <= 2000
+    assert [a["title"] for a in articles] == [f"NVIDIA headline {i}" for i in range(5)]
+    assert shorten_tool_output("short", max_chars=10) == "short"
+    assert shorten_tool_output("y" * 50, max_chars=10).startswith("y" * 10 + "... [40 more characters")
+
+
+def test_repeated_tool_results_are_sent_once():
+    """An identical result from the same tool becomes a pointer to the first call."""
+    news = _news("NVIDIA", chars=100)
+    messages = [HumanMessage(content="q")] + _turn(0, "news", news) + _turn(1, "news", news)
+
+    context = ContextCompactor(max_tokens=None, token_counter=TokenCounter("approx")).compact(messages)
+
+    assert context.deduplicated == 1
+    assert context.messages[2].content == news
+    assert context.messages[4].content == "[Same result as the earlier news call call_0]"
+    assert context.messages[4].tool_call_id == "call_1"
+    assert messages[4].content == news  # history itself is untouched
+    assert context.tokens_after < context.tokens_before
+
+
+def test_window_drops_oldest_turns_and_keeps_pairs():
+    """Over the token budget, whole old turns go; the system prompt and query stay."""
+    history = [SystemMessage(content="sys"), HumanMessage(content="question")]
+    for turn in range(10):
+        history += _turn(turn, "quote", f"price {turn} " + "z" * 400)
+
+    context = ContextCompactor(max_tokens=400, max_tool_chars=None, token_counter=TokenCounter("approx")).compact(history)
+
+    kept = context.messages
+    assert kept[:2] == history[:2]
+    assert context.tokens_after <= 400
+    assert context.dropped > 0 and len(kept) == len(history) - context.dropped
+    assert kept[-1] is history[-1]
+    # Every tool result still follows the AI message that requested it
+    for index, message in enumerate(kept):
+        if isinstance(message, ToolMessage):
+            assert kept[index - 1].tool_calls[0]["id"] == message.tool_call_id
+
+
+def test_window_keeps_the_latest_question_on_a_multi_turn_thread():
+    """The newest user message survives even when the tool turns after it fill the budget."""
+    history = [SystemMessage(content="sys"), HumanMessage(content="first question")]
+    for turn in range(3):
+        history += _turn(turn, "quote", f"price {turn} " + "z" * 400)
+    history += [AIMessage(content="first answer"), HumanMessage(content="follow-up question")]
+    for turn in range(3, 10):
+        history += _turn(turn, "quote", f"price {turn} " + "z" * 400)
+
+    context = ContextCompactor(max_tokens=400, max_tool_chars=None, token_counter=TokenCounter("approx")).compact(history)
+
+    kept = context.messages
+    assert kept[:2] == history[:2]
+    assert kept[2].content == "follow-up question"
+    assert kept[-1] is history[-1] and isinstance(kept[3], AIMessage)
+    assert len(kept) == len(history) - context.dropped
+
+
+def test_duplicate_keeps_its_content_when_the_original_is_windowed_out():
+    """A repeated result is not reduced to a reference to a turn the window dropped."""
+    news = _news("NVIDIA", articles=2, chars=300)
+    history = [HumanMessage(content="question")] + _turn(0, "news", news)
+    for turn in range(1, 6):
+        history += _turn(turn, "quote", f"price {turn} " + "z" * 400)
+    history += _turn(6, "news", news) + _turn(7, "news", news)
+
+    context = ContextCompactor(max_tokens=700, max_tool_chars=None, token_counter=TokenCounter("approx")).compact(history)
+
+    kept = {m.tool_call_id: m.content for m in context.messages if isinstance(m, ToolMessage)}
+    assert "call_0" not in kept
+    assert kept["call_6"] == news
+    assert kept["call_7"] == "[Same result as the earlier news call call_6]"
+    assert context.deduplicated == 1
+
+
+def test_disabled_compactor_passes_messages_through():
+    """With compaction off the prompt is the history, but tokens are still counted."""
+    messages = [HumanMessage(content="q")] + _turn(0, "news", _news("NVIDIA"))
+
+    context = ContextCompactor(enabled=False, token_counter=TokenCounter("approx")).compact(messages)
+
+    assert context.messages is messages
+    assert not context.changed and context.tokens_before > 0
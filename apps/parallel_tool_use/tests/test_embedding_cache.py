@@ -0,0 +1,116 @@
+"""Unit tests for the persistent embedding cache and memory-mapped index loading."""
+import os
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from shared.config import BaseConfig
+from shared.retrieval import CachedEmbeddings, EmbeddingCache, ExactIndex, VectorShard, build_flat_index, load_index, save_index
+
+
+class _CountingEmbeddings(Embeddings):
+    """Deterministic embeddings that record every text they embed."""
+
+    model_name = "counting-v1"
+
+    def __init__(self, dim: int = 8):
+        self.dim = dim
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        rng = np.random.default_rng(sum(map(ord, text)))
+        return rng.normal(size=self.dim).tolist()
+
+
+def test_only_new_and_changed_texts_are_embedded(tmp_path):
+    """Cached texts are served from disk, also after reopening the cache."""
+    model = _CountingEmbeddings()
+    cached = CachedEmbeddings(model, EmbeddingCache(str(tmp_path)))
+    first = cached.embed_matrix(["a", "b", "a"])
+    assert model.embedded == ["a", "b"]  # duplicates in a batch are embedded once
+    assert np.allclose(first[0], first[2])
+
+    reopened = CachedEmbeddings(model, EmbeddingCache(str(tmp_path)))
+    again = reopened.embed_documents(["b", "a", "c (changed)"])
+
+    assert model.embedded == ["a", "b", "c (changed)"]
+    assert np.allclose(again[1], first[0], atol=1e-6)
+    assert reopened.get_stats()["hits"] == 2 and reopened.get_stats()["misses"] == 1
+    assert len(reopened.cache) == 3
+
+
+def test_namespaces_and_dtype_are_kept_apart(tmp_path):
+    """Another model never gets this model's vectors; float16 halves the stored bytes."""
+    model = _CountingEmbeddings()
+    cache = EmbeddingCache(str(tmp_path / "f16"), dtype="float16")
+    CachedEmbeddings(model, cache).embed_matrix(["a"])
+    CachedEmbeddings(model, cache, namespace="other-model").embed_matrix(["a"])
+
+    assert model.embedded == ["a", "a"]
+    assert os.path.getsize(tmp_path / "f16" / "vectors.float16") == 2 * 8 * 2
+    with pytest.raises(ValueError):
+        EmbeddingCache(str(tmp_path / "f16"), dtype="float32")
+
+
+def test_rows_appended_by_another_process_are_picked_up(tmp_path):
+    """A second cache on the same directory sees the first one's appends without re-embedding."""
+    model = _CountingEmbeddings()
+    writer = CachedEmbeddings(model, EmbeddingCache(str(tmp_path)))
+    reader = CachedEmbeddings(model, EmbeddingCache(str(tmp_path)))
+
+    writer.embed_matrix(["x", "y"])
+    reader.embed_matrix(["y", "x"])
+
+    assert model.embedded == ["x", "y"]
+
+
+def test_torn_append_is_ignored_and_overwritten(tmp_path):
+    """Bytes of an interrupted append are not read as a row and are replaced by the next one."""
+    model = _CountingEmbeddings()
+    CachedEmbeddings(model, EmbeddingCache(str(tmp_path))).embed_matrix(["a"])
+    with open(tmp_path / "vectors.float32", "ab") as f:
+        f.write(b"\x00" * 12)
+
+    cached = CachedEmbeddings(model, EmbeddingCache(str(tmp_path)))
+    assert len(cached.cache) == 1
+    vectors = cached.embed_matrix(["b", "a"])
+
+    assert np.allclose(vectors[0], model.embed_query("b"), atol=1e-6)
+    assert os.path.getsize(tmp_path / "vectors.float32") == 2 * 8 * 4
+
+
+def test_embedding_cache_from_config(tmp_path):
+    """The cache directory and dtype come from the retrieval settings."""
+    config = BaseConfig(retrieval_embedding_cache_dir=str(tmp_path), retrieval_embedding_cache_dtype="float16")
+    cached = CachedEmbeddings.from_config(config, _CountingEmbeddings())
+
+    assert cached.namespace == "counting-v1"
+    assert cached.cache.dtype == np.float16
+
+
+def test_saved_index_and_shard_load_memory_mapped(tmp_path):
+    """A saved index is mapped, not read, and searches like the original."""
+    vectors = np.random.default_rng(0).normal(size=(50, 8)).astype(np.float32)
+    index = build_flat_index(vectors, metric="l2", backend="numpy")
+    save_index(index, str(tmp_path / "flat.bin"))
+
+    loaded = load_index(str(tmp_path / "flat.bin"))
+
+    assert isinstance(loaded, ExactIndex) and isinstance(loaded._vectors, np.memmap)
+    assert loaded.metric == "l2"
+    assert np.array_equal(loaded.search(vectors[:3], 5)[1], index.search(vectors[:3], 5)[1])
+
+    documents = [Document(page_content=f"doc {i}", metadata={"i": i}) for i in range(50)]
+    shard = VectorShard.from_vectors("s", vectors, documents, backend="numpy")
+    shard.save(str(tmp_path / "shard"))
+    restored = VectorShard.load("s", str(tmp_path / "shard"))
+
+    assert restored.documents == documents
+    assert np.allclose(restored.centroid, shard.centroid)
+    assert [hit.document for hit in restored.search(vectors[7], 3)] == [hit.document for hit in shard.search(vectors[7], 3)]
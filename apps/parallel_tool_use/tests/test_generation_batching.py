@@ -0,0 +1,83 @@
+"""Unit tests for the shared Hugging Face generation batching gateway."""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from shared.llm import GenerationBatcher
+
+
+class FakePipeline:
+    """Stand-in for a transformers text-generation pipeline that records batch sizes."""
+
+    task = "text-generation"
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+        self.lock = threading.Lock()
+
+    def __call__(self, prompts, batch_size=1, **kwargs):
+        with self.lock:
+            self.batches.append((list(prompts), batch_size, kwargs))
+        if self.fail:
+            raise RuntimeError("out of memory")
+        suffix = kwargs.get("suffix", "!")
+        return [[{"generated_text": f"{prompt}{suffix}"}] for prompt in prompts]
+
+
+def test_concurrent_prompts_share_one_batch():
+    """Prompts arriving within the wait window run in one pipeline call."""
+    pipe = FakePipeline()
+    batcher = GenerationBatcher(pipe, max_batch_size=8, max_wait=0.2)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        outputs = list(pool.map(batcher, ["a", "b", "c", "d"]))
+    batcher.close()
+
+    assert outputs == [[{"generated_text": f"{p}!"}] for p in "abcd"]
+    assert len(pipe.batches) == 1
+    prompts, batch_size, _ = pipe.batches[0]
+    assert sorted(prompts) == ["a", "b", "c", "d"]
+    assert batch_size == 4
+    assert batcher.get_stats()["largest_batch"] == 4
+
+
+def test_batches_are_capped_and_grouped_by_kwargs():
+    """Batches respect max_batch_size and never mix generation kwargs."""
+    pipe = FakePipeline()
+    batcher = GenerationBatcher(pipe, max_batch_size=2, max_wait=0.1)
+
+    futures = [batcher.submit(p) for p in "abc"] + [batcher.submit("d", suffix="?")]
+    results = [f.result(timeout=2) for f in futures]
+    batcher.close()
+
+    assert results[-1] == [{"generated_text": "d?"}]
+    assert all(len(prompts) <= 2 for prompts, _, _ in pipe.batches)
+    assert all(
+        kwargs == ({"suffix": "?"} if prompts == ["d"] else {})
+        for prompts, _, kwargs in pipe.batches
+    )
+
+
+def test_pipeline_errors_fail_every_request_in_the_batch():
+    """An exception in the pipeline is delivered to each waiting caller."""
+    batcher = GenerationBatcher(FakePipeline(fail=True), max_wait=0.05)
+
+    async def generate():
+        return await asyncio.gather(batcher.agenerate("a"), batcher.agenerate("b"), return_exceptions=True)
+
+    errors = asyncio.run(generate())
+    batcher.close()
+
+    assert all(isinstance(e, RuntimeError) for e in errors)
+
+
+def test_batcher_proxies_pipeline_attributes():
+    """Attributes like ``task`` are read from the wrapped pipeline."""
+    batcher = GenerationBatcher(FakePipeline())
+    assert batcher.task == "text-generation"
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit("late")
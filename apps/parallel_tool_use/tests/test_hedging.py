@@ -0,0 +1,107 @@
+"""Unit tests for the shared hedged execution primitive."""
+import asyncio
+
+import pytest
+from langchain_core.tools import StructuredTool
+
+from shared.agents import Hedger, LatencyTracker
+
+
+def test_latency_tracker_percentile():
+    """Percentile is taken over the rolling window."""
+    tracker = LatencyTracker(window=100)
+    assert tracker.percentile(0.95) is None
+    for i in range(1, 101):
+        tracker.record(i / 100)
+    assert tracker.percentile(0.95) == 0.96
+
+
+def test_backup_wins_and_loser_is_cancelled():
+    """A slow first attempt is beaten by the backup and then cancelled."""
+    hedger = Hedger(default_delay=0.02, min_delay=0.0, burst=1.0)
+    delays = iter([5.0, 0.01])
+    cancelled = []
+    
+    async def call():
+        delay = next(delays)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(delay)
+            raise
+        return delay
+    
+    result = asyncio.run(asyncio.wait_for(hedger.run(call, key="news"), timeout=1.0))
+    
+    assert result == 0.01
+    assert cancelled == [5.0]
+    stats = hedger.get_stats()["news"]
+    assert stats["hedges"] == 1
+    assert stats["backup_wins"] == 1
+    assert stats["cancelled"] == 1
+
+
+def test_fast_calls_are_not_hedged():
+    """Calls finishing before the hedge delay never send a backup."""
+    hedger = Hedger(default_delay=1.0)
+    calls = []
+    
+    async def call():
+        calls.append(1)
+        return "ok"
+    
+    async def scenario():
+        return [await hedger.run(call) for _ in range(5)]
+    
+    assert asyncio.run(scenario()) == ["ok"] * 5
+    assert len(calls) == 5
+    assert hedger.get_stats()["default"]["hedges"] == 0
+
+
+def test_hedge_rate_is_capped():
+    """Without budget, slow calls wait for the first attempt instead of hedging."""
+    hedger = Hedger(default_delay=0.0, min_delay=0.001, max_hedge_rate=0.1, burst=1.0)
+    
+    async def slow():
+        await asyncio.sleep(0.01)
+        return "ok"
+    
+    async def scenario():
+        return [await hedger.run(slow) for _ in range(10)]
+    
+    asyncio.run(scenario())
+    # The bucket starts full (one hedge); ten calls only earn ~0.9 more tokens
+    assert hedger.get_stats()["default"]["hedges"] == 1
+
+
+def test_failure_falls_over_to_backup_and_all_failures_raise():
+    """A failing attempt starts a backup; if every attempt fails the error is raised."""
+    hedger = Hedger(default_delay=10.0, burst=2.0)
+    outcomes = iter([RuntimeError("first"), "second"])
+    
+    async def flaky():
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    
+    assert asyncio.run(hedger.run(flaky)) == "second"
+    
+    async def always_fails():
+        raise RuntimeError("down")
+    
+    with pytest.raises(RuntimeError, match="down"):
+        asyncio.run(hedger.run(always_fails))
+
+
+def test_wrap_tool_keeps_schema():
+    """Wrapped tools keep their name and arguments."""
+    async def lookup(symbol: str) -> str:
+        return symbol
+    
+    tool = StructuredTool.from_function(coroutine=lookup, name="lookup", description="Look up")
+    wrapped = Hedger().wrap_tool(tool)
+    
+    assert wrapped.name == "lookup"
+    assert wrapped.args == tool.args
+    assert asyncio.run(wrapped.ainvoke({"symbol": "AAPL"})) == "AAPL"
@@ -0,0 +1,99 @@
+"""Unit tests for the shared HTTP client pool."""
+import asyncio
+import threading
+import time
+
+import httpx
+
+from shared.tools import HTTPClientPool
+
+
+def test_sync_client_is_reused():
+    """The same client (and connection pool) serves every sync request."""
+    pool = HTTPClientPool()
+    assert pool.client is pool.client
+    pool.close()
+
+
+def test_per_host_limit_caps_concurrency():
+    """No more than the host limit of requests run against one host at a time."""
+    pool = HTTPClientPool(per_host_limit=10, host_limits={"slow.test": 2})
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return httpx.Response(200)
+    
+    pool._client = httpx.Client(transport=httpx.MockTransport(handler))
+    threads = [threading.Thread(target=pool.request, args=("GET", "https://slow.test/x")) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    
+    assert peak == 2
+
+
+def test_async_client_follows_event_loop_and_warms():
+    """Warm-up connects through the shared async client; a new loop gets a fresh client."""
+    pool = HTTPClientPool(per_host_limit=1)
+    seen = []
+    
+    async def scenario():
+        client = pool.async_client
+        client._transport = httpx.MockTransport(lambda request: seen.append(request.method) or httpx.Response(405))
+        result = await pool.warm(["https://api.example.test"])
+        assert pool.async_client is client
+        await pool.aclose()
+        return result
+    
+    assert asyncio.run(scenario()) == {"https://api.example.test": True}
+    assert seen == ["HEAD"]
+    
+    async def other_loop():
+        return pool.async_client
+    
+    assert asyncio.run(other_loop()) is not None
+
+
+def test_client_replaced_by_another_loop_is_closed():
+    """The old loop's client is closed on that loop if it still runs, else at aclose()."""
+    pool = HTTPClientPool()
+    
+    async def get_client():
+        return pool.async_client
+    
+    running = asyncio.new_event_loop()
+    thread = threading.Thread(target=running.run_forever, daemon=True)
+    thread.start()
+    live = asyncio.run_coroutine_threadsafe(get_client(), running).result(timeout=2)
+    
+    async def replace():
+        return pool.async_client
+    
+    asyncio.run(replace())
+    deadline = time.monotonic() + 2
+    while not live.is_closed and time.monotonic() < deadline:
+        time.sleep(0.01)
+    running.call_soon_threadsafe(running.stop)
+    thread.join(timeout=2)
+    running.close()
+    assert live.is_closed
+    
+    finished = asyncio.run(get_client())
+    
+    async def replace_and_shut_down():
+        current = pool.async_client
+        await pool.aclose()
+        return current
+    
+    current = asyncio.run(replace_and_shut_down())
+    assert finished.is_closed and current.is_closed
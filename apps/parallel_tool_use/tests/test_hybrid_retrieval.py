@@ -0,0 +1,126 @@
+"""Unit tests for hybrid retrieval and rank fusion."""
+import asyncio
+import time
+from typing import List
+
+import pytest
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from shared.retrieval import (
+    HybridRetriever,
+    KeywordRetriever,
+    normalized_score_fusion,
+    reciprocal_rank_fusion,
+)
+
+A, B, C, D = (Document(page_content=text) for text in ("alpha", "bravo", "charlie", "delta"))
+
+
+class _FixedRetriever(BaseRetriever):
+    """Returns a fixed ranking after ``delay`` seconds, or raises ``error``."""
+
+    documents: List[Document]
+    delay: float = 0.0
+    error: str = ""
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        time.sleep(self.delay)
+        if self.error:
+            raise RuntimeError(self.error)
+        return self.documents
+
+
+def test_reciprocal_rank_fusion_rewards_agreement_and_weights():
+    """A document found by both legs beats one ranked first by only one leg."""
+    rankings = {"dense": [(A, 0.9), (B, 0.8)], "sparse": [(C, 12.0), (B, 7.0)]}
+
+    fused = reciprocal_rank_fusion(rankings, k=60)
+    assert [hit.document for hit in fused] == [B, A, C]
+    assert fused[0].ranks == {"dense": 1, "sparse": 1}
+    assert fused[0].score == pytest.approx(2 / 62)
+
+    weighted = reciprocal_rank_fusion(rankings, weights={"sparse": 3.0}, k=60)
+    assert [hit.document for hit in weighted] == [B, C, A]
+
+
+def test_normalized_score_fusion_scales_each_leg():
+    """Scores on different scales are min-max normalized before summing."""
+    rankings = {"dense": [(A, 0.9), (B, 0.5), (D, 0.1)], "sparse": [(B, 20.0), (C, 10.0), (A, 0.0)]}
+
+    fused = normalized_score_fusion(rankings)
+
+    scores = {hit.document.page_content: hit.score for hit in fused}
+    assert scores == pytest.approx({"alpha": 1.0, "bravo": 1.5, "charlie": 0.5, "delta": 0.0})
+
+
+def test_fusion_matches_documents_when_only_one_leg_has_ids():
+    """Ids are used only when every result has one; otherwise both legs are matched by text."""
+    with_id = Document(id="doc-a", page_content="alpha")
+    mixed = {"dense": [(with_id, 0.9), (B, 0.5)], "sparse": [(A, 3.0)]}
+
+    fused = reciprocal_rank_fusion(mixed)
+    assert len(fused) == 2 and fused[0].ranks == {"dense": 0, "sparse": 0}
+    assert normalized_score_fusion(mixed)[0].ranks == {"dense": 0, "sparse": 0}
+
+    same_text = {"dense": [(with_id, 0.9)], "sparse": [(Document(id="doc-b", page_content="alpha"), 3.0)]}
+    assert len(reciprocal_rank_fusion(same_text)) == 2
+
+
+def test_legs_run_concurrently():
+    """Two slow legs take about as long as one."""
+    retriever = HybridRetriever(
+        retrievers={
+            "dense": _FixedRetriever(documents=[A, B], delay=0.3),
+            "sparse": _FixedRetriever(documents=[B, C], delay=0.3),
+        },
+        k=3,
+    )
+
+    started = time.perf_counter()
+    result = retriever.search("q")
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.5
+    assert result.documents == [B, A, C]
+    assert set(result.leg_seconds) == {"dense", "sparse"}
+    assert all(seconds >= 0.3 for seconds in result.leg_seconds.values())
+    retriever.close()
+
+
+def test_slow_or_failing_leg_degrades_to_the_other():
+    """The answer comes from the legs that finished before the deadline."""
+    retriever = HybridRetriever(
+        retrievers={
+            "dense": _FixedRetriever(documents=[A], delay=1.0),
+            "sparse": _FixedRetriever(documents=[C, B]),
+            "broken": _FixedRetriever(documents=[], error="index offline"),
+        },
+        timeout=0.2,
+    )
+
+    started = time.perf_counter()
+    result = retriever.search("q")
+
+    assert time.perf_counter() - started < 0.5
+    assert result.documents == [C, B]
+    assert result.timed_out == ["dense"]
+    assert result.failed == {"broken": "index offline"}
+    assert retriever.get_stats() == {"queries": 1, "timed_out": {"dense": 1}, "failed": {"broken": 1}}
+    retriever.close()
+
+
+def test_ainvoke_fuses_keyword_scores():
+    """The async path runs the legs off the event loop and fuses keyword scores."""
+    keyword = KeywordRetriever.from_documents([A, B, Document(page_content="bravo bravo charlie")], k=2)
+    retriever = HybridRetriever(
+        retrievers={"dense": _FixedRetriever(documents=[A], delay=0.05), "sparse": keyword},
+        fusion="score",
+        timeout=1.0,
+    )
+
+    documents = asyncio.run(retriever.ainvoke("bravo"))
+
+    # The shorter keyword match has the higher BM25 score, normalized to 1.0 like the only dense hit
+    assert [doc.page_content for doc in documents] == ["alpha", "bravo", "bravo bravo charlie"]
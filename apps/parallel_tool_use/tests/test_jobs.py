@@ -0,0 +1,273 @@
+"""Unit tests for the background job manager."""
+import asyncio
+import time
+
+import pytest
+
+from shared.agents import InMemoryJobBackend, JobManager, JobQueueFull
+from shared.config import BaseConfig
+
+
+async def _wait_for(manager: JobManager, job_id: str, status: str, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = await manager.get(job_id)
+        if job is not None and job.status == status:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} never reached {status}")
+
+
+def test_jobs_run_and_keep_their_outcome():
+    """Results and errors are stored on the job record."""
+    async def runner(request):
+        if request["query"] == "boom":
+            raise RuntimeError("tool exploded")
+        return {"answer": request["query"].upper()}
+
+    async def scenario():
+        manager = JobManager(runner, max_workers=2)
+        await manager.start()
+        ok = await manager.submit({"query": "hi"})
+        bad = await manager.submit({"query": "boom"})
+        done = await _wait_for(manager, ok.id, "succeeded")
+        failed = await _wait_for(manager, bad.id, "failed")
+        stats = await manager.get_stats()
+        await manager.stop()
+        return done, failed, stats
+
+    done, failed, stats = asyncio.run(scenario())
+
+    assert done.result == {"answer": "HI"} and done.started_at >= done.submitted_at
+    assert failed.error == "tool exploded"
+    assert stats["succeeded"] == 1 and stats["failed"] == 1 and stats["queued"] == 0
+
+
+def test_full_queue_rejects_with_retry_after():
+    """Beyond max_queue waiting jobs, submit raises and leaves no record behind."""
+    async def runner(request):
+        await asyncio.sleep(10)
+
+    async def scenario():
+        manager = JobManager(runner, backend=InMemoryJobBackend(max_queue=2), max_workers=1)
+        for _ in range(2):
+            await manager.submit({})
+        with pytest.raises(JobQueueFull) as rejected:
+            await manager.submit({})
+        return rejected.value, len(manager.backend._jobs)
+
+    rejected, records = asyncio.run(scenario())
+
+    assert rejected.retry_after >= 1
+    assert records == 2
+
+
+def test_cancel_stops_a_running_job():
+    """Cancelling a running job cancels the runner's task, not just the record."""
+    reached_end = []
+
+    async def runner(request):
+        await asyncio.sleep(30)
+        reached_end.append(request)
+
+    async def scenario():
+        manager = JobManager(runner, max_workers=1)
+        await manager.start()
+        job = await manager.submit({"query": "slow"})
+        await _wait_for(manager, job.id, "running")
+        started = time.monotonic()
+        cancelled = await manager.cancel(job.id)
+        elapsed = time.monotonic() - started
+        await manager.stop()
+        return cancelled, elapsed, manager.running
+
+    cancelled, elapsed, running = asyncio.run(scenario())
+
+    assert cancelled.status == "cancelled"
+    assert elapsed < 1.0
+    assert running == 0 and reached_end == []
+
+
+def test_cancelled_queued_job_is_skipped():
+    """A job cancelled before a worker takes it never runs."""
+    ran = []
+
+    async def runner(request):
+        ran.append(request["query"])
+        return {}
+
+    async def scenario():
+        manager = JobManager(runner, max_workers=1)
+        first = await manager.submit({"query": "first"})
+        second = await manager.submit({"query": "second"})
+        await manager.cancel(first.id)
+        await manager.start()
+        await _wait_for(manager, second.id, "succeeded")
+        await manager.stop()
+        return await manager.get(first.id)
+
+    first = asyncio.run(scenario())
+
+    assert first.status == "cancelled"
+    assert ran == ["second"]
+
+
+def test_cancel_flag_from_another_replica_stops_the_job():
+    """A cancellation requested through the shared backend is picked up by the holding worker."""
+    async def runner(request):
+        await asyncio.sleep(30)
+
+    async def scenario():
+        backend = InMemoryJobBackend()
+        worker = JobManager(runner, backend=backend, max_workers=1, cancel_poll_interval=0.01)
+        other_replica = JobManager(runner, backend=backend)
+        await worker.start()
+        job = await worker.submit({})
+        await _wait_for(worker, job.id, "running")
+        await other_replica.cancel(job.id)
+        cancelled = await _wait_for(worker, job.id, "cancelled")
+        await worker.stop()
+        return cancelled
+
+    assert asyncio.run(scenario()).status == "cancelled"
+
+
+def test_cancel_and_start_of_a_queued_job_cannot_both_win():
+    """Whichever of cancel and the worker changes a queued job first, the other sees it and backs off."""
+    ran = []
+
+    async def runner(request):
+        ran.append(request["query"])
+        await asyncio.sleep(30)
+
+    async def scenario():
+        manager = JobManager(runner, max_workers=1)
+        # Cancelled after a worker loaded it as queued: the worker must not start it
+        late = await manager.submit({"query": "late"})
+        loaded = await manager.backend.load(late.id)
+        await manager.cancel(late.id)
+        await manager._execute(loaded)
+        late = await manager.get(late.id)
+
+        # Started after cancel loaded it as queued: cancel must stop the run, not overwrite it
+        early = await manager.submit({"query": "early"})
+        queued = await manager.backend.load(early.id)
+        execution = asyncio.ensure_future(manager._execute(await manager.backend.load(early.id)))
+        await _wait_for(manager, early.id, "running")
+        assert await manager._finish(queued, "cancelled") is None
+        cancelled = await manager.cancel(early.id)
+        await execution
+        return late, cancelled
+
+    late, early = asyncio.run(scenario())
+
+    assert late.status == "cancelled" and late.started_at is None
+    assert early.status == "cancelled" and early.started_at is not None
+    assert ran == ["early"]
+
+
+def test_jobs_of_a_crashed_replica_are_failed_after_the_lease():
+    """A running job without heartbeats is failed by a live replica; one whose worker heartbeats is left running."""
+    async def runner(request):
+        await asyncio.sleep(30)
+
+    async def scenario():
+        backend = InMemoryJobBackend()
+        crashed = JobManager(runner, backend=backend, lease_seconds=0.3)
+        alive = JobManager(runner, backend=backend, max_workers=1, lease_seconds=0.3)
+        survivor = JobManager(runner, backend=backend, lease_seconds=0.3)
+        # A replica that marked a job running and then died without a heartbeat
+        orphan = await crashed.submit({})
+        await backend.dequeue(timeout=1.0)
+        running = await backend.load(orphan.id)
+        running.status, running.started_at = "running", time.time()
+        running.heartbeat_at = running.started_at
+        await backend.save(running)
+
+        await alive.start()
+        held = await alive.submit({})
+        await _wait_for(alive, held.id, "running")
+        failed = await _wait_for(alive, orphan.id, "failed")
+        await asyncio.sleep(0.5)
+        reaped = await survivor.reap_stale()
+        states = (failed, await survivor.get(held.id))
+        await alive.stop()
+        return reaped, states
+
+    reaped, (orphan, held) = asyncio.run(scenario())
+
+    assert reaped == 0
+    assert orphan.status == "failed" and orphan.error.startswith("Worker lost")
+    assert held.status == "running"
+    with pytest.raises(ValueError):
+        JobManager(runner=None, lease_seconds=0)
+
+
+def test_finished_jobs_expire_after_result_ttl():
+    """Finished records are dropped after result_ttl; queued and running ones are kept."""
+    async def runner(request):
+        return {"ok": True}
+
+    async def scenario():
+        manager = JobManager(runner, result_ttl=0.05)
+        await manager.start()
+        job = await manager.submit({})
+        await _wait_for(manager, job.id, "succeeded")
+        await asyncio.sleep(0.1)
+        expired = await manager.get(job.id)
+        await manager.stop()
+        return expired
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_stop_cancels_running_jobs():
+    """Shutting down records running jobs as cancelled with a reason."""
+    async def runner(request):
+        await asyncio.sleep(30)
+
+    async def scenario():
+        manager = JobManager(runner, max_workers=1)
+        await manager.start()
+        job = await manager.submit({})
+        await _wait_for(manager, job.id, "running")
+        await manager.stop()
+        return await manager.get(job.id)
+
+    job = asyncio.run(scenario())
+
+    assert job.status == "cancelled" and job.error == "Server shutting down"
+
+
+def test_cancellation_escaping_a_run_does_not_stop_the_worker():
+    """A CancelledError raised inside a run fails that job; the worker keeps taking jobs."""
+    async def runner(request):
+        if request["query"] == "cancelled":
+            raise asyncio.CancelledError()
+        return {"answer": request["query"]}
+
+    async def scenario():
+        manager = JobManager(runner, max_workers=1)
+        await manager.start()
+        escaped = await manager.submit({"query": "cancelled"})
+        failed = await _wait_for(manager, escaped.id, "failed")
+        following = await manager.submit({"query": "next"})
+        done = await _wait_for(manager, following.id, "succeeded")
+        await manager.stop()
+        return failed, done
+
+    failed, done = asyncio.run(scenario())
+
+    assert failed.error == "Run was cancelled unexpectedly"
+    assert done.result == {"answer": "next"}
+
+
+def test_job_manager_from_config():
+    """The backend setting selects the store; unknown backends are rejected."""
+    async def runner(request):
+        return {}
+
+    manager = JobManager.from_config(BaseConfig(jobs_max_workers=3, jobs_max_queue=7), runner)
+    assert manager.max_workers == 3 and manager.backend.max_queue == 7
+    with pytest.raises(ValueError):
+        JobManager.from_config(BaseConfig(jobs_backend="kafka"), runner)
@@ -0,0 +1,97 @@
+"""Unit tests for the BM25 keyword index."""
+import math
+
+import pytest
+from langchain_core.documents import Document
+
+from shared.retrieval import BM25Index, KeywordRetriever
+
+DOCS = [
+    Document(page_content="Error ERR-502 means the upstream gateway timed out.", metadata={"id": 0}),
+    Document(page_content="The QuantumLeap V3 processor has 128 tensor units.", metadata={"id": 1}),
+    Document(page_content="Restart the gateway after error ERR-502 persists; check the gateway logs.", metadata={"id": 2}),
+    Document(page_content="The Smart Mug keeps coffee at a constant temperature.", metadata={"id": 3}),
+]
+
+
+def _bm25(index: BM25Index, query: str, doc: int) -> float:
+    """Reference BM25 score computed directly from the texts."""
+    tokenized = [index.tokenizer(d.page_content) for d in index.documents]
+    avg = sum(map(len, tokenized)) / len(tokenized)
+    score = 0.0
+    for term in set(index.tokenizer(query)):
+        df = sum(term in tokens for tokens in tokenized)
+        tf = tokenized[doc].count(term)
+        if not tf:
+            continue
+        idf = math.log(1 + (len(tokenized) - df + 0.5) / (df + 0.5))
+        score += idf * tf * (index.k1 + 1) / (tf + index.k1 * (1 - index.b + index.b * len(tokenized[doc]) / avg))
+    return score
+
+
+def test_scores_match_bm25_and_rank_exact_terms_first():
+    """Scores are Okapi BM25 and only matching documents are returned."""
+    index = BM25Index.from_documents(DOCS)
+
+    hits = index.search("gateway ERR-502", k=10)
+
+    assert [doc.metadata["id"] for doc, _ in hits] == [2, 0]
+    for doc, score in hits:
+        assert score == pytest.approx(_bm25(index, "gateway ERR-502", doc.metadata["id"]), rel=1e-5)
+    assert index.search("nothing matches", k=3) == []
+
+
+def test_batched_queries_equal_single_queries():
+    """search_many returns what separate searches would."""
+    index = BM25Index.from_documents(DOCS)
+    queries = ["gateway error", "tensor processor", "coffee", "gateway logs restart"]
+
+    batched = index.search_many(queries, k=2)
+
+    assert batched == [index.search(query, k=2) for query in queries]
+
+
+def test_incremental_adds_are_searchable_and_update_statistics():
+    """Added documents are found at once and change the corpus statistics."""
+    index = BM25Index.from_documents(DOCS[:2])
+    assert [doc.metadata["id"] for doc, _ in index.search("gateway")] == [0]
+
+    assert index.add_documents(DOCS[2:]) == [2, 3]
+
+    hits = index.search("gateway", k=4)
+    assert [doc.metadata["id"] for doc, _ in hits] == [2, 0]
+    assert hits[0][1] == pytest.approx(_bm25(index, "gateway", 2), rel=1e-5)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    """A saved index loads memory-mapped, gives the same results and keeps accepting adds."""
+    index = BM25Index.from_documents(DOCS[:3])
+    index.save(str(tmp_path))
+    loaded = BM25Index.load(str(tmp_path))
+
+    assert loaded.search_many(["gateway error", "tensor"], k=3) == index.search_many(["gateway error", "tensor"], k=3)
+    assert loaded.get_stats()["unsaved_terms"] == 0
+
+    loaded.add_documents(DOCS[3:])
+    assert loaded.search("coffee")[0][0].metadata["id"] == 3
+    loaded.save(str(tmp_path / "again"))
+    reloaded = BM25Index.load(str(tmp_path / "again"), mmap=False)
+    assert reloaded.search_many(["coffee", "gateway"], k=4) == loaded.search_many(["coffee", "gateway"], k=4)
+
+
+def test_save_and_load_keeps_document_ids(tmp_path):
+    """Document ids survive a save/load, so other result lists keyed by id still match."""
+    documents = [Document(id=f"kb-{i}", page_content=d.page_content, metadata=d.metadata) for i, d in enumerate(DOCS)]
+    BM25Index.from_documents(documents).save(str(tmp_path))
+
+    loaded = BM25Index.load(str(tmp_path))
+
+    assert [d.id for d in loaded.documents] == ["kb-0", "kb-1", "kb-2", "kb-3"]
+    assert loaded.search("coffee")[0][0] == documents[3]
+
+
+def test_keyword_retriever_invoke():
+    """The retriever returns the top k documents for a query."""
+    retriever = KeywordRetriever.from_documents(DOCS, k=1)
+
+    assert retriever.invoke("How many tensor units?") == [DOCS[1]]
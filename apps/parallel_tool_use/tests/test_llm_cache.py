@@ -0,0 +1,125 @@
+"""Unit tests for the shared LLM response cache."""
+import asyncio
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from shared.config import BaseConfig
+from shared.llm import LLMFactory, LLMResponseCache
+
+
+class CountingChatModel(BaseChatModel):
+    """Fake chat model that counts provider calls."""
+    
+    calls: int = 0
+    temperature: float = 0.7
+    
+    @property
+    def _llm_type(self) -> str:
+        return "counting-fake"
+    
+    @property
+    def _identifying_params(self) -> dict:
+        return {"temperature": self.temperature}
+    
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=f"answer {self.calls}"))])
+
+
+def test_exact_hit_survives_restart(tmp_path):
+    """Identical prompts are served from disk, including after reopening the cache."""
+    path = str(tmp_path / "cache.sqlite")
+    llm = CountingChatModel(cache=LLMResponseCache(path=path))
+    
+    assert llm.invoke([HumanMessage(content="NVDA price?")]).content == "answer 1"
+    assert llm.invoke([HumanMessage(content="NVDA price?")]).content == "answer 1"
+    assert asyncio.run(llm.ainvoke([HumanMessage(content="NVDA price?")])).content == "answer 1"
+    assert llm.calls == 1
+    
+    restarted = CountingChatModel(cache=LLMResponseCache(path=path))
+    assert restarted.invoke([HumanMessage(content="NVDA price?")]).content == "answer 1"
+    assert restarted.calls == 0
+
+
+def test_key_includes_model_settings(tmp_path):
+    """A different temperature does not reuse the cached response."""
+    cache = LLMResponseCache(path=str(tmp_path / "cache.sqlite"))
+    CountingChatModel(cache=cache, temperature=0.0).invoke("hello")
+    
+    other = CountingChatModel(cache=cache, temperature=1.0)
+    other.invoke("hello")
+    assert other.calls == 1
+    assert cache.get_stats()["misses"] == 2
+
+
+def test_lru_eviction(tmp_path):
+    """Least recently used responses are evicted beyond max_entries."""
+    cache = LLMResponseCache(path=str(tmp_path / "cache.sqlite"), max_entries=2)
+    llm = CountingChatModel(cache=cache)
+    llm.invoke("a")
+    llm.invoke("b")
+    llm.invoke("a")  # refresh "a"
+    llm.invoke("c")  # evicts "b"
+    
+    assert len(cache) == 2
+    llm.invoke("b")
+    assert llm.calls == 4
+
+
+def test_semantic_tier_threshold(tmp_path):
+    """Similar prompts hit the semantic tier only above the threshold."""
+    vectors = {"human: what is nvda trading at": [1.0, 0.0], "human: nvda price now": [0.96, 0.28],
+               "human: apple news": [0.0, 1.0]}
+    cache = LLMResponseCache(
+        path=str(tmp_path / "cache.sqlite"),
+        embed=lambda text: vectors[text.lower()],
+        similarity_threshold=0.9,
+    )
+    llm = CountingChatModel(cache=cache)
+    
+    llm.invoke("what is NVDA trading at")
+    assert llm.invoke("NVDA price now").content == "answer 1"
+    assert llm.invoke("Apple news").content == "answer 2"
+    stats = cache.get_stats()
+    assert stats["semantic_hits"] == 1
+    assert stats["exact_hits"] == 0
+
+
+def test_semantic_index_is_updated_in_place(tmp_path):
+    """Writes and evictions update the loaded embedding matrix instead of reloading it from disk."""
+    vectors = {f"human: q{i}": [float(i == j) for j in range(6)] for i in range(6)}
+    cache = LLMResponseCache(
+        path=str(tmp_path / "cache.sqlite"),
+        embed=lambda text: vectors[text.lower().replace("again ", "")],
+        similarity_threshold=0.9,
+        max_entries=3,
+    )
+    statements = []
+    cache._conn.set_trace_callback(statements.append)
+    llm = CountingChatModel(cache=cache)
+
+    for i in range(5):
+        llm.invoke(f"q{i}")  # misses; q0 and q1 are evicted
+    assert llm.invoke("again q4").content == "answer 5"
+    assert llm.invoke("again q0").content == "answer 6"
+
+    assert sum("SELECT key, embedding" in statement for statement in statements) == 1
+    assert cache.get_stats()["semantic_hits"] == 1
+
+
+def test_factory_applies_cache_when_enabled(tmp_path, monkeypatch):
+    """LLMFactory attaches the shared response cache when llm_cache_enabled is set."""
+    monkeypatch.setattr(LLMFactory, "_create_openai", staticmethod(lambda config, **kw: CountingChatModel()))
+    config = BaseConfig(llm_cache_enabled=True, llm_cache_path=str(tmp_path / "f.sqlite"))
+    
+    first = LLMFactory.create(config=config)
+    second = LLMFactory.create(config=config)
+    assert isinstance(first.cache, LLMResponseCache)
+    assert first.cache is second.cache
+    
+    disabled = LLMFactory.create(config=BaseConfig(llm_cache_enabled=False))
+    assert disabled.cache is None
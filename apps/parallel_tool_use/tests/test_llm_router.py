@@ -0,0 +1,161 @@
+"""Unit tests for the routing LLM pool with provider failover."""
+import asyncio
+import time
+from typing import Any, List, Optional
+from unittest.mock import patch
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from shared.config import BaseConfig
+from shared.llm import LLMFactory, LLMRouter, NoProviderAvailableError
+
+
+class ProviderError(Exception):
+    """Error carrying an HTTP status code like the provider SDK errors."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FakeProvider(BaseChatModel):
+    """Local fake provider with a fixed latency and an optional error."""
+
+    reply: str
+    latency: float = 0.0
+    error: Optional[Any] = None
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-provider"
+
+    def bind_tools(self, tools: list, **kwargs: Any) -> "FakeProvider":
+        return self
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.calls += 1
+        time.sleep(self.latency)
+        if self.error is not None:
+            raise self.error
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.error is not None:
+            raise self.error
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+    async def _astream(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.error is not None:
+            raise self.error
+        for token in self.reply.split():
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+
+MESSAGES = [HumanMessage(content="hi")]
+
+
+def test_routes_to_lowest_latency_provider():
+    """After each provider is sampled, calls go to the faster one."""
+    slow = FakeProvider(reply="slow", latency=0.05)
+    fast = FakeProvider(reply="fast", latency=0.0)
+    router = LLMRouter.from_providers([("slow", slow), ("fast", fast)], max_in_flight=1)
+
+    replies = [router.invoke(MESSAGES).content for _ in range(5)]
+
+    # The slow provider is tried first (priority order), then loses on latency
+    assert replies[0] == "slow"
+    assert replies[1:] == ["fast"] * 4
+    assert router.get_stats()["slow"]["latency_ewma"] > router.get_stats()["fast"]["latency_ewma"]
+
+
+def test_rate_limit_fails_over_and_cools_down():
+    """A 429 moves the call to the next provider and the limited one is skipped afterwards."""
+    limited = FakeProvider(reply="primary", error=ProviderError(429))
+    backup = FakeProvider(reply="backup")
+    router = LLMRouter.from_providers([("primary", limited), ("backup", backup)], cooldown=60.0)
+
+    assert router.invoke(MESSAGES).content == "backup"
+    assert router.invoke(MESSAGES).content == "backup"
+    assert limited.calls == 1
+    assert router.get_stats()["primary"]["cooling_down"] is True
+
+
+def test_non_retryable_error_is_raised():
+    """A bad-request error would fail everywhere, so it is not retried on another provider."""
+    broken = FakeProvider(reply="x", error=ProviderError(400))
+    backup = FakeProvider(reply="backup")
+    router = LLMRouter.from_providers([("primary", broken), ("backup", backup)])
+
+    with pytest.raises(ProviderError):
+        router.invoke(MESSAGES)
+    assert backup.calls == 0
+
+
+def test_timeout_fails_over_async():
+    """A provider exceeding the per-attempt timeout is abandoned for the next one."""
+    hung = FakeProvider(reply="late", latency=5.0)
+    backup = FakeProvider(reply="backup")
+    router = LLMRouter.from_providers([("primary", hung), ("backup", backup)], timeout=0.05)
+
+    result = asyncio.run(router.ainvoke(MESSAGES))
+
+    assert result.content == "backup"
+    stats = router.get_stats()["primary"]
+    assert stats["failures"] == 1 and stats["in_flight"] == 0
+
+
+def test_in_flight_cap_spreads_concurrent_calls():
+    """Concurrent calls beyond a provider's cap go to the next provider or are rejected."""
+    first = FakeProvider(reply="first", latency=0.05)
+    second = FakeProvider(reply="second", latency=0.05)
+    router = LLMRouter.from_providers([("first", first), ("second", second)], max_in_flight=1)
+
+    async def fan_out():
+        return await asyncio.gather(*(router.ainvoke(MESSAGES) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(fan_out())
+
+    assert sorted(r.content for r in results if isinstance(r, AIMessage)) == ["first", "second"]
+    assert sum(isinstance(r, NoProviderAvailableError) for r in results) == 1
+
+
+def test_stream_fails_over_before_first_token():
+    """A streaming call that fails before any token is retried on the next provider."""
+    limited = FakeProvider(reply="nope", error=ProviderError(503))
+    backup = FakeProvider(reply="hello from backup")
+    router = LLMRouter.from_providers([("primary", limited), ("backup", backup)]).bind_tools([])
+
+    async def collect():
+        return [chunk.content async for chunk in router.astream(MESSAGES)]
+
+    tokens = [t for t in asyncio.run(collect()) if t]
+    assert tokens == ["hello", "from", "backup"]
+    assert router.get_stats()["primary"]["failures"] == 1
+
+
+def test_factory_builds_router_from_config():
+    """LLMFactory.create returns a router when llm_router_providers is configured."""
+    config = BaseConfig(llm_router_providers=["openai:gpt-4o-mini", "anthropic"], llm_router_max_in_flight=3)
+    created = []
+
+    def fake_create_provider(config, provider, **kwargs):
+        created.append((provider, kwargs))
+        return FakeProvider(reply=provider)
+
+    with patch.object(LLMFactory, "_create_provider", side_effect=fake_create_provider):
+        llm = LLMFactory.create(config=config)
+
+    assert isinstance(llm, LLMRouter)
+    assert created == [
+        ("openai", {"model": "gpt-4o-mini", "max_retries": 0}),
+        ("anthropic", {"max_retries": 0}),
+    ]
+    assert llm.get_stats()["anthropic"]["max_in_flight"] == 3
@@ -0,0 +1,140 @@
+"""Unit tests for the in-process metrics registry."""
+import asyncio
+import random
+import threading
+
+import pytest
+from langchain_core.tools import StructuredTool
+
+from shared.observability import MetricsRegistry, track_call
+from shared.tools import ToolExecutor
+
+
+def test_counter_sums_increments_from_many_threads():
+    """Increments land in per-thread cells and are summed on read."""
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ("status",))
+
+    def work():
+        for _ in range(10_000):
+            requests.inc("ok")
+        requests.inc("error", amount=2)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert requests.value("ok") == 80_000
+    assert requests.value("error") == 16
+    with pytest.raises(ValueError):
+        requests.inc("ok", amount=-1)
+
+
+def test_gauge_tracks_in_progress_and_callbacks():
+    """Gauges go up and down, and callback values are read at scrape time."""
+    registry = MetricsRegistry()
+    in_flight = registry.gauge("in_flight", "Running.")
+    depth = registry.gauge("queue_depth", "Queued.")
+    queue = [1, 2, 3]
+    depth.set_function(lambda: len(queue))
+
+    with in_flight.track_in_progress():
+        assert in_flight.value() == 1
+    assert in_flight.value() == 0
+
+    queue.pop()
+    assert depth.value() == 2
+
+
+def test_hdr_histogram_quantiles_are_within_relative_error():
+    """Quantiles stay within the bucket precision over several orders of magnitude."""
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency.", ("route",))
+    rng = random.Random(0)
+    samples = sorted(rng.lognormvariate(-3, 1.5) for _ in range(20_000))
+    for sample in samples:
+        latency.observe(sample, "/run")
+
+    for q in (0.5, 0.9, 0.99):
+        exact = samples[int(q * len(samples)) - 1]
+        assert latency.quantile(q, "/run") == pytest.approx(exact, rel=0.02, abs=2e-6)
+    assert latency.quantile(0.5, "/health") is None
+
+
+def test_registry_renders_prometheus_text():
+    """Every family is rendered with HELP/TYPE lines; histograms as summaries."""
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests.", ("status",)).inc("ok")
+    registry.histogram("latency_seconds", "Latency.").observe(0.25)
+
+    text = registry.render()
+
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{status="ok"} 1' in text
+    assert "# TYPE latency_seconds summary" in text
+    assert 'latency_seconds{quantile="0.99"} 0.25' in text
+    assert "latency_seconds_count 1" in text
+
+
+def test_registry_returns_existing_family_and_rejects_type_clash():
+    """Asking twice for a name returns the same metric; a different type is an error."""
+    registry = MetricsRegistry()
+    counter = registry.counter("calls_total", "Calls.")
+
+    assert registry.counter("calls_total", "Calls.") is counter
+    with pytest.raises(ValueError):
+        registry.gauge("calls_total", "Calls.")
+
+
+def test_track_call_labels_outcome():
+    """track_call counts ok, error and cancelled outcomes and always records latency."""
+    registry = MetricsRegistry()
+    calls = registry.counter("llm_calls_total", "Calls.", ("status",))
+    seconds = registry.histogram("llm_seconds", "Latency.")
+
+    with track_call(calls, seconds):
+        pass
+    with pytest.raises(RuntimeError):
+        with track_call(calls, seconds):
+            raise RuntimeError("boom")
+
+    async def cancelled():
+        with track_call(calls, seconds):
+            await asyncio.sleep(10)
+
+    async def run():
+        task = asyncio.ensure_future(cancelled())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+
+    assert calls.values() == {("ok",): 1, ("error",): 1, ("cancelled",): 1}
+    assert seconds.quantile(1.0) is not None
+
+
+def test_tool_executor_listeners_see_every_call():
+    """Listeners receive timings of calls made outside any track() scope."""
+    executor = ToolExecutor(default_timeout=1.0)
+    timings = []
+    executor.add_listener(timings.append)
+
+    def fail(x: int) -> int:
+        raise ValueError("upstream down")
+
+    ok_tool = StructuredTool.from_function(func=lambda x: x, name="echo", description="Echo.")
+    bad_tool = StructuredTool.from_function(func=fail, name="fail", description="Fail.")
+
+    async def run():
+        await executor.ainvoke(ok_tool, {"x": 1})
+        with pytest.raises(ValueError):
+            await executor.ainvoke(bad_tool, {"x": 1})
+
+    asyncio.run(run())
+    executor.shutdown()
+
+    assert [(t.tool, t.status) for t in timings] == [("echo", "ok"), ("fail", "error")]
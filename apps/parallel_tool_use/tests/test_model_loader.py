@@ -0,0 +1,110 @@
+"""Unit tests for background model loading and readiness reporting."""
+import asyncio
+import threading
+
+import pytest
+
+from shared.llm import ModelWarmPool
+from shared.observability import HealthCheck
+
+
+def test_start_loads_in_background_and_reports_ready():
+    """Models load off the calling thread; readiness flips once the load finishes."""
+    release = threading.Event()
+    loaded_on = []
+
+    def loader():
+        loaded_on.append(threading.current_thread().name)
+        release.wait(timeout=2)
+        return "model"
+
+    pool = ModelWarmPool()
+    pool.register("llm", loader)
+    assert pool.get_status()["llm"]["state"] == "pending"
+
+    pool.start()
+    assert not pool.is_ready()
+    assert pool.get_status()["llm"]["state"] == "loading"
+
+    release.set()
+    assert pool.get("llm", timeout=2) == "model"
+    assert pool.is_ready("llm")
+    assert loaded_on == ["model-load-llm"]
+    assert pool.get_status()["llm"]["load_seconds"] is not None
+
+
+def test_get_loads_on_first_use_once():
+    """Without start(), the first get() loads the model and later calls reuse it."""
+    calls = []
+    pool = ModelWarmPool()
+    pool.register("llm", lambda: calls.append(1) or object())
+
+    async def concurrent_gets():
+        return await asyncio.gather(pool.aget("llm"), pool.aget("llm"))
+
+    first, second = asyncio.run(concurrent_gets())
+    assert first is second is pool.get("llm")
+    assert calls == [1]
+
+
+def test_failed_load_is_reported():
+    """A failing loader marks the model failed and re-raises to callers."""
+    def loader():
+        raise RuntimeError("no weights")
+
+    pool = ModelWarmPool(retry_backoff=0.0)
+    pool.register("llm", loader)
+    with pytest.raises(RuntimeError):
+        pool.get("llm")
+    assert pool.get_status()["llm"]["state"] == "failed"
+    assert not pool.is_ready()
+
+
+def test_failed_load_is_retried_with_backoff():
+    """Transient load failures are retried; a later get() retries a load that used up its attempts."""
+    attempts = []
+
+    def loader():
+        attempts.append(1)
+        if len(attempts) in (1, 3, 4):
+            raise RuntimeError("hub unavailable")
+        return "model"
+
+    pool = ModelWarmPool(max_attempts=2, retry_backoff=0.01)
+    pool.register("llm", loader)
+    assert pool.get("llm") == "model"
+    assert pool.get_status()["llm"]["attempts"] == 2
+
+    flaky = ModelWarmPool(max_attempts=2, retry_backoff=0.0)
+    flaky.register("llm", loader)
+    with pytest.raises(RuntimeError):
+        flaky.get("llm")
+    assert flaky.has_failed("llm") and flaky.get_status()["llm"]["error"] == "hub unavailable"
+    assert flaky.get("llm") == "model"
+    assert not flaky.has_failed()
+
+
+def test_health_check_liveness():
+    """A failing liveness check makes the health status unhealthy."""
+    failed = {"llm": False}
+    health_check = HealthCheck(app_name="test", version="0")
+    health_check.add_liveness_check("llm", lambda: not failed["llm"])
+
+    assert health_check.get_health_status()["status"] == "healthy"
+    failed["llm"] = True
+    status = health_check.get_health_status()
+    assert status["status"] == "unhealthy" and status["checks"] == {"llm": False}
+
+
+def test_health_check_readiness():
+    """Liveness stays healthy while a readiness check is failing."""
+    ready = {"llm": False}
+    health_check = HealthCheck(app_name="test", version="0")
+    health_check.add_readiness_check("llm", lambda: ready["llm"])
+
+    status = health_check.get_health_status()
+    assert status["status"] == "healthy"
+    assert status["ready"] is False
+
+    ready["llm"] = True
+    assert health_check.get_readiness_status() == {"ready": True, "checks": {"llm": True}}
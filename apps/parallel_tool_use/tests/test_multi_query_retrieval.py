@@ -0,0 +1,105 @@
+"""Unit tests for batched multi-query retrieval."""
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from shared.retrieval import BatchedMultiQueryRetriever, CachedEmbeddings, EmbeddingCache, SearchHit, VectorShard, fuse_query_hits
+
+
+class _AxisEmbeddings(Embeddings):
+    """Embeds a text as the unit vector of its axis word ("x", "y" or "z"), recording each call."""
+
+    axes = {"x": [1.0, 0.0, 0.0], "y": [0.0, 1.0, 0.0], "z": [0.0, 0.0, 1.0]}
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [self.axes[text.split()[0]] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def _shard():
+    documents = [Document(page_content=text) for text in ("x doc", "y doc", "xy doc", "z doc", "x doc")]
+    vectors = np.array([[1.0, 0, 0], [0, 1.0, 0], [0.7, 0.7, 0], [0, 0, 1.0], [0.9, 0, 0.1]], dtype=np.float32)
+    return VectorShard.from_vectors("kb", vectors, documents, backend="numpy"), documents
+
+
+def test_all_queries_are_embedded_and_searched_once():
+    """With batch_queries, one embedding call and one index search serve every expanded query."""
+    shard, _ = _shard()
+    embeddings = _AxisEmbeddings()
+    retriever = BatchedMultiQueryRetriever(shard=shard, embeddings=embeddings, k=3, per_query_k=2, batch_queries=True)
+    searches = []
+    search = shard.index.search
+    shard.index.search = lambda queries, k: searches.append(len(queries)) or search(queries, k)
+
+    result = retriever.search_many(["x what", "y why", "z how"])
+
+    assert embeddings.calls == [["x what", "y why", "z how"]]
+    assert searches == [3]
+    assert [len(hits) for hits in result.per_query] == [2, 2, 2]
+    assert len(result.hits) == 3
+
+
+def test_queries_are_embedded_as_queries_and_not_cached(tmp_path):
+    """By default each query goes through embed_query; the batched path skips the document cache."""
+    shard, _ = _shard()
+    embeddings = _AxisEmbeddings()
+    query_side = []
+    embeddings.embed_query = lambda text: query_side.append(text) or embeddings.axes[text.split()[0]]
+    cached = CachedEmbeddings(embeddings, EmbeddingCache(str(tmp_path)))
+
+    BatchedMultiQueryRetriever(shard=shard, embeddings=cached, k=2).search_many(["x a", "y b"])
+    assert query_side == ["x a", "y b"] and embeddings.calls == []
+
+    BatchedMultiQueryRetriever(shard=shard, embeddings=cached, k=2, batch_queries=True).search_many(["x a", "y b"])
+    assert embeddings.calls == [["x a", "y b"]]
+    assert len(cached.cache) == 0
+
+
+def test_documents_are_merged_by_row_not_text():
+    """Equal texts at different rows stay separate; a row found by several queries appears once."""
+    shard, documents = _shard()
+    retriever = BatchedMultiQueryRetriever(shard=shard, embeddings=_AxisEmbeddings(), k=10, per_query_k=3)
+
+    hits = retriever.search_many(["x a", "y b"]).hits
+
+    found = [hit.document for hit in hits]
+    assert any(d is documents[0] for d in found) and any(d is documents[4] for d in found)
+    assert sum(d is documents[2] for d in found) == 1
+    xy = next(hit for hit in hits if hit.document is documents[2])
+    assert set(xy.ranks) == {"x a", "y b"}
+    assert xy.score == pytest.approx(0.7, abs=1e-6)  # max over both queries
+
+
+def test_rrf_favours_documents_found_by_many_queries():
+    """RRF sums rank contributions; max keeps the single best score."""
+    a, b = Document(page_content="a"), Document(page_content="b")
+    per_query = [[SearchHit(a, 0.9, "kb"), SearchHit(b, 0.8, "kb")], [SearchHit(b, 0.5, "kb")]]
+
+    by_max = fuse_query_hits(["q1", "q2"], per_query, fusion="max")
+    by_rrf = fuse_query_hits(["q1", "q2"], per_query, fusion="rrf", rrf_k=60)
+
+    assert [hit.document for hit in by_max] == [a, b]
+    assert [hit.document for hit in by_rrf] == [b, a]
+    assert by_rrf[0].score == pytest.approx(1 / 62 + 1 / 61)
+    with pytest.raises(ValueError):
+        fuse_query_hits(["q1"], per_query[:1], fusion="mean")
+
+
+def test_invoke_and_empty_query_set():
+    """A single query goes through invoke; no queries means no work."""
+    shard, documents = _shard()
+    embeddings = _AxisEmbeddings()
+    retriever = BatchedMultiQueryRetriever(shard=shard, embeddings=embeddings, k=1)
+
+    assert retriever.invoke("z only") == [documents[3]]
+    assert retriever.search_many([]).hits == []
+    assert len(embeddings.calls) == 1
+    with pytest.raises(ValueError):
+        BatchedMultiQueryRetriever(shard=shard, embeddings=embeddings, fusion="mean")
@@ -0,0 +1,153 @@
+"""Unit tests for the sharded vector retriever."""
+import time
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from shared.retrieval import ExactIndex, ShardedRetriever, VectorShard, build_flat_index
+from shared.retrieval.index import normalize
+
+
+def _clustered(shards: int = 4, per_shard: int = 200, d: int = 32, seed: int = 0):
+    """Documents drawn around one centre per shard, with normalized vectors."""
+    rng = np.random.default_rng(seed)
+    centres = normalize(rng.normal(size=(shards, d)))
+    vectors = [normalize(centre + 0.3 * rng.normal(size=(per_shard, d))) for centre in centres]
+    documents = [
+        [Document(page_content=f"doc {s}-{i}", metadata={"shard": s}) for i in range(per_shard)]
+        for s in range(shards)
+    ]
+    return centres, vectors, documents
+
+
+class _SlowIndex:
+    """Index wrapper that takes ``delay`` seconds per search."""
+
+    def __init__(self, index, delay: float):
+        self.index = index
+        self.delay = delay
+        self.ntotal = index.ntotal
+        self.metric_type = index.metric_type
+
+    def search(self, queries, k):
+        time.sleep(self.delay)
+        return self.index.search(queries, k)
+
+
+class _KeywordEmbeddings(Embeddings):
+    """Embeds text as counts of a few keywords."""
+
+    words = ["chip", "ring", "mug"]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        return [float(text.lower().count(word)) + 0.01 for word in self.words]
+
+
+def test_merged_top_k_matches_a_single_index():
+    """Merging per-shard top-k gives exactly the monolithic top-k, in score order."""
+    _, vectors, documents = _clustered()
+    shards = [VectorShard.from_vectors(f"s{i}", v, docs, backend="numpy") for i, (v, docs) in enumerate(zip(vectors, documents))]
+    retriever = ShardedRetriever(shards=shards, k=10)
+    monolithic = build_flat_index(np.vstack(vectors), backend="numpy")
+    all_documents = [doc for docs in documents for doc in docs]
+    queries = normalize(np.random.default_rng(1).normal(size=(20, 32)))
+
+    for query in queries:
+        result = retriever.search_by_vector(query)
+        scores, ids = monolithic.search(query, 10)
+        assert [hit.document for hit in result.hits] == [all_documents[i] for i in ids[0]]
+        assert np.allclose([hit.score for hit in result.hits], scores[0], atol=1e-5)
+        assert sorted(result.searched) == ["s0", "s1", "s2", "s3"]
+    retriever.close()
+
+
+def test_l2_shards_report_higher_is_better_scores():
+    """L2 distances are negated so the nearest documents rank first after the merge."""
+    _, vectors, documents = _clustered(shards=2, per_shard=50)
+    shards = [VectorShard.from_vectors(f"s{i}", v, docs, metric="l2", backend="numpy") for i, (v, docs) in enumerate(zip(vectors, documents))]
+    query = vectors[1][7]
+
+    hits = ShardedRetriever(shards=shards, k=3).search_by_vector(query).hits
+
+    assert hits[0].document is documents[1][7]
+    assert hits[0].score == pytest.approx(0.0, abs=1e-5)
+    assert hits[0].score >= hits[1].score >= hits[2].score
+
+
+def test_slow_shard_is_left_out_after_its_timeout():
+    """A shard missing the timeout does not hold up the query."""
+    _, vectors, documents = _clustered(shards=2, per_shard=50)
+    fast = VectorShard.from_vectors("fast", vectors[0], documents[0], backend="numpy")
+    slow_index = _SlowIndex(build_flat_index(vectors[1], backend="numpy"), delay=1.0)
+    slow = VectorShard("slow", slow_index, documents[1])
+    retriever = ShardedRetriever(shards=[fast, slow], k=5, shard_timeout=0.1)
+
+    started = time.perf_counter()
+    result = retriever.search_by_vector(vectors[1][0])
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.5
+    assert result.timed_out == ["slow"] and result.searched == ["fast"]
+    assert len(result.hits) == 5 and all(hit.shard == "fast" for hit in result.hits)
+    assert retriever.get_stats()["timed_out"] == 1
+    retriever.close()
+
+
+def test_searches_past_their_timeout_do_not_starve_later_queries():
+    """Slow searches still running from earlier queries leave threads for the next query's fast shards."""
+    _, vectors, documents = _clustered(shards=2, per_shard=50)
+    fast = VectorShard.from_vectors("fast", vectors[0], documents[0], backend="numpy")
+    slow = VectorShard("slow", _SlowIndex(build_flat_index(vectors[1], backend="numpy"), delay=1.0), documents[1])
+    retriever = ShardedRetriever(shards=[fast, slow], k=5, shard_timeout=0.1)
+
+    results = [retriever.search_by_vector(vectors[1][0]) for _ in range(3)]
+
+    assert [result.searched for result in results] == [["fast"]] * 3
+    assert retriever.get_stats()["queries"] == 3
+    retriever.close()
+
+
+def test_far_shards_are_pruned_but_the_closest_is_kept():
+    """Shards below the centroid similarity threshold are skipped; at least min_shards are searched."""
+    centres, vectors, documents = _clustered()
+    shards = [VectorShard.from_vectors(f"s{i}", v, docs, backend="numpy") for i, (v, docs) in enumerate(zip(vectors, documents))]
+
+    near_s2 = ShardedRetriever(shards=shards, k=5, prune_threshold=0.8).search_by_vector(centres[2])
+    assert near_s2.searched == ["s2"] and sorted(near_s2.pruned) == ["s0", "s1", "s3"]
+    assert all(hit.document.metadata["shard"] == 2 for hit in near_s2.hits)
+
+    unrelated = -centres.sum(axis=0)
+    fallback = ShardedRetriever(shards=shards, k=5, prune_threshold=0.99, min_shards=2).search_by_vector(unrelated)
+    assert len(fallback.searched) == 2 and len(fallback.hits) == 5
+
+
+def test_text_queries_and_vectorstore_shards():
+    """A LangChain FAISS store is wrapped without re-embedding and queried through invoke."""
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_community.vectorstores import FAISS
+
+    embeddings = _KeywordEmbeddings()
+    texts = {"eng": ["The chip has 128 tensor units", "Ring firmware v2.1"], "mkt": ["The mug keeps coffee hot", "A chip for creators"]}
+    shards = []
+    for name, shard_texts in texts.items():
+        index = ExactIndex(3)
+        index.add(embeddings.embed_documents(shard_texts))
+        store = FAISS(
+            embeddings,
+            index,
+            InMemoryDocstore({str(i): Document(page_content=t) for i, t in enumerate(shard_texts)}),
+            {i: str(i) for i in range(len(shard_texts))},
+        )
+        shards.append(VectorShard.from_vectorstore(name, store))
+
+    retriever = ShardedRetriever(shards=shards, embeddings=embeddings, k=2)
+    documents = retriever.invoke("chip chip")
+
+    assert {doc.page_content for doc in documents} == {"The chip has 128 tensor units", "A chip for creators"}
+    with pytest.raises(ValueError):
+        ShardedRetriever(shards=[shards[0], shards[0]])
@@ -0,0 +1,134 @@
+"""Unit tests for the shared speculative tool prefetch engine."""
+import asyncio
+
+from langchain_core.tools import StructuredTool
+
+from shared.agents import RulePredictor, SpeculativeExecutor
+from shared.config import BaseConfig
+
+
+def _counting_tool(name, calls, delay=0.0, cancelled=None):
+    """Build a tool that records its calls and sleeps for ``delay`` seconds."""
+    async def arun(symbol: str) -> str:
+        calls.append(symbol)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if cancelled is not None:
+                cancelled.append(symbol)
+            raise
+        return f"{name}:{symbol}"
+
+    return StructuredTool.from_function(coroutine=arun, name=name, description=f"{name} tool")
+
+
+def _predict_symbols(query):
+    return [("quote", {"symbol": word}) for word in query.split() if word.isupper()]
+
+
+def test_rule_predictor_deduplicates_across_rules():
+    """The same predicted call from two rules is launched once."""
+    predictor = RulePredictor([_predict_symbols, _predict_symbols])
+    assert predictor.predict("price of NVDA and AAPL") == [
+        ("quote", {"symbol": "NVDA"}),
+        ("quote", {"symbol": "AAPL"}),
+    ]
+
+
+def test_matching_call_reuses_speculative_result():
+    """A model call matching a prediction awaits the speculative task instead of calling again."""
+    calls = []
+    tool = _counting_tool("quote", calls)
+    speculator = SpeculativeExecutor([tool], RulePredictor([_predict_symbols]))
+    wrapped = speculator.wrap_tool(tool)
+
+    async def request():
+        async with speculator.session("price of NVDA") as session:
+            await asyncio.sleep(0)  # stands in for the LLM turn
+            result = await wrapped.ainvoke({"symbol": "NVDA"})
+        return result, session.summary
+
+    result, summary = asyncio.run(request())
+
+    assert result == "quote:NVDA"
+    assert calls == ["NVDA"]
+    assert summary["used"] == 1 and summary["wasted"] == 0
+    stats = speculator.get_stats()
+    assert stats["hits"] == 1 and stats["hit_rate"] == 1.0
+
+
+def test_unused_speculation_is_cancelled_and_counted_as_waste():
+    """Predictions the model never calls are cancelled when the request ends."""
+    calls, cancelled = [], []
+    tool = _counting_tool("quote", calls, delay=5.0, cancelled=cancelled)
+    speculator = SpeculativeExecutor([tool], RulePredictor([_predict_symbols]))
+
+    async def request():
+        async with speculator.session("price of NVDA") as session:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0)
+        return session.summary
+
+    summary = asyncio.run(request())
+
+    assert cancelled == ["NVDA"]
+    assert summary == {"launched": 1, "used": 0, "wasted": 1, "wasted_seconds": summary["wasted_seconds"]}
+    assert speculator.get_stats()["tools"]["quote"]["wasted"] == 1
+
+
+def test_waste_counts_run_time_not_request_time():
+    """An unused call that finished early is charged its own run time, not the rest of the request."""
+    tool = _counting_tool("quote", [], delay=0.0)
+    speculator = SpeculativeExecutor([tool], RulePredictor([_predict_symbols]))
+
+    async def request():
+        async with speculator.session("price of NVDA") as session:
+            await asyncio.sleep(0.2)
+        return session.summary
+
+    summary = asyncio.run(request())
+
+    assert summary["wasted"] == 1
+    assert summary["wasted_seconds"] < 0.1
+
+
+def test_mismatched_args_run_normally():
+    """A call with different arguments misses and runs its own tool call."""
+    calls = []
+    tool = _counting_tool("quote", calls)
+    speculator = SpeculativeExecutor([tool], RulePredictor([_predict_symbols]))
+    wrapped = speculator.wrap_tool(tool)
+
+    async def request():
+        async with speculator.session("price of NVDA"):
+            return await wrapped.ainvoke({"symbol": "AAPL"})
+
+    assert asyncio.run(request()) == "quote:AAPL"
+    assert sorted(calls) == ["AAPL", "NVDA"]
+    assert speculator.get_stats()["tools"]["quote"]["misses"] == 1
+
+
+def test_low_hit_rate_tool_stops_being_speculated():
+    """After enough unused launches, a tool is only re-probed periodically."""
+    calls = []
+    tool = _counting_tool("quote", calls)
+    speculator = SpeculativeExecutor(
+        [tool], RulePredictor([_predict_symbols]), min_samples=3, min_hit_rate=0.5, probe_interval=100
+    )
+
+    async def request():
+        async with speculator.session("price of NVDA"):
+            await asyncio.sleep(0)
+
+    for _ in range(5):
+        asyncio.run(request())
+
+    assert speculator.get_stats()["launched"] == 3
+
+
+def test_from_config_applies_every_gate_setting():
+    """Sample count and probe interval come from the config like the hit rate."""
+    config = BaseConfig(speculation_min_hit_rate=0.4, speculation_min_samples=5, speculation_probe_interval=3)
+    speculator = SpeculativeExecutor.from_config(config, [], RulePredictor([]))
+
+    assert (speculator.min_hit_rate, speculator.min_samples, speculator.probe_interval) == (0.4, 5, 3)
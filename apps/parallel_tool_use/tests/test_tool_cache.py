@@ -0,0 +1,189 @@
+"""Unit tests for the shared tool result cache."""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from shared.tools import InMemoryCacheBackend, RedisCacheBackend, ToolResultCache
+
+
+def test_in_memory_backend_evicts_least_recently_used():
+    """Oldest untouched entry is evicted once max_entries is exceeded."""
+    backend = InMemoryCacheBackend(max_entries=2)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    backend.get("a")  # refresh "a"
+    backend.set("c", 3)
+    
+    assert backend.get("a") == (True, 1)
+    assert backend.get("b") == (False, None)
+    assert backend.get("c") == (True, 3)
+    assert backend.get_stats()["evictions"] == 1
+
+
+def test_in_memory_backend_expires_entries():
+    """Entries are not returned after their TTL."""
+    backend = InMemoryCacheBackend()
+    backend.set("k", "v", ttl=0.01)
+    time.sleep(0.02)
+    assert backend.get("k") == (False, None)
+
+
+def test_per_tool_ttl_and_hit_counters():
+    """Per-tool TTL overrides the default and hits/misses are counted."""
+    cache = ToolResultCache(default_ttl=60.0, ttls={"fast": 0.01})
+    calls = []
+    
+    @cache.cached("fast")
+    def fast(symbol: str) -> str:
+        calls.append(symbol)
+        return symbol.lower()
+    
+    assert fast("AAPL") == "aapl"
+    assert fast(symbol="AAPL") == "aapl"
+    assert calls == ["AAPL"]
+    
+    time.sleep(0.02)
+    fast("AAPL")
+    assert calls == ["AAPL", "AAPL"]
+    
+    stats = cache.get_stats()
+    assert stats["tools"]["fast"] == {"hits": 1, "misses": 2, "coalesced": 0}
+
+
+def test_concurrent_identical_calls_are_coalesced():
+    """Only one of many concurrent identical calls reaches the upstream."""
+    cache = ToolResultCache()
+    calls = []
+    started = threading.Event()
+    
+    @cache.cached("slow")
+    def slow(symbol: str) -> str:
+        calls.append(symbol)
+        started.set()
+        time.sleep(0.1)
+        return "result"
+    
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(slow, "NVDA")]
+        started.wait()
+        futures += [pool.submit(slow, "NVDA") for _ in range(7)]
+        results = [f.result() for f in futures]
+    
+    assert results == ["result"] * 8
+    assert calls == ["NVDA"]
+    assert cache.get_stats()["coalesced"] == 7
+
+
+def test_async_calls_are_coalesced_and_errors_not_cached():
+    """Awaiting callers share one in-flight coroutine; failures are retried next time."""
+    cache = ToolResultCache()
+    calls = []
+    
+    @cache.cached("news")
+    async def news(company_name: str) -> list:
+        calls.append(company_name)
+        await asyncio.sleep(0.05)
+        if len(calls) == 1:
+            raise RuntimeError("upstream down")
+        return [company_name]
+    
+    async def scenario():
+        results = await asyncio.gather(*(news("Apple") for _ in range(5)), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert await news("Apple") == ["Apple"]
+        assert await news("Apple") == ["Apple"]
+    
+    asyncio.run(scenario())
+    assert calls == ["Apple", "Apple"]
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    """A follower still gets the result when the caller that started the compute is cancelled."""
+    cache = ToolResultCache()
+    calls = []
+
+    @cache.cached("news")
+    async def news(company_name: str) -> list:
+        calls.append(company_name)
+        await asyncio.sleep(0.05)
+        return [company_name]
+
+    async def scenario():
+        leader = asyncio.ensure_future(news("Apple"))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(news("Apple"))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        assert await follower == ["Apple"]
+        assert leader.cancelled()
+
+        # With every caller gone the compute itself is cancelled and not cached
+        alone = asyncio.ensure_future(news("Tesla"))
+        await asyncio.sleep(0.01)
+        alone.cancel()
+        await asyncio.sleep(0.06)
+        assert await news("Tesla") == ["Tesla"]
+
+    asyncio.run(scenario())
+    assert calls == ["Apple", "Tesla", "Tesla"]
+
+
+def test_redis_backend_stays_off_the_event_loop():
+    """The async path runs the blocking Redis round trips on worker threads."""
+    threads = []
+    
+    class _BlockingClient:
+        def __init__(self):
+            self.store = {}
+        
+        def get(self, key):
+            threads.append(threading.get_ident())
+            return self.store.get(key)
+        
+        def set(self, key, value, px=None):
+            threads.append(threading.get_ident())
+            self.store[key] = value
+    
+    backend = RedisCacheBackend.__new__(RedisCacheBackend)
+    backend.prefix, backend._client = "test:", _BlockingClient()
+    cache = ToolResultCache(backend=backend)
+    
+    async def compute():
+        return {"price": 1.0}
+    
+    async def scenario():
+        first = await cache.aget_or_compute("quote", {"s": "A"}, compute)
+        second = await cache.aget_or_compute("quote", {"s": "A"}, compute)
+        return first, second, threading.get_ident()
+    
+    first, second, loop_thread = asyncio.run(scenario())
+    
+    assert first == second == {"price": 1.0}
+    assert len(threads) == 3 and loop_thread not in threads
+
+
+def test_disabled_cache_passes_through():
+    """Disabled cache always calls the tool."""
+    cache = ToolResultCache(enabled=False)
+    calls = []
+    
+    @cache.cached("tool")
+    def tool(x: int) -> int:
+        calls.append(x)
+        return x
+    
+    tool(1)
+    tool(1)
+    assert calls == [1, 1]
+
+
+def test_unknown_backend_rejected():
+    """from_config rejects unsupported backends."""
+    class Config:
+        tool_cache_backend = "memcached"
+    
+    with pytest.raises(ValueError):
+        ToolResultCache.from_config(Config())
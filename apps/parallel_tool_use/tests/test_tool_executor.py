@@ -0,0 +1,151 @@
+"""Unit tests for the shared bounded-concurrency tool executor."""
+import asyncio
+import threading
+import time
+
+import pytest
+from langchain_core.tools import StructuredTool
+
+from shared.tools import ToolExecutor, ToolTimeoutError
+
+
+def _async_tool(name, delay, state=None):
+    """Build a tool that sleeps and tracks its peak concurrency in ``state``."""
+    state = state if state is not None else {}
+    state.setdefault("active", 0)
+    state.setdefault("peak", 0)
+    
+    async def run(x: int) -> int:
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            state["active"] -= 1
+        return x
+    
+    return StructuredTool.from_function(coroutine=run, name=name, description=f"{name} tool")
+
+
+def test_global_and_per_tool_limits():
+    """Fan-out is capped globally and per tool."""
+    executor = ToolExecutor(max_concurrency=3, tool_limits={"news": 1})
+    prices, news = {}, {}
+    price_tool = executor.wrap(_async_tool("price", 0.02, prices))
+    news_tool = executor.wrap(_async_tool("news", 0.02, news))
+    
+    async def scenario():
+        calls = [price_tool.ainvoke({"x": i}) for i in range(6)] + [news_tool.ainvoke({"x": i}) for i in range(3)]
+        return await asyncio.gather(*calls)
+    
+    assert asyncio.run(scenario()) == [0, 1, 2, 3, 4, 5, 0, 1, 2]
+    assert prices["peak"] <= 3
+    assert news["peak"] == 1
+
+
+def test_timeout_and_timings_are_recorded():
+    """Slow calls time out and every call gets a timing record."""
+    executor = ToolExecutor(default_timeout=1.0, tool_timeouts={"slow": 0.01})
+    fast = executor.wrap(_async_tool("fast", 0.0))
+    slow = executor.wrap(_async_tool("slow", 1.0))
+    
+    async def scenario():
+        with executor.track() as calls:
+            assert await fast.ainvoke({"x": 1}) == 1
+            with pytest.raises(ToolTimeoutError):
+                await slow.ainvoke({"x": 2})
+        return calls
+    
+    calls = asyncio.run(scenario())
+    assert [(c.tool, c.status) for c in calls] == [("fast", "ok"), ("slow", "timeout")]
+    assert calls[0].as_log_entry().startswith("[TOOLS] fast ok in")
+
+
+def test_request_deadline_clips_tool_timeout():
+    """A track() deadline shortens the per-tool timeout."""
+    executor = ToolExecutor(default_timeout=10.0)
+    slow = executor.wrap(_async_tool("slow", 1.0))
+    
+    async def scenario():
+        with executor.track(deadline=time.monotonic() + 0.02):
+            start = time.perf_counter()
+            with pytest.raises(ToolTimeoutError):
+                await slow.ainvoke({"x": 1})
+            return time.perf_counter() - start
+    
+    assert asyncio.run(scenario()) < 0.5
+
+
+def test_cancellation_reaches_running_tool():
+    """Cancelling the caller cancels the in-flight tool coroutine."""
+    executor = ToolExecutor()
+    state = {}
+    slow = executor.wrap(_async_tool("slow", 5.0, state))
+    
+    async def scenario():
+        with executor.track() as calls:
+            task = asyncio.ensure_future(slow.ainvoke({"x": 1}))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        return calls
+    
+    calls = asyncio.run(scenario())
+    assert state["active"] == 0
+    assert calls[0].status == "cancelled"
+
+
+def test_sync_tools_run_on_shared_pool():
+    """Sync tools run on the executor's pool and keep their schema when wrapped."""
+    executor = ToolExecutor(max_workers=2)
+    
+    def double(x: int) -> int:
+        """Double a number."""
+        return (x * 2, threading.current_thread().name)
+    
+    wrapped = executor.wrap(StructuredTool.from_function(func=double, name="double"))
+    assert wrapped.name == "double"
+    assert wrapped.args == {"x": {"title": "X", "type": "integer"}}
+    
+    value, thread_name = wrapped.invoke({"x": 2})
+    assert value == 4
+    assert thread_name.startswith("tool")
+    
+    value, thread_name = asyncio.run(wrapped.ainvoke({"x": 3}))
+    assert value == 6
+    assert thread_name.startswith("tool")
+    executor.shutdown()
+
+
+def test_timed_out_sync_tool_keeps_its_slots_until_its_thread_ends():
+    """A sync tool's thread outlives its timeout, so its concurrency slots and in_flight count do too."""
+    executor = ToolExecutor(tool_limits={"blocking": 1}, tool_timeouts={"blocking": 0.01})
+    release = threading.Event()
+    
+    def blocking(x: int) -> int:
+        """Block until released."""
+        release.wait(5)
+        return x
+    
+    wrapped = executor.wrap(StructuredTool.from_function(func=blocking, name="blocking"))
+    
+    async def scenario():
+        with pytest.raises(ToolTimeoutError):
+            await wrapped.ainvoke({"x": 1})
+        held = (executor.in_flight, executor._async_tool["blocking"].locked())
+        release.set()
+        await asyncio.sleep(0.05)
+        return held, (executor.in_flight, executor._async_tool["blocking"].locked())
+    
+    assert asyncio.run(scenario()) == ((1, True), (0, False))
+    
+    release.clear()
+    with pytest.raises(ToolTimeoutError):
+        wrapped.invoke({"x": 2})
+    held = (executor.in_flight, executor._sync_tool["blocking"]._value)
+    release.set()
+    time.sleep(0.05)
+    assert held == (1, 0)
+    assert (executor.in_flight, executor._sync_tool["blocking"]._value) == (0, 1)
+    executor.shutdown()
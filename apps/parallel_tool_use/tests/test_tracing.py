@@ -0,0 +1,150 @@
+"""Unit tests for per-request tracing, span export and latency histograms."""
+import asyncio
+from typing import List
+from unittest.mock import patch
+
+import pytest
+import sentry_sdk
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langgraph.graph import END, MessagesState, StateGraph
+from sentry_sdk.transport import Transport
+
+from shared.observability import (
+    TraceMetrics,
+    TracingCallbackHandler,
+    current_trace,
+    export_trace,
+    trace_request,
+)
+
+
+class StreamingFakeModel(BaseChatModel):
+    """Chat model streaming two tokens and reporting token usage."""
+
+    @property
+    def _llm_type(self) -> str:
+        return "streaming-fake"
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message = AIMessage(content="hello world", usage_metadata={"input_tokens": 7, "output_tokens": 2, "total_tokens": 9})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs):
+        yield ChatGenerationChunk(message=AIMessageChunk(content="hello "))
+        yield ChatGenerationChunk(message=AIMessageChunk(
+            content="world", usage_metadata={"input_tokens": 7, "output_tokens": 2, "total_tokens": 9}
+        ))
+
+
+def _graph():
+    model = StreamingFakeModel()
+
+    async def agent(state: MessagesState):
+        return {"messages": [await model.ainvoke(state["messages"])]}
+
+    workflow = StateGraph(MessagesState)
+    workflow.add_node("agent", agent)
+    workflow.set_entry_point("agent")
+    workflow.add_edge("agent", END)
+    return workflow.compile()
+
+
+def test_trace_request_nests_spans_under_root():
+    """Spans default to the root span and are reported relative to the trace start."""
+    with trace_request("run_agent") as trace:
+        assert current_trace() is trace
+        node = trace.start_span("agent", "node")
+        trace.end_span(node, tokens=3)
+    assert current_trace() is None
+
+    root, child = trace.to_list()
+    assert root["kind"] == "request" and root["parent_id"] is None
+    assert child["parent_id"] == root["span_id"]
+    assert child["attributes"] == {"tokens": 3}
+    assert 0 <= child["start_ms"] and child["duration_ms"] <= root["duration_ms"]
+
+
+def test_callback_handler_records_node_and_llm_spans():
+    """Graph nodes and LLM calls become spans with token counts and time to first token."""
+    graph = _graph()
+
+    async def run():
+        with trace_request("run_agent") as trace:
+            config = {"callbacks": [TracingCallbackHandler(trace)]}
+            async for _ in graph.astream_events({"messages": [HumanMessage(content="hi")]}, config, version="v2"):
+                pass
+        return trace
+
+    spans = {span["kind"]: span for span in asyncio.run(run()).to_list()}
+
+    assert spans["node"]["name"] == "agent"
+    llm = spans["llm"]
+    assert llm["parent_id"] == spans["node"]["span_id"]
+    assert llm["attributes"]["input_tokens"] == 7
+    assert llm["attributes"]["output_tokens"] == 2
+    assert llm["attributes"]["time_to_first_token_ms"] <= llm["duration_ms"]
+
+
+def test_trace_metrics_renders_histograms():
+    """Finished spans are bucketed into Prometheus histograms."""
+    metrics = TraceMetrics()
+    with trace_request("run_agent") as trace:
+        trace.end_span(trace.start_span("get_stock_price", "tool"))
+    metrics.observe_trace(trace)
+
+    text = metrics.render()
+    assert "# TYPE agent_span_duration_seconds histogram" in text
+    assert 'agent_span_duration_seconds_bucket{kind="tool",name="get_stock_price",status="ok",le="+Inf"} 1' in text
+    assert 'agent_span_duration_seconds_count{kind="request",name="run_agent",status="ok"} 1' in text
+
+
+@pytest.fixture
+def sentry_transactions():
+    """Initialize Sentry with an in-memory transport and collect sent transactions."""
+    transactions = []
+
+    class CapturingTransport(Transport):
+        def capture_envelope(self, envelope):
+            transactions.extend(item.payload.json for item in envelope.items if item.type == "transaction")
+
+    sentry_sdk.init(dsn="https://public@sentry.example.com/1", transport=CapturingTransport, traces_sample_rate=1.0)
+    yield transactions
+    sentry_sdk.get_client().close()
+    sentry_sdk.get_global_scope().set_client(None)
+
+
+def test_export_trace_sends_sentry_spans(sentry_transactions):
+    """A trace outside any Sentry transaction is exported as its own transaction."""
+    with trace_request("run_agent") as trace:
+        node = trace.start_span("tools", "node")
+        trace.add_span("get_stock_price", "tool", node.start_ns, node.start_ns + 1000, queued_ms=0.1)
+        trace.end_span(node)
+
+    export_trace(trace)
+    sentry_sdk.flush()
+
+    (transaction,) = sentry_transactions
+    assert transaction["transaction"] == "run_agent"
+    ops = {span["op"]: span for span in transaction["spans"]}
+    assert set(ops) == {"agent.request", "agent.node", "agent.tool"}
+    assert ops["agent.tool"]["parent_span_id"] == ops["agent.node"]["span_id"]
+    assert ops["agent.tool"]["data"]["queued_ms"] == 0.1
+
+
+def test_export_trace_without_sentry_is_a_no_op():
+    """Without init_sentry nothing is sent and nothing fails."""
+    with trace_request("run_agent") as trace:
+        pass
+    export_trace(trace)
+
+
+def test_export_trace_errors_are_logged_not_raised(sentry_transactions, capsys):
+    """A failing Sentry export never propagates into the request."""
+    with trace_request("run_agent") as trace:
+        pass
+    with patch("sentry_sdk.get_current_span", side_effect=RuntimeError("sdk changed")):
+        export_trace(trace)
+
+    assert "Failed to export trace to Sentry: sdk changed" in capsys.readouterr().out
@@ -1,5 +1,8 @@
 """Unit tests for App 01: Parallel Tool Use."""
+import asyncio
 import sys
+import time
+import httpx
 import pytest
 from unittest.mock import patch, MagicMock
 from fastapi.testclient import TestClient
@@ -23,6 +26,58 @@ def mock_dependencies():
         config.api_host = "0.0.0.0"
         config.api_port = 8000
         config.tavily_api_key = "test-key"
+        config.http_max_connections = 10
+        config.http_max_keepalive_connections = 5
+        config.http_keepalive_expiry = 30.0
+        config.http_timeout = 5.0
+        config.http_per_host_limit = 4
+        config.http_host_limits = {}
+        config.http_warm_on_startup = False
+        config.tool_max_concurrency = 8
+        config.tool_max_workers = 4
+        config.tool_default_timeout = 5.0
+        config.tool_concurrency_limits = {}
+        config.tool_timeouts = {}
+        config.hedge_enabled = True
+        config.hedge_percentile = 0.95
+        config.hedge_max_rate = 0.1
+        config.hedge_min_delay = 0.05
+        config.hedge_default_delay = 2.0
+        config.tool_batch_max_size = 50
+        config.tool_batch_max_wait = 0.01
+        config.tool_cache_enabled = True
+        config.tool_cache_backend = "memory"
+        config.tool_cache_max_entries = 128
+        config.tool_cache_default_ttl = 60.0
+        config.speculation_enabled = False
+        config.speculation_max_calls = 4
+        config.speculation_min_hit_rate = 0.2
+        config.speculation_min_samples = 20
+        config.speculation_probe_interval = 10
+        config.agent_max_llm_turns = 8
+        config.agent_max_tool_calls = 24
+        config.agent_max_tokens = None
+        config.agent_deadline_seconds = 60.0
+        config.context_enabled = True
+        config.context_max_tokens = 8000
+        config.context_max_tool_chars = 2000
+        config.context_dedupe_tool_results = True
+        config.context_tokenizer = "approx"
+        config.checkpoint_backend = "memory"
+        config.checkpoint_path = ""
+        config.checkpoint_retention_seconds = None
+        config.checkpoint_lease_seconds = 120.0
+        config.jobs_backend = "memory"
+        config.jobs_max_workers = 2
+        config.jobs_max_queue = 4
+        config.jobs_result_ttl = 60.0
+        config.jobs_lease_seconds = 30.0
+        config.admission_max_concurrency = 4
+        config.admission_max_queue = 2
+        config.admission_queue_timeout = 1.0
+        config.admission_saturation_threshold = 0.5
+        config.model_load_max_attempts = 3
+        config.model_load_retry_backoff = 0.0
         mock_config_load.return_value = config
         
         # Setup mock LLM
@@ -33,6 +88,25 @@ def mock_dependencies():
         yield
 
 
+def _quote_response(prices):
+    """Build a Yahoo Finance v7 quote response for the given symbol prices."""
+    return {"quoteResponse": {"result": [
+        {"symbol": symbol, "regularMarketPrice": price} for symbol, price in prices.items()
+    ]}}
+
+
+def _tavily_response(results):
+    """Build a Tavily search API response with the given results."""
+    payload = {"results": [{"content": "...", "score": 0.9, **r} for r in results]}
+    return httpx.Response(200, json=payload, request=httpx.Request("POST", "https://api.tavily.com/search"))
+
+
+async def _astream_states(*states):
+    """Async generator standing in for agent_app.astream."""
+    for state in states:
+        yield state
+
+
 def test_health_endpoint():
     """Test health endpoint returns 200 and correct format."""
     from apps.parallel_tool_use.app import app as fastapi_app
@@ -48,6 +122,18 @@ def test_health_endpoint():
     assert data["status"] == "healthy"
 
 
+def test_health_endpoint_reports_a_model_that_never_loaded():
+    """Test /health returns 503 once the LLM has failed every load attempt."""
+    from apps.parallel_tool_use.app import app as fastapi_app, model_pool
+    
+    with patch.object(model_pool, "has_failed", return_value=True):
+        response = TestClient(fastapi_app).get("/health")
+    
+    assert response.status_code == 503
+    assert response.json()["status"] == "unhealthy"
+    assert response.json()["checks"] == {"llm": False}
+
+
 def test_root_endpoint():
     """Test root endpoint returns API information."""
     from apps.parallel_tool_use.app import app as fastapi_app
@@ -73,7 +159,7 @@ def test_run_endpoint_success(mock_agent_app):
         "messages": [AIMessage(content="Test response")],
         "performance_log": ["[AGENT] LLM call took 0.5 seconds."]
     }
-    mock_agent_app.stream.return_value = iter([mock_state])
+    mock_agent_app.astream.return_value = _astream_states(mock_state)
     
     client = TestClient(fastapi_app)
     response = client.post(
@@ -95,7 +181,7 @@ def test_run_endpoint_error(mock_agent_app):
     from apps.parallel_tool_use.app import app as fastapi_app
     
     # Mock agent error
-    mock_agent_app.stream.side_effect = Exception("Test error")
+    mock_agent_app.astream.side_effect = Exception("Test error")
     
     client = TestClient(fastapi_app)
     response = client.post(
@@ -106,27 +192,493 @@ def test_run_endpoint_error(mock_agent_app):
     assert response.status_code == 500
 
 
+@patch('apps.parallel_tool_use.app.agent_app')
+def test_run_endpoint_streaming(mock_agent_app):
+    """Test run endpoint emits server-sent events when stream=True."""
+    from apps.parallel_tool_use.app import app as fastapi_app
+    from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+    
+    final_state = {
+        "messages": [AIMessage(content="NVDA is up")],
+        "performance_log": ["[AGENT] LLM call took 0.5 seconds."]
+    }
+    events = [
+        {"event": "on_chain_start", "name": "LangGraph", "parent_ids": [], "metadata": {}, "data": {}},
+        {"event": "on_chain_start", "name": "agent", "parent_ids": ["root"],
+         "metadata": {"langgraph_node": "agent"}, "data": {}},
+        {"event": "on_chat_model_stream", "name": "llm", "parent_ids": ["root", "agent"],
+         "metadata": {"langgraph_node": "agent"}, "data": {"chunk": AIMessageChunk(content="NVDA")}},
+        {"event": "on_tool_end", "name": "get_stock_price", "parent_ids": ["root", "tools"],
+         "metadata": {"langgraph_node": "tools"},
+         "data": {"output": ToolMessage(content="177.82", tool_call_id="1")}},
+        {"event": "on_chain_end", "name": "LangGraph", "parent_ids": [], "metadata": {},
+         "data": {"output": final_state}},
+    ]
+    mock_agent_app.astream_events.return_value = _astream_states(*events)
+    
+    client = TestClient(fastapi_app)
+    response = client.post("/run", json={"query": "Test query", "stream": True})
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    body = response.text
+    assert 'event: node_start\ndata: {"node": "agent"}' in body
+    assert 'event: token\ndata: {"node": "agent", "content": "NVDA"}' in body
+    assert '"tool": "get_stock_price", "output": "177.82"' in body
+    assert body.rstrip().split("\n\n")[-1].startswith("event: result")
+    assert '"result": "NVDA is up"' in body
+    
+    from apps.parallel_tool_use.app import admission
+    assert admission.active == 0
+
+
 def test_get_stock_price_tool():
     """Test stock price tool with mocked yfinance."""
     from apps.parallel_tool_use.app import get_stock_price
     
-    with patch('apps.parallel_tool_use.app.yf.Ticker') as mock_ticker:
-        mock_info = {'regularMarketPrice': 150.00}
-        mock_ticker.return_value.info = mock_info
+    with patch('apps.parallel_tool_use.app.YfData') as mock_yf_data:
+        mock_yf_data.return_value.get_raw_json.return_value = _quote_response({"AAPL": 150.00})
         
         result = get_stock_price.invoke({"symbol": "AAPL"})
         assert result == 150.00
 
 
+def test_stock_prices_fall_back_to_public_api():
+    """Test quotes come from per-symbol Ticker.info when yfinance internals or the response shape change."""
+    from apps.parallel_tool_use.app import _fetch_stock_prices
+    
+    infos = {"AAPL": {"regularMarketPrice": 150.0}, "MSFT": {"currentPrice": 42.0}}
+    with patch('apps.parallel_tool_use.app.yf.Ticker') as mock_ticker:
+        mock_ticker.side_effect = lambda symbol: MagicMock(info=infos.get(symbol, {}))
+        
+        with patch('apps.parallel_tool_use.app.YfData', None):
+            assert _fetch_stock_prices(["AAPL", "MSFT", "NOPE"]) == {"AAPL": 150.0, "MSFT": 42.0, "NOPE": None}
+        with patch('apps.parallel_tool_use.app.YfData') as mock_yf_data:
+            mock_yf_data.return_value.get_raw_json.return_value = {"finance": {"result": None}}
+            assert _fetch_stock_prices(["AAPL"]) == {"AAPL": 150.0}
+
+
 def test_get_recent_company_news_tool():
     """Test company news tool with mocked Tavily."""
     from apps.parallel_tool_use.app import get_recent_company_news
     
-    with patch('apps.parallel_tool_use.app.TavilySearchResults') as mock_tavily:
-        mock_search = MagicMock()
-        mock_search.invoke.return_value = [{"title": "Test News", "url": "http://example.com"}]
-        mock_tavily.return_value = mock_search
-        
+    response = _tavily_response([{"title": "Test News", "url": "http://example.com"}])
+    with patch('apps.parallel_tool_use.app.http_pool.request', return_value=response) as mock_request:
         result = get_recent_company_news.invoke({"company_name": "Apple"})
+        mock_request.assert_called_once()
         assert isinstance(result, list)
         assert len(result) > 0
+
+
+def test_get_stock_price_tool_async():
+    """Test the async stock price variant resolves through the quote batcher."""
+    from apps.parallel_tool_use.app import get_stock_price
+    
+    with patch('apps.parallel_tool_use.app.YfData') as mock_yf_data:
+        mock_yf_data.return_value.get_raw_json.return_value = _quote_response({"MSFT": 42.0})
+        
+        result = asyncio.run(get_stock_price.ainvoke({"symbol": "msft"}))
+        assert result == 42.0
+
+
+def test_concurrent_stock_prices_share_one_quote_fetch():
+    """Test parallel get_stock_price calls are resolved with a single bulk request."""
+    from apps.parallel_tool_use.app import get_stock_price, stock_quote_batcher
+    
+    async def fan_out():
+        return await asyncio.gather(*(
+            get_stock_price.ainvoke({"symbol": symbol}) for symbol in ["AAPL", "MSFT", "NVDA", "NOPE"]
+        ), return_exceptions=True)
+    
+    with patch('apps.parallel_tool_use.app.YfData') as mock_yf_data:
+        get_raw_json = mock_yf_data.return_value.get_raw_json
+        get_raw_json.return_value = _quote_response({"AAPL": 150.0, "MSFT": 42.0, "NVDA": 177.8})
+        
+        results = asyncio.run(fan_out())
+        
+        assert results[:3] == [150.0, 42.0, 177.8]
+        assert str(results[3]) == "Could not find price for symbol NOPE"
+        get_raw_json.assert_called_once()
+        assert get_raw_json.call_args.kwargs["params"]["symbols"] == "AAPL,MSFT,NVDA,NOPE"
+        assert stock_quote_batcher.get_stats()["batches"] == 1
+
+
+def test_get_recent_company_news_tool_async():
+    """Test the async company news variant uses the pooled async HTTP client."""
+    from apps.parallel_tool_use.app import get_recent_company_news
+    
+    async def fake_arequest(method, url, **kwargs):
+        assert kwargs["json"]["query"] == "latest news about Apple"
+        return _tavily_response([{"title": "Async News", "url": "http://example.com"}])
+    
+    with patch('apps.parallel_tool_use.app.http_pool.arequest', side_effect=fake_arequest):
+        result = asyncio.run(get_recent_company_news.ainvoke({"company_name": "Apple"}))
+        assert result[0]["title"] == "Async News"
+
+
+def test_get_stock_price_tool_is_cached():
+    """Test repeated stock price lookups reuse the cached upstream result."""
+    from apps.parallel_tool_use.app import app as fastapi_app, get_stock_price
+    
+    with patch('apps.parallel_tool_use.app.YfData') as mock_yf_data:
+        get_raw_json = mock_yf_data.return_value.get_raw_json
+        get_raw_json.return_value = _quote_response({"AAPL": 150.00})
+        
+        assert get_stock_price.invoke({"symbol": "AAPL"}) == 150.00
+        assert asyncio.run(get_stock_price.ainvoke({"symbol": "AAPL"})) == 150.00
+        assert get_raw_json.call_count == 1
+    
+    client = TestClient(fastapi_app)
+    stats = client.get("/cache/stats").json()
+    assert stats["tools"]["get_stock_price"]["hits"] == 1
+    assert stats["tools"]["get_stock_price"]["misses"] == 1
+
+
+def test_unknown_symbol_is_an_error_and_not_cached():
+    """Test a missing price raises instead of caching an error string as the result."""
+    from apps.parallel_tool_use.app import get_stock_price
+    
+    with patch('apps.parallel_tool_use.app.YfData') as mock_yf_data:
+        get_raw_json = mock_yf_data.return_value.get_raw_json
+        get_raw_json.return_value = _quote_response({})
+        
+        for _ in range(2):
+            with pytest.raises(ValueError, match="Could not find price for symbol NOPE"):
+                get_stock_price.invoke({"symbol": "NOPE"})
+        assert get_raw_json.call_count == 2
+
+
+def test_client_disconnect_cancels_agent_run():
+    """Test an abandoned request cancels the running graph."""
+    from apps.parallel_tool_use.app import ClientDisconnected, _run_until_disconnected
+    
+    cancelled = []
+    
+    class DisconnectedRequest:
+        async def is_disconnected(self):
+            return True
+    
+    async def slow_graph():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+    
+    async def scenario():
+        with pytest.raises(ClientDisconnected):
+            await _run_until_disconnected(slow_graph(), DisconnectedRequest(), poll_interval=0.01)
+        await asyncio.sleep(0)
+    
+    asyncio.run(scenario())
+    assert cancelled == [True]
+
+
+def test_speculation_predicts_calls_from_query():
+    """Test ticker and company mentions become speculative tool calls."""
+    from apps.parallel_tool_use.app import speculator
+    
+    predictions = speculator.predictor.predict(
+        "What is the current stock price of NVIDIA (NVDA) and what is the latest news?"
+    )
+    assert predictions == [
+        ("get_stock_price", {"symbol": "NVDA"}),
+        ("get_recent_company_news", {"company_name": "NVIDIA"}),
+    ]
+    assert speculator.predictor.predict("Tell me a joke") == []
+    assert speculator.predictor.predict("What did the CEO say about AI and US ETF stock prices?") == []
+    assert speculator.predictor.predict("Is $AAPL stock up today?") == [("get_stock_price", {"symbol": "AAPL"})]
+
+
+def test_speculative_stock_price_is_reused_by_tool_node():
+    """Test the tool node reuses the stock price fetched during the LLM turn."""
+    from apps.parallel_tool_use.app import speculator, tool_node
+    
+    speculator.enabled = True
+    node_tool = tool_node.tools_by_name["get_stock_price"]
+    
+    async def request():
+        async with speculator.session("$NVDA stock price?") as session:
+            result = await node_tool.ainvoke({"symbol": "NVDA"})
+        return result, session.summary
+    
+    with patch('apps.parallel_tool_use.app.YfData') as mock_yf_data:
+        get_raw_json = mock_yf_data.return_value.get_raw_json
+        get_raw_json.return_value = _quote_response({"NVDA": 177.8})
+        
+        result, summary = asyncio.run(request())
+    
+    assert result == 177.8
+    assert get_raw_json.call_count == 1
+    assert summary["used"] == 1
+
+
+def test_ready_endpoint_waits_for_llm_load():
+    """Test /ready returns 503 until the background LLM load has finished."""
+    from apps.parallel_tool_use.app import app as fastapi_app, model_pool
+    
+    client = TestClient(fastapi_app)
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["models"]["llm"]["state"] == "pending"
+    
+    model_pool.get("llm")
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["checks"] == {"llm": True}
+
+
+@patch('apps.parallel_tool_use.app.agent_app')
+def test_run_returns_spans_and_feeds_metrics(mock_agent_app):
+    """Test /run returns the request trace and /metrics exposes its latency."""
+    from apps.parallel_tool_use.app import app as fastapi_app
+    from langchain_core.messages import AIMessage
+    
+    mock_agent_app.astream.return_value = _astream_states(
+        {"messages": [AIMessage(content="done")], "performance_log": []}
+    )
+    
+    client = TestClient(fastapi_app)
+    data = client.post("/run", json={"query": "Test query"}).json()
+    
+    assert data["spans"][0]["name"] == "run_agent"
+    assert data["spans"][0]["kind"] == "request"
+    assert data["spans"][0]["duration_ms"] > 0
+    
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'agent_span_duration_seconds_count{kind="request",name="run_agent",status="ok"} 1' in response.text
+
+
+@patch('apps.parallel_tool_use.app.agent_app')
+def test_metrics_counts_requests_and_in_flight_graphs(mock_agent_app):
+    """Test /metrics reports request counts, latency quantiles and in-flight graphs."""
+    from apps.parallel_tool_use.app import app as fastapi_app
+    from langchain_core.messages import AIMessage
+    
+    mock_agent_app.astream.return_value = _astream_states(
+        {"messages": [AIMessage(content="done")], "performance_log": []}
+    )
+    
+    client = TestClient(fastapi_app)
+    client.post("/run", json={"query": "Test query"})
+    text = client.get("/metrics").text
+    
+    assert 'agent_requests_total{mode="json",status="ok"} 1' in text
+    assert 'agent_request_duration_seconds{mode="json",quantile="0.99"}' in text
+    assert "agent_graphs_in_flight 0" in text
+    assert 'agent_tool_cache_lookups_total{tool="get_stock_price",result="hit"} 0' in text
+
+
+def test_run_rejects_with_retry_after_when_overloaded():
+    """Test /run returns 503 with Retry-After once no slot or queue place is left."""
+    import apps.parallel_tool_use.app as app_module
+    from shared.agents import AdmissionController
+    
+    app_module.admission = AdmissionController(max_concurrency=1, max_queue=0)
+    asyncio.run(app_module.admission.acquire())
+    
+    client = TestClient(app_module.app)
+    for stream in (False, True):
+        response = client.post("/run", json={"query": "Test query", "stream": stream})
+        assert response.status_code == 503
+        assert int(response.headers["Retry-After"]) >= 1
+    
+    assert app_module.admission.get_stats()["queue_full"] == 2
+
+
+def _scripted_app(plan, latency=0.0):
+    """Import the app with a scripted tool-calling model and offline quotes."""
+    from apps.parallel_tool_use.tests.fakes import FakeYfData, LatencyModel, ScriptedChatModel
+    import apps.parallel_tool_use.app as app_module
+    
+    model = ScriptedChatModel(plan=plan, latency=LatencyModel("constant", latency))
+    with patch('shared.llm.LLMFactory.create', return_value=model):
+        app_module.model_pool.get("llm")
+    return app_module, patch.object(app_module, "YfData", FakeYfData)
+
+
+def test_runaway_agent_loop_stops_at_llm_turn_budget():
+    """Test a model that never stops calling tools is cut off with a partial answer."""
+    runaway = [[("get_stock_price", {"symbol": f"SYM{turn}"})] for turn in range(50)]
+    app_module, fake_quotes = _scripted_app(runaway)
+    
+    with fake_quotes:
+        response = TestClient(app_module.app).post("/run", json={"query": "Loop", "max_llm_turns": 3})
+    
+    data = response.json()
+    assert response.status_code == 200
+    assert data["budget"]["exhausted"] == "llm_turns"
+    assert data["budget"]["used"]["llm_turns"] == 3
+    assert data["budget"]["used"]["tool_calls"] == 3
+    assert data["result"].startswith("Stopped before finishing: the LLM turn budget ran out.")
+    assert "- get_stock_price:" in data["result"]
+    assert data["performance_log"][-1] == "[BUDGET] Stopped early: LLM turn budget exhausted."
+
+
+def test_partial_answer_leaves_out_tool_errors():
+    """Test error results and their retry instructions are not shown to the user."""
+    from langchain_core.messages import ToolMessage
+    from apps.parallel_tool_use.app import _partial_answer
+    
+    messages = [
+        ToolMessage(content="177.8", tool_call_id="1", name="get_stock_price"),
+        ToolMessage(content="Error: bad symbol\n Please fix your mistakes.", tool_call_id="2",
+                    name="get_stock_price", status="error"),
+    ]
+    
+    answer = _partial_answer(messages, "llm_turns")
+    
+    assert "- get_stock_price: 177.8" in answer
+    assert "Please fix your mistakes" not in answer
+
+
+def test_tool_call_budget_stops_before_an_oversized_turn():
+    """Test a turn requesting more tool calls than remain is not executed."""
+    plan = [[("get_stock_price", {"symbol": s}) for s in ("NVDA", "AAPL", "MSFT")]]
+    app_module, fake_quotes = _scripted_app(plan)
+    
+    with fake_quotes:
+        data = TestClient(app_module.app).post("/run", json={"query": "Quotes", "max_tool_calls": 2}).json()
+    
+    assert data["budget"]["exhausted"] == "tool_calls"
+    assert data["budget"]["used"] == {**data["budget"]["used"], "llm_turns": 1, "tool_calls": 0}
+
+
+def test_deadline_cuts_a_slow_llm_call():
+    """Test the request deadline cancels an LLM call that would overrun it."""
+    app_module, fake_quotes = _scripted_app([], latency=5.0)
+    
+    with fake_quotes:
+        data = TestClient(app_module.app).post("/run", json={"query": "Slow", "deadline_seconds": 0.1}).json()
+    
+    assert data["budget"]["exhausted"] == "deadline"
+    assert data["total_time"] < 2.0
+
+
+def test_request_budget_cannot_exceed_server_limits():
+    """Test request overrides only tighten the configured budgets."""
+    app_module, fake_quotes = _scripted_app([])
+    
+    with fake_quotes:
+        data = TestClient(app_module.app).post("/run", json={"query": "Hi", "max_llm_turns": 100}).json()
+    
+    assert data["budget"]["limits"]["llm_turns"] == 8
+    assert data["budget"]["limits"]["deadline_seconds"] == 60.0
+    assert data["budget"]["exhausted"] is None
+    assert data["result"] == "done"
+
+
+def test_repeated_tool_results_are_compacted_in_the_prompt():
+    """Test a repeated tool result is sent to the LLM once and the saving is logged and counted."""
+    from apps.parallel_tool_use.tests.fakes import FakeTavilyClient
+    
+    plan = [[("get_recent_company_news", {"company_name": "NVIDIA"})]] * 2
+    app_module, fake_quotes = _scripted_app(plan)
+    app_module.tavily_client = FakeTavilyClient()
+    
+    with fake_quotes:
+        client = TestClient(app_module.app)
+        data = client.post("/run", json={"query": "Repeat"}).json()
+        metrics = client.get("/metrics").text
+    
+    compacted = [entry for entry in data["performance_log"] if entry.startswith("[CONTEXT]")]
+    assert len(compacted) == 1
+    assert "1 deduplicated" in compacted[0]
+    assert "agent_llm_prompt_tokens_total" in metrics
+    assert app_module.context_tokens_trimmed.value() > 0
+
+
+def test_run_with_thread_id_resumes_after_a_failure():
+    """Test a retried run resumes from its last completed node instead of redoing finished work."""
+    from apps.parallel_tool_use.tests.fakes import FakeYfData, ScriptedChatModel
+    
+    app_module, fake_quotes = _scripted_app([[("get_stock_price", {"symbol": "NVDA"})]])
+    app_module.tool_cache.enabled = False
+    original = ScriptedChatModel._agenerate
+    llm_calls = []
+    
+    async def flaky(self, messages, *args, **kwargs):
+        llm_calls.append(len(messages))
+        if len(llm_calls) == 2:
+            raise RuntimeError("provider down")
+        return await original(self, messages, *args, **kwargs)
+    
+    body = {"query": "Price of NVDA?", "thread_id": "t-1"}
+    with fake_quotes, patch.object(ScriptedChatModel, "_agenerate", flaky):
+        client = TestClient(app_module.app)
+        assert client.post("/run", json=body).status_code == 500
+        quotes = FakeYfData.requests.total
+        
+        resumed = client.post("/run", json=body).json()
+        resumed_calls = len(llm_calls)
+        repeated = client.post("/run", json=body).json()
+        repeated_calls = len(llm_calls)
+        new_turn = client.post("/run", json={"query": "And AAPL?", "thread_id": "t-1"}).json()
+    
+    assert resumed["result"] == "done" and resumed["thread_id"] == "t-1"
+    assert "[CHECKPOINT] Resumed thread t-1 at agent." in resumed["performance_log"]
+    assert resumed_calls == 3  # the first LLM turn was not repeated
+    assert FakeYfData.requests.total == quotes  # nor was the tool call
+    assert repeated["result"] == "done"
+    assert repeated["performance_log"][-1].startswith("[CHECKPOINT] Thread t-1 already answered")
+    assert repeated_calls == resumed_calls
+    # A different query continues the finished thread with the earlier messages as context
+    assert new_turn["result"] == "done"
+    assert llm_calls[-1] == 5
+
+
+def test_second_run_on_a_busy_thread_is_rejected():
+    """Test a thread with a run in progress rejects another run with 409, and a finished run frees it."""
+    app_module, fake_quotes = _scripted_app([])
+    
+    with fake_quotes:
+        client = TestClient(app_module.app)
+        app_module._active_threads.add("busy")
+        try:
+            rejected = client.post("/run", json={"query": "Hi", "thread_id": "busy"})
+        finally:
+            app_module._active_threads.discard("busy")
+        finished = client.post("/run", json={"query": "Hi", "thread_id": "free"})
+    
+    assert rejected.status_code == 409
+    assert finished.status_code == 200
+    assert "free" not in app_module._active_threads
+
+
+def test_jobs_run_in_the_background_and_can_be_cancelled():
+    """Test a job is accepted at once, polled to its result, and a slow one is cancelled mid-call."""
+    from apps.parallel_tool_use.tests.fakes import LatencyModel
+    
+    app_module, fake_quotes = _scripted_app([[("get_stock_price", {"symbol": "NVDA"})]])
+    
+    with fake_quotes, TestClient(app_module.app) as client:
+        submitted = client.post("/jobs", json={"query": "Price of NVDA?"})
+        assert submitted.status_code == 202
+        job_url = submitted.headers["Location"]
+        for _ in range(100):
+            job = client.get(job_url).json()
+            if job["status"] == "succeeded":
+                break
+            time.sleep(0.05)
+        assert job["result"]["result"] == "done"
+        assert job["result"]["budget"]["used"]["tool_calls"] == 1
+        
+        app_module.model_pool.get("llm").latency = LatencyModel("constant", 30.0)
+        slow = client.post("/jobs", json={"query": "Slow"}).json()
+        for _ in range(100):
+            if client.get(f"/jobs/{slow['id']}").json()["status"] == "running":
+                break
+            time.sleep(0.05)
+        started = time.time()
+        cancelled = client.delete(f"/jobs/{slow['id']}").json()
+        
+        assert cancelled["status"] == "cancelled"
+        assert time.time() - started < 2.0
+        assert client.get("/jobs/unknown").status_code == 404
+        assert client.delete("/jobs/unknown").status_code == 404
+        assert client.post("/jobs", json={"query": "q", "stream": True}).status_code == 400
+        stats = client.get("/cache/stats").json()["jobs"]
+    
+    assert stats["succeeded"] == 1 and stats["cancelled"] == 1
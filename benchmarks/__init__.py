@@ -0,0 +1 @@
+"""Offline benchmarks for the agent apps; run the scripts directly, e.g. ``python benchmarks/bench_suite.py``."""
@@ -0,0 +1,135 @@
+"""Overload benchmark for admission control on App 01's /run endpoint.
+
+Drives ``/run`` in-process (httpx ASGI transport) with an open-loop arrival
+rate above what the fake LLM backend can serve. The backend models a real
+capacity limit (a GPU or provider quota): at most ``--capacity`` generations
+run at once, each taking ``--latency`` seconds, and the rest wait. Two
+configurations are compared:
+
+    unbounded - no effective admission limit: every request is accepted and
+                queues at the backend, so latency grows for everyone
+    admission - max concurrency = backend capacity, a bounded wait queue
+                with a deadline, and 503 + Retry-After for the overflow
+
+Usage:
+    python benchmarks/bench_admission.py --rate 80 --duration 3 --capacity 4 --latency 0.1
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Any, List, Optional
+from unittest.mock import patch
+
+import httpx
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from shared.agents import AdmissionController  # noqa: E402
+
+
+class CapacityLimitedChatModel(BaseChatModel):
+    """Chat model serving at most ``capacity`` generations at once, ``latency`` seconds each."""
+
+    latency: float = 0.1
+    capacity: int = 4
+    semaphore: Optional[Any] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "capacity-limited-fake"
+
+    def bind_tools(self, tools: list, **kwargs: Any) -> "CapacityLimitedChatModel":
+        return self
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, **kwargs: Any) -> ChatResult:
+        raise NotImplementedError("The benchmark drives the async path")
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, **kwargs: Any) -> ChatResult:
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.capacity)
+        async with self.semaphore:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="done"))])
+
+
+def load_app(latency: float, capacity: int):
+    """Import the app module with the capacity-limited fake LLM in place of the configured provider."""
+    model = CapacityLimitedChatModel(latency=latency, capacity=capacity)
+    with patch("shared.llm.LLMFactory.create", return_value=model):
+        from apps.parallel_tool_use import app as app_module
+        app_module.model_pool.get("llm")
+    return app_module, model
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Return the ``q`` quantile (0-1) of the samples."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else float("nan")
+
+
+async def drive(app_module, rate: float, duration: float) -> dict:
+    """Send requests at ``rate`` per second for ``duration`` seconds and collect outcomes."""
+    ok: List[float] = []
+    rejected: List[float] = []
+    transport = httpx.ASGITransport(app=app_module.app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+        async def one() -> None:
+            started = time.perf_counter()
+            response = await client.post("/run", json={"query": "Say hello."})
+            elapsed = time.perf_counter() - started
+            (ok if response.status_code == 200 else rejected).append(elapsed)
+
+        tasks = []
+        start = time.perf_counter()
+        sent = 0
+        while time.perf_counter() - start < duration:
+            tasks.append(asyncio.ensure_future(one()))
+            sent += 1
+            # Open loop: arrivals follow the clock, not completions
+            await asyncio.sleep(max(0.0, start + sent / rate - time.perf_counter()))
+        await asyncio.gather(*tasks)
+
+    return {"sent": sent, "ok": ok, "rejected": rejected}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=80.0, help="Offered requests per second")
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds of offered load")
+    parser.add_argument("--capacity", type=int, default=4, help="Concurrent generations the backend serves")
+    parser.add_argument("--latency", type=float, default=0.1, help="Seconds per generation")
+    parser.add_argument("--queue", type=int, default=8, help="Admission wait queue size")
+    parser.add_argument("--queue-timeout", type=float, default=0.5, help="Admission queue deadline in seconds")
+    args = parser.parse_args()
+
+    app_module, model = load_app(args.latency, args.capacity)
+    capacity_rps = args.capacity / args.latency
+    print(f"backend capacity {capacity_rps:.0f} req/s, offered {args.rate:.0f} req/s for {args.duration:.0f}s")
+
+    scenarios = {
+        "unbounded": AdmissionController(max_concurrency=1_000_000, max_queue=0),
+        "admission": AdmissionController(
+            max_concurrency=args.capacity, max_queue=args.queue, queue_timeout=args.queue_timeout
+        ),
+    }
+    print(f"{'config':>10} {'sent':>6} {'ok':>6} {'503':>6} {'ok p50':>8} {'ok p99':>8} {'503 p99':>8}")
+    for name, controller in scenarios.items():
+        app_module.admission = controller
+        model.semaphore = None
+        result = asyncio.run(drive(app_module, args.rate, args.duration))
+        ok, rejected = result["ok"], result["rejected"]
+        print(
+            f"{name:>10} {result['sent']:>6} {len(ok):>6} {len(rejected):>6} "
+            f"{percentile(ok, 0.5):>7.3f}s {percentile(ok, 0.99):>7.3f}s {percentile(rejected, 0.99):>7.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
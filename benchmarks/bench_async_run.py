@@ -0,0 +1,82 @@
+"""Load benchmark for the async /run execution path of App 01.
+
+Drives the compiled agent graph with a fake chat model whose latency is
+simulated the way real provider clients behave: the sync path blocks the
+calling thread, the async path yields to the event loop. Two modes are
+compared at increasing concurrency inside a single event loop (one uvicorn
+worker):
+
+    stream   - the previous implementation: ``agent_app.stream`` called from
+               an async handler, which serializes every request
+    astream  - the current implementation: ``agent_app.astream``
+
+Usage:
+    python benchmarks/bench_async_run.py --latency 0.2 --concurrency 1 4 16 --output async_run.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from unittest.mock import patch
+
+from langchain_core.messages import HumanMessage
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from apps.parallel_tool_use.tests.fakes import LatencyModel, ScriptedChatModel  # noqa: E402
+
+
+def load_agent_app(latency: float):
+    """Import the app module with the fake LLM in place of the configured provider."""
+    model = ScriptedChatModel(latency=LatencyModel("constant", latency))
+    with patch("shared.llm.LLMFactory.create", return_value=model):
+        from apps.parallel_tool_use import app as app_module
+        app_module.model_pool.get("llm")
+    return app_module.agent_app
+
+
+async def run_once(agent_app, mode: str) -> None:
+    """Execute one agent request the way run_agent does in the given mode."""
+    inputs = {"messages": [HumanMessage(content="What is NVDA trading at?")], "performance_log": []}
+    if mode == "stream":
+        for _ in agent_app.stream(inputs, stream_mode="values"):
+            pass
+    else:
+        async for _ in agent_app.astream(inputs, stream_mode="values"):
+            pass
+
+
+async def measure(agent_app, mode: str, concurrency: int) -> float:
+    """Return requests/second for ``concurrency`` simultaneous requests."""
+    start = time.perf_counter()
+    await asyncio.gather(*(run_once(agent_app, mode) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return concurrency / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2, help="Simulated LLM latency in seconds")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--output", help="Also write the results as JSON to this path")
+    args = parser.parse_args()
+
+    agent_app = load_agent_app(args.latency)
+
+    results = []
+    print(f"{'concurrency':>12} {'stream req/s':>14} {'astream req/s':>14} {'speedup':>8}")
+    for concurrency in args.concurrency:
+        sync_rps = asyncio.run(measure(agent_app, "stream", concurrency))
+        async_rps = asyncio.run(measure(agent_app, "astream", concurrency))
+        print(f"{concurrency:>12} {sync_rps:>14.2f} {async_rps:>14.2f} {async_rps / sync_rps:>7.1f}x")
+        results.append({"concurrency": concurrency, "stream_rps": sync_rps, "astream_rps": async_rps})
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"latency": args.latency, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
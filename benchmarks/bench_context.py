@@ -0,0 +1,99 @@
+"""Prompt size and turn latency of a long agent loop, with and without context compaction.
+
+Replays a deep research loop (stock quotes and Tavily-sized news results,
+with some companies looked up twice) and measures, for every LLM turn, the
+prompt tokens the model would receive. Turn latency is modelled as a fixed
+overhead plus a prefill cost per prompt token, as for hosted and local
+models alike; the time spent compacting is measured and included.
+
+Usage:
+    python benchmarks/bench_context.py --turns 12 --max-tokens 4000 --prefill-ms-per-1k 40
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from shared.agents import ContextCompactor, TokenCounter  # noqa: E402
+
+COMPANIES = ["NVIDIA", "AMD", "Intel", "NVIDIA", "TSMC", "AMD", "Broadcom", "Qualcomm"]
+
+
+def news_result(company: str, articles: int = 5, chars: int = 900) -> str:
+    """A Tavily-sized result: a handful of articles with long content."""
+    body = f"{company} reported quarterly results and guidance ahead of analyst expectations. " * (chars // 80)
+    return json.dumps([
+        {"title": f"{company} headline {i}", "url": f"https://news.example.com/{company}/{i}", "content": body[:chars]}
+        for i in range(articles)
+    ])
+
+
+def turn_messages(turn: int) -> List[BaseMessage]:
+    """One agent turn: a quote and a news lookup requested together, with their results."""
+    company = COMPANIES[turn % len(COMPANIES)]
+    calls = [
+        {"name": "get_stock_price", "args": {"symbol": company[:4].upper()}, "id": f"q{turn}", "type": "tool_call"},
+        {"name": "get_recent_company_news", "args": {"company_name": company}, "id": f"n{turn}", "type": "tool_call"},
+    ]
+    return [
+        AIMessage(content="", tool_calls=calls),
+        ToolMessage(content=str(100.0 + turn), tool_call_id=f"q{turn}", name="get_stock_price"),
+        ToolMessage(content=news_result(company), tool_call_id=f"n{turn}", name="get_recent_company_news"),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=12, help="LLM turns in the loop")
+    parser.add_argument("--max-tokens", type=int, default=4000, help="Prompt token budget")
+    parser.add_argument("--max-tool-chars", type=int, default=2000, help="Maximum characters per tool result")
+    parser.add_argument("--overhead-ms", type=float, default=300.0, help="Fixed latency per LLM call")
+    parser.add_argument("--prefill-ms-per-1k", type=float, default=40.0, help="Latency per 1k prompt tokens")
+    parser.add_argument("--encoding", default="cl100k_base", help="tiktoken encoding, or approx")
+    args = parser.parse_args()
+
+    counter = TokenCounter(args.encoding)
+    counter.warm()
+    compactor = ContextCompactor(max_tokens=args.max_tokens, max_tool_chars=args.max_tool_chars, token_counter=counter)
+
+    history: List[BaseMessage] = [HumanMessage(content="Compare the recent news and prices of the big chip makers.")]
+    totals = {"full": 0, "compact": 0, "full_s": 0.0, "compact_s": 0.0, "compact_cpu_s": 0.0}
+
+    def latency(tokens: int) -> float:
+        return (args.overhead_ms + args.prefill_ms_per_1k * tokens / 1000) / 1000
+
+    print(f"{'turn':>4} {'full tok':>9} {'compact tok':>12} {'full lat':>9} {'compact lat':>12} {'compact cpu':>12}")
+    for turn in range(args.turns):
+        started = time.perf_counter()
+        context = compactor.compact(history)
+        compact_cpu = time.perf_counter() - started
+
+        full_latency = latency(context.tokens_before)
+        compact_latency = latency(context.tokens_after) + compact_cpu
+        totals["full"] += context.tokens_before
+        totals["compact"] += context.tokens_after
+        totals["full_s"] += full_latency
+        totals["compact_s"] += compact_latency
+        totals["compact_cpu_s"] += compact_cpu
+        print(
+            f"{turn + 1:>4} {context.tokens_before:>9} {context.tokens_after:>12} "
+            f"{full_latency:>8.3f}s {compact_latency:>11.3f}s {compact_cpu * 1000:>10.2f}ms"
+        )
+        history += turn_messages(turn)
+
+    print(
+        f"\ntotal prompt tokens {totals['full']} -> {totals['compact']} "
+        f"({1 - totals['compact'] / totals['full']:.0%} fewer); "
+        f"modelled LLM time {totals['full_s']:.2f}s -> {totals['compact_s']:.2f}s "
+        f"(compaction {totals['compact_cpu_s'] * 1000:.1f}ms)"
+    )
+
+
+if __name__ == "__main__":
+    main()
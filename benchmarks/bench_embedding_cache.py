@@ -0,0 +1,97 @@
+"""Startup cost of embedding a knowledge base and building its index, with and without the persistent cache.
+
+Simulates a process start as the notebooks do it (embed every document, then
+build a vector index) with an embedding model that costs a fixed time per
+document, as a CPU sentence-transformer does. Compared:
+
+    cold      - empty cache: every document is embedded and the index built and saved
+    restart   - a fresh process: vectors come from the memory-mapped cache and
+                the saved index is memory-mapped instead of rebuilt
+    update    - a restart after --changed-pct of the documents were edited
+
+Usage:
+    python benchmarks/bench_embedding_cache.py --docs 20000 --dim 384 --embed-ms 0.5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from shared.retrieval import CachedEmbeddings, EmbeddingCache, build_flat_index, load_index, save_index  # noqa: E402
+
+
+class SlowEmbeddings(Embeddings):
+    """Deterministic embeddings costing ``seconds_per_text`` each."""
+
+    model_name = "bench-embeddings"
+
+    def __init__(self, dim: int, seconds_per_text: float):
+        self.dim = dim
+        self.seconds_per_text = seconds_per_text
+        self.embedded = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.seconds_per_text * len(texts))
+        self.embedded += len(texts)
+        rng = np.random.default_rng(len(texts))
+        return rng.normal(size=(len(texts), self.dim)).astype(np.float32).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def start(directory: str, texts: List[str], model: SlowEmbeddings, dtype: str, reuse_index: bool) -> float:
+    """One process start: embed the corpus through the cache and get an index; returns seconds."""
+    started = time.perf_counter()
+    embeddings = CachedEmbeddings(model, EmbeddingCache(os.path.join(directory, "embeddings"), dtype=dtype))
+    before = model.embedded
+    vectors = embeddings.embed_matrix(texts)
+    index_path = os.path.join(directory, "index.bin")
+    if reuse_index and model.embedded == before and os.path.exists(index_path):
+        index = load_index(index_path)
+    else:
+        index = build_flat_index(vectors)
+        save_index(index, index_path)
+    index.search(vectors[:1], 5)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20000, help="Documents in the knowledge base")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--embed-ms", type=float, default=0.5, help="Embedding cost per document")
+    parser.add_argument("--changed-pct", type=float, default=1.0, help="Percent of documents edited before the update run")
+    parser.add_argument("--dtype", default="float32", help="Cache dtype: float32 or float16")
+    args = parser.parse_args()
+
+    texts = [f"Document {i}: knowledge base article body." for i in range(args.docs)]
+    changed = int(args.docs * args.changed_pct / 100)
+    edited = [f"{text} (revised)" if i < changed else text for i, text in enumerate(texts)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        model = SlowEmbeddings(args.dim, args.embed_ms / 1000)
+        runs = [
+            ("cold", texts, False),
+            ("restart", texts, True),
+            ("update", edited, True),
+        ]
+        print(f"{args.docs} documents, d={args.dim}, {args.embed_ms}ms per embedding, cache {args.dtype}\n")
+        print(f"{'run':<10} {'startup s':>10} {'embedded':>9}")
+        for name, corpus, reuse in runs:
+            before = model.embedded
+            seconds = start(directory, corpus, model, args.dtype, reuse)
+            print(f"{name:<10} {seconds:>10.3f} {model.embedded - before:>9}")
+        size = sum(os.path.getsize(os.path.join(directory, "embeddings", f)) for f in os.listdir(os.path.join(directory, "embeddings")))
+        print(f"\ncache size on disk: {size / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
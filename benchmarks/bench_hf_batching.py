@@ -0,0 +1,87 @@
+"""Throughput benchmark for batched local Hugging Face generation.
+
+Sends ``--requests`` concurrent prompts (one thread each, the way concurrent
+/run requests reach ``ChatHuggingFace``) through ``GenerationBatcher`` with
+increasing ``max_batch_size`` and reports generated tokens/second. Batch
+size 1 is the previous one-prompt-at-a-time behaviour.
+
+Runs on CPU with a tiny model; requires ``transformers`` and ``torch``.
+
+Usage:
+    python benchmarks/bench_hf_batching.py --model sshleifer/tiny-gpt2 --batch-sizes 1 2 4 8 16
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from shared.llm.batching import GenerationBatcher  # noqa: E402
+
+
+def load_pipeline(model: str):
+    """Load a CPU text-generation pipeline, left-padded for batching."""
+    try:
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer, pipeline
+    except ImportError:
+        raise ImportError(
+            "transformers and torch are required for this benchmark. "
+            "Install with: pip install transformers torch"
+        )
+
+    tokenizer = AutoTokenizer.from_pretrained(model)
+    if tokenizer.pad_token_id is None:
+        tokenizer.pad_token_id = tokenizer.eos_token_id
+    tokenizer.padding_side = "left"
+    model_instance = AutoModelForCausalLM.from_pretrained(model, torch_dtype=torch.float32)
+    return pipeline("text-generation", model=model_instance, tokenizer=tokenizer, device="cpu")
+
+
+def measure(pipe, batch_size: int, requests: int, new_tokens: int, max_wait: float) -> float:
+    """Return generated tokens/second for ``requests`` concurrent prompts."""
+    batcher = GenerationBatcher(pipe, max_batch_size=batch_size, max_wait=max_wait)
+    prompts = [f"Request {i}: summarize the latest market news for company number {i}." for i in range(requests)]
+    generation_kwargs = {
+        "max_new_tokens": new_tokens,
+        "min_new_tokens": new_tokens,
+        "do_sample": False,
+        "return_full_text": False,
+    }
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=requests) as pool:
+            list(pool.map(lambda prompt: batcher(prompt, **generation_kwargs), prompts))
+        elapsed = time.perf_counter() - start
+    finally:
+        batcher.close()
+
+    return requests * new_tokens / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="sshleifer/tiny-gpt2", help="Causal LM to load on CPU")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--requests", type=int, default=32, help="Concurrent generation requests")
+    parser.add_argument("--new-tokens", type=int, default=32, help="Tokens generated per request")
+    parser.add_argument("--max-wait", type=float, default=0.02, help="Batch collection window in seconds")
+    args = parser.parse_args()
+
+    pipe = load_pipeline(args.model)
+    # Warm up kernels and caches outside the measurement
+    measure(pipe, 1, 1, args.new_tokens, args.max_wait)
+
+    baseline = None
+    print(f"{'batch size':>10} {'tokens/s':>10} {'speedup':>8}")
+    for batch_size in args.batch_sizes:
+        tokens_per_second = measure(pipe, batch_size, args.requests, args.new_tokens, args.max_wait)
+        baseline = baseline or tokens_per_second
+        print(f"{batch_size:>10} {tokens_per_second:>10.1f} {tokens_per_second / baseline:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
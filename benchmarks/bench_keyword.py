@@ -0,0 +1,132 @@
+"""Keyword retrieval at 100k+ documents: per-query re-vectorizing vs a precomputed BM25 index.
+
+The baseline reproduces notebook 12's TfidfRetriever, which re-tokenizes and
+re-weights the whole corpus for every query, then sorts every score. The
+BM25Index builds its posting lists once; a query reads only the postings of
+its own terms and selects the top k with argpartition. Also measured: a
+batched ``search_many`` over related queries, incremental adds, and
+save/load (memory-mapped) against rebuilding.
+
+Documents are drawn from a Zipf-distributed synthetic vocabulary, so term
+frequencies look like natural text.
+
+Usage:
+    python benchmarks/bench_keyword.py --docs 100000 --words 40 --queries 200
+"""
+import argparse
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import List
+
+import numpy as np
+from langchain_core.documents import Document
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from shared.retrieval import BM25Index  # noqa: E402
+from shared.retrieval.keyword import tokenize  # noqa: E402
+
+
+def synthetic_texts(count: int, words: int, vocabulary: int, rng: np.random.Generator) -> List[str]:
+    ranks = np.minimum(rng.zipf(1.2, size=(count, words)), vocabulary)
+    return [" ".join(f"w{r}" for r in row) for row in ranks]
+
+
+def revectorizing_search(texts: List[str], query: str, k: int) -> List[int]:
+    """Notebook 12's approach: vectorize the whole corpus on every query, cosine-score and fully sort."""
+    counts = [Counter(tokenize(text)) for text in texts]
+    df = Counter(term for c in counts for term in c)
+    idf = {term: math.log((1 + len(texts)) / (1 + n)) + 1 for term, n in df.items()}
+    query_terms = Counter(tokenize(query))
+    query_vec = {t: tf * idf.get(t, 0.0) for t, tf in query_terms.items()}
+    query_norm = math.sqrt(sum(v * v for v in query_vec.values())) or 1.0
+    scores = np.zeros(len(texts))
+    for i, c in enumerate(counts):
+        norm = math.sqrt(sum((tf * idf[t]) ** 2 for t, tf in c.items())) or 1.0
+        scores[i] = sum(c.get(t, 0) * idf.get(t, 0.0) * v for t, v in query_vec.items()) / (norm * query_norm)
+    return list(np.argsort(scores)[-k:][::-1])
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100000, help="Corpus size")
+    parser.add_argument("--words", type=int, default=40, help="Words per document")
+    parser.add_argument("--vocabulary", type=int, default=50000, help="Distinct words")
+    parser.add_argument("--queries", type=int, default=200, help="Queries for the index")
+    parser.add_argument("--baseline-queries", type=int, default=3, help="Queries for the (slow) re-vectorizing baseline")
+    parser.add_argument("--batch", type=int, default=8, help="Related queries per search_many batch")
+    parser.add_argument("--k", type=int, default=10, help="Documents per query")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    texts = synthetic_texts(args.docs, args.words, args.vocabulary, rng)
+    queries = [" ".join(f"w{r}" for r in rng.integers(5, 2000, size=4)) for _ in range(args.queries)]
+    documents = [Document(page_content=text) for text in texts]
+
+    started = time.perf_counter()
+    index = BM25Index.from_documents(documents)
+    build_s = time.perf_counter() - started
+    print(f"{args.docs} documents, {len(index.vocabulary)} terms; index built in {build_s:.2f}s\n")
+
+    baseline = []
+    for query in queries[:args.baseline_queries]:
+        started = time.perf_counter()
+        revectorizing_search(texts, query, args.k)
+        baseline.append(time.perf_counter() - started)
+
+    single = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, args.k)
+        single.append(time.perf_counter() - started)
+
+    # Query expansion: each batch is one question rephrased, sharing most terms
+    batches = []
+    for query in queries[:args.queries // args.batch]:
+        terms = query.split()
+        batches.append([" ".join(terms[:3] + [f"w{r}"]) for r in rng.integers(5, 2000, size=args.batch)])
+    looped, batched = [], []
+    for batch in batches:
+        started = time.perf_counter()
+        for query in batch:
+            index.search(query, args.k)
+        looped.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        index.search_many(batch, args.k)
+        batched.append(time.perf_counter() - started)
+
+    print(f"{'search':<34} {'p50 ms':>9} {'p99 ms':>9}")
+    print(f"{'re-vectorize per query (baseline)':<34} {statistics.median(baseline) * 1000:>9.1f} {max(baseline) * 1000:>9.1f}")
+    print(f"{'BM25Index.search':<34} {percentile(single, 0.5) * 1000:>9.2f} {percentile(single, 0.99) * 1000:>9.2f}")
+    print(f"{f'{args.batch} queries, looped':<34} {percentile(looped, 0.5) * 1000:>9.2f} {percentile(looped, 0.99) * 1000:>9.2f}")
+    print(f"{f'{args.batch} queries, search_many':<34} {percentile(batched, 0.5) * 1000:>9.2f} {percentile(batched, 0.99) * 1000:>9.2f}")
+    print(f"\nspeedup over baseline: {statistics.median(baseline) / percentile(single, 0.5):,.0f}x")
+
+    extra = [Document(page_content=text) for text in synthetic_texts(1000, args.words, args.vocabulary, rng)]
+    started = time.perf_counter()
+    index.add_documents(extra)
+    add_s = time.perf_counter() - started
+
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        index.save(directory)
+        save_s = time.perf_counter() - started
+        started = time.perf_counter()
+        loaded = BM25Index.load(directory)
+        load_s = time.perf_counter() - started
+        assert loaded.search(queries[0], args.k) == index.search(queries[0], args.k)
+    print(f"add 1000 documents {add_s * 1000:.0f}ms; save {save_s:.2f}s; load (mmap) {load_s:.2f}s vs rebuild {build_s:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Multi-query retrieval for query expansion: per-query thread fan-out vs one batched embed and search.
+
+The baseline reproduces notebook 10's ``retrieval_node``: the hypothetical
+document, sub-questions and keywords are each sent through
+``retriever.invoke`` on a 5-thread pool, so every query pays its own
+embedding call and its own FAISS search, and results are deduplicated by
+``page_content``. The BatchedMultiQueryRetriever (with ``batch_queries``,
+as the hashing model embeds queries and documents alike) embeds all queries
+with one ``embed_documents`` call, searches the query matrix with one
+``index.search`` and fuses per document (max score or RRF).
+
+The embedding model holds the GIL for a fixed cost per call plus a cost per
+text, as a local sentence-transformer's tokenizer and Python-side batching
+do, so threads cannot overlap it.
+
+Usage:
+    python benchmarks/bench_multi_query.py --docs 50000 --dim 384 --queries 5 --call-ms 4 --text-ms 0.5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from shared.retrieval import BatchedMultiQueryRetriever, VectorShard  # noqa: E402
+
+
+def busy(seconds: float) -> None:
+    """Spin in Python (holding the GIL) for ``seconds``."""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class GilBoundEmbeddings(Embeddings):
+    """Hashing embeddings projected to ``dim`` that cost ``call_seconds`` per call plus ``text_seconds`` per text."""
+
+    def __init__(self, dim: int, call_seconds: float, text_seconds: float):
+        self.dim = dim
+        self.call_seconds = call_seconds
+        self.text_seconds = text_seconds
+        self.calls = 0
+        self._projection = np.random.default_rng(0).normal(size=(4096, dim)).astype(np.float32)
+
+    def _vector(self, text: str) -> np.ndarray:
+        buckets = [hash(word) % 4096 for word in text.lower().split()]
+        vector = self._projection[buckets].sum(axis=0) if buckets else np.zeros(self.dim, dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        busy(self.call_seconds + self.text_seconds * len(texts))
+        return [self._vector(text).tolist() for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def fan_out(shard: VectorShard, embeddings: Embeddings, queries: List[str], k: int, pool: ThreadPoolExecutor) -> List[Document]:
+    """Notebook 10's approach: one embed and one search per query on a thread pool, deduplicated by text."""
+    def invoke(query: str) -> List[Document]:
+        return [hit.document for hit in shard.search(np.asarray(embeddings.embed_query(query), dtype=np.float32), k)]
+
+    seen, documents = set(), []
+    for result in pool.map(invoke, queries):
+        for document in result:
+            if document.page_content not in seen:
+                seen.add(document.page_content)
+                documents.append(document)
+    return documents
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=50000, help="Documents in the index")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--queries", type=int, default=5, help="Expanded queries per question")
+    parser.add_argument("--questions", type=int, default=50, help="Questions to time")
+    parser.add_argument("--k", type=int, default=4, help="Documents per query")
+    parser.add_argument("--call-ms", type=float, default=4.0, help="Embedding cost per call")
+    parser.add_argument("--text-ms", type=float, default=0.5, help="Embedding cost per text")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    vocabulary = [f"term{i}" for i in range(2000)]
+    texts = [" ".join(rng.choice(vocabulary, size=12)) for _ in range(args.docs)]
+    embeddings = GilBoundEmbeddings(args.dim, args.call_ms / 1000, args.text_ms / 1000)
+    vectors = np.asarray([embeddings._vector(text) for text in texts], dtype=np.float32)
+    shard = VectorShard.from_vectors("kb", vectors, [Document(page_content=text) for text in texts], metric="ip")
+    questions = [[" ".join(rng.choice(vocabulary, size=6)) for _ in range(args.queries)] for _ in range(args.questions)]
+
+    retrievers = {
+        "batched max": BatchedMultiQueryRetriever(
+            shard=shard, embeddings=embeddings, k=args.k * args.queries, per_query_k=args.k, batch_queries=True
+        ),
+        "batched rrf": BatchedMultiQueryRetriever(
+            shard=shard, embeddings=embeddings, k=args.k * args.queries, per_query_k=args.k, fusion="rrf", batch_queries=True
+        ),
+    }
+    print(f"{args.docs} documents, d={args.dim}, {args.queries} queries per question, "
+          f"embedding {args.call_ms}ms/call + {args.text_ms}ms/text\n")
+    print(f"{'approach':<14} {'p50 ms':>8} {'p90 ms':>8} {'embed calls':>12} {'docs':>6}")
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        runs = [("fan-out x5", lambda qs: fan_out(shard, embeddings, qs, args.k, pool))]
+        runs += [(name, lambda qs, r=retriever: r.search_many(qs).documents) for name, retriever in retrievers.items()]
+        baseline = [set(d.page_content for d in fan_out(shard, embeddings, qs, args.k, pool)) for qs in questions]
+        for name, run in runs:
+            run(questions[0])  # warm up
+            embeddings.calls = 0
+            samples, found = [], []
+            for queries in questions:
+                started = time.perf_counter()
+                documents = run(queries)
+                samples.append((time.perf_counter() - started) * 1000)
+                found.append(documents)
+            overlap = statistics.mean(
+                len(base & {d.page_content for d in docs}) / (len(base) or 1) for base, docs in zip(baseline, found)
+            )
+            print(f"{name:<14} {percentile(samples, 0.5):>8.2f} {percentile(samples, 0.9):>8.2f} "
+                  f"{embeddings.calls / len(questions):>12.1f} {statistics.mean(map(len, found)):>6.1f}"
+                  f"   overlap with fan-out {overlap:.2f}")
+
+
+if __name__ == "__main__":
+    main()
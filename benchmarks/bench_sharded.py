@@ -0,0 +1,95 @@
+"""Latency and recall of sharded vs monolithic vector search as the corpus grows.
+
+Builds a synthetic clustered corpus (one topic per shard, like the
+engineering and marketing knowledge bases of notebook 11) at several sizes
+and answers the same queries three ways:
+
+    monolithic - one exact index over the whole corpus (the recall reference)
+    sharded    - every shard searched concurrently, heap-merged global top-k
+    pruned     - as sharded, skipping shards whose centroid is far from the query
+
+Uses FAISS flat indexes when faiss is installed and ExactIndex otherwise.
+
+Usage:
+    python benchmarks/bench_sharded.py --sizes 20000 100000 400000 --shards 8 --dim 128 --queries 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+import numpy as np
+from langchain_core.documents import Document
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from shared.retrieval import ShardedRetriever, VectorShard, build_flat_index, faiss_available  # noqa: E402
+from shared.retrieval.index import normalize  # noqa: E402
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20000, 100000, 400000], help="Corpus sizes")
+    parser.add_argument("--shards", type=int, default=8, help="Shards (topics) per corpus")
+    parser.add_argument("--dim", type=int, default=128, help="Embedding dimension")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per configuration")
+    parser.add_argument("--k", type=int, default=10, help="Documents per query")
+    parser.add_argument("--spread", type=float, default=2.4, help="Norm of the noise around each topic centre (centres have norm 1)")
+    parser.add_argument("--prune-threshold", type=float, default=0.3, help="Centroid similarity threshold for the pruned run")
+    parser.add_argument("--backend", default="auto", help="Index backend: auto, faiss or numpy")
+    args = parser.parse_args()
+
+    backend = args.backend if args.backend != "auto" else ("faiss" if faiss_available() else "numpy")
+    print(f"index backend: {backend}, {args.shards} shards, d={args.dim}, k={args.k}\n")
+    print(f"{'docs':>8} {'mode':>11} {'p50 ms':>8} {'p99 ms':>8} {'recall':>7} {'shards/q':>9}")
+
+    rng = np.random.default_rng(0)
+    for size in args.sizes:
+        centres = normalize(rng.normal(size=(args.shards, args.dim)))
+        per_shard = size // args.shards
+        noise = args.spread / np.sqrt(args.dim)
+        vectors = [normalize(c + noise * rng.normal(size=(per_shard, args.dim))) for c in centres]
+        documents = [[Document(page_content=f"{s}:{i}") for i in range(per_shard)] for s in range(args.shards)]
+        shards = [VectorShard.from_vectors(f"s{s}", vectors[s], documents[s], backend=backend) for s in range(args.shards)]
+        monolithic = build_flat_index(np.vstack(vectors), backend=backend)
+        all_documents = [doc for docs in documents for doc in docs]
+
+        # Queries are topical: near one centre, as real questions target one knowledge base
+        topics = rng.integers(0, args.shards, size=args.queries)
+        queries = normalize(centres[topics] + noise * rng.normal(size=(args.queries, args.dim)))
+
+        truth = []
+        latencies = []
+        for query in queries:
+            started = time.perf_counter()
+            _, ids = monolithic.search(query, args.k)
+            latencies.append(time.perf_counter() - started)
+            truth.append({all_documents[i].page_content for i in ids[0]})
+        print(f"{size:>8} {'monolithic':>11} {percentile(latencies, 0.5) * 1000:>8.2f} {percentile(latencies, 0.99) * 1000:>8.2f} {1.0:>7.3f} {1:>9.1f}")
+
+        for mode, threshold in (("sharded", None), ("pruned", args.prune_threshold)):
+            retriever = ShardedRetriever(shards=shards, k=args.k, prune_threshold=threshold)
+            retriever.search_by_vector(queries[0])  # start the thread pool
+            latencies, recalls, searched = [], [], []
+            for query, expected in zip(queries, truth):
+                started = time.perf_counter()
+                result = retriever.search_by_vector(query)
+                latencies.append(time.perf_counter() - started)
+                recalls.append(len(expected & {doc.page_content for doc in result.documents}) / args.k)
+                searched.append(len(result.searched))
+            retriever.close()
+            print(
+                f"{size:>8} {mode:>11} {percentile(latencies, 0.5) * 1000:>8.2f} {percentile(latencies, 0.99) * 1000:>8.2f} "
+                f"{statistics.mean(recalls):>7.3f} {statistics.mean(searched):>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
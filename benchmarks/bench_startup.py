@@ -0,0 +1,75 @@
+"""Cold-start benchmark for App 01.
+
+Each measurement runs in a fresh interpreter, so nothing is warm from a
+previous run. Two timings are reported:
+
+    serving  - seconds until the app module is imported and the server could
+               answer /health (the LLM is still loading in the background)
+    ready    - seconds until the background LLM load finishes and /ready
+               would return 200
+
+For comparison, ``eager`` is import plus a blocking LLM load, which is what
+startup cost before loading moved to the background.
+
+Uses the configured LLM_PROVIDER; with the default openai provider a dummy
+API key is enough, since no request is made.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 5
+    LLM_PROVIDER=huggingface python benchmarks/bench_startup.py --runs 3
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+_PROBE = """
+import json, time
+start = time.perf_counter()
+from apps.parallel_tool_use import app as app_module
+serving = time.perf_counter() - start
+if {eager}:
+    app_module.model_pool.get("llm")
+    ready = time.perf_counter() - start
+else:
+    app_module.model_pool.start()
+    app_module.model_pool.get("llm")
+    ready = time.perf_counter() - start
+print(json.dumps({{"serving": serving, "ready": ready}}))
+"""
+
+
+def run_probe(eager: bool) -> dict:
+    """Start a fresh interpreter and return its startup timings."""
+    env = {**os.environ, "PYTHONPATH": REPO_ROOT}
+    env.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(eager=eager)],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per mode")
+    args = parser.parse_args()
+
+    print(f"{'mode':>12} {'serving s':>10} {'ready s':>10}")
+    for mode, eager in (("eager", True), ("background", False)):
+        runs = [run_probe(eager) for _ in range(args.runs)]
+        serving = statistics.median(r["ready"] if eager else r["serving"] for r in runs)
+        ready = statistics.median(r["ready"] for r in runs)
+        print(f"{mode:>12} {serving:>10.2f} {ready:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
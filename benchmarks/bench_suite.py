@@ -0,0 +1,238 @@
+"""Reproducible load/latency benchmark suite for App 01's /run endpoint.
+
+Runs entirely offline: the LLM is a scripted tool-calling fake and yfinance
+and Tavily are replaced by deterministic stand-ins, all with seeded latency
+distributions. Each scenario is driven through the full FastAPI stack
+(httpx ASGI transport) by ``concurrency`` closed-loop clients:
+
+    single_tool     - one get_stock_price call, then the answer
+    parallel_tools  - three quotes and two news searches in one turn
+    deep_loop       - five sequential turns of one tool call each
+
+Results (throughput, latency percentiles, error counts, LLM/tool call
+counts) are printed and written as JSON. Pass ``--compare`` with an earlier
+results file to see the change per case, and ``--max-regression`` to fail
+when p99 latency or throughput got worse by more than that fraction.
+
+Usage:
+    python benchmarks/bench_suite.py --concurrency 1 8 32 --requests 64
+    python benchmarks/bench_suite.py --compare benchmarks/results/<commit>.json --max-regression 0.2
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from unittest.mock import patch
+
+import httpx
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from apps.parallel_tool_use.tests.fakes import FakeTavilyClient, FakeYfData, LatencyModel, ScriptedChatModel, ToolCallPlan  # noqa: E402
+from shared.agents import AdmissionController  # noqa: E402
+
+SCENARIOS: Dict[str, List[ToolCallPlan]] = {
+    "single_tool": [
+        [("get_stock_price", {"symbol": "NVDA"})],
+    ],
+    "parallel_tools": [
+        [
+            ("get_stock_price", {"symbol": "NVDA"}),
+            ("get_stock_price", {"symbol": "AAPL"}),
+            ("get_stock_price", {"symbol": "MSFT"}),
+            ("get_recent_company_news", {"company_name": "NVIDIA"}),
+            ("get_recent_company_news", {"company_name": "Apple"}),
+        ],
+    ],
+    "deep_loop": [
+        [("get_stock_price", {"symbol": "NVDA"})],
+        [("get_recent_company_news", {"company_name": "NVIDIA"})],
+        [("get_stock_price", {"symbol": "AMD"})],
+        [("get_recent_company_news", {"company_name": "AMD"})],
+        [("get_stock_price", {"symbol": "INTC"})],
+    ],
+}
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def load_app(model: ScriptedChatModel):
+    """Import the app module with the scripted model in place of the configured provider."""
+    with patch("shared.llm.LLMFactory.create", return_value=model):
+        import apps.parallel_tool_use.app as app_module
+        app_module.model_pool.get("llm")
+    return app_module
+
+
+def percentile(samples: List[float], q: float) -> Optional[float]:
+    """Return the ``q`` quantile (0-1) of the samples, or None when empty."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def drive(app_module, concurrency: int, requests: int) -> Dict[str, Any]:
+    """Issue ``requests`` /run calls from ``concurrency`` closed-loop clients."""
+    latencies: List[float] = []
+    errors = 0
+    next_request = iter(range(requests))
+    transport = httpx.ASGITransport(app=app_module.app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+        async def worker() -> None:
+            nonlocal errors
+            for index in next_request:
+                # Queries carry no ticker/company so speculative prefetch stays idle
+                started = time.perf_counter()
+                response = await client.post("/run", json={"query": f"Benchmark request {index}"})
+                latencies.append(time.perf_counter() - started)
+                errors += response.status_code != 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {"latencies": latencies, "errors": errors, "elapsed": elapsed}
+
+
+def run_case(app_module, model: ScriptedChatModel, tavily: FakeTavilyClient, scenario: str, concurrency: int, requests: int) -> Dict[str, Any]:
+    """Run one scenario at one concurrency level and summarize it."""
+    model.plan = SCENARIOS[scenario]
+    llm_calls, tool_calls = model.calls, FakeYfData.requests.total + tavily.requests.total
+    app_module.admission = AdmissionController(max_concurrency=concurrency, max_queue=0)
+
+    measured = asyncio.run(drive(app_module, concurrency, requests))
+
+    latencies = measured["latencies"]
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": measured["errors"],
+        "throughput_rps": requests / measured["elapsed"],
+        "latency_seconds": {
+            "mean": sum(latencies) / len(latencies),
+            "p50": percentile(latencies, 0.5),
+            "p90": percentile(latencies, 0.9),
+            "p99": percentile(latencies, 0.99),
+            "max": max(latencies),
+        },
+        "llm_calls": model.calls - llm_calls,
+        # Upstream fetches after batching and hedging, not tool calls requested by the model
+        "upstream_calls": FakeYfData.requests.total + tavily.requests.total - tool_calls,
+    }
+
+
+def git_commit() -> Optional[str]:
+    """Current commit of the working tree, if it is a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, max_regression: Optional[float]) -> bool:
+    """Print per-case changes against a baseline file; return False on a regression beyond the limit."""
+    with open(baseline_path) as f:
+        baseline = {(r["scenario"], r["concurrency"]): r for r in json.load(f)["results"]}
+
+    ok = True
+    print(f"\nvs {baseline_path}")
+    print(f"{'scenario':>16} {'conc':>5} {'p99 change':>11} {'req/s change':>13}")
+    for result in results:
+        base = baseline.get((result["scenario"], result["concurrency"]))
+        if base is None:
+            continue
+        p99_change = result["latency_seconds"]["p99"] / base["latency_seconds"]["p99"] - 1
+        rps_change = result["throughput_rps"] / base["throughput_rps"] - 1
+        regressed = max_regression is not None and (p99_change > max_regression or -rps_change > max_regression)
+        ok = ok and not regressed
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{result['scenario']:>16} {result['concurrency']:>5} {p99_change:>+10.1%} {rps_change:>+12.1%}{flag}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=64, help="Requests per scenario and concurrency level")
+    parser.add_argument("--llm-latency", default="lognormal:0.2:0.3", help="constant:S, uniform:A:B or lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--quote-latency", default="lognormal:0.08:0.4")
+    parser.add_argument("--news-latency", default="lognormal:0.3:0.5")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tool-cache", action="store_true", help="Keep the tool result cache on (off by default)")
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, help="Exit 1 if p99 or throughput regress by more than this fraction")
+    parser.add_argument("--verbose", action="store_true", help="Show the app's per-request log output")
+    args = parser.parse_args()
+
+    latencies = {
+        "llm": LatencyModel.parse(args.llm_latency, args.seed),
+        "quote": LatencyModel.parse(args.quote_latency, args.seed),
+        "news": LatencyModel.parse(args.news_latency, args.seed),
+    }
+    model = ScriptedChatModel(latency=latencies["llm"])
+    tavily = FakeTavilyClient(latency=latencies["news"])
+    FakeYfData.latency = latencies["quote"]
+
+    app_module = load_app(model)
+    app_module.tavily_client = tavily
+    app_module.tool_cache.enabled = args.tool_cache
+
+    results = []
+    print(f"{'scenario':>16} {'conc':>5} {'req/s':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'errors':>6}")
+    with patch.object(app_module, "YfData", FakeYfData):
+        for scenario in args.scenarios:
+            for concurrency in args.concurrency:
+                quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+                with quiet:
+                    result = run_case(app_module, model, tavily, scenario, concurrency, args.requests)
+                results.append(result)
+                latency = result["latency_seconds"]
+                print(
+                    f"{scenario:>16} {concurrency:>5} {result['throughput_rps']:>8.2f} "
+                    f"{latency['p50']:>7.3f}s {latency['p90']:>7.3f}s {latency['p99']:>7.3f}s {result['errors']:>6}"
+                )
+
+    commit = git_commit()
+    report = {
+        "suite": "parallel_tool_use",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "requests": args.requests,
+            "seed": args.seed,
+            "tool_cache": args.tool_cache,
+            "latency": {name: str(model) for name, model in latencies.items()},
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or 'results'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare and not compare(results, args.compare, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,10 +13,12 @@ setup(
         "pydantic>=2.0.0",
         "pydantic-settings>=2.0.0",
         "langchain>=0.1.0",
-        "langgraph>=0.1.0",
+        "langgraph>=1.2.0",  # langgraph.channels.delta (DeltaChannel)
         "fastapi>=0.100.0",
         "uvicorn>=0.20.0",
-        "sentry-sdk>=1.30.0",
+        "sentry-sdk>=2.0.0",
+        "httpx>=0.25.0",
+        "numpy>=1.24.0",  # shared.retrieval
     ],
     extras_require={
         "dev": [
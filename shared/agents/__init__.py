@@ -1,4 +1,35 @@
 """Agent utilities and base patterns."""
+from .admission import AdmissionController, AdmissionRejected, AdmissionSlot
 from .base import BaseAgent
+from .budget import ExecutionBudget
+from .checkpoint import FileCheckpointSaver, SQLiteCheckpointSaver, append_reducer, checkpointer_from_config
+from .context import CompactedContext, ContextCompactor, TokenCounter
+from .hedging import Hedger, LatencyTracker
+from .jobs import InMemoryJobBackend, Job, JobBackend, JobManager, JobQueueFull, RedisJobBackend
+from .speculation import RulePredictor, SpeculationSession, SpeculativeExecutor
 
-__all__ = ["BaseAgent"]
+__all__ = [
+    "AdmissionController",
+    "AdmissionRejected",
+    "AdmissionSlot",
+    "BaseAgent",
+    "CompactedContext",
+    "ContextCompactor",
+    "ExecutionBudget",
+    "FileCheckpointSaver",
+    "Hedger",
+    "InMemoryJobBackend",
+    "Job",
+    "JobBackend",
+    "JobManager",
+    "JobQueueFull",
+    "LatencyTracker",
+    "RedisJobBackend",
+    "RulePredictor",
+    "SQLiteCheckpointSaver",
+    "SpeculationSession",
+    "SpeculativeExecutor",
+    "TokenCounter",
+    "append_reducer",
+    "checkpointer_from_config",
+]
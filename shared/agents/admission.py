@@ -0,0 +1,204 @@
+"""Admission control: a concurrency gate with a bounded, deadline-limited wait queue."""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is turned away instead of being queued or admitted."""
+
+    def __init__(self, reason: str, retry_after: float):
+        """
+        Initialize the rejection.
+
+        Args:
+            reason: ``queue_full`` or ``queue_timeout``
+            retry_after: Suggested seconds before the client retries
+        """
+        super().__init__(f"Server overloaded ({reason}); retry after {retry_after:.0f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionSlot:
+    """An admitted request's slot; ``release`` is idempotent."""
+
+    def __init__(self, controller: "AdmissionController", queued_seconds: float):
+        self._controller = controller
+        self.queued_seconds = queued_seconds
+        self.admitted_at = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        """Give the slot back (to the next queued request, if any)."""
+        if self._released:
+            return
+        self._released = True
+        self._controller._release(time.monotonic() - self.admitted_at)
+
+
+class AdmissionController:
+    """
+    Admits at most ``max_concurrency`` requests at once.
+
+    Requests beyond the limit wait in a FIFO queue of at most ``max_queue``
+    entries for up to ``queue_timeout`` seconds; a freed slot is handed
+    directly to the oldest waiter. When the queue is full, or a request's
+    wait runs out, ``AdmissionRejected`` is raised right away with a
+    Retry-After estimate, so overload turns into fast rejections rather than
+    unbounded latency for everyone.
+
+    The controller is meant to be used from the server's event loop.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 32,
+        max_queue: int = 64,
+        queue_timeout: float = 10.0,
+        saturation_threshold: float = 0.5,
+        alpha: float = 0.2,
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            max_concurrency: Requests executing at once
+            max_queue: Requests allowed to wait for a slot (0 = reject immediately when busy)
+            queue_timeout: Maximum seconds a request waits for a slot
+            saturation_threshold: Queue fill fraction at which the server reports itself saturated
+            alpha: EWMA smoothing factor for request service time
+        """
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.saturation_threshold = saturation_threshold
+        self.alpha = alpha
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._service_seconds: Optional[float] = None
+        self._counters = {"admitted": 0, "queued": 0, "queue_full": 0, "queue_timeout": 0}
+
+    @classmethod
+    def from_config(cls, config: Any) -> "AdmissionController":
+        """
+        Create a controller from a BaseConfig.
+
+        Args:
+            config: Configuration object with ``admission_*`` settings
+
+        Returns:
+            Configured AdmissionController
+        """
+        return cls(
+            max_concurrency=config.admission_max_concurrency,
+            max_queue=config.admission_max_queue,
+            queue_timeout=config.admission_queue_timeout,
+            saturation_threshold=config.admission_saturation_threshold,
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests waiting for a slot."""
+        return len(self._waiters)
+
+    def retry_after(self) -> float:
+        """Estimate whole seconds until a retry could be admitted, from recent service times."""
+        if self._service_seconds is None:
+            return max(1.0, math.ceil(self.queue_timeout))
+        backlog = self.queue_depth + 1
+        return max(1.0, math.ceil(self._service_seconds * backlog / self.max_concurrency))
+
+    async def acquire(self) -> AdmissionSlot:
+        """
+        Wait for a slot.
+
+        Returns:
+            AdmissionSlot that must be released when the request finishes
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait timed out
+        """
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            self._counters["admitted"] += 1
+            return AdmissionSlot(self, 0.0)
+        if len(self._waiters) >= self.max_queue:
+            self._counters["queue_full"] += 1
+            raise AdmissionRejected("queue_full", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._counters["queued"] += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self._release(None)
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                self._counters["queue_timeout"] += 1
+                raise AdmissionRejected("queue_timeout", self.retry_after()) from None
+            raise
+        self._counters["admitted"] += 1
+        return AdmissionSlot(self, time.monotonic() - started)
+
+    def _release(self, service_seconds: Optional[float]) -> None:
+        if service_seconds is not None:
+            if self._service_seconds is None:
+                self._service_seconds = service_seconds
+            else:
+                self._service_seconds += self.alpha * (service_seconds - self._service_seconds)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot passes straight to the waiter; ``active`` is unchanged
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[AdmissionSlot]:
+        """Hold a slot for the enclosed block; see ``acquire``."""
+        slot = await self.acquire()
+        try:
+            yield slot
+        finally:
+            slot.release()
+
+    def is_saturated(self) -> bool:
+        """Whether the wait queue is filled past the saturation threshold."""
+        if self.max_queue == 0:
+            return self.active >= self.max_concurrency
+        return self.queue_depth / self.max_queue >= self.saturation_threshold
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get current load, saturation and admission counters."""
+        if self.max_queue:
+            saturation = self.queue_depth / self.max_queue
+        else:
+            saturation = float(self.active >= self.max_concurrency)
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queue_depth": self.queue_depth,
+            "utilization": self.active / self.max_concurrency,
+            "saturation": saturation,
+            "saturated": self.is_saturated(),
+            "service_seconds_ewma": self._service_seconds,
+            "retry_after": self.retry_after(),
+            **self._counters,
+            "rejected": self._counters["queue_full"] + self._counters["queue_timeout"],
+        }
+
+
+__all__ = ["AdmissionController", "AdmissionRejected", "AdmissionSlot"]
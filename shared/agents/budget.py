@@ -0,0 +1,144 @@
+"""Per-request execution budgets for agent loops: LLM turns, tool calls, tokens and a deadline."""
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+def _tighter(limit: Optional[float], override: Optional[float]) -> Optional[float]:
+    """A request override may only tighten a server limit."""
+    if override is None:
+        return limit
+    return override if limit is None else min(limit, override)
+
+
+class ExecutionBudget:
+    """
+    Tracks one request's consumption against its limits.
+
+    Limits set to None are not enforced. The graph nodes consult the budget
+    before each step (``exhausted`` / ``allows_tool_calls``) and record what
+    they used; once a limit is reached the agent answers with what it has
+    instead of continuing. ``deadline`` is an absolute ``time.monotonic()``
+    value, so it can also be passed to ``ToolExecutor.track``.
+    """
+
+    def __init__(
+        self,
+        max_llm_turns: Optional[int] = None,
+        max_tool_calls: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        deadline_seconds: Optional[float] = None,
+    ):
+        """
+        Start a budget.
+
+        Args:
+            max_llm_turns: Maximum LLM calls
+            max_tool_calls: Maximum tool calls across all turns
+            max_tokens: Maximum input plus output tokens across all LLM calls
+            deadline_seconds: Wall-clock seconds from now until the deadline
+        """
+        self.max_llm_turns = max_llm_turns
+        self.max_tool_calls = max_tool_calls
+        self.max_tokens = max_tokens
+        self.deadline_seconds = deadline_seconds
+        self.started = time.monotonic()
+        self.deadline = self.started + deadline_seconds if deadline_seconds is not None else None
+        self.llm_turns = 0
+        self.tool_calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.stop_reason: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Any, **overrides: Optional[float]) -> "ExecutionBudget":
+        """
+        Create a budget from a BaseConfig, tightened by per-request overrides.
+
+        Args:
+            config: Configuration object with ``agent_max_*`` and ``agent_deadline_seconds``
+            **overrides: ``max_llm_turns``, ``max_tool_calls``, ``max_tokens`` or
+                ``deadline_seconds`` from the request; None keeps the config value
+
+        Returns:
+            ExecutionBudget
+        """
+        return cls(
+            max_llm_turns=_tighter(config.agent_max_llm_turns, overrides.get("max_llm_turns")),
+            max_tool_calls=_tighter(config.agent_max_tool_calls, overrides.get("max_tool_calls")),
+            max_tokens=_tighter(config.agent_max_tokens, overrides.get("max_tokens")),
+            deadline_seconds=_tighter(config.agent_deadline_seconds, overrides.get("deadline_seconds")),
+        )
+
+    @property
+    def tokens(self) -> int:
+        """Input plus output tokens spent so far."""
+        return self.input_tokens + self.output_tokens
+
+    def remaining_seconds(self) -> Optional[float]:
+        """Seconds left until the deadline (never negative), or None without one."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def exhausted(self) -> Optional[str]:
+        """
+        Check whether another LLM turn may start.
+
+        Returns:
+            The exhausted budget (``llm_turns``, ``tokens`` or ``deadline``), or None
+        """
+        if self.max_llm_turns is not None and self.llm_turns >= self.max_llm_turns:
+            return "llm_turns"
+        if self.max_tokens is not None and self.tokens >= self.max_tokens:
+            return "tokens"
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return "deadline"
+        return None
+
+    def allows_tool_calls(self, count: int) -> bool:
+        """Whether ``count`` more tool calls fit in the budget."""
+        return self.max_tool_calls is None or self.tool_calls + count <= self.max_tool_calls
+
+    def record_llm_turn(self, message: Any) -> None:
+        """Count an LLM call and its token usage (from ``usage_metadata``, when reported)."""
+        usage = getattr(message, "usage_metadata", None) or {}
+        with self._lock:
+            self.llm_turns += 1
+            self.input_tokens += usage.get("input_tokens", 0)
+            self.output_tokens += usage.get("output_tokens", 0)
+
+    def record_tool_calls(self, count: int) -> None:
+        """Count tool calls about to run."""
+        with self._lock:
+            self.tool_calls += count
+
+    def stop(self, reason: str) -> None:
+        """Record why the agent stopped early (the first reason wins)."""
+        with self._lock:
+            if self.stop_reason is None:
+                self.stop_reason = reason
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Limits, consumption and the early-stop reason (None if the agent finished on its own)."""
+        return {
+            "limits": {
+                "llm_turns": self.max_llm_turns,
+                "tool_calls": self.max_tool_calls,
+                "tokens": self.max_tokens,
+                "deadline_seconds": self.deadline_seconds,
+            },
+            "used": {
+                "llm_turns": self.llm_turns,
+                "tool_calls": self.tool_calls,
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+                "tokens": self.tokens,
+                "elapsed_seconds": time.monotonic() - self.started,
+            },
+            "exhausted": self.stop_reason,
+        }
+
+
+__all__ = ["ExecutionBudget"]
@@ -0,0 +1,655 @@
+"""Persistent LangGraph checkpoint stores (SQLite and append-only files) for resumable agent runs."""
+import asyncio
+import base64
+import os
+import pickle
+import random
+import sqlite3
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator, Sequence
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+
+
+def append_reducer(current: List[Any], updates: Sequence[List[Any]]) -> List[Any]:
+    """
+    ``operator.add`` for a batch of list updates, as a ``DeltaChannel`` reducer.
+
+    State fields annotated with ``DeltaChannel(append_reducer)`` are
+    checkpointed as the per-step writes only; the full list is rebuilt by
+    replaying them on resume instead of being re-serialized every step.
+    """
+    return current + [item for update in updates for item in update]
+
+
+def _next_version(current: Optional[Any]) -> str:
+    """Monotonic string channel versions, as used by LangGraph's in-memory saver."""
+    if current is None:
+        number = 0
+    elif isinstance(current, int):
+        number = current
+    else:
+        number = int(current.split(".")[0])
+    return f"{number + 1:032}.{random.random():016}"
+
+
+class _ThreadedAsyncMixin:
+    """Async saver methods that run the blocking sync implementation in a worker thread."""
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata, new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = ""
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+class _Retention:
+    """How long idle threads are kept, and when the store last pruned them."""
+
+    def __init__(self, seconds: Optional[float], interval: float = 3600.0):
+        self.seconds = seconds
+        # Prune at most this often, and at least every tenth of the retention period
+        self.interval = min(interval, seconds / 10) if seconds else interval
+        self.last_run = 0.0
+
+    def due(self) -> bool:
+        return self.seconds is not None and time.time() - self.last_run >= self.interval
+
+
+class SQLiteCheckpointSaver(_ThreadedAsyncMixin, BaseCheckpointSaver[str]):
+    """
+    Checkpoint store in a local SQLite database.
+
+    Uses LangGraph's storage layout: a checkpoint row holds the channel
+    versions, each channel value is stored once per version in ``blobs``
+    (only channels that changed in a step are written), and node outputs are
+    stored in ``writes``. Combined with ``DeltaChannel`` state fields, a step
+    adds just its own new messages rather than the whole history.
+
+    A run takes a lease on its thread (``claim_thread``) so two processes
+    sharing the database never interleave writes to one thread, and threads
+    idle for longer than ``retention_seconds`` are deleted.
+    """
+
+    def __init__(
+        self,
+        path: str = ".cache/checkpoints.sqlite",
+        retention_seconds: Optional[float] = None,
+        **kwargs: Any,
+    ):
+        """
+        Open or create the database.
+
+        Args:
+            path: SQLite database file (``:memory:`` for a non-persistent store)
+            retention_seconds: Delete threads with no checkpoint for this long (None = keep forever)
+            **kwargs: Passed to BaseCheckpointSaver (e.g. ``serde``)
+        """
+        super().__init__(**kwargs)
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.path = path
+        self.retention = _Retention(retention_seconds)
+        self._leases: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                parent_checkpoint_id TEXT,
+                type TEXT NOT NULL,
+                checkpoint BLOB NOT NULL,
+                metadata_type TEXT NOT NULL,
+                metadata BLOB NOT NULL,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+            );
+            CREATE TABLE IF NOT EXISTS blobs (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                channel TEXT NOT NULL,
+                version TEXT NOT NULL,
+                type TEXT NOT NULL,
+                value BLOB,
+                PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+            );
+            CREATE TABLE IF NOT EXISTS writes (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                task_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                channel TEXT NOT NULL,
+                type TEXT NOT NULL,
+                value BLOB,
+                task_path TEXT NOT NULL DEFAULT '',
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+            );
+            CREATE TABLE IF NOT EXISTS threads (
+                thread_id TEXT PRIMARY KEY,
+                updated_at REAL NOT NULL,
+                lease_owner TEXT,
+                lease_expires_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS threads_updated_at ON threads (updated_at);
+            """
+        )
+
+    def _tuple(self, thread_id: str, checkpoint_ns: str, row: Tuple[Any, ...]) -> CheckpointTuple:
+        checkpoint_id, parent_id, type_, checkpoint_bytes, metadata_type, metadata_bytes = row
+        checkpoint: Checkpoint = self.serde.loads_typed((type_, checkpoint_bytes))
+
+        channel_values: Dict[str, Any] = {}
+        for channel, version in checkpoint["channel_versions"].items():
+            blob = self._conn.execute(
+                "SELECT type, value FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if blob is not None and blob[0] != "empty":
+                channel_values[channel] = self.serde.loads_typed(blob)
+
+        writes = self._conn.execute(
+            "SELECT task_id, channel, type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_path, task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+
+        def config_for(cid: str) -> RunnableConfig:
+            return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": cid}}
+
+        return CheckpointTuple(
+            config=config_for(checkpoint_id),
+            checkpoint={**checkpoint, "channel_values": channel_values},
+            metadata=self.serde.loads_typed((metadata_type, metadata_bytes)),
+            parent_config=config_for(parent_id) if parent_id else None,
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((type_, value)))
+                for task_id, channel, type_, value in writes
+            ],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Load the checkpoint named by ``config``, or the thread's latest one."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+        with self._lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            return self._tuple(thread_id, checkpoint_ns, row) if row is not None else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """List checkpoints newest first, optionally for one thread, before a checkpoint or by metadata."""
+        clauses, params = [], []
+        if config is not None:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before is not None and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+                f"metadata_type, metadata FROM checkpoints {where} ORDER BY checkpoint_id DESC",
+                params,
+            ).fetchall()
+            results = []
+            for thread_id, checkpoint_ns, *row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                metadata = self.serde.loads_typed((row[4], row[5]))
+                if filter and not all(metadata.get(key) == value for key, value in filter.items()):
+                    continue
+                results.append(self._tuple(thread_id, checkpoint_ns, tuple(row)))
+        yield from results
+
+    def put(
+        self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata, new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        """Store a checkpoint and the values of the channels that changed since its parent."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        stored = checkpoint.copy()
+        values: Dict[str, Any] = stored.pop("channel_values")  # type: ignore[misc]
+        blobs = [
+            (thread_id, checkpoint_ns, channel, str(version),
+             *(self.serde.dumps_typed(values[channel]) if channel in values else ("empty", None)))
+            for channel, version in new_versions.items()
+        ]
+        type_, checkpoint_bytes = self.serde.dumps_typed(stored)
+        metadata_type, metadata_bytes = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)", blobs)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                     type_, checkpoint_bytes, metadata_type, metadata_bytes),
+                )
+                now = time.time()
+                self._conn.execute(
+                    "INSERT INTO threads (thread_id, updated_at) VALUES (?, ?) "
+                    "ON CONFLICT (thread_id) DO UPDATE SET updated_at = excluded.updated_at",
+                    (thread_id, now),
+                )
+                if thread_id in self._leases:
+                    # Each step renews the lease of a run that is still making progress
+                    owner, ttl = self._leases[thread_id]
+                    self._conn.execute(
+                        "UPDATE threads SET lease_expires_at = ? WHERE thread_id = ? AND lease_owner = ?",
+                        (now + ttl, thread_id, owner),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            if self.retention.due():
+                self._prune_locked()
+
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(
+        self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = ""
+    ) -> None:
+        """Store a node's outputs against the checkpoint it ran from."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            rows.append((
+                thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, idx),
+                channel, *self.serde.dumps_typed(value), task_path,
+            ))
+        # Regular writes are kept from the first attempt; special writes (errors, interrupts) are replaced
+        regular = [row for row in rows if row[4] >= 0]
+        special = [row for row in rows if row[4] < 0]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany("INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", regular)
+                self._conn.executemany("INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", special)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete every checkpoint and write of a thread."""
+        with self._lock:
+            for table in ("checkpoints", "blobs", "writes", "threads"):
+                self._conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+
+    def claim_thread(self, thread_id: str, owner: str, ttl: float) -> bool:
+        """
+        Take the lease on a thread so only one run writes to it at a time.
+
+        The lease lasts ``ttl`` seconds and is renewed by every checkpoint
+        the run stores, so a crashed run's thread becomes claimable again.
+
+        Args:
+            thread_id: Thread to claim
+            owner: Unique id of the claiming run
+            ttl: Lease duration in seconds
+
+        Returns:
+            True if claimed, False if another run holds an unexpired lease
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(
+                    "INSERT INTO threads (thread_id, updated_at, lease_owner, lease_expires_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (thread_id) DO UPDATE SET lease_owner = excluded.lease_owner, "
+                    "lease_expires_at = excluded.lease_expires_at "
+                    "WHERE threads.lease_owner IS NULL OR threads.lease_owner = excluded.lease_owner "
+                    "OR threads.lease_expires_at < ?",
+                    (thread_id, now, owner, now + ttl, now),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            claimed = cursor.rowcount == 1
+            if claimed:
+                self._leases[thread_id] = (owner, ttl)
+            return claimed
+
+    def release_thread(self, thread_id: str, owner: str) -> None:
+        """Give up a lease taken with ``claim_thread``."""
+        with self._lock:
+            self._leases.pop(thread_id, None)
+            self._conn.execute(
+                "UPDATE threads SET lease_owner = NULL, lease_expires_at = NULL WHERE thread_id = ? AND lease_owner = ?",
+                (thread_id, owner),
+            )
+
+    def prune(self) -> int:
+        """
+        Delete threads idle for longer than ``retention_seconds``.
+
+        Whole threads are deleted rather than their old checkpoints, since
+        ``DeltaChannel`` values are rebuilt by replaying the thread's history.
+
+        Returns:
+            Number of threads deleted
+        """
+        with self._lock:
+            return self._prune_locked()
+
+    def _prune_locked(self) -> int:
+        if self.retention.seconds is None:
+            return 0
+        now = time.time()
+        stale = [row[0] for row in self._conn.execute(
+            "SELECT thread_id FROM threads WHERE updated_at < ? AND (lease_expires_at IS NULL OR lease_expires_at < ?)",
+            (now - self.retention.seconds, now),
+        ).fetchall()]
+        self._conn.execute("BEGIN")
+        try:
+            for table in ("checkpoints", "blobs", "writes", "threads"):
+                self._conn.executemany(f"DELETE FROM {table} WHERE thread_id = ?", [(t,) for t in stale])
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self.retention.last_run = now
+        return len(stale)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        return _next_version(current)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class FileCheckpointSaver(_ThreadedAsyncMixin, InMemorySaver):
+    """
+    Checkpoint store with one append-only file per thread in a local directory.
+
+    Each checkpoint and each batch of node writes is appended as a record,
+    so a step costs one small append, and a thread's file is replayed into
+    memory the first time the thread is used after a restart. A torn record
+    left by a crash mid-append is dropped on load. Suited to a single
+    process (thread leases are held in memory); use the SQLite store when
+    several workers share the directory. Threads idle for longer than
+    ``retention_seconds`` are deleted.
+    """
+
+    def __init__(
+        self,
+        directory: str = ".cache/checkpoints",
+        fsync: bool = False,
+        retention_seconds: Optional[float] = None,
+        **kwargs: Any,
+    ):
+        """
+        Create the store.
+
+        Args:
+            directory: Directory holding one ``<base64 thread_id>.ckpt`` file per thread
+            fsync: fsync after every append (survives power loss, slower)
+            retention_seconds: Delete threads with no checkpoint for this long (None = keep forever)
+            **kwargs: Passed to InMemorySaver (e.g. ``serde``)
+        """
+        super().__init__(**kwargs)
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fsync = fsync
+        self.retention = _Retention(retention_seconds)
+        self._loaded: set = set()
+        self._leases: Dict[str, Tuple[str, float, float]] = {}
+        self._file_lock = threading.RLock()
+
+    def _path(self, thread_id: str) -> str:
+        # Reversible and collision-free, unlike replacing unsafe characters
+        encoded = base64.urlsafe_b64encode(str(thread_id).encode()).decode().rstrip("=")
+        return os.path.join(self.directory, f"{encoded}.ckpt")
+
+    @staticmethod
+    def _thread_id(filename: str) -> str:
+        encoded = filename[:-len(".ckpt")]
+        return base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)).decode()
+
+    def _load(self, thread_id: str) -> None:
+        with self._file_lock:
+            if thread_id in self._loaded:
+                return
+            self._loaded.add(thread_id)
+            path = self._path(thread_id)
+            if not os.path.exists(path):
+                return
+            with open(path, "r+b") as f:
+                end = 0
+                while True:
+                    try:
+                        record = pickle.load(f)
+                    except Exception:
+                        # EOFError at a clean end, anything else at a torn last record
+                        break
+                    end = f.tell()
+                    self._apply(thread_id, record)
+                if end < os.fstat(f.fileno()).st_size:
+                    print(f"⚠️  Dropping a torn checkpoint record at the end of {path}")
+                    f.truncate(end)
+
+    def _apply(self, thread_id: str, record: Tuple[Any, ...]) -> None:
+        kind, checkpoint_ns, checkpoint_id, payload = record
+        if kind == "checkpoint":
+            saved, blobs = payload
+            for (channel, version), blob in blobs.items():
+                self.blobs[(thread_id, checkpoint_ns, channel, version)] = blob
+            self.storage[thread_id][checkpoint_ns][checkpoint_id] = saved
+        else:
+            self.writes[(thread_id, checkpoint_ns, checkpoint_id)].update(payload)
+
+    def _append(self, thread_id: str, record: Tuple[Any, ...]) -> None:
+        with open(self._path(thread_id), "ab") as f:
+            pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        self._load(config["configurable"]["thread_id"])
+        return super().get_tuple(config)
+
+    def list(self, config: Optional[RunnableConfig], **kwargs: Any) -> Iterator[CheckpointTuple]:
+        if config is not None:
+            self._load(config["configurable"]["thread_id"])
+        else:
+            for name in os.listdir(self.directory):
+                if name.endswith(".ckpt"):
+                    self._load(self._thread_id(name))
+        return super().list(config, **kwargs)
+
+    def put(
+        self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata, new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._file_lock:
+            self._load(thread_id)
+            saved_config = super().put(config, checkpoint, metadata, new_versions)
+            blobs = {
+                (channel, version): self.blobs[(thread_id, checkpoint_ns, channel, version)]
+                for channel, version in new_versions.items()
+            }
+            saved = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+            self._append(thread_id, ("checkpoint", checkpoint_ns, checkpoint["id"], (saved, blobs)))
+            if thread_id in self._leases:
+                owner, ttl, _ = self._leases[thread_id]
+                self._leases[thread_id] = (owner, ttl, time.time() + ttl)
+            if self.retention.due():
+                self.prune()
+        return saved_config
+
+    def put_writes(
+        self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = ""
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        key = (thread_id, checkpoint_ns, checkpoint_id)
+        with self._file_lock:
+            self._load(thread_id)
+            super().put_writes(config, writes, task_id, task_path)
+            stored = self.writes.get(key, {})
+            written = {
+                inner: stored[inner]
+                for inner in ((task_id, WRITES_IDX_MAP.get(channel, idx)) for idx, (channel, _) in enumerate(writes))
+                if inner in stored
+            }
+            self._append(thread_id, ("writes", checkpoint_ns, checkpoint_id, written))
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._file_lock:
+            self._load(thread_id)
+            super().delete_thread(thread_id)
+            if os.path.exists(self._path(thread_id)):
+                os.remove(self._path(thread_id))
+            self._loaded.discard(thread_id)
+
+    def claim_thread(self, thread_id: str, owner: str, ttl: float) -> bool:
+        """Take the lease on a thread; see ``SQLiteCheckpointSaver.claim_thread``."""
+        now = time.time()
+        with self._file_lock:
+            held = self._leases.get(thread_id)
+            if held is not None and held[0] != owner and held[2] >= now:
+                return False
+            self._leases[thread_id] = (owner, ttl, now + ttl)
+            return True
+
+    def release_thread(self, thread_id: str, owner: str) -> None:
+        """Give up a lease taken with ``claim_thread``."""
+        with self._file_lock:
+            if self._leases.get(thread_id, (None,))[0] == owner:
+                del self._leases[thread_id]
+
+    def prune(self) -> int:
+        """
+        Delete threads whose file was not appended to for ``retention_seconds``.
+
+        Returns:
+            Number of threads deleted
+        """
+        if self.retention.seconds is None:
+            return 0
+        now = time.time()
+        deleted = 0
+        with self._file_lock:
+            for name in os.listdir(self.directory):
+                if not name.endswith(".ckpt"):
+                    continue
+                thread_id = self._thread_id(name)
+                if thread_id in self._leases and self._leases[thread_id][2] >= now:
+                    continue
+                if os.path.getmtime(os.path.join(self.directory, name)) < now - self.retention.seconds:
+                    self.delete_thread(thread_id)
+                    deleted += 1
+            self.retention.last_run = now
+        return deleted
+
+    def get_delta_channel_history(self, *, config: RunnableConfig, channels: Sequence[str]) -> Any:
+        self._load(config["configurable"]["thread_id"])
+        return super().get_delta_channel_history(config=config, channels=channels)
+
+    async def aget_delta_channel_history(self, *, config: RunnableConfig, channels: Sequence[str]) -> Any:
+        return await asyncio.to_thread(lambda: self.get_delta_channel_history(config=config, channels=channels))
+
+
+def checkpointer_from_config(config: Any) -> Optional[BaseCheckpointSaver]:
+    """
+    Create the configured checkpoint store.
+
+    Args:
+        config: Configuration object with ``checkpoint_backend`` (none, memory,
+            sqlite, file), ``checkpoint_path`` and ``checkpoint_retention_seconds``
+
+    Returns:
+        A checkpoint saver, or None when checkpointing is disabled
+    """
+    backend = config.checkpoint_backend
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return InMemorySaver()
+    if backend == "sqlite":
+        return SQLiteCheckpointSaver(config.checkpoint_path, retention_seconds=config.checkpoint_retention_seconds)
+    if backend == "file":
+        return FileCheckpointSaver(config.checkpoint_path, retention_seconds=config.checkpoint_retention_seconds)
+    raise ValueError(f"Unsupported checkpoint backend: {backend}")
+
+
+__all__ = ["FileCheckpointSaver", "SQLiteCheckpointSaver", "append_reducer", "checkpointer_from_config"]
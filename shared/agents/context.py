@@ -0,0 +1,341 @@
+"""Prompt context management for agent loops: compact tool results and window the history to a token budget."""
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, ToolMessage
+
+# Tokens the chat format adds around each message (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+class TokenCounter:
+    """
+    Counts tokens with a tiktoken encoding, memoizing counts per text.
+
+    The encoding is loaded once on first use. If tiktoken is not installed
+    or its encoding cannot be loaded (it is downloaded on first use), or the
+    encoding is ``approx``, tokens are estimated as one per four characters.
+    Agent loops re-send the same messages every turn, so nearly every count
+    after the first turn is a cache hit.
+    """
+
+    def __init__(self, encoding: str = "cl100k_base", cache_size: int = 4096):
+        """
+        Create a counter.
+
+        Args:
+            encoding: tiktoken encoding name, or ``approx`` for the character estimate
+            cache_size: Texts whose counts are memoized (least recently used evicted)
+        """
+        self.encoding = encoding
+        self.cache_size = cache_size
+        self._encoder: Any = None
+        self._loaded = encoding == "approx"
+        self._cache: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def _load(self) -> Any:
+        if not self._loaded:
+            with self._load_lock:
+                if not self._loaded:
+                    try:
+                        import tiktoken
+                        self._encoder = tiktoken.get_encoding(self.encoding)
+                    except Exception as e:
+                        print(f"⚠️  tiktoken encoding {self.encoding} unavailable ({e}); estimating tokens from length")
+                    self._loaded = True
+        return self._encoder
+
+    def warm(self) -> None:
+        """Load the encoding now instead of on the first count."""
+        self._load()
+
+    def count(self, text: str) -> int:
+        """Tokens in ``text``."""
+        with self._lock:
+            cached = self._cache.get(text)
+            if cached is not None:
+                self._cache.move_to_end(text)
+                return cached
+
+        encoder = self._load()
+        if encoder is not None:
+            tokens = len(encoder.encode(text, disallowed_special=()))
+        else:
+            tokens = (len(text) + 3) // 4
+
+        with self._lock:
+            self._cache[text] = tokens
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return tokens
+
+    def count_message(self, message: BaseMessage) -> int:
+        """Tokens one message adds to a prompt, including its tool call arguments."""
+        tokens = MESSAGE_OVERHEAD_TOKENS + self.count(_text(message.content))
+        for call in getattr(message, "tool_calls", None) or []:
+            tokens += self.count(call["name"]) + self.count(json.dumps(call.get("args", {}), sort_keys=True))
+        return tokens
+
+    def count_messages(self, messages: List[BaseMessage]) -> int:
+        """Tokens of a whole prompt."""
+        return sum(self.count_message(message) for message in messages)
+
+
+def _text(content: Any) -> str:
+    return content if isinstance(content, str) else json.dumps(content, default=str)
+
+
+def _shorten_strings(value: Any, max_chars: int) -> Any:
+    """Cut every string in a JSON value to ``max_chars`` so all items keep their leading fields."""
+    if isinstance(value, str):
+        return value if len(value) <= max_chars else value[:max_chars] + "..."
+    if isinstance(value, list):
+        return [_shorten_strings(item, max_chars) for item in value]
+    if isinstance(value, dict):
+        return {key: _shorten_strings(item, max_chars) for key, item in value.items()}
+    return value
+
+
+def _count_strings(value: Any) -> int:
+    if isinstance(value, str):
+        return 1
+    if isinstance(value, list):
+        return sum(_count_strings(item) for item in value)
+    if isinstance(value, dict):
+        return sum(_count_strings(item) for item in value.values())
+    return 0
+
+
+def shorten_tool_output(content: str, max_chars: int, min_field_chars: int = 80) -> str:
+    """
+    Shrink a tool result to about ``max_chars`` characters.
+
+    JSON results (such as a list of search hits) have each string field cut
+    to an equal share of the limit, so every item stays visible with its
+    title and the start of its text. Anything still too long is truncated.
+
+    Args:
+        content: Tool message text
+        max_chars: Target length
+        min_field_chars: Smallest per-field share for JSON results
+
+    Returns:
+        The original text when it fits, else the shortened text with a truncation marker
+    """
+    if len(content) <= max_chars:
+        return content
+    try:
+        parsed = json.loads(content)
+    except ValueError:
+        parsed = None
+    if isinstance(parsed, (list, dict)):
+        share = max(min_field_chars, max_chars // max(1, _count_strings(parsed)))
+        shortened = json.dumps(_shorten_strings(parsed, share), ensure_ascii=False)
+        if len(shortened) <= max_chars:
+            return shortened
+        content = shortened
+    return content[:max_chars] + f"... [{len(content) - max_chars} more characters truncated]"
+
+
+@dataclass
+class CompactedContext:
+    """The messages to send to the LLM and what compaction did to them."""
+
+    messages: List[BaseMessage]
+    tokens_before: int
+    tokens_after: int
+    truncated: int = 0
+    deduplicated: int = 0
+    dropped: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return self.tokens_after < self.tokens_before
+
+
+class ContextCompactor:
+    """
+    Builds the prompt for each agent turn from the full message history.
+
+    The graph state keeps every message; only the copy sent to the LLM is
+    compacted, in three steps:
+
+    1. A tool result identical to an earlier one from the same tool is
+       replaced by a pointer to that call.
+    2. Tool results longer than ``max_tool_chars`` are shortened.
+    3. If the prompt is still over ``max_tokens``, the oldest turns are
+       dropped. System messages and the first user message are always kept,
+       and an AI message is dropped together with its tool results so every
+       tool call stays paired with its result.
+    """
+
+    def __init__(
+        self,
+        max_tokens: Optional[int] = 8000,
+        max_tool_chars: Optional[int] = 2000,
+        dedupe_tool_results: bool = True,
+        enabled: bool = True,
+        token_counter: Optional[TokenCounter] = None,
+    ):
+        """
+        Create a compactor.
+
+        Args:
+            max_tokens: Prompt token budget for the sliding window (None = no window)
+            max_tool_chars: Maximum characters per tool result (None = no shortening)
+            dedupe_tool_results: Replace repeated identical tool results with a pointer
+            enabled: If False, messages are passed through unchanged (tokens are still counted)
+            token_counter: Counter to use (default: cl100k_base)
+        """
+        self.max_tokens = max_tokens
+        self.max_tool_chars = max_tool_chars
+        self.dedupe_tool_results = dedupe_tool_results
+        self.enabled = enabled
+        self.tokens = token_counter or TokenCounter()
+
+    @classmethod
+    def from_config(cls, config: Any) -> "ContextCompactor":
+        """
+        Create a compactor from a BaseConfig.
+
+        Args:
+            config: Configuration object with ``context_*`` settings
+
+        Returns:
+            ContextCompactor
+        """
+        return cls(
+            max_tokens=config.context_max_tokens,
+            max_tool_chars=config.context_max_tool_chars,
+            dedupe_tool_results=config.context_dedupe_tool_results,
+            enabled=config.context_enabled,
+            token_counter=TokenCounter(config.context_tokenizer),
+        )
+
+    def _compact_tool_results(
+        self, messages: List[BaseMessage]
+    ) -> Tuple[List[BaseMessage], int, int, Dict[str, Tuple[str, BaseMessage]]]:
+        compacted: List[BaseMessage] = []
+        seen: Dict[Tuple[Optional[str], str], str] = {}
+        # Deduplicated call id -> (call id it points to, its message with the content kept)
+        duplicates: Dict[str, Tuple[str, BaseMessage]] = {}
+        truncated = deduplicated = 0
+        for message in messages:
+            if isinstance(message, ToolMessage) and isinstance(message.content, str):
+                content = message.content
+                if self.max_tool_chars is not None:
+                    content = shorten_tool_output(content, self.max_tool_chars)
+                key = (message.name, message.content)
+                if self.dedupe_tool_results and key in seen:
+                    full = message.model_copy(update={"content": content}) if content != message.content else message
+                    duplicates[message.tool_call_id] = (seen[key], full)
+                    content = self._reference(message.name, seen[key])
+                    deduplicated += 1
+                else:
+                    seen.setdefault(key, message.tool_call_id)
+                    truncated += content != message.content
+                if content != message.content:
+                    message = message.model_copy(update={"content": content})
+            compacted.append(message)
+        return compacted, truncated, deduplicated, duplicates
+
+    @staticmethod
+    def _reference(name: Optional[str], tool_call_id: str) -> str:
+        return f"[Same result as the earlier {name} call {tool_call_id}]"
+
+    def _restore_references(
+        self, messages: List[BaseMessage], duplicates: Dict[str, Tuple[str, BaseMessage]]
+    ) -> Tuple[List[BaseMessage], int]:
+        """Give back their content to deduplicated results whose original was windowed out."""
+        kept_ids = {m.tool_call_id for m in messages if isinstance(m, ToolMessage)}
+        holders: Dict[str, str] = {}
+        restored_messages: List[BaseMessage] = []
+        restored = 0
+        for message in messages:
+            if isinstance(message, ToolMessage) and message.tool_call_id in duplicates:
+                original, full = duplicates[message.tool_call_id]
+                if original not in kept_ids:
+                    if original in holders:
+                        # An earlier kept duplicate got the content back; point there instead
+                        message = message.model_copy(update={"content": self._reference(message.name, holders[original])})
+                    else:
+                        holders[original] = message.tool_call_id
+                        message = full
+                        restored += 1
+            restored_messages.append(message)
+        return restored_messages, restored
+
+    def _window(self, messages: List[BaseMessage]) -> Tuple[List[BaseMessage], int]:
+        # Pin system messages and the first user message (the task itself)
+        pinned_end = next((i + 1 for i, m in enumerate(messages) if isinstance(m, HumanMessage)), 0)
+        pinned = messages[:pinned_end]
+        pinned += [m for m in messages[pinned_end:] if isinstance(m, SystemMessage)]
+
+        # Turns: a non-tool message plus the tool results that follow it
+        turns: List[List[BaseMessage]] = []
+        for message in messages[pinned_end:]:
+            if isinstance(message, SystemMessage):
+                continue
+            if isinstance(message, ToolMessage) and turns:
+                turns[-1].append(message)
+            else:
+                turns.append([message])
+
+        # The latest user message is the question being answered now; pin it too
+        latest = max((i for i, turn in enumerate(turns) if isinstance(turn[0], HumanMessage)), default=None)
+        budget = self.max_tokens - self.tokens.count_messages(pinned)
+        if latest is not None:
+            budget -= self.tokens.count_messages(turns[latest])
+        kept: List[int] = []
+        for i in reversed(range(len(turns))):
+            if i != latest:
+                cost = self.tokens.count_messages(turns[i])
+                # The latest turn is always sent, even when it alone is over budget
+                if kept and cost > budget:
+                    break
+                budget -= cost
+            kept.append(i)
+        if latest is not None and latest not in kept:
+            kept.append(latest)
+
+        dropped = sum(len(turn) for i, turn in enumerate(turns) if i not in kept)
+        return pinned + [m for i in reversed(kept) for m in turns[i]], dropped
+
+    def compact(self, messages: List[BaseMessage]) -> CompactedContext:
+        """
+        Compact the history into the next prompt.
+
+        Args:
+            messages: Full conversation so far
+
+        Returns:
+            CompactedContext with the prompt messages and token counts before and after
+        """
+        tokens_before = self.tokens.count_messages(messages)
+        if not self.enabled:
+            return CompactedContext(messages, tokens_before, tokens_before)
+
+        compacted, truncated, deduplicated, duplicates = self._compact_tool_results(messages)
+        dropped = 0
+        if self.max_tokens is not None and self.tokens.count_messages(compacted) > self.max_tokens:
+            compacted, dropped = self._window(compacted)
+            # A reference to a result that was windowed out would point at nothing
+            compacted, restored = self._restore_references(compacted, duplicates)
+            deduplicated -= restored
+
+        return CompactedContext(
+            messages=compacted,
+            tokens_before=tokens_before,
+            tokens_after=self.tokens.count_messages(compacted),
+            truncated=truncated,
+            deduplicated=deduplicated,
+            dropped=dropped,
+        )
+
+
+__all__ = ["CompactedContext", "ContextCompactor", "TokenCounter", "shorten_tool_output"]
@@ -0,0 +1,263 @@
+"""Hedged (redundant) execution with latency-based backup requests and loser cancellation."""
+import asyncio
+import functools
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from langchain_core.tools import BaseTool as LangChainTool
+from langchain_core.tools import StructuredTool
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Rolling window of recent successful latencies."""
+
+    def __init__(self, window: int = 200):
+        """Initialize the tracker keeping the last ``window`` samples."""
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        """Add a latency sample."""
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return the ``q`` quantile (0-1) of the window, or None when empty."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class Hedger:
+    """
+    Runs async calls with a delayed backup attempt and cancels the loser.
+
+    The first attempt starts immediately. If it has not finished after the
+    hedge delay (the ``percentile`` latency of recent successful calls for
+    the same key, or ``default_delay`` until ``min_samples`` are collected),
+    a backup attempt starts. The first successful attempt wins and every
+    other attempt is cancelled, so pending HTTP requests are aborted rather
+    than left to finish. A failed attempt triggers the backup immediately,
+    subject to the same budget.
+
+    Hedges are budgeted with a token bucket: every call earns
+    ``max_hedge_rate`` tokens (capped at ``burst``) and every backup costs
+    one, so backups stay at most that fraction of traffic.
+
+    Only coroutines can be hedged; sync work in threads cannot be cancelled.
+    Place the hedge below any single-flight result cache, otherwise the
+    cache coalesces the backup onto the original attempt.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        max_hedge_rate: float = 0.1,
+        burst: float = 2.0,
+        min_delay: float = 0.05,
+        default_delay: float = 1.0,
+        min_samples: int = 20,
+        max_attempts: int = 2,
+        window: int = 200,
+        enabled: bool = True,
+    ):
+        """
+        Initialize the hedger.
+
+        Args:
+            percentile: Latency quantile after which a backup is sent
+            max_hedge_rate: Maximum fraction of calls that may send a backup
+            burst: Maximum hedge tokens saved up during quiet periods
+            min_delay: Lower bound on the hedge delay in seconds
+            default_delay: Hedge delay used until ``min_samples`` latencies are known
+            min_samples: Samples required before the percentile is trusted
+            max_attempts: Total attempts per call, including the first
+            window: Number of latency samples kept per key
+            enabled: When False, calls run once with no hedging
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+
+        self.percentile = percentile
+        self.max_hedge_rate = max_hedge_rate
+        self.burst = burst
+        self.min_delay = min_delay
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        self.max_attempts = max_attempts
+        self.window = window
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._trackers: Dict[str, LatencyTracker] = {}
+        self._tokens = burst
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def from_config(cls, config: Any) -> "Hedger":
+        """
+        Create a hedger from a BaseConfig.
+
+        Args:
+            config: Configuration object with ``hedge_*`` settings
+
+        Returns:
+            Configured Hedger
+        """
+        return cls(
+            percentile=config.hedge_percentile,
+            max_hedge_rate=config.hedge_max_rate,
+            min_delay=config.hedge_min_delay,
+            default_delay=config.hedge_default_delay,
+            enabled=config.hedge_enabled,
+        )
+
+    def _tracker(self, key: str) -> LatencyTracker:
+        with self._lock:
+            tracker = self._trackers.get(key)
+            if tracker is None:
+                tracker = self._trackers[key] = LatencyTracker(self.window)
+            return tracker
+
+    def _count(self, key: str, counter: str) -> None:
+        with self._lock:
+            counters = self._counters.setdefault(
+                key, {"calls": 0, "hedges": 0, "backup_wins": 0, "cancelled": 0}
+            )
+            counters[counter] += 1
+
+    def hedge_delay(self, key: str = "default") -> float:
+        """Get the current delay before a backup attempt for a key."""
+        tracker = self._tracker(key)
+        delay = tracker.percentile(self.percentile) if len(tracker) >= self.min_samples else None
+        return max(self.min_delay, delay if delay is not None else self.default_delay)
+
+    def _earn_token(self) -> None:
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.max_hedge_rate)
+
+    def _take_token(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+    async def run(self, factory: Callable[[], Awaitable[T]], key: str = "default") -> T:
+        """
+        Run ``factory()`` with hedging and return the first successful result.
+
+        Args:
+            factory: Zero-argument callable returning a new awaitable per attempt
+            key: Latency class of the call (e.g. tool name)
+
+        Returns:
+            Result of the winning attempt
+
+        Raises:
+            Exception: The last error if every attempt failed
+        """
+        if not self.enabled or self.max_attempts == 1:
+            return await factory()
+
+        self._count(key, "calls")
+        self._earn_token()
+        delay = self.hedge_delay(key)
+        tracker = self._tracker(key)
+
+        async def attempt() -> Any:
+            started = time.perf_counter()
+            result = await factory()
+            return result, time.perf_counter() - started
+
+        attempts = [asyncio.ensure_future(attempt())]
+        pending = set(attempts)
+        last_error: Optional[BaseException] = None
+
+        try:
+            while pending:
+                can_hedge = len(attempts) < self.max_attempts
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=delay if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                for task in done:
+                    if task.exception() is None:
+                        result, latency = task.result()
+                        tracker.record(latency)
+                        if task is not attempts[0]:
+                            self._count(key, "backup_wins")
+                        return result
+                    last_error = task.exception()
+
+                # Timed out waiting, or an attempt failed: start a backup if the
+                # budget allows (failures are budgeted too, to cap amplification)
+                if can_hedge and self._take_token():
+                    self._count(key, "hedges")
+                    backup = asyncio.ensure_future(attempt())
+                    attempts.append(backup)
+                    pending.add(backup)
+
+            raise last_error
+        finally:
+            for task in attempts:
+                if not task.done():
+                    task.cancel()
+                    self._count(key, "cancelled")
+            await asyncio.gather(*attempts, return_exceptions=True)
+
+    def hedged(self, key: str) -> Callable:
+        """Decorator that hedges every call of an async function under ``key``."""
+        def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                return await self.run(lambda: func(*args, **kwargs), key=key)
+            return wrapper
+        return decorator
+
+    def wrap_tool(self, tool: LangChainTool) -> StructuredTool:
+        """
+        Return a tool with the same name and schema whose async calls are hedged.
+
+        Sync calls run once, unhedged.
+
+        Args:
+            tool: LangChain tool to wrap
+
+        Returns:
+            StructuredTool suitable for ``ToolNode``
+        """
+        def run(**kwargs: Any) -> Any:
+            return tool.invoke(kwargs, {"callbacks": []})
+
+        async def arun(**kwargs: Any) -> Any:
+            return await self.run(lambda: tool.ainvoke(kwargs, {"callbacks": []}), key=tool.name)
+
+        return StructuredTool(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            func=run,
+            coroutine=arun,
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-key hedge counters and current hedge delays."""
+        with self._lock:
+            counters = {key: dict(values) for key, values in self._counters.items()}
+        return {
+            key: {**values, "hedge_delay": self.hedge_delay(key)}
+            for key, values in counters.items()
+        }
+
+
+__all__ = ["Hedger", "LatencyTracker"]
@@ -0,0 +1,607 @@
+"""Background agent jobs: a bounded submission queue, a worker pool, result retention and cancellation."""
+import asyncio
+import heapq
+import json
+import math
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+    def __init__(self, message: str, retry_after: float):
+        """
+        Initialize the rejection.
+
+        Args:
+            message: Human-readable reason
+            retry_after: Suggested seconds before resubmitting
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass
+class Job:
+    """One submitted agent run and its outcome."""
+
+    id: str
+    request: Dict[str, Any]
+    status: str = QUEUED
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    heartbeat_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        return cls(**data)
+
+
+class JobBackend(ABC):
+    """Storage for job records plus the queue of job ids waiting for a worker."""
+
+    name = "base"
+
+    @abstractmethod
+    async def save(self, job: Job, ttl: Optional[float] = None) -> None:
+        """Store the job record, expiring it after ``ttl`` seconds when given."""
+        pass
+
+    @abstractmethod
+    async def save_if(self, job: Job, status: str, ttl: Optional[float] = None) -> bool:
+        """Store the job record only if the stored one still has ``status``; False if it changed or is gone."""
+        pass
+
+    @abstractmethod
+    async def load(self, job_id: str) -> Optional[Job]:
+        """Return the job record, or None if unknown or expired."""
+        pass
+
+    @abstractmethod
+    async def delete(self, job_id: str) -> None:
+        """Remove the job record if present."""
+        pass
+
+    @abstractmethod
+    async def enqueue(self, job_id: str) -> bool:
+        """Queue a job id for a worker; False if the queue is full."""
+        pass
+
+    @abstractmethod
+    async def dequeue(self, timeout: float) -> Optional[str]:
+        """Wait up to ``timeout`` seconds for the next queued job id."""
+        pass
+
+    @abstractmethod
+    async def depth(self) -> int:
+        """Number of job ids waiting in the queue."""
+        pass
+
+    @abstractmethod
+    async def running_ids(self) -> List[str]:
+        """Ids of jobs recorded as running, on any replica."""
+        pass
+
+    @abstractmethod
+    async def request_cancel(self, job_id: str, ttl: float) -> None:
+        """Flag a running job for cancellation by whichever worker holds it."""
+        pass
+
+    @abstractmethod
+    async def cancel_requested(self, job_id: str) -> bool:
+        """Whether cancellation was requested for the job."""
+        pass
+
+    async def close(self) -> None:
+        """Release backend connections."""
+        pass
+
+
+class InMemoryJobBackend(JobBackend):
+    """Job records and queue held in this process (single replica)."""
+
+    name = "memory"
+
+    def __init__(self, max_queue: int = 100):
+        """Create the backend with a queue of at most ``max_queue`` waiting jobs."""
+        self.max_queue = max_queue
+        self._jobs: Dict[str, Tuple[Job, Optional[float]]] = {}
+        self._expiry: List[Tuple[float, str]] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._cancelled: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def _get_queue(self) -> asyncio.Queue:
+        # Created on first use so it belongs to the serving event loop
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        return self._queue
+
+    def _purge(self) -> None:
+        now = time.monotonic()
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, job_id = heapq.heappop(self._expiry)
+            entry = self._jobs.get(job_id)
+            if entry is not None and entry[1] == expires_at:
+                del self._jobs[job_id]
+                self._cancelled.discard(job_id)
+
+    def _store(self, job: Job, ttl: Optional[float]) -> None:
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        # Copies, so a caller changing its Job does not change the record
+        self._jobs[job.id] = (replace(job), expires_at)
+        if expires_at is not None:
+            heapq.heappush(self._expiry, (expires_at, job.id))
+
+    async def save(self, job: Job, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._purge()
+            self._store(job, ttl)
+
+    async def save_if(self, job: Job, status: str, ttl: Optional[float] = None) -> bool:
+        with self._lock:
+            self._purge()
+            entry = self._jobs.get(job.id)
+            if entry is None or entry[0].status != status:
+                return False
+            self._store(job, ttl)
+            return True
+
+    async def load(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._purge()
+            entry = self._jobs.get(job_id)
+            return replace(entry[0]) if entry is not None else None
+
+    async def delete(self, job_id: str) -> None:
+        self._jobs.pop(job_id, None)
+        self._cancelled.discard(job_id)
+
+    async def enqueue(self, job_id: str) -> bool:
+        try:
+            self._get_queue().put_nowait(job_id)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def dequeue(self, timeout: float) -> Optional[str]:
+        try:
+            return await asyncio.wait_for(self._get_queue().get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def depth(self) -> int:
+        return self._get_queue().qsize()
+
+    async def running_ids(self) -> List[str]:
+        with self._lock:
+            return [job_id for job_id, (job, _) in self._jobs.items() if job.status == RUNNING]
+
+    async def request_cancel(self, job_id: str, ttl: float) -> None:
+        self._cancelled.add(job_id)
+
+    async def cancel_requested(self, job_id: str) -> bool:
+        return job_id in self._cancelled
+
+
+class RedisJobBackend(JobBackend):
+    """
+    Job records and queue in a local Redis-compatible server, shared by every replica.
+
+    Records are JSON strings with native key TTLs; the queue is a list that
+    workers on all replicas pop from, bounded by ``max_queue`` at submit.
+    Status changes are compare-and-set in a Lua script, which also keeps
+    the set of running job ids.
+    """
+
+    name = "redis"
+
+    # KEYS: record, running set; ARGV: expected status, record, ttl ms or "", new status, job id
+    _SAVE_IF = """
+local raw = redis.call('GET', KEYS[1])
+if not raw or cjson.decode(raw)['status'] ~= ARGV[1] then
+    return 0
+end
+if ARGV[3] == '' then
+    redis.call('SET', KEYS[1], ARGV[2])
+else
+    redis.call('SET', KEYS[1], ARGV[2], 'PX', ARGV[3])
+end
+if ARGV[4] == 'running' then
+    redis.call('SADD', KEYS[2], ARGV[5])
+else
+    redis.call('SREM', KEYS[2], ARGV[5])
+end
+return 1
+"""
+
+    def __init__(self, url: str = "redis://localhost:6379/0", max_queue: int = 100, prefix: str = "agent-jobs:"):
+        """Connect to the server at ``url``; all keys are namespaced with ``prefix``."""
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise ImportError("redis is required for the Redis job backend. Install with: pip install redis")
+
+        self.max_queue = max_queue
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._queue_key = prefix + "queue"
+        self._running_key = prefix + "running"
+        self._save_if = self._client.register_script(self._SAVE_IF)
+
+    async def save(self, job: Job, ttl: Optional[float] = None) -> None:
+        px = max(1, int(ttl * 1000)) if ttl is not None else None
+        await self._client.set(self.prefix + "job:" + job.id, json.dumps(job.to_dict(), default=str), px=px)
+
+    async def save_if(self, job: Job, status: str, ttl: Optional[float] = None) -> bool:
+        px = str(max(1, int(ttl * 1000))) if ttl is not None else ""
+        saved = await self._save_if(
+            keys=[self.prefix + "job:" + job.id, self._running_key],
+            args=[status, json.dumps(job.to_dict(), default=str), px, job.status, job.id],
+        )
+        return bool(saved)
+
+    async def load(self, job_id: str) -> Optional[Job]:
+        raw = await self._client.get(self.prefix + "job:" + job_id)
+        return Job.from_dict(json.loads(raw)) if raw is not None else None
+
+    async def delete(self, job_id: str) -> None:
+        await self._client.delete(self.prefix + "job:" + job_id, self.prefix + "cancel:" + job_id)
+        await self._client.srem(self._running_key, job_id)
+
+    async def enqueue(self, job_id: str) -> bool:
+        # Check-then-push may overshoot by the number of concurrent submitters; the bound is advisory
+        if await self._client.llen(self._queue_key) >= self.max_queue:
+            return False
+        await self._client.lpush(self._queue_key, job_id)
+        return True
+
+    async def dequeue(self, timeout: float) -> Optional[str]:
+        popped = await self._client.brpop([self._queue_key], timeout=max(1, int(timeout)))
+        return popped[1].decode() if popped is not None else None
+
+    async def depth(self) -> int:
+        return await self._client.llen(self._queue_key)
+
+    async def running_ids(self) -> List[str]:
+        return [job_id.decode() for job_id in await self._client.smembers(self._running_key)]
+
+    async def request_cancel(self, job_id: str, ttl: float) -> None:
+        await self._client.set(self.prefix + "cancel:" + job_id, b"1", px=max(1, int(ttl * 1000)))
+
+    async def cancel_requested(self, job_id: str) -> bool:
+        return bool(await self._client.exists(self.prefix + "cancel:" + job_id))
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class JobManager:
+    """
+    Runs submitted jobs on a pool of asyncio workers.
+
+    ``submit`` queues a job and returns at once; workers take jobs in FIFO
+    order and await ``runner(job.request)``. Finished jobs are kept for
+    ``result_ttl`` seconds. Cancelling a running job cancels its task, which
+    propagates into the in-flight LLM call and tool executor calls; with a
+    shared backend the worker holding the job notices a cancellation flag
+    set by any replica within ``cancel_poll_interval`` seconds.
+
+    Every status change is a compare-and-set on the stored status, so a
+    cancel and a worker taking the same queued job cannot both win. Workers
+    heartbeat their running jobs; a running job whose heartbeat is older
+    than ``lease_seconds`` (its replica crashed) is failed by any manager.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        backend: Optional[JobBackend] = None,
+        max_workers: int = 4,
+        result_ttl: float = 3600.0,
+        cancel_poll_interval: float = 0.5,
+        lease_seconds: float = 30.0,
+    ):
+        """
+        Create a manager; call ``start`` from the serving event loop.
+
+        Args:
+            runner: Coroutine function running one job's request and returning its result
+            backend: Job storage and queue (default: in-memory, 100 waiting jobs)
+            max_workers: Jobs executed concurrently by this process
+            result_ttl: Seconds finished jobs (results and errors) are kept
+            cancel_poll_interval: Seconds between checks for cancellation requested elsewhere
+            lease_seconds: Seconds without a heartbeat after which a running job is failed
+        """
+        if max_workers <= 0:
+            raise ValueError("max_workers must be positive")
+        if lease_seconds <= 0:
+            raise ValueError("lease_seconds must be positive")
+
+        self.runner = runner
+        self.backend = backend or InMemoryJobBackend()
+        self.max_workers = max_workers
+        self.result_ttl = result_ttl
+        self.cancel_poll_interval = cancel_poll_interval
+        self.lease_seconds = lease_seconds
+        self._workers: List[asyncio.Task] = []
+        self._reaper: Optional[asyncio.Task] = None
+        # Job id -> (runner task, set once the outcome is stored)
+        self._running: Dict[str, Tuple[asyncio.Task, asyncio.Event]] = {}
+        self._cancelled_locally: Set[str] = set()
+        self.finished: Dict[str, int] = {status: 0 for status in FINISHED}
+        # Moving average of job run time, for Retry-After estimates
+        self._run_seconds: Optional[float] = None
+        self.alpha = 0.2
+
+    @classmethod
+    def from_config(cls, config: Any, runner: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]) -> "JobManager":
+        """
+        Create a manager from a BaseConfig.
+
+        Args:
+            config: Configuration object with ``jobs_*`` settings
+            runner: Coroutine function running one job's request
+
+        Returns:
+            Configured JobManager
+        """
+        if config.jobs_backend == "memory":
+            backend = InMemoryJobBackend(max_queue=config.jobs_max_queue)
+        elif config.jobs_backend == "redis":
+            backend = RedisJobBackend(url=config.jobs_redis_url, max_queue=config.jobs_max_queue)
+        else:
+            raise ValueError(f"Unsupported jobs backend: {config.jobs_backend}")
+
+        return cls(
+            runner,
+            backend=backend,
+            max_workers=config.jobs_max_workers,
+            result_ttl=config.jobs_result_ttl,
+            lease_seconds=config.jobs_lease_seconds,
+        )
+
+    @property
+    def running(self) -> int:
+        """Jobs currently executing in this process."""
+        return len(self._running)
+
+    def retry_after(self, queued: int) -> float:
+        """Estimate whole seconds until ``queued`` waiting jobs have drained enough to accept another."""
+        if self._run_seconds is None:
+            return 1.0
+        return max(1.0, math.ceil(self._run_seconds * max(1, queued) / self.max_workers))
+
+    async def start(self) -> None:
+        """Start the workers and the reaper of stale running jobs."""
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._work()) for _ in range(self.max_workers)]
+            self._reaper = asyncio.create_task(self._reap())
+
+    async def stop(self) -> None:
+        """Stop the workers, cancelling the jobs they are running."""
+        tasks = self._workers + ([self._reaper] if self._reaper is not None else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._reaper = None
+        await self.backend.close()
+
+    async def submit(self, request: Dict[str, Any]) -> Job:
+        """
+        Queue a job.
+
+        Args:
+            request: Payload passed to the runner
+
+        Returns:
+            The queued Job
+
+        Raises:
+            JobQueueFull: If the queue is at capacity
+        """
+        job = Job(id=uuid.uuid4().hex, request=request)
+        # Saved first so a worker that dequeues it at once finds the record
+        await self.backend.save(job)
+        if not await self.backend.enqueue(job.id):
+            await self.backend.delete(job.id)
+            queued = await self.backend.depth()
+            raise JobQueueFull(f"Job queue is full ({queued} waiting)", self.retry_after(queued))
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """The job's current record, or None if unknown or expired."""
+        return await self.backend.load(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a queued or running job; finished jobs are returned unchanged.
+
+        Returns:
+            The job record after the request, or None if unknown or expired
+        """
+        job = await self.backend.load(job_id)
+        if job is None or job.status in FINISHED:
+            return job
+        if job.status == QUEUED:
+            # The worker that dequeues it skips it
+            cancelled = await self._finish(job, CANCELLED)
+            if cancelled is not None:
+                return cancelled
+            # A worker took it first, or it finished in between
+            job = await self.backend.load(job_id)
+            if job is None or job.status in FINISHED:
+                return job
+
+        running = self._running.get(job_id)
+        if running is not None:
+            task, recorded = running
+            self._cancelled_locally.add(job_id)
+            task.cancel()
+            # Wait until the worker has stored the cancelled outcome
+            await recorded.wait()
+            return await self.backend.load(job_id)
+        # Running on another replica; its worker polls for the flag
+        await self.backend.request_cancel(job_id, ttl=self.result_ttl)
+        return job
+
+    async def _finish(
+        self, job: Job, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None
+    ) -> Optional[Job]:
+        """Store the outcome if the job still has the status it had when loaded; None if another writer changed it."""
+        finished = replace(job, status=status, result=result, error=error, finished_at=time.time())
+        if not await self.backend.save_if(finished, job.status, ttl=self.result_ttl):
+            return None
+        self.finished[status] += 1
+        return finished
+
+    async def reap_stale(self) -> int:
+        """
+        Fail running jobs whose worker stopped heartbeating, e.g. because its replica crashed.
+
+        Returns:
+            Number of jobs failed
+        """
+        reaped = 0
+        for job_id in await self.backend.running_ids():
+            if job_id in self._running:
+                continue
+            job = await self.backend.load(job_id)
+            if job is None or job.status != RUNNING:
+                continue
+            silent = time.time() - (job.heartbeat_at or job.started_at or job.submitted_at)
+            if silent <= self.lease_seconds:
+                continue
+            if await self._finish(job, FAILED, error=f"Worker lost: no heartbeat for {silent:.0f}s") is not None:
+                reaped += 1
+        return reaped
+
+    async def _reap(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 2)
+            try:
+                await self.reap_stale()
+            except Exception as e:
+                print(f"⚠️  Job backend {self.backend.name} unavailable: {e}")
+
+    def _observe(self, run_seconds: float) -> None:
+        if self._run_seconds is None:
+            self._run_seconds = run_seconds
+        else:
+            self._run_seconds += self.alpha * (run_seconds - self._run_seconds)
+
+    async def _work(self) -> None:
+        while True:
+            try:
+                job_id = await self.backend.dequeue(timeout=1.0)
+                if job_id is None:
+                    continue
+                job = await self.backend.load(job_id)
+            except Exception as e:
+                print(f"⚠️  Job backend {self.backend.name} unavailable: {e}")
+                await asyncio.sleep(1.0)
+                continue
+            # Cancelled while queued, or expired
+            if job is None or job.status != QUEUED:
+                continue
+            await self._execute(job)
+
+    async def _watch_for_cancel(self, job_id: str, task: asyncio.Task) -> None:
+        while not task.done():
+            await asyncio.sleep(self.cancel_poll_interval)
+            if await self.backend.cancel_requested(job_id):
+                self._cancelled_locally.add(job_id)
+                task.cancel()
+                return
+
+    async def _heartbeat(self, job: Job, task: asyncio.Task) -> None:
+        while not task.done():
+            await asyncio.sleep(self.lease_seconds / 3)
+            job.heartbeat_at = time.time()
+            try:
+                alive = await self.backend.save_if(job, RUNNING)
+            except Exception as e:
+                print(f"⚠️  Job backend {self.backend.name} unavailable: {e}")
+                continue
+            if not alive and not task.done():
+                # Failed as stale by another replica; its outcome stands
+                self._cancelled_locally.add(job.id)
+                task.cancel()
+                return
+
+    async def _execute(self, job: Job) -> None:
+        now = time.time()
+        started = replace(job, status=RUNNING, started_at=now, heartbeat_at=now)
+        if not await self.backend.save_if(started, QUEUED):
+            # Cancelled between dequeue and start
+            return
+        job = started
+
+        task = asyncio.ensure_future(self.runner(job.request))
+        recorded = asyncio.Event()
+        self._running[job.id] = (task, recorded)
+        watcher = asyncio.ensure_future(self._watch_for_cancel(job.id, task))
+        heartbeat = asyncio.ensure_future(self._heartbeat(job, task))
+        try:
+            result = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                # The worker itself is being stopped
+                task.cancel()
+                await self._finish(job, CANCELLED, error="Server shutting down")
+                raise
+            if job.id in self._cancelled_locally:
+                await self._finish(job, CANCELLED)
+            else:
+                # A cancellation escaped the run (e.g. a cancelled tool call); keep the worker going
+                await self._finish(job, FAILED, error="Run was cancelled unexpectedly")
+        except Exception as e:
+            await self._finish(job, FAILED, error=str(e))
+        else:
+            self._observe(time.time() - job.started_at)
+            await self._finish(job, SUCCEEDED, result=result)
+        finally:
+            watcher.cancel()
+            heartbeat.cancel()
+            recorded.set()
+            self._running.pop(job.id, None)
+            self._cancelled_locally.discard(job.id)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, running jobs and finished counts by status."""
+        return {
+            "backend": self.backend.name,
+            "queued": await self.backend.depth(),
+            "running": self.running,
+            "workers": self.max_workers,
+            **self.finished,
+        }
+
+
+__all__ = [
+    "InMemoryJobBackend",
+    "Job",
+    "JobBackend",
+    "JobManager",
+    "JobQueueFull",
+    "RedisJobBackend",
+]
@@ -0,0 +1,310 @@
+"""Speculative tool prefetching: predict likely tool calls and run them alongside the LLM."""
+import asyncio
+import contextvars
+import json
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.tools import BaseTool as LangChainTool
+from langchain_core.tools import StructuredTool
+
+# A predicted tool call: (tool name, arguments)
+ToolCallPrediction = Tuple[str, Dict[str, Any]]
+
+
+def _call_key(tool_name: str, args: Dict[str, Any]) -> str:
+    return f"{tool_name}:{json.dumps(args, sort_keys=True, default=str)}"
+
+
+class RulePredictor:
+    """
+    Predicts tool calls from the user query with a list of rules.
+
+    Each rule is a callable taking the query and returning a list of
+    ``(tool_name, args)`` predictions. Duplicates across rules are dropped.
+    """
+
+    def __init__(self, rules: List[Callable[[str], List[ToolCallPrediction]]]):
+        """Initialize the predictor with its rules."""
+        self.rules = rules
+
+    def predict(self, query: str) -> List[ToolCallPrediction]:
+        """Return the de-duplicated predictions of every rule, in rule order."""
+        seen = set()
+        predictions = []
+        for rule in self.rules:
+            for name, args in rule(query):
+                key = _call_key(name, args)
+                if key not in seen:
+                    seen.add(key)
+                    predictions.append((name, args))
+        return predictions
+
+
+class _Speculation:
+    """One speculatively launched tool call."""
+
+    def __init__(self, tool_name: str, task: asyncio.Task):
+        self.tool_name = tool_name
+        self.task = task
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.used = False
+        task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        if self.finished is None:
+            self.finished = time.perf_counter()
+
+
+class SpeculationSession:
+    """Speculative calls launched for a single request."""
+
+    def __init__(self, executor: "SpeculativeExecutor"):
+        self.executor = executor
+        self.summary: Optional[Dict[str, Any]] = None
+        self._calls: Dict[str, _Speculation] = {}
+
+    def launch(self, predictions: List[ToolCallPrediction]) -> None:
+        """Start the predicted calls as background tasks."""
+        for name, args in predictions:
+            tool = self.executor.tools.get(name)
+            key = _call_key(name, args)
+            if tool is None or key in self._calls:
+                continue
+            task = asyncio.ensure_future(tool.ainvoke(args, {"callbacks": []}))
+            self._calls[key] = _Speculation(name, task)
+            self.executor._count(name, "launched")
+
+    def take(self, tool_name: str, args: Dict[str, Any]) -> Optional[asyncio.Task]:
+        """Claim the speculative call matching the tool name and arguments, if any."""
+        speculation = self._calls.get(_call_key(tool_name, args))
+        if speculation is None or speculation.used:
+            self.executor._count(tool_name, "misses")
+            return None
+        speculation.used = True
+        self.executor._count(tool_name, "hits")
+        return speculation.task
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Cancel speculative calls that were never used and record wasted work.
+
+        Returns:
+            Summary with launched, used and wasted counts and wasted seconds
+        """
+        now = time.perf_counter()
+        wasted = 0
+        wasted_seconds = 0.0
+        for speculation in self._calls.values():
+            if speculation.used:
+                continue
+            wasted += 1
+            # A call that finished early wasted only its own run time, not the rest of the request
+            finished = speculation.finished if speculation.finished is not None else now
+            wasted_seconds += finished - speculation.started
+            self.executor._count(speculation.tool_name, "wasted")
+            if not speculation.task.done():
+                speculation.task.cancel()
+            else:
+                # Retrieve the exception so an unused failed call does not warn
+                speculation.task.cancelled() or speculation.task.exception()
+
+        self.executor._add_wasted_seconds(wasted_seconds)
+        return {
+            "launched": len(self._calls),
+            "used": len(self._calls) - wasted,
+            "wasted": wasted,
+            "wasted_seconds": wasted_seconds,
+        }
+
+
+_current_session: contextvars.ContextVar[Optional[SpeculationSession]] = contextvars.ContextVar(
+    "speculation_session", default=None
+)
+
+
+class SpeculativeExecutor:
+    """
+    Launches predicted tool calls at the start of a request and reuses them.
+
+    ``session(query)`` predicts tool calls and starts them as background
+    tasks, so they overlap with the first LLM turn. Tools wrapped with
+    ``wrap_tool`` look up the current session when the model actually calls
+    them; a call matching on name and arguments awaits the speculative task
+    instead of starting a new one. Unused calls are cancelled when the
+    session ends (work already running in a thread is discarded).
+
+    The session lives in a context variable rather than in graph state, so
+    state stays serializable for checkpointing.
+
+    Predictions are gated by learned per-tool hit rates: once a tool has
+    ``min_samples`` launches and a hit rate below ``min_hit_rate``, it is
+    only re-probed every ``probe_interval`` sessions.
+    """
+
+    def __init__(
+        self,
+        tools: List[LangChainTool],
+        predictor: RulePredictor,
+        max_calls: int = 4,
+        min_hit_rate: float = 0.2,
+        min_samples: int = 20,
+        probe_interval: int = 10,
+        enabled: bool = True,
+    ):
+        """
+        Initialize the executor.
+
+        Args:
+            tools: Tools that may be speculated (unwrapped implementations)
+            predictor: Predictor producing ``(tool_name, args)`` for a query
+            max_calls: Maximum speculative calls per request
+            min_hit_rate: Hit rate below which a tool stops being speculated
+            min_samples: Launches before the hit rate is trusted
+            probe_interval: Sessions between re-probes of a gated tool
+            enabled: When False, sessions launch nothing
+        """
+        self.tools = {tool.name: tool for tool in tools}
+        self.predictor = predictor
+        self.max_calls = max_calls
+        self.min_hit_rate = min_hit_rate
+        self.min_samples = min_samples
+        self.probe_interval = probe_interval
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._sessions = 0
+        self._wasted_seconds = 0.0
+
+    @classmethod
+    def from_config(
+        cls, config: Any, tools: List[LangChainTool], predictor: RulePredictor
+    ) -> "SpeculativeExecutor":
+        """
+        Create a speculative executor from a BaseConfig.
+
+        Args:
+            config: Configuration object with ``speculation_*`` settings
+            tools: Tools that may be speculated
+            predictor: Predictor producing ``(tool_name, args)`` for a query
+
+        Returns:
+            Configured SpeculativeExecutor
+        """
+        return cls(
+            tools,
+            predictor,
+            max_calls=config.speculation_max_calls,
+            min_hit_rate=config.speculation_min_hit_rate,
+            min_samples=config.speculation_min_samples,
+            probe_interval=config.speculation_probe_interval,
+            enabled=config.speculation_enabled,
+        )
+
+    def _count(self, tool_name: str, counter: str) -> None:
+        with self._lock:
+            counters = self._counters.setdefault(
+                tool_name, {"launched": 0, "hits": 0, "misses": 0, "wasted": 0}
+            )
+            counters[counter] += 1
+
+    def _add_wasted_seconds(self, seconds: float) -> None:
+        with self._lock:
+            self._wasted_seconds += seconds
+
+    def _allowed(self, tool_name: str) -> bool:
+        counters = self._counters.get(tool_name)
+        if counters is None or counters["launched"] < self.min_samples:
+            return True
+        if counters["hits"] / counters["launched"] >= self.min_hit_rate:
+            return True
+        return self._sessions % self.probe_interval == 0
+
+    def predict(self, query: str) -> List[ToolCallPrediction]:
+        """Predict the tool calls worth speculating for a query."""
+        predictions = [(name, args) for name, args in self.predictor.predict(query) if self._allowed(name)]
+        return predictions[:self.max_calls]
+
+    @asynccontextmanager
+    async def session(self, query: str) -> AsyncIterator[SpeculationSession]:
+        """
+        Speculate for one request; must be entered on the request's event loop.
+
+        Args:
+            query: User query the predictor runs on
+
+        Yields:
+            The SpeculationSession; its ``summary`` is set when the block exits
+        """
+        session = SpeculationSession(self)
+        with self._lock:
+            self._sessions += 1
+        if self.enabled:
+            session.launch(self.predict(query))
+        token = _current_session.set(session)
+        try:
+            yield session
+        finally:
+            _current_session.reset(token)
+            session.summary = session.close()
+
+    def wrap_tool(self, tool: LangChainTool) -> StructuredTool:
+        """
+        Return a tool with the same name and schema that reuses speculative results.
+
+        Outside a session, or without a matching speculation, the wrapped
+        tool runs normally. A failed speculative call falls back to a real call.
+
+        Args:
+            tool: LangChain tool to wrap
+
+        Returns:
+            StructuredTool suitable for ``ToolNode``
+        """
+        def run(**kwargs: Any) -> Any:
+            return tool.invoke(kwargs, {"callbacks": []})
+
+        async def arun(**kwargs: Any) -> Any:
+            session = _current_session.get()
+            task = session.take(tool.name, kwargs) if session is not None else None
+            if task is not None:
+                try:
+                    return await task
+                except Exception:
+                    pass
+            return await tool.ainvoke(kwargs, {"callbacks": []})
+
+        return StructuredTool(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            func=run,
+            coroutine=arun,
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit-rate and wasted-work metrics."""
+        with self._lock:
+            tools = {name: dict(counters) for name, counters in self._counters.items()}
+            wasted_seconds = self._wasted_seconds
+            sessions = self._sessions
+
+        launched = sum(c["launched"] for c in tools.values())
+        hits = sum(c["hits"] for c in tools.values())
+        return {
+            "enabled": self.enabled,
+            "sessions": sessions,
+            "launched": launched,
+            "hits": hits,
+            "wasted": sum(c["wasted"] for c in tools.values()),
+            "hit_rate": hits / launched if launched else 0.0,
+            "wasted_seconds": wasted_seconds,
+            "tools": tools,
+        }
+
+
+__all__ = ["RulePredictor", "SpeculationSession", "SpeculativeExecutor", "ToolCallPrediction"]
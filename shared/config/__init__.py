@@ -1,7 +1,7 @@
 """Configuration management for agentic parallelism applications."""
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class BaseConfig(BaseSettings):
@@ -24,6 +24,32 @@ class BaseConfig(BaseSettings):
     anthropic_api_key: Optional[str] = Field(default=None, description="Anthropic API key")
     huggingface_token: Optional[str] = Field(default=None, description="Hugging Face token")
     
+    # LLM Provider Routing
+    llm_router_providers: List[str] = Field(default_factory=list, description="Providers to route across, e.g. [\"openai:gpt-4o-mini\", \"anthropic\"]; empty = single llm_provider")
+    llm_router_max_in_flight: int = Field(default=32, description="Maximum concurrent LLM calls per routed provider")
+    llm_router_timeout: Optional[float] = Field(default=60.0, description="Seconds before a routed LLM call fails over (time to first token when streaming)")
+    llm_router_cooldown: float = Field(default=30.0, description="Seconds a rate-limited provider is skipped when no Retry-After is given")
+    
+    # LLM Response Cache
+    llm_cache_enabled: bool = Field(default=False, description="Cache LLM responses (opt-in)")
+    llm_cache_path: str = Field(default=".cache/llm_cache.sqlite", description="SQLite file for the LLM response cache")
+    llm_cache_max_entries: int = Field(default=10000, description="Maximum cached LLM responses before LRU eviction")
+    llm_cache_ttl: Optional[float] = Field(default=None, description="LLM response TTL in seconds (None = no expiry)")
+    llm_cache_semantic_enabled: bool = Field(default=False, description="Enable the embedding-similarity cache tier")
+    llm_cache_similarity_threshold: float = Field(default=0.95, description="Minimum cosine similarity for a semantic cache hit")
+    llm_cache_embedding_model: str = Field(default="sentence-transformers/all-MiniLM-L6-v2", description="Embedding model for the semantic cache tier")
+    
+    # Hugging Face Model Loading
+    hf_model_cache_dir: Optional[str] = Field(default=None, description="Local snapshot cache for Hugging Face models (None = HF default cache)")
+    hf_cpu_dtype: str = Field(default="auto", description="CPU weight dtype: auto keeps the checkpoint dtype (no converted copy); float32 or bfloat16 convert at load")
+    model_load_max_attempts: int = Field(default=3, description="Load attempts per model before /health reports it failed")
+    model_load_retry_backoff: float = Field(default=1.0, description="Seconds before the first model load retry, doubled for each further retry")
+    
+    # Hugging Face Generation Batching
+    hf_batch_enabled: bool = Field(default=True, description="Batch concurrent local Hugging Face generations")
+    hf_batch_max_size: int = Field(default=8, description="Maximum prompts per batched forward pass")
+    hf_batch_max_wait: float = Field(default=0.02, description="Seconds to collect concurrent prompts into one batch")
+    
     # LangSmith Configuration
     langchain_tracing_v2: bool = Field(default=True, description="Enable LangSmith tracing")
     langchain_api_key: Optional[str] = Field(default=None, description="LangSmith API key")
@@ -38,9 +64,94 @@ class BaseConfig(BaseSettings):
     api_host: str = Field(default="0.0.0.0", description="API server host")
     api_port: int = Field(default=8000, description="API server port")
     
+    # Agent Execution Budgets (per request; requests may tighten them)
+    agent_max_llm_turns: Optional[int] = Field(default=8, description="Maximum LLM calls per request (None = unlimited)")
+    agent_max_tool_calls: Optional[int] = Field(default=24, description="Maximum tool calls per request (None = unlimited)")
+    agent_max_tokens: Optional[int] = Field(default=None, description="Maximum input plus output tokens per request (None = unlimited)")
+    agent_deadline_seconds: Optional[float] = Field(default=120.0, description="Wall-clock seconds per request before the agent answers with partial results")
+    
+    # Prompt Context Management
+    context_enabled: bool = Field(default=True, description="Compact the message history before each LLM call")
+    context_max_tokens: Optional[int] = Field(default=8000, description="Prompt token budget; older turns are dropped beyond it (None = no window)")
+    context_max_tool_chars: Optional[int] = Field(default=2000, description="Maximum characters per tool result sent to the LLM (None = unlimited)")
+    context_dedupe_tool_results: bool = Field(default=True, description="Send repeated identical tool results once")
+    context_tokenizer: str = Field(default="cl100k_base", description="tiktoken encoding for token counts, or approx for a length estimate")
+
+    # Graph Checkpointing (runs with a thread_id resume from their last completed step)
+    checkpoint_backend: str = Field(default="memory", description="Checkpoint store: none, memory (this process only), sqlite, file")
+    checkpoint_path: str = Field(default=".cache/checkpoints.sqlite", description="SQLite file (sqlite backend) or directory (file backend) for checkpoints")
+    checkpoint_retention_seconds: Optional[float] = Field(default=7 * 24 * 3600.0, description="Delete persisted threads idle for this long (None = keep forever)")
+    checkpoint_lease_seconds: float = Field(default=120.0, description="Lease a run holds on its thread, renewed every step; a crashed run's thread is claimable after it")
+
+    # Admission Control
+    admission_max_concurrency: int = Field(default=32, description="Maximum agent runs executing at once per worker")
+    admission_max_queue: int = Field(default=64, description="Maximum requests waiting for a slot before 503 rejection")
+    admission_queue_timeout: float = Field(default=10.0, description="Seconds a request may wait for a slot before 503 rejection")
+    admission_saturation_threshold: float = Field(default=0.5, description="Queue fill fraction at which /health reports the worker as saturated")
+    
+    # Background Jobs (POST /jobs)
+    jobs_backend: str = Field(default="memory", description="Job queue and result store: memory, redis (shared by replicas)")
+    jobs_max_workers: int = Field(default=4, description="Jobs executed concurrently per worker process")
+    jobs_max_queue: int = Field(default=100, description="Maximum queued jobs before submissions are rejected with 503")
+    jobs_result_ttl: float = Field(default=3600.0, description="Seconds finished job results are kept")
+    jobs_lease_seconds: float = Field(default=30.0, description="Seconds without a worker heartbeat before a running job is failed")
+    jobs_redis_url: str = Field(default="redis://localhost:6379/0", description="Redis URL for the redis jobs backend")
+
+    # Retrieval
+    retrieval_k: int = Field(default=4, description="Documents returned per retrieval query")
+    retrieval_shard_timeout: Optional[float] = Field(default=1.0, description="Seconds to wait for each shard before answering without it")
+    retrieval_prune_threshold: Optional[float] = Field(default=None, description="Skip shards whose centroid cosine similarity to the query is below this (None searches all)")
+    retrieval_max_workers: Optional[int] = Field(default=None, description="Threads searching shards concurrently (default: two per shard)")
+    retrieval_hybrid_timeout: Optional[float] = Field(default=1.0, description="Seconds hybrid search waits for its legs before fusing those that finished")
+    retrieval_fusion: str = Field(default="rrf", description="Hybrid result fusion: rrf (reciprocal rank) or score (normalized scores)")
+    retrieval_rrf_k: int = Field(default=60, description="Rank damping constant for reciprocal rank fusion")
+    retrieval_embedding_cache_dir: str = Field(default=".cache/embeddings", description="Directory of the memory-mapped document embedding cache")
+    retrieval_embedding_cache_dtype: str = Field(default="float32", description="Stored embedding precision: float32, float16")
+
     # Tool API Keys
     tavily_api_key: Optional[str] = Field(default=None, description="Tavily API key for search")
     
+    # Shared HTTP Client Pool
+    http_max_connections: int = Field(default=100, description="Maximum open connections in the shared HTTP pool")
+    http_max_keepalive_connections: int = Field(default=20, description="Idle keep-alive connections kept in the shared HTTP pool")
+    http_keepalive_expiry: float = Field(default=30.0, description="Seconds an idle pooled connection is kept")
+    http_timeout: float = Field(default=10.0, description="Default timeout in seconds for tool HTTP requests")
+    http_per_host_limit: Optional[int] = Field(default=10, description="Maximum concurrent requests per upstream host")
+    http_host_limits: Dict[str, int] = Field(default_factory=dict, description="Per-host concurrency overrides, e.g. {\"api.tavily.com\": 4}")
+    http_warm_on_startup: bool = Field(default=True, description="Open upstream connections before serving traffic")
+    
+    # Tool Executor
+    tool_max_concurrency: int = Field(default=16, description="Maximum concurrent tool calls across all requests")
+    tool_max_workers: int = Field(default=16, description="Threads in the shared pool for sync tools")
+    tool_default_timeout: Optional[float] = Field(default=30.0, description="Default tool call timeout in seconds")
+    tool_concurrency_limits: Dict[str, int] = Field(default_factory=dict, description="Per-tool concurrency limits, e.g. {\"get_recent_company_news\": 4}")
+    tool_timeouts: Dict[str, float] = Field(default_factory=dict, description="Per-tool timeouts in seconds")
+    
+    # Hedged Tool Requests
+    hedge_enabled: bool = Field(default=True, description="Send a backup request for slow upstream tool calls")
+    hedge_percentile: float = Field(default=0.95, description="Latency quantile after which a backup request is sent")
+    hedge_max_rate: float = Field(default=0.1, description="Maximum fraction of calls that may send a backup request")
+    hedge_min_delay: float = Field(default=0.05, description="Minimum seconds before a backup request")
+    hedge_default_delay: float = Field(default=2.0, description="Backup delay in seconds until enough latencies are observed")
+    
+    # Tool Call Batching
+    tool_batch_max_size: int = Field(default=50, description="Distinct keys that trigger an immediate bulk tool fetch")
+    tool_batch_max_wait: float = Field(default=0.01, description="Seconds to collect concurrent tool calls into one bulk fetch")
+    
+    # Tool Result Cache
+    tool_cache_enabled: bool = Field(default=True, description="Cache tool results across requests")
+    tool_cache_backend: str = Field(default="memory", description="Tool cache backend: memory, redis")
+    tool_cache_max_entries: int = Field(default=1024, description="Maximum entries in the in-memory tool cache")
+    tool_cache_default_ttl: float = Field(default=60.0, description="Default tool result TTL in seconds")
+    tool_cache_redis_url: str = Field(default="redis://localhost:6379/0", description="Redis URL for the redis tool cache backend")
+    
+    # Speculative Tool Prefetch
+    speculation_enabled: bool = Field(default=True, description="Start predicted tool calls alongside the first LLM turn")
+    speculation_max_calls: int = Field(default=4, description="Maximum speculative tool calls per request")
+    speculation_min_hit_rate: float = Field(default=0.2, description="Hit rate below which a tool stops being speculated")
+    speculation_min_samples: int = Field(default=20, description="Speculative launches of a tool before its hit rate is trusted")
+    speculation_probe_interval: int = Field(default=10, description="Requests between re-probes of a tool below the hit rate")
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         # Set sentry_environment to environment if not explicitly set
@@ -1,5 +1,17 @@
 """LLM factory and abstractions for multiple providers."""
 from .factory import LLMFactory
 from .base import BaseLLM
+from .batching import GenerationBatcher
+from .cache import LLMResponseCache
+from .loader import ModelWarmPool
+from .router import LLMRouter, NoProviderAvailableError
 
-__all__ = ["LLMFactory", "BaseLLM"]
+__all__ = [
+    "LLMFactory",
+    "BaseLLM",
+    "GenerationBatcher",
+    "LLMResponseCache",
+    "LLMRouter",
+    "ModelWarmPool",
+    "NoProviderAvailableError",
+]
@@ -0,0 +1,176 @@
+"""Dynamic batching of concurrent generation requests for local Hugging Face pipelines."""
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+# Pipeline kwargs that would conflict with the batch this gateway forms
+_BATCH_KWARGS = ("batch_size",)
+
+
+class _GenerationRequest:
+    """One prompt waiting for a batch slot."""
+
+    def __init__(self, prompt: Any, kwargs: Dict[str, Any]):
+        self.prompt = prompt
+        self.kwargs = kwargs
+        self.group = repr(sorted(kwargs.items()))
+        self.future: Future = Future()
+
+
+class GenerationBatcher:
+    """
+    Queues concurrent generation requests and runs them through a pipeline in batches.
+
+    A worker thread takes the first queued request, keeps collecting until
+    ``max_batch_size`` requests are waiting or ``max_wait`` seconds have
+    passed, and calls the pipeline once per group of requests sharing the
+    same generation kwargs, with ``batch_size`` set to the group size. The
+    pipeline pads the batch (set a pad token and left padding on the
+    tokenizer for decoder-only models). Each caller's future is resolved
+    with its own output.
+
+    The batcher is a drop-in stand-in for a ``transformers`` pipeline:
+    calling it with a prompt or list of prompts blocks until the outputs are
+    ready, and other attributes (``task``, ``tokenizer``, ``model``) are read
+    from the wrapped pipeline, so it can be handed to ``HuggingFacePipeline``.
+    Concurrent requests served from different threads then share batches.
+    """
+
+    def __init__(self, pipeline: Any, max_batch_size: int = 8, max_wait: float = 0.02):
+        """
+        Initialize the batcher.
+
+        Args:
+            pipeline: Callable taking a list of prompts and returning one output per prompt
+            max_batch_size: Maximum prompts per pipeline call
+            max_wait: Seconds to wait for more requests after the first one arrives
+        """
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be positive")
+
+        self.pipeline = pipeline
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        self._queue: "queue.Queue[Optional[_GenerationRequest]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+
+        self.batches = 0
+        self.requests = 0
+        self.largest_batch = 0
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes not set in __init__: defer to the pipeline
+        if name == "pipeline":
+            raise AttributeError(name)
+        return getattr(self.pipeline, name)
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("GenerationBatcher is closed")
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="generation-batcher", daemon=True)
+                self._worker.start()
+
+    def submit(self, prompt: Any, **kwargs: Any) -> Future:
+        """
+        Queue one prompt for the next batch.
+
+        Args:
+            prompt: Prompt passed to the pipeline
+            **kwargs: Generation kwargs; only requests with equal kwargs share a batch
+
+        Returns:
+            Future resolved with the pipeline output for this prompt
+        """
+        for key in _BATCH_KWARGS:
+            kwargs.pop(key, None)
+        self._ensure_worker()
+        request = _GenerationRequest(prompt, kwargs)
+        self._queue.put(request)
+        return request.future
+
+    def __call__(self, inputs: Any, **kwargs: Any) -> Any:
+        """Generate for a prompt or list of prompts, blocking until the outputs are ready."""
+        if isinstance(inputs, list):
+            futures = [self.submit(prompt, **kwargs) for prompt in inputs]
+            return [future.result() for future in futures]
+        return self.submit(inputs, **kwargs).result()
+
+    async def agenerate(self, prompt: Any, **kwargs: Any) -> Any:
+        """Generate for one prompt without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(prompt, **kwargs))
+
+    def _collect(self, first: _GenerationRequest) -> Tuple[List[_GenerationRequest], bool]:
+        """Gather requests for one batch; returns the batch and whether to stop."""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                return batch, True
+            batch.append(request)
+        return batch, False
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stop = self._collect(first)
+
+            groups: Dict[str, List[_GenerationRequest]] = {}
+            for request in batch:
+                groups.setdefault(request.group, []).append(request)
+            for requests in groups.values():
+                self._run_batch(requests)
+
+    def _run_batch(self, requests: List[_GenerationRequest]) -> None:
+        self.batches += 1
+        self.requests += len(requests)
+        self.largest_batch = max(self.largest_batch, len(requests))
+
+        prompts = [request.prompt for request in requests]
+        try:
+            outputs = self.pipeline(prompts, batch_size=len(prompts), **requests[0].kwargs)
+        except Exception as e:
+            for request in requests:
+                request.future.set_exception(e)
+            return
+
+        for request, output in zip(requests, outputs):
+            request.future.set_result(output)
+
+    def close(self) -> None:
+        """Stop the worker after the requests already queued are served."""
+        with self._lock:
+            self._closed = True
+            worker = self._worker
+        if worker is not None:
+            self._queue.put(None)
+            worker.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batch counters."""
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "largest_batch": self.largest_batch,
+            "avg_batch_size": self.requests / self.batches if self.batches else 0.0,
+        }
+
+
+__all__ = ["GenerationBatcher"]
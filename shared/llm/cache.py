@@ -0,0 +1,274 @@
+"""Persistent exact and semantic response cache for LangChain chat models."""
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+
+
+class LLMResponseCache(BaseCache):
+    """
+    SQLite-backed LLM response cache with an optional embedding-similarity tier.
+
+    Plugs into LangChain's cache hook (``chat_model.cache = ...``), so lookups
+    happen inside ``invoke``/``ainvoke`` and still work after ``bind_tools``.
+
+    The exact tier is keyed on the prompt and ``llm_string`` LangChain passes
+    in: the prompt is the serialized message list with message ids stripped,
+    and ``llm_string`` captures the model, temperature, stop words and bound
+    tools. A response is therefore only reused for the same model settings.
+
+    The semantic tier (enabled by passing ``embed``) embeds the text of the
+    messages and returns the closest stored response for the same
+    ``llm_string`` whose cosine similarity is at least ``similarity_threshold``.
+
+    Entries are bounded by ``max_entries`` with least-recently-used eviction
+    and optionally expire after ``ttl`` seconds. The database file survives
+    process restarts.
+    """
+
+    def __init__(
+        self,
+        path: str = ".cache/llm_cache.sqlite",
+        max_entries: int = 10000,
+        ttl: Optional[float] = None,
+        embed: Optional[Callable[[str], Sequence[float]]] = None,
+        similarity_threshold: float = 0.95,
+    ):
+        """
+        Initialize the cache and create the database if needed.
+
+        Args:
+            path: SQLite database file (``:memory:`` for a non-persistent cache)
+            max_entries: Maximum number of stored responses before LRU eviction
+            ttl: Seconds after which a response expires (None = never)
+            embed: Function mapping text to an embedding vector; enables the semantic tier
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.embed = embed
+        self.similarity_threshold = similarity_threshold
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                llm_string TEXT NOT NULL,
+                value BLOB NOT NULL,
+                embedding BLOB,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_llm ON responses (llm_string)")
+
+        # Semantic tier: per-llm_string (keys, normalized embedding matrix), built lazily
+        self._vectors: Dict[str, Tuple[List[str], Any]] = {}
+
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(prompt: str, llm_string: str) -> str:
+        """Build the exact-match key for a prompt and model configuration."""
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def prompt_text(prompt: str) -> str:
+        """Extract whitespace-normalized message text from a serialized prompt for embedding."""
+        try:
+            messages = json.loads(prompt)
+        except ValueError:
+            return " ".join(prompt.split())
+
+        parts = []
+        for message in messages if isinstance(messages, list) else [messages]:
+            fields = message.get("kwargs", {}) if isinstance(message, dict) else {}
+            content = fields.get("content", "")
+            if not isinstance(content, str):
+                content = json.dumps(content, sort_keys=True)
+            parts.append(f"{fields.get('type', 'message')}: {' '.join(content.split())}")
+        return "\n".join(parts)
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl is not None and created_at + self.ttl <= time.time()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """Look up a cached response, trying the exact tier then the semantic tier."""
+        key = self.make_key(prompt, llm_string)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and not self._expired(row[1]):
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                self.exact_hits += 1
+                return pickle.loads(row[0])
+            if row is not None:
+                self._delete(key, llm_string)
+
+        if self.embed is not None:
+            value = self._semantic_lookup(prompt, llm_string, now)
+            if value is not None:
+                return value
+
+        self.misses += 1
+        return None
+
+    def _semantic_lookup(self, prompt: str, llm_string: str, now: float) -> Optional[RETURN_VAL_TYPE]:
+        import numpy as np
+
+        query = np.asarray(self.embed(self.prompt_text(prompt)), dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return None
+        query /= norm
+
+        with self._lock:
+            keys, matrix = self._load_vectors(llm_string)
+            if not keys:
+                return None
+            scores = matrix @ query
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity_threshold:
+                return None
+
+            key = keys[best]
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or self._expired(row[1]):
+                self._delete(key, llm_string)
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.semantic_hits += 1
+            return pickle.loads(row[0])
+
+    def _load_vectors(self, llm_string: str) -> Tuple[List[str], Any]:
+        """Get (or build from disk) the normalized embedding matrix for an llm_string."""
+        import numpy as np
+
+        if llm_string not in self._vectors:
+            rows = self._conn.execute(
+                "SELECT key, embedding FROM responses WHERE llm_string = ? AND embedding IS NOT NULL",
+                (llm_string,),
+            ).fetchall()
+            keys = [row[0] for row in rows]
+            if rows:
+                matrix = np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+            else:
+                matrix = np.empty((0, 0), dtype=np.float32)
+            self._vectors[llm_string] = (keys, matrix)
+        return self._vectors[llm_string]
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Store a response, evicting the least recently used entries when full."""
+        key = self.make_key(prompt, llm_string)
+        now = time.time()
+
+        embedding = None
+        if self.embed is not None:
+            import numpy as np
+
+            vector = np.asarray(self.embed(self.prompt_text(prompt)), dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            if norm > 0:
+                embedding = (vector / norm).tobytes()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, llm_string, value, embedding, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, llm_string, pickle.dumps(return_val), embedding, now, now),
+            )
+            self._set_vector(llm_string, key, embedding)
+            self._evict()
+
+    def _set_vector(self, llm_string: str, key: str, embedding: Optional[bytes]) -> None:
+        """Add, replace or drop one key's row in a loaded semantic index. Caller holds the lock."""
+        import numpy as np
+
+        if llm_string not in self._vectors:
+            return  # Built from disk on the first lookup
+        keys, matrix = self._vectors[llm_string]
+        if key in keys:
+            self._drop_vectors({key})
+            keys, matrix = self._vectors[llm_string]
+        if embedding is not None:
+            vector = np.frombuffer(embedding, dtype=np.float32)[None, :]
+            matrix = vector if not keys else np.concatenate([matrix, vector])
+            self._vectors[llm_string] = (keys + [key], matrix)
+
+    def _drop_vectors(self, keys: set) -> None:
+        """Remove keys from every loaded semantic index. Caller holds the lock."""
+        for llm_string, (cached_keys, matrix) in list(self._vectors.items()):
+            keep = [i for i, key in enumerate(cached_keys) if key not in keys]
+            if len(keep) < len(cached_keys):
+                self._vectors[llm_string] = ([cached_keys[i] for i in keep], matrix[keep])
+
+    def _evict(self) -> None:
+        """Drop least recently used rows above max_entries. Caller holds the lock."""
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        overflow = count - self.max_entries
+        if overflow <= 0:
+            return
+        evicted = [row[0] for row in self._conn.execute(
+            "SELECT key FROM responses ORDER BY last_access ASC LIMIT ?", (overflow,)
+        ).fetchall()]
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key in evicted])
+        self.evictions += overflow
+        self._drop_vectors(set(evicted))
+
+    def _delete(self, key: str, llm_string: str) -> None:
+        """Delete a single row. Caller holds the lock."""
+        self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+        self._drop_vectors({key})
+
+    def clear(self, **kwargs: Any) -> None:
+        """Remove all cached responses."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._vectors.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and store size."""
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        return {
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.exact_hits + self.semantic_hits) / lookups if lookups else 0.0,
+        }
+
+
+__all__ = ["LLMResponseCache"]
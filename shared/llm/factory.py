@@ -1,11 +1,17 @@
 """LLM factory for creating LLM instances based on provider."""
-from typing import Optional, Any
+from typing import Dict, List, Optional, Any
 from shared.config import BaseConfig
+from shared.llm.batching import GenerationBatcher
+from shared.llm.cache import LLMResponseCache
+from shared.llm.router import LLMRouter
 
 
 class LLMFactory:
     """Factory for creating LLM instances based on provider configuration."""
     
+    # Response caches shared by every LLM created for the same cache file
+    _response_caches: Dict[str, LLMResponseCache] = {}
+    
     @staticmethod
     def create(config: Optional[BaseConfig] = None, provider: Optional[str] = None, **kwargs) -> Any:
         """
@@ -13,7 +19,8 @@ class LLMFactory:
         
         Args:
             config: Configuration object (optional, will load from env if not provided)
-            provider: Override provider from config (optional)
+            provider: Override provider from config (optional); when omitted and
+                ``llm_router_providers`` is set, an LLMRouter over those providers is created
             **kwargs: Additional arguments to pass to the LLM constructor
             
         Returns:
@@ -23,8 +30,19 @@ class LLMFactory:
             from shared.config import load_config
             config = load_config()
         
-        provider = provider or config.llm_provider
+        if provider is None and config.llm_router_providers:
+            llm = LLMFactory.create_router(config, **kwargs)
+        else:
+            llm = LLMFactory._create_provider(config, provider or config.llm_provider, **kwargs)
+        
+        if config.llm_cache_enabled:
+            llm.cache = LLMFactory.get_response_cache(config)
         
+        return llm
+    
+    @staticmethod
+    def _create_provider(config: BaseConfig, provider: str, **kwargs) -> Any:
+        """Create a chat model for a single provider."""
         if provider == "openai":
             return LLMFactory._create_openai(config, **kwargs)
         elif provider == "anthropic":
@@ -36,6 +54,82 @@ class LLMFactory:
         else:
             raise ValueError(f"Unsupported LLM provider: {provider}")
     
+    @staticmethod
+    def create_router(config: BaseConfig, providers: Optional[List[str]] = None, **kwargs) -> LLMRouter:
+        """
+        Create a routing LLM over several providers.
+        
+        Each provider spec is ``"provider"`` or ``"provider:model"``, e.g.
+        ``["openai:gpt-4o-mini", "anthropic:claude-3-5-sonnet-20241022"]``.
+        Azure uses the deployment from ``AZURE_OPENAI_DEPLOYMENT_NAME``.
+        API clients are created without SDK retries so a rate-limited
+        provider fails over at once instead of backing off.
+        
+        Args:
+            config: Configuration object with ``llm_router_*`` settings
+            providers: Provider specs (defaults to ``config.llm_router_providers``)
+            **kwargs: Additional arguments passed to every provider constructor
+            
+        Returns:
+            LLMRouter over the configured providers
+        """
+        specs = providers or config.llm_router_providers
+        pool = []
+        for spec in specs:
+            provider, _, model = spec.partition(":")
+            provider_kwargs = dict(kwargs)
+            if model and provider != "azure":
+                provider_kwargs["model"] = model
+            if provider in ("openai", "anthropic", "azure"):
+                provider_kwargs.setdefault("max_retries", 0)
+            pool.append((spec, LLMFactory._create_provider(config, provider, **provider_kwargs)))
+        
+        return LLMRouter.from_providers(
+            pool,
+            max_in_flight=config.llm_router_max_in_flight,
+            timeout=config.llm_router_timeout,
+            cooldown=config.llm_router_cooldown,
+        )
+    
+    @staticmethod
+    def get_response_cache(config: BaseConfig) -> LLMResponseCache:
+        """
+        Get the shared response cache for the configured cache file.
+        
+        Args:
+            config: Configuration object with ``llm_cache_*`` settings
+            
+        Returns:
+            LLMResponseCache shared by all LLMs using the same cache path
+        """
+        cache = LLMFactory._response_caches.get(config.llm_cache_path)
+        if cache is None:
+            embed = None
+            if config.llm_cache_semantic_enabled:
+                embed = LLMFactory._create_cache_embedder(config)
+            cache = LLMResponseCache(
+                path=config.llm_cache_path,
+                max_entries=config.llm_cache_max_entries,
+                ttl=config.llm_cache_ttl,
+                embed=embed,
+                similarity_threshold=config.llm_cache_similarity_threshold,
+            )
+            LLMFactory._response_caches[config.llm_cache_path] = cache
+        return cache
+    
+    @staticmethod
+    def _create_cache_embedder(config: BaseConfig) -> Any:
+        """Create the embedding function used by the semantic cache tier."""
+        try:
+            from langchain_huggingface import HuggingFaceEmbeddings
+        except ImportError:
+            raise ImportError(
+                "langchain-huggingface is required for the semantic LLM cache. "
+                "Install with: pip install langchain-huggingface sentence-transformers"
+            )
+        
+        return HuggingFaceEmbeddings(model_name=config.llm_cache_embedding_model).embed_query
+    
     @staticmethod
     def _create_openai(config: BaseConfig, model: str = "gpt-4o-mini", **kwargs) -> Any:
         """Create OpenAI LLM instance."""
@@ -85,6 +179,34 @@ class LLMFactory:
             **{k: v for k, v in kwargs.items() if k != "temperature"}
         )
     
+    @staticmethod
+    def _resolve_local_model(config: BaseConfig, model: str) -> str:
+        """
+        Get a local snapshot directory for a Hugging Face model.
+        
+        Only config, tokenizer and safetensors files are fetched (no duplicate
+        ``.bin`` weights). An existing snapshot in ``hf_model_cache_dir`` is
+        used without contacting the Hub.
+        
+        Args:
+            config: Configuration object with ``huggingface_token`` and ``hf_model_cache_dir``
+            model: Model repository ID
+            
+        Returns:
+            Path to the local snapshot directory
+        """
+        from huggingface_hub import snapshot_download
+        
+        download_kwargs = {
+            "cache_dir": config.hf_model_cache_dir,
+            "allow_patterns": ["*.json", "*.safetensors", "tokenizer*", "*.model", "*.txt"],
+        }
+        try:
+            return snapshot_download(model, local_files_only=True, **download_kwargs)
+        except Exception:
+            print(f"⚠️  {model} not found in local model cache, downloading")
+            return snapshot_download(model, token=config.huggingface_token, **download_kwargs)
+    
     @staticmethod
     def _create_huggingface(config: BaseConfig, model: str = "meta-llama/Llama-3.2-3B-Instruct", **kwargs) -> Any:
         """Create Hugging Face LLM instance."""
@@ -101,12 +223,14 @@ class LLMFactory:
         # Determine device
         device = "mps" if torch.backends.mps.is_available() else "cuda" if torch.cuda.is_available() else "cpu"
         
-        # Load tokenizer and model
-        tokenizer = AutoTokenizer.from_pretrained(model, token=config.huggingface_token)
+        # Load tokenizer and model from a local snapshot of the safetensors weights
+        model_path = LLMFactory._resolve_local_model(config, model)
+        tokenizer = AutoTokenizer.from_pretrained(model_path)
         
-        # Model loading configuration
+        # Model loading configuration: safetensors are memory-mapped rather than
+        # read into memory, and low_cpu_mem_usage skips the random init pass
         model_kwargs = {
-            "token": config.huggingface_token,
+            "use_safetensors": True,
             "low_cpu_mem_usage": True,
         }
         
@@ -117,12 +241,13 @@ class LLMFactory:
             model_kwargs["torch_dtype"] = torch.float16
             model_kwargs["device_map"] = "auto"
         else:
-            model_kwargs["torch_dtype"] = torch.float32
+            # "auto" keeps the checkpoint dtype, so mapped weights are used without a converted copy
+            model_kwargs["torch_dtype"] = "auto" if config.hf_cpu_dtype == "auto" else getattr(torch, config.hf_cpu_dtype)
         
-        model_instance = AutoModelForCausalLM.from_pretrained(model, **model_kwargs)
+        model_instance = AutoModelForCausalLM.from_pretrained(model_path, **model_kwargs)
         
         # Create pipeline
-        pipe = pipeline(
+        pipe: Any = pipeline(
             "text-generation",
             model=model_instance,
             tokenizer=tokenizer,
@@ -131,6 +256,18 @@ class LLMFactory:
             repetition_penalty=kwargs.get("repetition_penalty", 1.1),
         )
         
+        if config.hf_batch_enabled:
+            # Decoder-only models must be left-padded so generation continues each prompt
+            if tokenizer.pad_token_id is None:
+                tokenizer.pad_token_id = tokenizer.eos_token_id
+            tokenizer.padding_side = "left"
+            # Concurrent requests (one thread each) share batched forward passes
+            pipe = GenerationBatcher(
+                pipe,
+                max_batch_size=config.hf_batch_max_size,
+                max_wait=config.hf_batch_max_wait,
+            )
+        
         llm_pipeline = HuggingFacePipeline(pipeline=pipe)
         return ChatHuggingFace(llm=llm_pipeline)
 
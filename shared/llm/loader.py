@@ -0,0 +1,165 @@
+"""Background model loading so the app can serve health probes while models load."""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+
+class _ModelSlot:
+    """Loader and load state of one registered model."""
+
+    def __init__(self, loader: Callable[[], Any]):
+        self.loader = loader
+        self.future: Optional[Future] = None
+        self.load_seconds: Optional[float] = None
+        self.attempts = 0
+        self.error: Optional[str] = None
+
+
+class ModelWarmPool:
+    """
+    Loads registered models in background threads and hands them out once ready.
+
+    Models are registered at import time with a zero-argument loader (cheap:
+    nothing is imported or loaded yet). ``start()``, typically called from the
+    FastAPI lifespan, begins loading every model in parallel so the server can
+    answer liveness probes immediately; ``is_ready`` backs a readiness probe.
+    ``get``/``aget`` wait for a model and load it on first use if ``start()``
+    was never called (scripts, notebooks, tests).
+
+    A failing loader is retried with exponential backoff; once every attempt
+    has failed the model is reported ``failed`` (see ``has_failed``) until a
+    later ``get``/``aget`` starts a fresh round of attempts.
+    """
+
+    def __init__(self, max_attempts: int = 3, retry_backoff: float = 1.0):
+        """
+        Initialize an empty pool.
+
+        Args:
+            max_attempts: Load attempts per model before it is reported failed
+            retry_backoff: Seconds before the first retry, doubled for each further retry
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff = retry_backoff
+        self._lock = threading.Lock()
+        self._slots: Dict[str, _ModelSlot] = {}
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        """
+        Register a model loader.
+
+        Args:
+            name: Model name used with ``get``/``aget``
+            loader: Zero-argument callable returning the loaded model
+        """
+        with self._lock:
+            self._slots[name] = _ModelSlot(loader)
+
+    def _load(self, name: str, slot: _ModelSlot) -> Any:
+        for attempt in range(1, self.max_attempts + 1):
+            slot.attempts = attempt
+            started = time.perf_counter()
+            try:
+                model = slot.loader()
+            except Exception as e:
+                slot.error = str(e)
+                if attempt == self.max_attempts:
+                    raise
+                delay = self.retry_backoff * 2 ** (attempt - 1)
+                print(f"⚠️  Failed to load model {name} (attempt {attempt}/{self.max_attempts}): {e}; retrying in {delay:.1f}s")
+                time.sleep(delay)
+            else:
+                slot.load_seconds = time.perf_counter() - started
+                slot.error = None
+                return model
+
+    def _start_slot(self, name: str, background: bool, retry_failed: bool = False) -> Future:
+        with self._lock:
+            slot = self._slots.get(name)
+            if slot is None:
+                raise KeyError(f"Unknown model: {name}")
+            failed = slot.future is not None and slot.future.done() and slot.future.exception() is not None
+            if slot.future is not None and not (retry_failed and failed):
+                return slot.future
+            slot.future = Future()
+
+        def run() -> None:
+            try:
+                slot.future.set_result(self._load(name, slot))
+            except BaseException as e:
+                print(f"⚠️  Failed to load model {name}: {e}")
+                slot.future.set_exception(e)
+
+        if background:
+            threading.Thread(target=run, name=f"model-load-{name}", daemon=True).start()
+        else:
+            run()
+        return slot.future
+
+    def start(self) -> None:
+        """Begin loading every registered model in background threads."""
+        with self._lock:
+            names = list(self._slots)
+        for name in names:
+            self._start_slot(name, background=True)
+
+    def get(self, name: str, timeout: Optional[float] = None) -> Any:
+        """
+        Get a model, waiting for (or performing) its load.
+
+        Args:
+            name: Registered model name
+            timeout: Maximum seconds to wait for a background load
+
+        Returns:
+            The loaded model
+
+        Raises:
+            Exception: The loader's exception if loading failed
+        """
+        return self._start_slot(name, background=False, retry_failed=True).result(timeout=timeout)
+
+    async def aget(self, name: str) -> Any:
+        """Get a model without blocking the event loop while it loads."""
+        return await asyncio.wrap_future(self._start_slot(name, background=True, retry_failed=True))
+
+    def is_ready(self, name: Optional[str] = None) -> bool:
+        """Return whether a model (or, with no name, every model) has loaded successfully."""
+        with self._lock:
+            slots = [self._slots[name]] if name is not None else list(self._slots.values())
+        return all(
+            slot.future is not None and slot.future.done() and slot.future.exception() is None
+            for slot in slots
+        )
+
+    def has_failed(self, name: Optional[str] = None) -> bool:
+        """Return whether a model (or, with no name, any model) used up its load attempts."""
+        with self._lock:
+            slots = [self._slots[name]] if name is not None else list(self._slots.values())
+        return any(
+            slot.future is not None and slot.future.done() and slot.future.exception() is not None
+            for slot in slots
+        )
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """Get the load state (pending, loading, ready, failed), attempts, last error and load time of each model."""
+        with self._lock:
+            slots = dict(self._slots)
+
+        status = {}
+        for name, slot in slots.items():
+            if slot.future is None:
+                state = "pending"
+            elif not slot.future.done():
+                state = "loading"
+            elif slot.future.exception() is not None:
+                state = "failed"
+            else:
+                state = "ready"
+            status[name] = {"state": state, "attempts": slot.attempts, "error": slot.error, "load_seconds": slot.load_seconds}
+        return status
+
+
+__all__ = ["ModelWarmPool"]
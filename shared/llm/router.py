@@ -0,0 +1,326 @@
+"""Routing chat model: least-latency provider selection with transparent failover."""
+import asyncio
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+# The router reports start/end/tokens to callbacks itself; providers run without them
+_PROVIDER_CALL_CONFIG = {"callbacks": []}
+
+
+class NoProviderAvailableError(RuntimeError):
+    """Raised when every provider is at its in-flight cap, cooling down, or has failed."""
+
+
+def is_failover_error(error: BaseException) -> bool:
+    """
+    Return whether an error should move the call to the next provider.
+
+    Rate limits (429), overload/server errors (5xx, 529), timeouts and
+    connection failures fail over; anything else (e.g. a 400 for a bad
+    request) would fail on every provider and is raised immediately.
+    """
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    name = type(error).__name__
+    return any(marker in name for marker in ("RateLimit", "Timeout", "Overloaded", "Connection"))
+
+
+def _is_rate_limit(error: BaseException) -> bool:
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or "RateLimit" in type(error).__name__
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class ProviderStats:
+    """Rolling latency/error EWMAs, in-flight count and cooldown of one provider."""
+
+    def __init__(self, name: str, max_in_flight: int, alpha: float):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.alpha = alpha
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.calls = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self, now: float) -> bool:
+        with self._lock:
+            if self.in_flight >= self.max_in_flight or now < self.cooldown_until:
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, latency: Optional[float], error: Optional[BaseException], cooldown: float) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.calls += 1
+            failed = 1.0 if error is not None else 0.0
+            self.error_rate += self.alpha * (failed - self.error_rate)
+            if error is None:
+                self.latency = latency if self.latency is None else self.latency + self.alpha * (latency - self.latency)
+                return
+            self.failures += 1
+            if _is_rate_limit(error):
+                self.cooldown_until = time.monotonic() + (_retry_after(error) or cooldown)
+
+    def abandon(self) -> None:
+        """Release a slot without recording a sample (the call was cancelled)."""
+        with self._lock:
+            self.in_flight -= 1
+
+    def score(self, error_penalty: float) -> float:
+        # Providers without samples score 0 so they get tried
+        return (self.latency or 0.0) * (1.0 + error_penalty * self.error_rate)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "latency_ewma": self.latency,
+                "error_rate_ewma": self.error_rate,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "cooling_down": time.monotonic() < self.cooldown_until,
+                "calls": self.calls,
+                "failures": self.failures,
+            }
+
+
+class LLMRouter(BaseChatModel):
+    """
+    Chat model that routes each call across a pool of provider chat models.
+
+    Each call goes to the available provider with the lowest latency EWMA
+    (inflated by its error-rate EWMA); providers at their in-flight cap or
+    cooling down after a rate limit are skipped. When the chosen provider
+    fails with a rate limit, timeout, 5xx or connection error, the call moves
+    to the next provider; a streaming call only fails over before its first
+    chunk. Other errors are raised as-is.
+
+    ``bind_tools`` binds the tools on every provider and returns a router
+    sharing the same statistics, so it drops in wherever a single chat model
+    is used. Create one with ``LLMFactory.create_router``.
+    """
+
+    providers: List[Tuple[str, Any]]
+    """(name, chat model or bound runnable) in priority order."""
+    stats: Dict[str, Any]
+    """ProviderStats by provider name, shared by bound copies."""
+    timeout: Optional[float] = None
+    """Per-attempt timeout in seconds for async calls."""
+    cooldown: float = 30.0
+    """Seconds a provider is skipped after a rate limit without Retry-After."""
+    error_penalty: float = 4.0
+    """How strongly the error-rate EWMA inflates a provider's latency score."""
+
+    @classmethod
+    def from_providers(
+        cls,
+        providers: Sequence[Tuple[str, Any]],
+        max_in_flight: int = 32,
+        alpha: float = 0.2,
+        **kwargs: Any,
+    ) -> "LLMRouter":
+        """
+        Create a router over named provider chat models.
+
+        Args:
+            providers: (name, chat model) pairs in priority order
+            max_in_flight: Maximum concurrent calls per provider
+            alpha: EWMA smoothing factor for latency and error rate
+            **kwargs: ``timeout``, ``cooldown`` or ``error_penalty``
+
+        Returns:
+            Configured LLMRouter
+        """
+        if not providers:
+            raise ValueError("LLMRouter needs at least one provider")
+        stats = {name: ProviderStats(name, max_in_flight, alpha) for name, _ in providers}
+        return cls(providers=list(providers), stats=stats, **kwargs)
+
+    @property
+    def _llm_type(self) -> str:
+        return "llm-router"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> "LLMRouter":
+        """Bind tools on every provider; the returned router shares routing statistics."""
+        return self.model_copy(update={
+            "providers": [(name, model.bind_tools(tools, **kwargs)) for name, model in self.providers]
+        })
+
+    def _candidates(self) -> List[Tuple[str, Any]]:
+        order = {name: index for index, (name, _) in enumerate(self.providers)}
+        return sorted(
+            self.providers,
+            key=lambda provider: (self.stats[provider[0]].score(self.error_penalty), order[provider[0]]),
+        )
+
+    def _attempts(self) -> Iterator[Tuple[str, Any, ProviderStats]]:
+        """Yield acquired providers best-first; the caller must release each one."""
+        skipped = []
+        for name, model in self._candidates():
+            stats = self.stats[name]
+            if stats.try_acquire(time.monotonic()):
+                yield name, model, stats
+            else:
+                skipped.append(name)
+        raise NoProviderAvailableError(
+            f"No LLM provider left to try (at capacity or cooling down: {', '.join(skipped) or 'none'})"
+        )
+
+    def _finish(self, stats: ProviderStats, started: float, error: Optional[BaseException]) -> bool:
+        """Record an attempt; returns True if the call should fail over."""
+        stats.release(time.perf_counter() - started, error, self.cooldown)
+        if error is None or not is_failover_error(error):
+            return False
+        print(f"⚠️  LLM provider {stats.name} failed ({type(error).__name__}), failing over")
+        return True
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        last_error: Optional[BaseException] = None
+        try:
+            for name, model, stats in self._attempts():
+                started = time.perf_counter()
+                try:
+                    message = model.invoke(messages, _PROVIDER_CALL_CONFIG, stop=stop, **kwargs)
+                except Exception as e:
+                    if not self._finish(stats, started, e):
+                        raise
+                    last_error = e
+                    continue
+                except BaseException:
+                    stats.abandon()
+                    raise
+                self._finish(stats, started, None)
+                return ChatResult(generations=[ChatGeneration(message=message)], llm_output={"provider": name})
+        except NoProviderAvailableError as e:
+            raise e from last_error
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        last_error: Optional[BaseException] = None
+        try:
+            for name, model, stats in self._attempts():
+                started = time.perf_counter()
+                try:
+                    message = await asyncio.wait_for(
+                        model.ainvoke(messages, _PROVIDER_CALL_CONFIG, stop=stop, **kwargs),
+                        timeout=self.timeout,
+                    )
+                except Exception as e:
+                    if not self._finish(stats, started, e):
+                        raise
+                    last_error = e
+                    continue
+                except BaseException:
+                    stats.abandon()
+                    raise
+                self._finish(stats, started, None)
+                return ChatResult(generations=[ChatGeneration(message=message)], llm_output={"provider": name})
+        except NoProviderAvailableError as e:
+            raise e from last_error
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        last_error: Optional[BaseException] = None
+        try:
+            for _, model, stats in self._attempts():
+                started = time.perf_counter()
+                streamed = False
+                try:
+                    for chunk in model.stream(messages, _PROVIDER_CALL_CONFIG, stop=stop, **kwargs):
+                        streamed = True
+                        yield ChatGenerationChunk(message=chunk)
+                except Exception as e:
+                    # Once tokens reached the caller the call cannot move to another provider
+                    if not self._finish(stats, started, e) or streamed:
+                        raise
+                    last_error = e
+                    continue
+                except BaseException:
+                    stats.abandon()
+                    raise
+                self._finish(stats, started, None)
+                return
+        except NoProviderAvailableError as e:
+            raise e from last_error
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        last_error: Optional[BaseException] = None
+        try:
+            for _, model, stats in self._attempts():
+                started = time.perf_counter()
+                streamed = False
+                try:
+                    stream = model.astream(messages, _PROVIDER_CALL_CONFIG, stop=stop, **kwargs).__aiter__()
+                    while True:
+                        # The timeout covers time to first chunk
+                        try:
+                            chunk = await asyncio.wait_for(
+                                stream.__anext__(), timeout=None if streamed else self.timeout
+                            )
+                        except StopAsyncIteration:
+                            break
+                        streamed = True
+                        yield ChatGenerationChunk(message=chunk)
+                except Exception as e:
+                    if not self._finish(stats, started, e) or streamed:
+                        raise
+                    last_error = e
+                    continue
+                except BaseException:
+                    stats.abandon()
+                    raise
+                self._finish(stats, started, None)
+                return
+        except NoProviderAvailableError as e:
+            raise e from last_error
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-provider latency/error EWMAs, load and failure counts."""
+        return {name: stats.to_dict() for name, stats in self.stats.items()}
+
+
+__all__ = ["LLMRouter", "NoProviderAvailableError", "ProviderStats", "is_failover_error"]
@@ -1,5 +1,31 @@
-"""Observability utilities for Sentry and health checks."""
-from .sentry import init_sentry
+"""Observability utilities for Sentry, health checks, tracing and metrics."""
+from .sentry import init_sentry, export_trace
 from .health import HealthCheck
+from .metrics import (
+    Counter,
+    Gauge,
+    HdrHistogram,
+    LatencyHistogram,
+    MetricsRegistry,
+    TraceMetrics,
+    track_call,
+)
+from .tracing import Span, Trace, TracingCallbackHandler, current_trace, trace_request
 
-__all__ = ["init_sentry", "HealthCheck"]
+__all__ = [
+    "init_sentry",
+    "export_trace",
+    "HealthCheck",
+    "Counter",
+    "Gauge",
+    "HdrHistogram",
+    "LatencyHistogram",
+    "MetricsRegistry",
+    "TraceMetrics",
+    "track_call",
+    "Span",
+    "Trace",
+    "TracingCallbackHandler",
+    "current_trace",
+    "trace_request",
+]
@@ -1,5 +1,5 @@
 """Health check utilities for monitoring application status."""
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
 from datetime import datetime
 
 
@@ -11,6 +11,74 @@ class HealthCheck:
         self.app_name = app_name
         self.version = version
         self.start_time = datetime.utcnow()
+        self._readiness_checks: Dict[str, Callable[[], bool]] = {}
+        self._liveness_checks: Dict[str, Callable[[], bool]] = {}
+        self._load_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+    
+    def add_readiness_check(self, name: str, check_func: Callable[[], bool]) -> None:
+        """
+        Register a check that must pass before the app accepts traffic.
+        
+        Args:
+            name: Name reported in the readiness status
+            check_func: Function that returns True once the component is ready
+        """
+        self._readiness_checks[name] = check_func
+    
+    def add_liveness_check(self, name: str, check_func: Callable[[], bool]) -> None:
+        """
+        Register a check whose failure makes the health status ``unhealthy``.
+        
+        Use it for conditions a restart can fix, such as a model that failed
+        every load attempt, so the orchestrator replaces the instance.
+        
+        Args:
+            name: Name reported in the health status
+            check_func: Function that returns False once the component is broken
+        """
+        self._liveness_checks[name] = check_func
+    
+    def add_load_provider(self, name: str, stats_func: Callable[[], Dict[str, Any]]) -> None:
+        """
+        Register a load report included in the health status.
+        
+        The health status becomes ``saturated`` while any report has a true
+        ``saturated`` key, so the platform can scale out before requests
+        start being rejected.
+        
+        Args:
+            name: Key of the report in the health status
+            stats_func: Function returning the report, e.g. queue depth and saturation
+        """
+        self._load_providers[name] = stats_func
+    
+    def get_load_status(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get every registered load report.
+        
+        Returns:
+            Dictionary of reports keyed by provider name
+        """
+        load = {}
+        for name, stats_func in self._load_providers.items():
+            try:
+                load[name] = stats_func()
+            except Exception as e:
+                print(f"⚠️  Load report failed for {name}: {e}")
+        return load
+    
+    def get_readiness_status(self) -> Dict[str, Any]:
+        """
+        Get the readiness status of the application.
+        
+        Returns:
+            Dictionary with the overall ``ready`` flag and each check's result
+        """
+        checks = {
+            name: self.check_dependency(check_func, name)
+            for name, check_func in self._readiness_checks.items()
+        }
+        return {"ready": all(checks.values()), "checks": checks}
     
     def get_health_status(
         self,
@@ -35,8 +103,25 @@ class HealthCheck:
             "version": self.version,
             "uptime_seconds": uptime,
             "timestamp": datetime.utcnow().isoformat(),
+            # Liveness stays healthy while models load; readiness is reported separately
+            "ready": self.get_readiness_status()["ready"],
         }
         
+        if self._liveness_checks:
+            checks = {
+                name: self.check_dependency(check_func, name)
+                for name, check_func in self._liveness_checks.items()
+            }
+            status["checks"] = checks
+            if not all(checks.values()):
+                status["status"] = "unhealthy"
+        
+        load = self.get_load_status()
+        if load:
+            status["load"] = load
+            if status["status"] == "healthy" and any(report.get("saturated") for report in load.values()):
+                status["status"] = "saturated"
+        
         if include_dependencies and dependencies:
             status["dependencies"] = dependencies
             # Set overall status to unhealthy if any dependency is down
@@ -0,0 +1,420 @@
+"""In-process metrics registry with Prometheus text exposition.
+
+Counters, gauges and HDR-style histograms keep one cell per writing thread,
+so recording a sample never takes a lock; a scrape sums the cells.
+"""
+import asyncio
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .tracing import Trace
+
+# Latency bucket upper bounds in seconds (Prometheus ``le`` labels)
+DEFAULT_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+class LatencyHistogram:
+    """Cumulative-bucket latency histogram family keyed by label values."""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str], buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        """
+        Initialize the histogram family.
+
+        Args:
+            name: Metric name
+            help_text: Metric description for ``# HELP``
+            label_names: Names of the labels passed to ``observe``
+            buckets: Bucket upper bounds in seconds
+        """
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # label values -> (bucket counts, sum, count)
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, seconds: float, *label_values: str) -> None:
+        """Record one observation for the given label values."""
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        """Render the family in the Prometheus text exposition format."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._series.items()}
+
+        for label_values, (counts, total, count) in sorted(series.items()):
+            labels = tuple(zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class TraceMetrics:
+    """Aggregates span durations of finished traces into latency histograms."""
+
+    def __init__(self, prefix: str = "agent"):
+        """Initialize the span duration histogram family."""
+        self.span_seconds = LatencyHistogram(
+            f"{prefix}_span_duration_seconds",
+            "Duration of traced spans by kind (request, node, llm, tool) and name.",
+            ("kind", "name", "status"),
+        )
+
+    def observe_trace(self, trace: Trace) -> None:
+        """Record the duration of every finished span in a trace."""
+        for span in list(trace.spans):
+            if span.duration_ns is not None:
+                self.span_seconds.observe(span.duration_ns / 1e9, span.kind, span.name, span.status)
+
+    def render(self) -> str:
+        """Render all histograms in the Prometheus text exposition format."""
+        return "\n".join(self.span_seconds.render()) + "\n"
+
+
+class _ThreadCells:
+    """One mutable cell per writing thread; only the owning thread writes its cell."""
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._local = threading.local()
+        self._cells: List[Any] = []
+        # Taken once per thread, on its first write
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._local.cell = self._factory()
+            with self._lock:
+                self._cells.append(cell)
+            return cell
+
+    def all(self) -> List[Any]:
+        with self._lock:
+            return list(self._cells)
+
+
+class _ShardedValue:
+    """Labelled float values summed over per-thread cells, optionally read from callbacks."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        """
+        Initialize the metric family.
+
+        Args:
+            name: Metric name
+            help_text: Metric description for ``# HELP``
+            label_names: Names of the label values passed when recording
+        """
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._cells = _ThreadCells(dict)
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def _add(self, amount: float, label_values: Tuple[str, ...]) -> None:
+        cell = self._cells.get()
+        cell[label_values] = cell.get(label_values, 0.0) + amount
+
+    def set_function(self, func: Callable[[], float], *label_values: str) -> None:
+        """Read the value for ``label_values`` from ``func`` at scrape time instead."""
+        self._functions[label_values] = func
+
+    def values(self) -> Dict[Tuple[str, ...], float]:
+        """Get the current value of every label combination."""
+        totals: Dict[Tuple[str, ...], float] = {}
+        for cell in self._cells.all():
+            # Copying a dict is atomic under the GIL, so the owner may keep writing
+            for label_values, value in list(cell.items()):
+                totals[label_values] = totals.get(label_values, 0.0) + value
+        for label_values, func in list(self._functions.items()):
+            try:
+                totals[label_values] = float(func())
+            except Exception as e:
+                print(f"⚠️  Metric callback for {self.name} failed: {e}")
+        return totals
+
+    def value(self, *label_values: str) -> float:
+        """Get the current value for one label combination."""
+        return self.values().get(label_values, 0.0)
+
+    def render(self) -> List[str]:
+        """Render the family in the Prometheus text exposition format."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+        for label_values, value in sorted(self.values().items()):
+            labels = tuple(zip(self.label_names, label_values))
+            lines.append(f"{self.name}{_format_labels(labels)} {value:g}")
+        return lines
+
+
+class Counter(_ShardedValue):
+    """Monotonic counter family."""
+
+    type_name = "counter"
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        """Add ``amount`` (non-negative) to the counter for ``label_values``."""
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        self._add(amount, label_values)
+
+
+class Gauge(_ShardedValue):
+    """Gauge family for values that go up and down, e.g. in-flight work."""
+
+    type_name = "gauge"
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        """Increase the gauge for ``label_values``."""
+        self._add(amount, label_values)
+
+    def dec(self, *label_values: str, amount: float = 1.0) -> None:
+        """Decrease the gauge for ``label_values``."""
+        self._add(-amount, label_values)
+
+    @contextmanager
+    def track_in_progress(self, *label_values: str) -> Iterator[None]:
+        """Count the enclosed block as in progress."""
+        self.inc(*label_values)
+        try:
+            yield
+        finally:
+            self.dec(*label_values)
+
+
+def _bucket_index(value: int, bits: int) -> int:
+    """Log-linear bucket of a non-negative integer: exact below ``2**bits``, then ``bits - 1`` mantissa bits."""
+    if value < (1 << bits):
+        return value
+    shift = value.bit_length() - bits
+    return ((shift + 1) << (bits - 1)) + (value >> shift)
+
+
+def _bucket_bounds(index: int, bits: int) -> Tuple[int, int]:
+    """Inclusive value range of a bucket from ``_bucket_index``."""
+    if index < (1 << bits):
+        return index, index
+    shift = (index >> (bits - 1)) - 2
+    top = index - ((shift + 1) << (bits - 1))
+    return top << shift, ((top + 1) << shift) - 1
+
+
+class _HdrCell:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self) -> None:
+        self.counts: Dict[int, int] = {}
+        self.total = 0.0
+        self.count = 0
+
+
+class HdrHistogram:
+    """
+    HDR-style latency histogram family with bounded relative error.
+
+    Values are recorded in integer ``resolution`` units (microseconds by
+    default) into log-linear buckets, so quantiles are accurate to within
+    ``2 ** -(significant_bits - 1)`` (about 1.6% by default) across the whole
+    range with no fixed upper bound. Rendered as a Prometheus summary with
+    the configured quantiles.
+    """
+
+    type_name = "summary"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Sequence[str] = (),
+        quantiles: Sequence[float] = (0.5, 0.9, 0.99),
+        significant_bits: int = 7,
+        resolution: float = 1e-6,
+    ):
+        """
+        Initialize the histogram family.
+
+        Args:
+            name: Metric name
+            help_text: Metric description for ``# HELP``
+            label_names: Names of the label values passed to ``observe``
+            quantiles: Quantiles reported when rendering
+            significant_bits: Bucket precision; relative error is ``2 ** -(bits - 1)``
+            resolution: Smallest distinguishable value in seconds
+        """
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.quantiles = tuple(quantiles)
+        self.bits = significant_bits
+        self.resolution = resolution
+        self._cells = _ThreadCells(dict)
+
+    def observe(self, seconds: float, *label_values: str) -> None:
+        """Record one observation for the given label values."""
+        cell = self._cells.get()
+        series = cell.get(label_values)
+        if series is None:
+            series = cell[label_values] = _HdrCell()
+        index = _bucket_index(max(0, int(seconds / self.resolution)), self.bits)
+        series.counts[index] = series.counts.get(index, 0) + 1
+        series.total += seconds
+        series.count += 1
+
+    def _merged(self) -> Dict[Tuple[str, ...], Tuple[Dict[int, int], float, int]]:
+        merged: Dict[Tuple[str, ...], Tuple[Dict[int, int], float, int]] = {}
+        for cell in self._cells.all():
+            for label_values, series in list(cell.items()):
+                counts, total, count = merged.get(label_values, ({}, 0.0, 0))
+                for index, bucket_count in list(series.counts.items()):
+                    counts[index] = counts.get(index, 0) + bucket_count
+                merged[label_values] = (counts, total + series.total, count + series.count)
+        return merged
+
+    def _quantile(self, counts: Dict[int, int], count: int, q: float) -> float:
+        rank = max(1, int(q * count + 0.5))
+        seen = 0
+        for index in sorted(counts):
+            seen += counts[index]
+            if seen >= rank:
+                low, high = _bucket_bounds(index, self.bits)
+                return (low + high) / 2 * self.resolution
+        return 0.0
+
+    def quantile(self, q: float, *label_values: str) -> Optional[float]:
+        """Get the ``q`` quantile in seconds for ``label_values``, or None without samples."""
+        series = self._merged().get(label_values)
+        if series is None or not series[2]:
+            return None
+        return self._quantile(series[0], series[2], q)
+
+    def render(self) -> List[str]:
+        """Render the family as a Prometheus summary."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+        for label_values, (counts, total, count) in sorted(self._merged().items()):
+            labels = tuple(zip(self.label_names, label_values))
+            for q in self.quantiles:
+                value = self._quantile(counts, count, q)
+                lines.append(f"{self.name}{_format_labels(labels + (('quantile', repr(q)),))} {value:g}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named collection of metric families rendered together for ``/metrics``."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Any) -> Any:
+        """
+        Add a metric family (anything with ``name`` and ``render()``).
+
+        Returns:
+            The metric, or the one already registered under the same name
+            if it is of the same type
+
+        Raises:
+            ValueError: If another type of metric already uses the name
+        """
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is None:
+                self._metrics[metric.name] = metric
+                return metric
+        if type(existing) is not type(metric):
+            raise ValueError(f"Metric {metric.name} is already registered as {type(existing).__name__}")
+        return existing
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        """Get or create a counter family."""
+        return self.register(Counter(name, help_text, label_names))
+
+    def gauge(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge family."""
+        return self.register(Gauge(name, help_text, label_names))
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = (), **kwargs: Any) -> HdrHistogram:
+        """Get or create an HDR histogram family; ``kwargs`` go to ``HdrHistogram``."""
+        return self.register(HdrHistogram(name, help_text, label_names, **kwargs))
+
+    def render(self) -> str:
+        """Render every registered family in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def track_call(calls: Counter, seconds: HdrHistogram, *label_values: str) -> Iterator[None]:
+    """
+    Count the enclosed call by outcome and record its duration.
+
+    ``calls`` gets ``label_values`` plus a trailing status label: ``ok``,
+    ``error``, or ``cancelled`` when the block is cancelled or abandoned.
+
+    Args:
+        calls: Counter whose last label is the status
+        seconds: Histogram labelled with ``label_values``
+        *label_values: Label values shared by both metrics
+    """
+    started = time.perf_counter()
+    status = "error"
+    try:
+        yield
+        status = "ok"
+    except (asyncio.CancelledError, GeneratorExit):
+        status = "cancelled"
+        raise
+    finally:
+        seconds.observe(time.perf_counter() - started, *label_values)
+        calls.inc(*label_values, status)
+
+
+__all__ = [
+    "DEFAULT_LATENCY_BUCKETS",
+    "Counter",
+    "Gauge",
+    "HdrHistogram",
+    "LatencyHistogram",
+    "MetricsRegistry",
+    "TraceMetrics",
+    "track_call",
+]
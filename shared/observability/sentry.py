@@ -3,6 +3,8 @@ import sentry_sdk
 from sentry_sdk.integrations.fastapi import FastApiIntegration
 from typing import Optional
 
+from .tracing import Trace
+
 
 def init_sentry(
     dsn: Optional[str] = None,
@@ -67,4 +69,56 @@ def capture_message(message: str, level: str = "info", **kwargs) -> None:
     sentry_sdk.capture_message(message, level=level, **kwargs)
 
 
-__all__ = ["init_sentry", "capture_exception", "capture_message"]
+def export_trace(trace: Trace) -> None:
+    """
+    Export a request trace as Sentry spans.
+    
+    Spans are attached to the active Sentry span (e.g. the FastAPI request
+    transaction) or, if there is none, to a new ``agent.run`` transaction.
+    Does nothing unless Sentry was initialized with ``init_sentry``. Export
+    errors are logged, never raised, so tracing cannot fail a request.
+    
+    Args:
+        trace: Finished request trace
+    """
+    try:
+        if sentry_sdk.get_client().is_active():
+            _export_spans(trace)
+    except Exception as e:
+        print(f"⚠️  Failed to export trace to Sentry: {e}")
+
+
+def _export_spans(trace: Trace) -> None:
+    spans = sorted(trace.spans, key=lambda span: span.start_ns)
+    parent = sentry_sdk.get_current_span()
+    transaction = None
+    if parent is None:
+        transaction = sentry_sdk.start_transaction(
+            name=trace.root.name,
+            op="agent.run",
+            start_timestamp=trace.wall_time(trace.root.start_ns),
+        )
+        parent = transaction
+    
+    sentry_spans = {}
+    for span in spans:
+        if span.end_ns is None:
+            continue
+        sentry_parent = sentry_spans.get(span.parent_id, parent)
+        child = sentry_parent.start_child(
+            op=f"agent.{span.kind}",
+            name=span.name,
+            start_timestamp=trace.wall_time(span.start_ns),
+        )
+        for key, value in span.attributes.items():
+            child.set_data(key, value)
+        child.set_status("ok" if span.status == "ok" else "internal_error")
+        child.finish(end_timestamp=trace.wall_time(span.end_ns))
+        sentry_spans[span.span_id] = child
+    
+    if transaction is not None:
+        end_ns = trace.root.end_ns
+        transaction.finish(end_timestamp=trace.wall_time(end_ns) if end_ns is not None else None)
+
+
+__all__ = ["init_sentry", "capture_exception", "capture_message", "export_trace"]
@@ -0,0 +1,264 @@
+"""Per-request structured tracing: spans for graph nodes, LLM calls and tool calls."""
+import contextvars
+import itertools
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+@dataclass
+class Span:
+    """One timed operation within a trace; times are ``perf_counter_ns`` values."""
+
+    span_id: int
+    name: str
+    kind: str  # request, node, llm, tool
+    start_ns: int
+    end_ns: Optional[int] = None
+    parent_id: Optional[int] = None
+    status: str = "ok"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ns(self) -> Optional[int]:
+        """Span duration in nanoseconds, or None while the span is open."""
+        return None if self.end_ns is None else self.end_ns - self.start_ns
+
+    def to_dict(self, origin_ns: int) -> Dict[str, Any]:
+        """Convert the span to a dictionary with times in milliseconds relative to ``origin_ns``."""
+        duration_ns = self.duration_ns
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ms": (self.start_ns - origin_ns) / 1e6,
+            "duration_ms": None if duration_ns is None else duration_ns / 1e6,
+            "status": self.status,
+            "attributes": dict(self.attributes),
+        }
+
+
+class Trace:
+    """Spans recorded for one request."""
+
+    def __init__(self, name: str):
+        """Start a trace whose root ``request`` span is named ``name``."""
+        self.trace_id = uuid.uuid4().hex
+        self.origin_ns = time.perf_counter_ns()
+        self.wall_start = time.time()
+        self.spans: List[Span] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.root = self.start_span(name, "request")
+
+    def start_span(self, name: str, kind: str, parent_id: Optional[int] = None, **attributes: Any) -> Span:
+        """Open a span; ``parent_id`` defaults to the root span."""
+        if parent_id is None and self.spans:
+            parent_id = self.root.span_id
+        with self._lock:
+            span = Span(
+                span_id=next(self._ids),
+                name=name,
+                kind=kind,
+                start_ns=time.perf_counter_ns(),
+                parent_id=parent_id,
+                attributes=attributes,
+            )
+            self.spans.append(span)
+        return span
+
+    def end_span(self, span: Span, status: str = "ok", **attributes: Any) -> None:
+        """Close a span, recording its status and any final attributes."""
+        span.end_ns = time.perf_counter_ns()
+        span.status = status
+        span.attributes.update(attributes)
+
+    def add_span(
+        self,
+        name: str,
+        kind: str,
+        start_ns: int,
+        end_ns: int,
+        status: str = "ok",
+        parent_id: Optional[int] = None,
+        **attributes: Any,
+    ) -> Span:
+        """Record an already finished span; ``parent_id`` defaults to the open node span."""
+        if parent_id is None:
+            parent_id = self.open_node_id()
+        span = self.start_span(name, kind, parent_id=parent_id, **attributes)
+        span.start_ns, span.end_ns, span.status = start_ns, end_ns, status
+        return span
+
+    def open_node_id(self) -> Optional[int]:
+        """Get the ID of the most recently opened node span that is still running."""
+        with self._lock:
+            for span in reversed(self.spans):
+                if span.kind == "node" and span.end_ns is None:
+                    return span.span_id
+        return None
+
+    def wall_time(self, perf_ns: int) -> datetime:
+        """Convert a ``perf_counter_ns`` value of this trace to a wall-clock datetime."""
+        return datetime.fromtimestamp(self.wall_start + (perf_ns - self.origin_ns) / 1e9, tz=timezone.utc)
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Get every span as a dictionary, in start order."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start_ns)
+        return [span.to_dict(self.origin_ns) for span in spans]
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    """Get the trace of the request being handled, if any."""
+    return _current_trace.get()
+
+
+@contextmanager
+def trace_request(name: str) -> Iterator[Trace]:
+    """
+    Trace the enclosed block as one request.
+
+    Code running in the block (including tasks it starts) can record spans
+    through ``current_trace()``.
+
+    Args:
+        name: Name of the root span
+
+    Yields:
+        The Trace; its root span is closed when the block exits
+    """
+    trace = Trace(name)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    except BaseException:
+        trace.end_span(trace.root, status="error")
+        raise
+    else:
+        trace.end_span(trace.root)
+    finally:
+        _current_trace.reset(token)
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """
+    LangChain callback handler that records graph node and LLM spans into a Trace.
+
+    Pass it in the run config (``{"callbacks": [handler]}``) of a compiled
+    LangGraph graph. Direct children of the graph run become ``node`` spans;
+    chat model runs become ``llm`` spans with input/output token counts and
+    time to first token (when streaming).
+    """
+
+    # Timestamps are taken on the calling thread, not in an executor
+    run_inline = True
+
+    def __init__(self, trace: Trace):
+        """Initialize the handler for one trace."""
+        self.trace = trace
+        self._root_run: Optional[UUID] = None
+        self._parents: Dict[UUID, Optional[UUID]] = {}
+        self._spans: Dict[UUID, Span] = {}
+
+    def _parent_span_id(self, parent_run_id: Optional[UUID]) -> Optional[int]:
+        run_id = parent_run_id
+        while run_id is not None:
+            if run_id in self._spans:
+                return self._spans[run_id].span_id
+            run_id = self._parents.get(run_id)
+        return None
+
+    def _end(self, run_id: UUID, status: str = "ok", **attributes: Any) -> None:
+        span = self._spans.pop(run_id, None)
+        if span is not None:
+            self.trace.end_span(span, status=status, **attributes)
+
+    def on_chain_start(
+        self,
+        serialized: Dict[str, Any],
+        inputs: Dict[str, Any],
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        self._parents[run_id] = parent_run_id
+        if parent_run_id is None:
+            self._root_run = run_id
+        elif parent_run_id == self._root_run:
+            node = (metadata or {}).get("langgraph_node") or kwargs.get("name") or "chain"
+            self._spans[run_id] = self.trace.start_span(node, "node")
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, status="error", error=type(error).__name__)
+
+    def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any],
+        messages: List[List[Any]],
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        self._parents[run_id] = parent_run_id
+        model = (metadata or {}).get("ls_model_name") or kwargs.get("name") or "llm"
+        self._spans[run_id] = self.trace.start_span(
+            model,
+            "llm",
+            parent_id=self._parent_span_id(parent_run_id),
+            input_messages=sum(len(batch) for batch in messages),
+        )
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        span = self._spans.get(run_id)
+        if span is not None and "time_to_first_token_ms" not in span.attributes:
+            span.attributes["time_to_first_token_ms"] = (time.perf_counter_ns() - span.start_ns) / 1e6
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        usage: Dict[str, Any] = {}
+        for generations in response.generations:
+            for generation in generations:
+                message_usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if message_usage:
+                    usage = message_usage
+        self._end(
+            run_id,
+            input_tokens=usage.get("input_tokens"),
+            output_tokens=usage.get("output_tokens"),
+        )
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, status="error", error=type(error).__name__)
+
+    def on_tool_start(
+        self,
+        serialized: Dict[str, Any],
+        input_str: str,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        **kwargs: Any,
+    ) -> None:
+        # Tool spans are recorded by the ToolExecutor, which also knows queueing time
+        self._parents[run_id] = parent_run_id
+
+
+__all__ = ["Span", "Trace", "TracingCallbackHandler", "current_trace", "trace_request"]
@@ -0,0 +1,32 @@
+"""Retrieval engines for RAG agents."""
+from .embedding_cache import CachedEmbeddings, EmbeddingCache
+from .hybrid import FusedHit, HybridRetriever, HybridSearchResult, normalized_score_fusion, reciprocal_rank_fusion
+from .index import ExactIndex, build_flat_index, faiss_available, load_index, save_index
+from .keyword import BM25Index, KeywordRetriever
+from .multi_query import BatchedMultiQueryRetriever, MultiQueryResult, fuse_query_hits
+from .sharded import SearchHit, ShardedRetriever, ShardedSearchResult, VectorShard, merge_top_k
+
+__all__ = [
+    "BatchedMultiQueryRetriever",
+    "BM25Index",
+    "CachedEmbeddings",
+    "EmbeddingCache",
+    "ExactIndex",
+    "FusedHit",
+    "HybridRetriever",
+    "HybridSearchResult",
+    "KeywordRetriever",
+    "MultiQueryResult",
+    "SearchHit",
+    "ShardedRetriever",
+    "ShardedSearchResult",
+    "VectorShard",
+    "build_flat_index",
+    "faiss_available",
+    "fuse_query_hits",
+    "load_index",
+    "merge_top_k",
+    "normalized_score_fusion",
+    "reciprocal_rank_fusion",
+    "save_index",
+]
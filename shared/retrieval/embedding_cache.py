@@ -0,0 +1,241 @@
+"""Persistent embedding cache: content-hash keyed vectors in an append-only memory-mapped file."""
+import fcntl
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+_KEY_BYTES = 32  # sha256 digest
+_DTYPES = ("float32", "float16")
+
+
+class EmbeddingCache:
+    """
+    Embedding vectors stored on local disk, keyed by content hash.
+
+    Vectors are rows of a raw ``float32`` or ``float16`` file that is
+    memory-mapped, so opening the cache reads only the keys and lookups
+    touch only the pages they need; processes on one host share those pages
+    through the OS page cache. Keys are appended to a second file in row
+    order. Appends take an exclusive file lock, so several processes can
+    share one directory, and a row is only visible once both its vector and
+    key are complete, so a crash mid-append loses just that append.
+    """
+
+    def __init__(self, directory: str, dtype: str = "float32"):
+        """
+        Open or create the cache in ``directory``.
+
+        Args:
+            directory: Cache directory
+            dtype: ``float32``, or ``float16`` for half the disk and page cache at slightly lower precision
+
+        Raises:
+            ValueError: If the directory holds a cache with another dtype
+        """
+        if dtype not in _DTYPES:
+            raise ValueError(f"Unsupported embedding cache dtype: {dtype}")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.dtype = np.dtype(dtype)
+        self.dim: Optional[int] = None
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._keys_path = os.path.join(directory, "keys.bin")
+        self._vectors_path = os.path.join(directory, f"vectors.{dtype}")
+        self._lock_path = os.path.join(directory, ".lock")
+        self._rows: Dict[bytes, int] = {}
+        self._row_count = 0
+        self._vectors = np.empty((0, 0), dtype=self.dtype)
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_meta(self) -> None:
+        if self.dim is not None or not os.path.exists(self._meta_path):
+            return
+        with open(self._meta_path) as f:
+            meta = json.load(f)
+        if meta["dtype"] != self.dtype.name:
+            raise ValueError(f"Embedding cache in {self.directory} stores {meta['dtype']}, not {self.dtype.name}")
+        self.dim = meta["dim"]
+
+    def _complete_rows(self) -> int:
+        if self.dim is None or not os.path.exists(self._keys_path):
+            return 0
+        row_bytes = self.dim * self.dtype.itemsize
+        vector_bytes = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        return min(os.path.getsize(self._keys_path) // _KEY_BYTES, vector_bytes // row_bytes)
+
+    def refresh(self) -> None:
+        """Pick up rows appended by other processes since the cache was opened."""
+        with self._lock:
+            self._read_meta()
+            rows = self._complete_rows()
+            if rows <= self._row_count:
+                return
+            with open(self._keys_path, "rb") as f:
+                f.seek(self._row_count * _KEY_BYTES)
+                new_keys = f.read((rows - self._row_count) * _KEY_BYTES)
+            for row, offset in enumerate(range(0, len(new_keys), _KEY_BYTES), start=self._row_count):
+                self._rows.setdefault(new_keys[offset:offset + _KEY_BYTES], row)
+            self._row_count = rows
+            self._vectors = np.memmap(self._vectors_path, dtype=self.dtype, mode="r", shape=(rows, self.dim))
+
+    def lookup(self, keys: Sequence[bytes]) -> List[Optional[int]]:
+        """Row of each key, or None if it is not cached."""
+        return [self._rows.get(key) for key in keys]
+
+    def get(self, rows: Sequence[int]) -> np.ndarray:
+        """The vectors at ``rows`` as a float32 matrix."""
+        return np.asarray(self._vectors[list(rows)], dtype=np.float32)
+
+    def put(self, keys: Sequence[bytes], vectors: Any) -> None:
+        """
+        Append vectors for keys not cached yet.
+
+        Args:
+            keys: Content hashes, one per vector
+            vectors: Matrix with one row per key
+        """
+        matrix = np.asarray(vectors, dtype=self.dtype)
+        with self._file_lock():
+            self._read_meta()
+            if self.dim is None:
+                self.dim = matrix.shape[1]
+                with open(self._meta_path, "w") as f:
+                    json.dump({"dim": self.dim, "dtype": self.dtype.name}, f)
+            elif matrix.shape[1] != self.dim:
+                raise ValueError(f"Expected vectors of dimension {self.dim}, got {matrix.shape[1]}")
+            # Another process may have added some of these meanwhile
+            self.refresh()
+            fresh = {}
+            for position, key in enumerate(keys):
+                if key not in self._rows and key not in fresh:
+                    fresh[key] = position
+            if not fresh:
+                return
+
+            rows = self._complete_rows()
+            row_bytes = self.dim * self.dtype.itemsize
+            # Drop any torn tail so new rows line up with their keys
+            for path, size in ((self._vectors_path, rows * row_bytes), (self._keys_path, rows * _KEY_BYTES)):
+                with open(path, "ab") as f:
+                    f.truncate(size)
+            # Vectors first: a key never points past the end of the vector file
+            with open(self._vectors_path, "ab") as f:
+                f.write(np.ascontiguousarray(matrix[list(fresh.values())]).tobytes())
+            with open(self._keys_path, "ab") as f:
+                f.write(b"".join(fresh))
+            self.refresh()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cached vector count, dimension and dtype."""
+        return {"entries": len(self._rows), "dim": self.dim, "dtype": self.dtype.name}
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings model wrapper that only embeds documents it has not seen.
+
+    ``embed_documents`` hashes each text (with the model ``namespace``),
+    serves cached vectors from the EmbeddingCache and sends the misses to
+    the wrapped model in one batch, so a restart re-embeds nothing and an
+    update re-embeds only new or changed documents. Queries are embedded
+    directly since they rarely repeat.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache, namespace: Optional[str] = None):
+        """
+        Wrap ``embeddings``.
+
+        Args:
+            embeddings: Model computing the vectors
+            cache: Where vectors are stored
+            namespace: Identifies the model in cache keys (default: its ``model_name`` or ``model``
+                attribute), so models sharing a directory never serve each other's vectors
+        """
+        self.embeddings = embeddings
+        self.cache = cache
+        if namespace is None:
+            namespace = getattr(embeddings, "model_name", None) or getattr(embeddings, "model", None) or type(embeddings).__name__
+        self.namespace = str(namespace)
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, config: Any, embeddings: Embeddings, namespace: Optional[str] = None) -> "CachedEmbeddings":
+        """
+        Wrap ``embeddings`` with the cache configured in a BaseConfig.
+
+        Args:
+            config: Configuration object with ``retrieval_embedding_cache_*`` settings
+            embeddings: Model computing the vectors
+            namespace: See ``__init__``
+
+        Returns:
+            CachedEmbeddings
+        """
+        cache = EmbeddingCache(config.retrieval_embedding_cache_dir, dtype=config.retrieval_embedding_cache_dtype)
+        return cls(embeddings, cache, namespace)
+
+    def key(self, text: str) -> bytes:
+        """Content hash of ``text`` for this model."""
+        return hashlib.sha256(f"{self.namespace}\0{text}".encode()).digest()
+
+    def embed_matrix(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embed ``texts`` through the cache.
+
+        Returns:
+            float32 matrix with one row per text
+        """
+        keys = [self.key(text) for text in texts]
+        rows = self.cache.lookup(keys)
+        if None in rows:
+            # Another process may have embedded them already
+            self.cache.refresh()
+            rows = self.cache.lookup(keys)
+
+        missing: Dict[bytes, str] = {}
+        for key, text, row in zip(keys, texts, rows):
+            if row is None:
+                missing.setdefault(key, text)
+        self.misses += len(missing)
+        self.hits += len(texts) - sum(row is None for row in rows)
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            self.cache.put(list(missing), vectors)
+            rows = self.cache.lookup(keys)
+        return self.cache.get(rows) if texts else np.empty((0, self.cache.dim or 0), dtype=np.float32)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_matrix(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache hits and misses (texts embedded) since creation, and the cache size."""
+        return {"hits": self.hits, "misses": self.misses, **self.cache.get_stats()}
+
+
+__all__ = [
+    "CachedEmbeddings",
+    "EmbeddingCache",
+]
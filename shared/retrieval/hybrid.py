@@ -0,0 +1,310 @@
+"""Hybrid retrieval: dense and sparse legs searched concurrently under a deadline and fused into one ranking."""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStoreRetriever
+from pydantic import ConfigDict, PrivateAttr
+
+from .keyword import KeywordRetriever
+from .sharded import ShardedRetriever
+
+ScoredDocuments = List[Tuple[Document, float]]
+
+
+def document_key(document: Document, by_id: bool = True) -> str:
+    """Identity used to recognize the same document across legs: its id if ``by_id`` and it has one, else its text."""
+    return (document.id if by_id else None) or document.page_content
+
+
+def _all_have_ids(rankings: Dict[str, ScoredDocuments]) -> bool:
+    # Mixing id and text keys would stop matching a document one leg returns without its id
+    return all(document.id for ranking in rankings.values() for document, _ in ranking)
+
+
+@dataclass
+class FusedHit:
+    """A fused result: the document, its fused score and its rank (0-based) in each leg that found it."""
+
+    document: Document
+    score: float
+    ranks: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class HybridSearchResult:
+    """Fused top-k hits of one query and how each leg fared."""
+
+    hits: List[FusedHit]
+    leg_seconds: Dict[str, float] = field(default_factory=dict)
+    timed_out: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def documents(self) -> List[Document]:
+        return [hit.document for hit in self.hits]
+
+
+def reciprocal_rank_fusion(
+    rankings: Dict[str, ScoredDocuments], weights: Optional[Dict[str, float]] = None, k: int = 60
+) -> List[FusedHit]:
+    """
+    Fuse rankings with weighted reciprocal rank fusion.
+
+    A document scores ``sum(weight / (k + rank + 1))`` over the legs that
+    returned it, so agreement between legs counts and raw scores on
+    different scales never have to be compared. Documents are matched by
+    id when every returned document has one, else by text.
+
+    Args:
+        rankings: Leg name to its (document, score) list, best first
+        weights: Leg name to weight (default 1.0)
+        k: Rank damping constant; larger values flatten the contribution of top ranks
+
+    Returns:
+        Fused hits, best first
+    """
+    weights = weights or {}
+    by_id = _all_have_ids(rankings)
+    fused: Dict[str, FusedHit] = {}
+    for leg, ranking in rankings.items():
+        weight = weights.get(leg, 1.0)
+        for rank, (document, _) in enumerate(ranking):
+            hit = fused.setdefault(document_key(document, by_id), FusedHit(document, 0.0))
+            if leg not in hit.ranks:
+                hit.ranks[leg] = rank
+                hit.score += weight / (k + rank + 1)
+    return sorted(fused.values(), key=lambda hit: hit.score, reverse=True)
+
+
+def normalized_score_fusion(rankings: Dict[str, ScoredDocuments], weights: Optional[Dict[str, float]] = None) -> List[FusedHit]:
+    """
+    Fuse rankings by weighted sum of min-max normalized scores.
+
+    Each leg's scores are scaled to [0, 1] (all 1.0 if they are equal), so a
+    strong dense match and a strong keyword match weigh the same.
+
+    Args:
+        rankings: Leg name to its (document, score) list, best first
+        weights: Leg name to weight (default 1.0)
+
+    Returns:
+        Fused hits, best first
+    """
+    weights = weights or {}
+    by_id = _all_have_ids(rankings)
+    fused: Dict[str, FusedHit] = {}
+    for leg, ranking in rankings.items():
+        if not ranking:
+            continue
+        scores = [score for _, score in ranking]
+        low, span = min(scores), max(scores) - min(scores)
+        weight = weights.get(leg, 1.0)
+        for rank, (document, score) in enumerate(ranking):
+            hit = fused.setdefault(document_key(document, by_id), FusedHit(document, 0.0))
+            if leg not in hit.ranks:
+                hit.ranks[leg] = rank
+                hit.score += weight * ((score - low) / span if span else 1.0)
+    return sorted(fused.values(), key=lambda hit: hit.score, reverse=True)
+
+
+def scored_search(retriever: BaseRetriever, query: str) -> ScoredDocuments:
+    """
+    Run one retriever and return its documents with scores, best first.
+
+    Uses the retriever's own scores where it exposes them; other retrievers
+    get a descending rank-based score.
+    """
+    if isinstance(retriever, ShardedRetriever):
+        return [(hit.document, hit.score) for hit in retriever.search(query).hits]
+    if isinstance(retriever, KeywordRetriever):
+        return retriever.index.search(query, retriever.k)
+    if isinstance(retriever, VectorStoreRetriever) and retriever.search_type == "similarity":
+        k = retriever.search_kwargs.get("k", 4)
+        return retriever.vectorstore.similarity_search_with_relevance_scores(query, k)
+    documents = retriever.invoke(query)
+    return [(document, float(len(documents) - rank)) for rank, document in enumerate(documents)]
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Retriever fusing several legs (typically dense vector and sparse keyword search).
+
+    All legs start together, on a thread pool for ``invoke`` and as threads
+    under asyncio for ``ainvoke``, and the query waits for them until
+    ``timeout`` seconds. A leg that misses the deadline or fails is left out
+    and the answer comes from the legs that finished. Results are fused with
+    weighted reciprocal rank fusion (``rrf``) or normalized scores
+    (``score``) into one ranking of ``k`` documents; ``search`` also reports
+    each leg's latency.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    retrievers: Dict[str, BaseRetriever]
+    weights: Dict[str, float] = {}
+    k: int = 4
+    fusion: str = "rrf"
+    rrf_k: int = 60
+    timeout: Optional[float] = None
+
+    _executor: Optional[ThreadPoolExecutor] = PrivateAttr(default=None)
+    _executor_lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _stats: Dict[str, Any] = PrivateAttr(default_factory=lambda: {"queries": 0, "timed_out": {}, "failed": {}})
+
+    def model_post_init(self, __context: Any) -> None:
+        if not self.retrievers:
+            raise ValueError("At least one retriever is required")
+        if self.fusion not in ("rrf", "score"):
+            raise ValueError(f"Unsupported fusion: {self.fusion}")
+
+    @classmethod
+    def from_config(
+        cls, config: Any, retrievers: Dict[str, BaseRetriever], weights: Optional[Dict[str, float]] = None
+    ) -> "HybridRetriever":
+        """
+        Create a retriever from a BaseConfig.
+
+        Args:
+            config: Configuration object with ``retrieval_*`` settings
+            retrievers: Leg name to retriever
+            weights: Leg name to fusion weight (default 1.0 each)
+
+        Returns:
+            Configured HybridRetriever
+        """
+        return cls(
+            retrievers=retrievers,
+            weights=weights or {},
+            k=config.retrieval_k,
+            fusion=config.retrieval_fusion,
+            rrf_k=config.retrieval_rrf_k,
+            timeout=config.retrieval_hybrid_timeout,
+        )
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                # Headroom so a leg still running past its deadline does not delay the next query
+                self._executor = ThreadPoolExecutor(max_workers=2 * len(self.retrievers), thread_name_prefix="hybrid-leg")
+            return self._executor
+
+    def close(self) -> None:
+        """Shut down the leg search threads."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    @staticmethod
+    def _timed_leg(retriever: BaseRetriever, query: str) -> Tuple[ScoredDocuments, float]:
+        started = time.perf_counter()
+        ranking = scored_search(retriever, query)
+        return ranking, time.perf_counter() - started
+
+    def _fuse(self, result: HybridSearchResult, rankings: Dict[str, ScoredDocuments], k: int) -> HybridSearchResult:
+        if self.fusion == "rrf":
+            fused = reciprocal_rank_fusion(rankings, self.weights, self.rrf_k)
+        else:
+            fused = normalized_score_fusion(rankings, self.weights)
+        result.hits = fused[:k]
+
+        self._stats["queries"] += 1
+        for leg in result.timed_out:
+            self._stats["timed_out"][leg] = self._stats["timed_out"].get(leg, 0) + 1
+        for leg in result.failed:
+            self._stats["failed"][leg] = self._stats["failed"].get(leg, 0) + 1
+        if not rankings:
+            print(f"⚠️  No retrieval leg answered: timed out {result.timed_out}, failed {list(result.failed)}")
+        return result
+
+    def _record_leg(self, result: HybridSearchResult, rankings: Dict[str, ScoredDocuments], leg: str, outcome: Any) -> None:
+        ranking, seconds = outcome
+        rankings[leg] = ranking
+        result.leg_seconds[leg] = seconds
+
+    def _record_failure(self, result: HybridSearchResult, leg: str, error: BaseException) -> None:
+        print(f"⚠️  Retrieval leg {leg} failed: {error}")
+        result.failed[leg] = str(error)
+
+    def search(self, query: str, k: Optional[int] = None) -> HybridSearchResult:
+        """
+        Search all legs concurrently and fuse what finishes before the deadline.
+
+        Args:
+            query: Query text
+            k: Number of fused hits (default: ``self.k``)
+
+        Returns:
+            HybridSearchResult with the fused hits and per-leg latency and failures
+        """
+        executor = self._get_executor()
+        futures = {executor.submit(self._timed_leg, retriever, query): leg for leg, retriever in self.retrievers.items()}
+        done, _ = wait(futures, timeout=self.timeout)
+
+        result = HybridSearchResult(hits=[])
+        rankings: Dict[str, ScoredDocuments] = {}
+        for future, leg in futures.items():
+            if future not in done:
+                # A leg already running cannot be interrupted; its result is discarded
+                future.cancel()
+                result.timed_out.append(leg)
+            elif future.exception() is not None:
+                self._record_failure(result, leg, future.exception())
+            else:
+                self._record_leg(result, rankings, leg, future.result())
+        return self._fuse(result, rankings, k or self.k)
+
+    async def asearch(self, query: str, k: Optional[int] = None) -> HybridSearchResult:
+        """Async ``search``: legs run in threads so the event loop stays free."""
+        tasks = {
+            asyncio.ensure_future(asyncio.to_thread(self._timed_leg, retriever, query)): leg
+            for leg, retriever in self.retrievers.items()
+        }
+        done, pending = await asyncio.wait(tasks, timeout=self.timeout)
+        for task in pending:
+            task.cancel()
+
+        result = HybridSearchResult(hits=[])
+        rankings: Dict[str, ScoredDocuments] = {}
+        for task, leg in tasks.items():
+            if task not in done:
+                result.timed_out.append(leg)
+            elif task.exception() is not None:
+                self._record_failure(result, leg, task.exception())
+            else:
+                self._record_leg(result, rankings, leg, task.result())
+        return self._fuse(result, rankings, k or self.k)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self.search(query).documents
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return (await self.asearch(query)).documents
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Query count and per-leg timeout and failure counts."""
+        return {
+            "queries": self._stats["queries"],
+            "timed_out": dict(self._stats["timed_out"]),
+            "failed": dict(self._stats["failed"]),
+        }
+
+
+__all__ = [
+    "FusedHit",
+    "HybridRetriever",
+    "HybridSearchResult",
+    "document_key",
+    "normalized_score_fusion",
+    "reciprocal_rank_fusion",
+    "scored_search",
+]
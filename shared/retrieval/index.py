@@ -0,0 +1,225 @@
+"""Flat vector indexes with the FAISS search interface, backed by FAISS when it is installed."""
+import json
+import os
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+# FAISS metric ids, so indexes can be inspected without importing faiss
+METRIC_INNER_PRODUCT = 0
+METRIC_L2 = 1
+
+_METRICS = {"ip": METRIC_INNER_PRODUCT, "l2": METRIC_L2}
+
+
+def _import_faiss():
+    try:
+        import faiss
+    except ImportError:
+        raise ImportError("faiss is required for FAISS indexes. Install with: pip install faiss-cpu")
+    return faiss
+
+
+def faiss_available() -> bool:
+    """Whether the faiss package can be imported."""
+    try:
+        _import_faiss()
+    except ImportError:
+        return False
+    return True
+
+
+def as_matrix(vectors) -> np.ndarray:
+    """Return ``vectors`` as a C-contiguous float32 matrix, one row per vector."""
+    matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+    return matrix.reshape(1, -1) if matrix.ndim == 1 else matrix
+
+
+def normalize(vectors) -> np.ndarray:
+    """L2-normalize each row, leaving zero rows unchanged."""
+    matrix = as_matrix(vectors)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def top_k(scores: np.ndarray, k: int, higher_is_better: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Select the best ``k`` entries of each row of ``scores``, best first.
+
+    Uses ``argpartition`` so only the selected entries are sorted. Rows with
+    fewer than ``k`` entries are padded with id -1, as FAISS does.
+
+    Returns:
+        (selected scores, selected column ids), each of shape (rows, k)
+    """
+    scores = np.atleast_2d(scores)
+    rows, columns = scores.shape
+    keyed = -scores if higher_is_better else scores
+    take = min(k, columns)
+    if take == 0:
+        ids = np.empty((rows, 0), dtype=np.int64)
+    elif take < columns:
+        ids = np.argpartition(keyed, take - 1, axis=1)[:, :take]
+    else:
+        ids = np.tile(np.arange(columns), (rows, 1))
+    order = np.argsort(np.take_along_axis(keyed, ids, axis=1), axis=1, kind="stable")
+    ids = np.take_along_axis(ids, order, axis=1).astype(np.int64)
+    selected = np.take_along_axis(scores, ids, axis=1)
+    if take < k:
+        pad = np.full((rows, k - take), -np.inf if higher_is_better else np.inf, dtype=scores.dtype)
+        selected = np.hstack([selected, pad])
+        ids = np.hstack([ids, np.full((rows, k - take), -1, dtype=np.int64)])
+    return selected, ids
+
+
+class ExactIndex:
+    """
+    Brute-force flat index in NumPy with the FAISS ``Index`` interface.
+
+    Exact like ``IndexFlatIP``/``IndexFlatL2`` and fine for shards of up to a
+    few hundred thousand vectors; the matrix product runs in BLAS without
+    holding the GIL, so shards can be searched from threads concurrently.
+    """
+
+    def __init__(self, d: int, metric: str = "ip", vectors: Optional[np.ndarray] = None):
+        """
+        Create an index, empty unless ``vectors`` are given.
+
+        Args:
+            d: Vector dimension
+            metric: ``ip`` (inner product, higher is better) or ``l2`` (squared distance, lower is better)
+            vectors: Initial (n, d) float32 matrix, used as is (it may be memory-mapped)
+        """
+        if metric not in _METRICS:
+            raise ValueError(f"Unsupported metric: {metric}")
+        self.d = d
+        self.metric_type = _METRICS[metric]
+        self._vectors = vectors if vectors is not None else np.empty((0, d), dtype=np.float32)
+        self._norms: Optional[np.ndarray] = None
+
+    @property
+    def metric(self) -> str:
+        return "ip" if self.metric_type == METRIC_INNER_PRODUCT else "l2"
+
+    @property
+    def ntotal(self) -> int:
+        """Number of indexed vectors."""
+        return len(self._vectors)
+
+    def add(self, vectors) -> None:
+        """Append vectors; they get the next sequential ids."""
+        matrix = as_matrix(vectors)
+        if matrix.shape[1] != self.d:
+            raise ValueError(f"Expected vectors of dimension {self.d}, got {matrix.shape[1]}")
+        self._vectors = np.vstack([self._vectors, matrix]) if self.ntotal else matrix.copy()
+        self._norms = None
+
+    def reconstruct_n(self, start: int, n: int) -> np.ndarray:
+        """Return the stored vectors ``start`` to ``start + n``."""
+        return self._vectors[start:start + n].copy()
+
+    def search(self, queries, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the ``k`` nearest vectors of each query.
+
+        Returns:
+            (scores or squared distances, ids), each of shape (queries, k), best first
+        """
+        matrix = as_matrix(queries)
+        products = matrix @ self._vectors.T
+        if self.metric_type == METRIC_INNER_PRODUCT:
+            return top_k(products, k, higher_is_better=True)
+        if self._norms is None:
+            self._norms = np.einsum("ij,ij->i", self._vectors, self._vectors)
+        distances = self._norms[None, :] - 2 * products + np.einsum("ij,ij->i", matrix, matrix)[:, None]
+        return top_k(distances, k, higher_is_better=False)
+
+
+def build_flat_index(vectors, metric: str = "ip", backend: str = "auto"):
+    """
+    Build an exact index over ``vectors``.
+
+    Args:
+        vectors: Matrix with one row per vector
+        metric: ``ip`` or ``l2``
+        backend: ``faiss``, ``numpy`` (ExactIndex), or ``auto`` (faiss when installed)
+
+    Returns:
+        A FAISS index or ExactIndex containing the vectors with ids 0..n-1
+    """
+    if metric not in _METRICS:
+        raise ValueError(f"Unsupported metric: {metric}")
+    matrix = as_matrix(vectors)
+    if backend == "auto":
+        backend = "faiss" if faiss_available() else "numpy"
+
+    if backend == "faiss":
+        faiss = _import_faiss()
+        index = faiss.IndexFlatIP(matrix.shape[1]) if metric == "ip" else faiss.IndexFlatL2(matrix.shape[1])
+    elif backend == "numpy":
+        index = ExactIndex(matrix.shape[1], metric)
+    else:
+        raise ValueError(f"Unsupported index backend: {backend}")
+    index.add(matrix)
+    return index
+
+
+def _meta_path(path: str) -> str:
+    return path + ".meta.json"
+
+
+def save_index(index: Any, path: str) -> None:
+    """
+    Write a FAISS index or ExactIndex to ``path`` so ``load_index`` can memory-map it.
+
+    A FAISS index is written with ``faiss.write_index``; an ExactIndex as a
+    ``.npy`` matrix. A small ``<path>.meta.json`` records which.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if isinstance(index, ExactIndex):
+        with open(path, "wb") as f:
+            np.save(f, np.ascontiguousarray(index.reconstruct_n(0, index.ntotal)))
+        meta = {"type": "exact", "metric": index.metric}
+    else:
+        _import_faiss().write_index(index, path)
+        meta = {"type": "faiss"}
+    with open(_meta_path(path), "w") as f:
+        json.dump(meta, f)
+
+
+def load_index(path: str, mmap: bool = True):
+    """
+    Load an index written by ``save_index``.
+
+    With ``mmap`` the vectors are mapped rather than read: loading is
+    near-instant whatever the index size, pages are read on first search,
+    and processes loading the same file share them through the OS page
+    cache. A memory-mapped FAISS index is read-only.
+
+    Returns:
+        A FAISS index or ExactIndex
+    """
+    with open(_meta_path(path)) as f:
+        meta = json.load(f)
+    if meta["type"] == "exact":
+        vectors = np.load(path, mmap_mode="r" if mmap else None)
+        return ExactIndex(vectors.shape[1], meta["metric"], vectors=vectors)
+    if meta["type"] == "faiss":
+        faiss = _import_faiss()
+        flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if mmap else 0
+        return faiss.read_index(path, flags)
+    raise ValueError(f"Unsupported index type: {meta['type']}")
+
+
+__all__ = [
+    "ExactIndex",
+    "METRIC_INNER_PRODUCT",
+    "METRIC_L2",
+    "as_matrix",
+    "build_flat_index",
+    "faiss_available",
+    "load_index",
+    "normalize",
+    "save_index",
+    "top_k",
+]
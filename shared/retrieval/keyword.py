@@ -0,0 +1,278 @@
+"""Keyword retrieval: a BM25 inverted index with incremental adds, batched queries and on-disk persistence."""
+import json
+import math
+import os
+import re
+import threading
+from array import array
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict
+
+from .index import top_k
+
+_TOKEN = re.compile(r"\w+")
+_FORMAT_VERSION = 1
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; product codes like ``ERR-502`` become ``err`` and ``502``."""
+    return _TOKEN.findall(text.lower())
+
+
+class BM25Index:
+    """
+    Inverted index scoring documents with Okapi BM25.
+
+    Each term has a posting list of (document id, term frequency). A query
+    touches only the posting lists of its own terms, so it never re-reads
+    the corpus; the best ``k`` are picked with ``argpartition``. Postings
+    loaded from disk live in flat CSR arrays (memory-mapped by default), and
+    documents added afterwards go to per-term append buffers that ``save``
+    folds back in. Searches may run from several threads; adds are
+    serialized.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, tokenizer: Optional[Callable[[str], List[str]]] = None):
+        """
+        Create an empty index.
+
+        Args:
+            k1: Term frequency saturation
+            b: Document length normalization (0 disables it)
+            tokenizer: Function splitting text into terms (default: ``tokenize``)
+        """
+        self.k1 = k1
+        self.b = b
+        self.tokenizer = tokenizer or tokenize
+        self.vocabulary: Dict[str, int] = {}
+        self.documents: List[Document] = []
+        self._doc_lengths = np.empty(0, dtype=np.int32)
+        self._total_length = 0
+        # Postings from the last save/load: term t's entries are _ids[_offsets[t]:_offsets[t + 1]]
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._ids = np.empty(0, dtype=np.int32)
+        self._tfs = np.empty(0, dtype=np.int32)
+        # Postings added since, by term id
+        self._added: Dict[int, Tuple[array, array]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Document], **kwargs: Any) -> "BM25Index":
+        """Build an index over ``documents``; keyword arguments go to the constructor."""
+        index = cls(**kwargs)
+        index.add_documents(documents)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add_documents(self, documents: Iterable[Document]) -> List[int]:
+        """
+        Index more documents without touching existing postings.
+
+        Returns:
+            The new documents' ids
+        """
+        # Tokenize outside the lock; only the postings update is serialized
+        counted = [(document, Counter(self.tokenizer(document.page_content))) for document in documents]
+        with self._lock:
+            first = len(self.documents)
+            lengths = []
+            for doc_id, (document, counts) in enumerate(counted, start=first):
+                for term, tf in counts.items():
+                    term_id = self.vocabulary.setdefault(term, len(self.vocabulary))
+                    postings = self._added.get(term_id)
+                    if postings is None:
+                        postings = self._added[term_id] = (array("i"), array("i"))
+                    postings[0].append(doc_id)
+                    postings[1].append(tf)
+                lengths.append(sum(counts.values()))
+                self.documents.append(document)
+            self._doc_lengths = np.concatenate([self._doc_lengths, np.asarray(lengths, dtype=np.int32)])
+            self._total_length += sum(lengths)
+        return list(range(first, first + len(counted)))
+
+    def _postings(self, term_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        if term_id + 1 < len(self._offsets):
+            start, end = self._offsets[term_id], self._offsets[term_id + 1]
+            ids, tfs = self._ids[start:end], self._tfs[start:end]
+        else:
+            ids, tfs = self._ids[:0], self._tfs[:0]
+        added = self._added.get(term_id)
+        if added is not None:
+            with self._lock:
+                # Copied so a concurrent add can grow the buffers
+                new_ids = np.array(added[0], dtype=np.int32)
+                new_tfs = np.array(added[1], dtype=np.int32)
+            ids, tfs = np.concatenate([ids, new_ids]), np.concatenate([tfs, new_tfs])
+        return ids, tfs
+
+    def _term_weights(self, term_id: int, doc_count: int, doc_lengths: np.ndarray, avg_length: float) -> Tuple[np.ndarray, np.ndarray]:
+        """BM25 contribution of one term to every document containing it."""
+        ids, tfs = self._postings(term_id)
+        if len(ids) and ids[-1] >= doc_count:
+            # Added after the search took its snapshot
+            visible = ids < doc_count
+            ids, tfs = ids[visible], tfs[visible]
+        df = len(ids)
+        idf = math.log(1.0 + (doc_count - df + 0.5) / (df + 0.5))
+        tfs = tfs.astype(np.float32)
+        norm = self.k1 * (1.0 - self.b + self.b * doc_lengths[ids] / avg_length)
+        return ids, (idf * tfs * (self.k1 + 1.0) / (tfs + norm)).astype(np.float32)
+
+    def search_many(self, queries: Sequence[str], k: int = 4) -> List[List[Tuple[Document, float]]]:
+        """
+        Score several queries in one pass.
+
+        Each distinct term's posting list is read and weighted once for the
+        whole batch, so expanded or related queries sharing terms cost little
+        more than one.
+
+        Args:
+            queries: Query texts
+            k: Documents per query
+
+        Returns:
+            For each query, up to ``k`` (document, score) pairs, best first;
+            documents matching no query term are not returned
+        """
+        # A consistent snapshot: documents added during the search are ignored
+        doc_count = len(self._doc_lengths)
+        if doc_count == 0:
+            return [[] for _ in queries]
+        doc_lengths = self._doc_lengths[:doc_count]
+        avg_length = max(self._total_length / doc_count, 1e-9)
+        weights: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+        results = []
+        for query in queries:
+            term_ids = {self.vocabulary[t] for t in self.tokenizer(query) if t in self.vocabulary}
+            if not term_ids:
+                results.append([])
+                continue
+            scores = np.zeros(doc_count, dtype=np.float32)
+            touched = []
+            for term_id in term_ids:
+                if term_id not in weights:
+                    weights[term_id] = self._term_weights(term_id, doc_count, doc_lengths, avg_length)
+                ids, term_scores = weights[term_id]
+                scores[ids] += term_scores
+                touched.append(ids)
+            candidates = np.unique(np.concatenate(touched))
+            best, positions = top_k(scores[candidates], k)
+            results.append([
+                (self.documents[candidates[p]], float(score))
+                for score, p in zip(best[0], positions[0])
+                if p >= 0
+            ])
+        return results
+
+    def search(self, query: str, k: int = 4) -> List[Tuple[Document, float]]:
+        """Return up to ``k`` (document, BM25 score) pairs for ``query``, best first."""
+        return self.search_many([query], k)[0]
+
+    def save(self, directory: str) -> None:
+        """
+        Write the index to ``directory``, folding added postings into the CSR arrays.
+
+        Postings and document lengths are ``.npy`` files so ``load`` can
+        memory-map them; the vocabulary and documents are JSON.
+        """
+        with self._lock:
+            vocab_size = len(self.vocabulary)
+            base_terms = np.repeat(np.arange(len(self._offsets) - 1, dtype=np.int64), np.diff(self._offsets))
+            added_terms = [np.full(len(ids), term_id, dtype=np.int64) for term_id, (ids, _) in self._added.items()]
+            terms = np.concatenate([base_terms] + added_terms)
+            ids = np.concatenate([self._ids] + [np.array(ids, dtype=np.int32) for ids, _ in self._added.values()])
+            tfs = np.concatenate([self._tfs] + [np.array(tfs, dtype=np.int32) for _, tfs in self._added.values()])
+            order = np.lexsort((ids, terms))
+            terms, ids, tfs = terms[order], ids[order], tfs[order]
+            offsets = np.zeros(vocab_size + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum(np.bincount(terms, minlength=vocab_size))
+
+            os.makedirs(directory, exist_ok=True)
+            np.save(os.path.join(directory, "offsets.npy"), offsets)
+            np.save(os.path.join(directory, "doc_ids.npy"), ids)
+            np.save(os.path.join(directory, "term_freqs.npy"), tfs)
+            np.save(os.path.join(directory, "doc_lengths.npy"), self._doc_lengths)
+            terms_by_id = sorted(self.vocabulary, key=self.vocabulary.__getitem__)
+            with open(os.path.join(directory, "vocabulary.json"), "w") as f:
+                json.dump(terms_by_id, f)
+            with open(os.path.join(directory, "documents.jsonl"), "w") as f:
+                for document in self.documents:
+                    f.write(json.dumps({"id": document.id, "page_content": document.page_content, "metadata": document.metadata}) + "\n")
+            with open(os.path.join(directory, "meta.json"), "w") as f:
+                json.dump({"format": _FORMAT_VERSION, "k1": self.k1, "b": self.b}, f)
+
+            self._offsets, self._ids, self._tfs = offsets, ids, tfs
+            self._added = {}
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True, tokenizer: Optional[Callable[[str], List[str]]] = None) -> "BM25Index":
+        """
+        Load an index written by ``save``.
+
+        Args:
+            directory: Directory passed to ``save``
+            mmap: Memory-map the posting arrays instead of reading them into memory
+            tokenizer: Must match the tokenizer the index was built with
+
+        Returns:
+            BM25Index ready for searches and further adds
+        """
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("format") != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported keyword index format: {meta.get('format')}")
+
+        index = cls(k1=meta["k1"], b=meta["b"], tokenizer=tokenizer)
+        mode = "r" if mmap else None
+        index._offsets = np.load(os.path.join(directory, "offsets.npy"), mmap_mode=mode)
+        index._ids = np.load(os.path.join(directory, "doc_ids.npy"), mmap_mode=mode)
+        index._tfs = np.load(os.path.join(directory, "term_freqs.npy"), mmap_mode=mode)
+        index._doc_lengths = np.load(os.path.join(directory, "doc_lengths.npy"))
+        index._total_length = int(index._doc_lengths.sum())
+        with open(os.path.join(directory, "vocabulary.json")) as f:
+            index.vocabulary = {term: term_id for term_id, term in enumerate(json.load(f))}
+        with open(os.path.join(directory, "documents.jsonl")) as f:
+            index.documents = [Document(**json.loads(line)) for line in f]
+        return index
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Document, term and posting counts."""
+        return {
+            "documents": len(self.documents),
+            "terms": len(self.vocabulary),
+            "postings": len(self._ids) + sum(len(ids) for ids, _ in self._added.values()),
+            "unsaved_terms": len(self._added),
+        }
+
+
+class KeywordRetriever(BaseRetriever):
+    """LangChain retriever over a BM25Index; drop-in for a re-vectorizing TF-IDF retriever."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    index: BM25Index
+    k: int = 4
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Document], k: int = 4, **kwargs: Any) -> "KeywordRetriever":
+        """Index ``documents`` and wrap the index; keyword arguments go to BM25Index."""
+        return cls(index=BM25Index.from_documents(documents, **kwargs), k=k)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return [document for document, _ in self.index.search(query, self.k)]
+
+
+__all__ = [
+    "BM25Index",
+    "KeywordRetriever",
+    "tokenize",
+]
@@ -0,0 +1,142 @@
+"""Batched multi-query retrieval for query expansion: one index search (and optionally one embedding call) per query set."""
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict
+
+from .embedding_cache import CachedEmbeddings
+from .hybrid import FusedHit
+from .sharded import SearchHit, VectorShard
+
+
+@dataclass
+class MultiQueryResult:
+    """Fused hits of a query set, with the time spent embedding and searching."""
+
+    hits: List[FusedHit]
+    embed_seconds: float = 0.0
+    search_seconds: float = 0.0
+    per_query: List[List[SearchHit]] = field(default_factory=list)
+
+    @property
+    def documents(self) -> List[Document]:
+        return [hit.document for hit in self.hits]
+
+
+def fuse_query_hits(queries: Sequence[str], per_query: Sequence[List[SearchHit]], fusion: str = "max", rrf_k: int = 60) -> List[FusedHit]:
+    """
+    Merge the hit lists of several queries into one ranking.
+
+    Documents are matched by index row, not text. With ``max`` a document
+    keeps its best score over all queries; with ``rrf`` it scores
+    ``sum(1 / (rrf_k + rank + 1))`` over the queries that found it, which
+    favours documents many expansions agree on.
+
+    Args:
+        queries: Query texts, used to label each hit's ranks
+        per_query: Hits of each query, best first
+        fusion: ``max`` or ``rrf``
+        rrf_k: Rank damping constant for ``rrf``
+
+    Returns:
+        Fused hits, best first
+    """
+    if fusion not in ("max", "rrf"):
+        raise ValueError(f"Unsupported fusion: {fusion}")
+    fused: Dict[int, FusedHit] = {}
+    for query, hits in zip(queries, per_query):
+        for rank, hit in enumerate(hits):
+            entry = fused.get(id(hit.document))
+            if entry is None:
+                entry = fused[id(hit.document)] = FusedHit(hit.document, float("-inf") if fusion == "max" else 0.0)
+            entry.ranks.setdefault(query, rank)
+            if fusion == "max":
+                entry.score = max(entry.score, hit.score)
+            else:
+                entry.score += 1.0 / (rrf_k + rank + 1)
+    return sorted(fused.values(), key=lambda hit: hit.score, reverse=True)
+
+
+class BatchedMultiQueryRetriever(BaseRetriever):
+    """
+    Retriever answering a set of expanded queries with one batch.
+
+    Query expansion (HyDE document, sub-questions, keywords) yields several
+    queries for one question. Instead of a thread per query, each embedding
+    and searching separately, all queries are searched with one
+    ``index.search`` over the query matrix and the hits are fused per
+    document (see ``fuse_query_hits``).
+
+    Queries are embedded with ``embed_query``, which applies any query-side
+    instruction prefix. For models that embed queries and documents alike,
+    ``batch_queries=True`` embeds the whole set with one ``embed_documents``
+    call instead; a ``CachedEmbeddings`` wrapper is bypassed there so query
+    vectors never enter the document cache.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    shard: VectorShard
+    embeddings: Embeddings
+    k: int = 4
+    per_query_k: Optional[int] = None
+    fusion: str = "max"
+    rrf_k: int = 60
+    batch_queries: bool = False
+
+    def model_post_init(self, __context: Any) -> None:
+        if self.fusion not in ("max", "rrf"):
+            raise ValueError(f"Unsupported fusion: {self.fusion}")
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore: Any, **kwargs: Any) -> "BatchedMultiQueryRetriever":
+        """Wrap a LangChain ``FAISS`` vector store and its embedding model; keyword arguments go to the retriever."""
+        return cls(shard=VectorShard.from_vectorstore("vectorstore", vectorstore), embeddings=vectorstore.embeddings, **kwargs)
+
+    def search_many(self, queries: Sequence[str], k: Optional[int] = None) -> MultiQueryResult:
+        """
+        Retrieve for all ``queries`` at once.
+
+        Args:
+            queries: Expanded query texts
+            k: Number of fused documents (default: ``self.k``)
+
+        Returns:
+            MultiQueryResult with the fused hits, each query's own hits and timings
+        """
+        queries = list(queries)
+        if not queries:
+            return MultiQueryResult(hits=[])
+        started = time.perf_counter()
+        vectors = self._embed_queries(queries)
+        embedded = time.perf_counter()
+        per_query = self.shard.search_many(vectors, self.per_query_k or self.k)
+        searched = time.perf_counter()
+        hits = fuse_query_hits(queries, per_query, self.fusion, self.rrf_k)
+        return MultiQueryResult(
+            hits=hits[:k or self.k],
+            embed_seconds=embedded - started,
+            search_seconds=searched - embedded,
+            per_query=per_query,
+        )
+
+    def _embed_queries(self, queries: List[str]) -> List[List[float]]:
+        if not self.batch_queries:
+            return [self.embeddings.embed_query(query) for query in queries]
+        model = self.embeddings.embeddings if isinstance(self.embeddings, CachedEmbeddings) else self.embeddings
+        return model.embed_documents(queries)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self.search_many([query]).documents
+
+
+__all__ = [
+    "BatchedMultiQueryRetriever",
+    "MultiQueryResult",
+    "fuse_query_hits",
+]
@@ -0,0 +1,373 @@
+"""Sharded vector retrieval: concurrent scatter, score-ordered top-k merge and centroid-based shard pruning."""
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict, PrivateAttr
+
+from .index import METRIC_INNER_PRODUCT, as_matrix, build_flat_index, load_index, normalize, save_index
+
+
+@dataclass
+class SearchHit:
+    """One retrieved document with its score (higher is better) and the shard it came from."""
+
+    document: Document
+    score: float
+    shard: str
+
+
+@dataclass
+class ShardedSearchResult:
+    """Merged top-k hits of one query and what happened on each shard."""
+
+    hits: List[SearchHit]
+    searched: List[str] = field(default_factory=list)
+    pruned: List[str] = field(default_factory=list)
+    timed_out: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    shard_seconds: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def documents(self) -> List[Document]:
+        return [hit.document for hit in self.hits]
+
+
+class VectorShard:
+    """
+    One partition of the corpus: a vector index and the documents its ids point to.
+
+    ``index`` is any object with the FAISS ``search(queries, k)`` interface
+    (a FAISS index or ExactIndex). Scores are reported higher-is-better, so
+    L2 distances are negated. The centroid (the normalized mean vector) is
+    used to skip shards that are far from a query.
+    """
+
+    def __init__(self, name: str, index: Any, documents: Sequence[Document], centroid: Optional[np.ndarray] = None):
+        """
+        Create a shard.
+
+        Args:
+            name: Shard name, reported in results
+            index: FAISS-style index whose id ``i`` is ``documents[i]``
+            documents: Documents in index id order
+            centroid: Mean vector of the shard (default: computed from the index when it can reconstruct vectors)
+        """
+        if index.ntotal != len(documents):
+            raise ValueError(f"Shard {name}: index holds {index.ntotal} vectors but {len(documents)} documents were given")
+        self.name = name
+        self.index = index
+        self.documents = list(documents)
+        self.higher_is_better = getattr(index, "metric_type", METRIC_INNER_PRODUCT) == METRIC_INNER_PRODUCT
+        if centroid is None and index.ntotal and hasattr(index, "reconstruct_n"):
+            try:
+                centroid = index.reconstruct_n(0, index.ntotal).mean(axis=0)
+            except RuntimeError:
+                # Compressed FAISS indexes cannot always reconstruct; never prune those
+                centroid = None
+        self.centroid = normalize(centroid)[0] if centroid is not None else None
+
+    @classmethod
+    def from_vectors(
+        cls, name: str, vectors: Any, documents: Sequence[Document], metric: str = "ip", backend: str = "auto"
+    ) -> "VectorShard":
+        """
+        Build a shard with an exact index over precomputed document vectors.
+
+        Args:
+            name: Shard name
+            vectors: One embedding per document
+            documents: The documents, in the same order
+            metric: ``ip`` (use with normalized embeddings) or ``l2``
+            backend: Index backend, see ``build_flat_index``
+
+        Returns:
+            VectorShard
+        """
+        matrix = as_matrix(vectors)
+        return cls(name, build_flat_index(matrix, metric, backend), documents, centroid=matrix.mean(axis=0))
+
+    @classmethod
+    def from_vectorstore(cls, name: str, vectorstore: Any) -> "VectorShard":
+        """
+        Wrap a LangChain ``FAISS`` vector store as a shard without re-embedding it.
+
+        Args:
+            name: Shard name
+            vectorstore: ``langchain_community.vectorstores.FAISS`` instance
+
+        Returns:
+            VectorShard over the store's index and documents
+        """
+        ids = [vectorstore.index_to_docstore_id[i] for i in range(vectorstore.index.ntotal)]
+        documents = [vectorstore.docstore.search(doc_id) for doc_id in ids]
+        return cls(name, vectorstore.index, documents)
+
+    def save(self, directory: str) -> None:
+        """Write the index, documents and centroid to ``directory``."""
+        os.makedirs(directory, exist_ok=True)
+        save_index(self.index, os.path.join(directory, "index.bin"))
+        with open(os.path.join(directory, "documents.jsonl"), "w") as f:
+            for document in self.documents:
+                f.write(json.dumps({"id": document.id, "page_content": document.page_content, "metadata": document.metadata}) + "\n")
+        if self.centroid is not None:
+            np.save(os.path.join(directory, "centroid.npy"), self.centroid)
+
+    @classmethod
+    def load(cls, name: str, directory: str, mmap: bool = True) -> "VectorShard":
+        """
+        Load a shard written by ``save``.
+
+        Args:
+            name: Shard name
+            directory: Directory passed to ``save``
+            mmap: Memory-map the index (see ``load_index``)
+
+        Returns:
+            VectorShard
+        """
+        index = load_index(os.path.join(directory, "index.bin"), mmap=mmap)
+        with open(os.path.join(directory, "documents.jsonl")) as f:
+            documents = [Document(**json.loads(line)) for line in f]
+        centroid_path = os.path.join(directory, "centroid.npy")
+        # Stored so loading does not read every vector to recompute it
+        centroid = np.load(centroid_path) if os.path.exists(centroid_path) else None
+        return cls(name, index, documents, centroid=centroid)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def similarity(self, query: np.ndarray) -> Optional[float]:
+        """Cosine similarity of a normalized query to the shard centroid, or None if unknown."""
+        if self.centroid is None:
+            return None
+        return float(self.centroid @ query)
+
+    def search(self, query: np.ndarray, k: int) -> List[SearchHit]:
+        """Return the shard's ``k`` best hits for one query vector, best first."""
+        return self.search_many(query, k)[0]
+
+    def search_many(self, queries: Any, k: int) -> List[List[SearchHit]]:
+        """Return the ``k`` best hits of each row of a query matrix, with one index search call."""
+        scores, ids = self.index.search(as_matrix(queries), min(k, len(self.documents)))
+        sign = 1.0 if self.higher_is_better else -1.0
+        return [
+            [SearchHit(self.documents[i], sign * float(score), self.name) for score, i in zip(row_scores, row_ids) if i >= 0]
+            for row_scores, row_ids in zip(scores, ids)
+        ]
+
+
+def merge_top_k(runs: Sequence[List[SearchHit]], k: int) -> List[SearchHit]:
+    """
+    Merge per-shard hit lists (each sorted best first) into the global top ``k``.
+
+    A lazy k-way heap merge: only ``k`` hits are popped, so the cost is
+    O(k log shards) however many hits each shard returned.
+    """
+    merged = heapq.merge(*runs, key=lambda hit: -hit.score)
+    return list(itertools.islice(merged, k))
+
+
+class ShardedRetriever(BaseRetriever):
+    """
+    Retriever over several vector shards searched concurrently.
+
+    Each query is embedded once and sent to every shard on a thread pool
+    (FAISS and BLAS release the GIL, so shard searches run in parallel).
+    Every shard returns its own top ``k``, and the sorted lists are
+    heap-merged by score into the global top ``k``, the same result a single
+    index over all shards gives. Shards not answering within
+    ``shard_timeout`` seconds are left out of that query's result. With
+    ``prune_threshold`` set, shards whose centroid has a cosine similarity to
+    the query below it are skipped, but the ``min_shards`` closest are always
+    searched. Shard scores must be comparable: one embedding model and metric.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    shards: List[VectorShard]
+    embeddings: Optional[Embeddings] = None
+    k: int = 4
+    shard_timeout: Optional[float] = None
+    prune_threshold: Optional[float] = None
+    min_shards: int = 1
+    max_workers: Optional[int] = None
+
+    _executor: Optional[ThreadPoolExecutor] = PrivateAttr(default=None)
+    _executor_lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _stats: Dict[str, int] = PrivateAttr(default_factory=lambda: {"queries": 0, "pruned": 0, "timed_out": 0, "failed": 0})
+    _stats_lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, __context: Any) -> None:
+        if not self.shards:
+            raise ValueError("At least one shard is required")
+        if len({shard.higher_is_better for shard in self.shards}) > 1:
+            raise ValueError("All shards must use the same metric for their scores to be merged")
+        if len({shard.name for shard in self.shards}) != len(self.shards):
+            raise ValueError("Shard names must be unique")
+
+    @classmethod
+    def from_config(
+        cls, config: Any, shards: List[VectorShard], embeddings: Optional[Embeddings] = None
+    ) -> "ShardedRetriever":
+        """
+        Create a retriever from a BaseConfig.
+
+        Args:
+            config: Configuration object with ``retrieval_*`` settings
+            shards: Shards to search
+            embeddings: Embedding model for text queries
+
+        Returns:
+            Configured ShardedRetriever
+        """
+        return cls(
+            shards=shards,
+            embeddings=embeddings,
+            k=config.retrieval_k,
+            shard_timeout=config.retrieval_shard_timeout,
+            prune_threshold=config.retrieval_prune_threshold,
+            max_workers=config.retrieval_max_workers,
+        )
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                # Headroom so a shard search still running past its timeout does not delay the next query
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers or 2 * len(self.shards), thread_name_prefix="shard-search"
+                )
+            return self._executor
+
+    def close(self) -> None:
+        """Shut down the shard search threads."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def select_shards(self, query: np.ndarray) -> Tuple[List[VectorShard], List[VectorShard]]:
+        """
+        Split the shards into those to search for a query vector and those pruned.
+
+        Returns:
+            (shards to search, pruned shards)
+        """
+        if self.prune_threshold is None:
+            return list(self.shards), []
+        unit = normalize(query)[0]
+        similarities = {shard.name: shard.similarity(unit) for shard in self.shards}
+        closest = sorted(
+            (shard for shard in self.shards if similarities[shard.name] is not None),
+            key=lambda shard: similarities[shard.name],
+            reverse=True,
+        )
+        keep = {shard.name for shard in closest[:self.min_shards]}
+        selected, pruned = [], []
+        for shard in self.shards:
+            similarity = similarities[shard.name]
+            if similarity is None or similarity >= self.prune_threshold or shard.name in keep:
+                selected.append(shard)
+            else:
+                pruned.append(shard)
+        return selected, pruned
+
+    def _timed_search(self, shard: VectorShard, query: np.ndarray, k: int) -> Tuple[List[SearchHit], float]:
+        started = time.perf_counter()
+        hits = shard.search(query, k)
+        return hits, time.perf_counter() - started
+
+    def search_by_vector(self, query: Any, k: Optional[int] = None) -> ShardedSearchResult:
+        """
+        Search the shards with an embedded query.
+
+        Args:
+            query: Query embedding
+            k: Number of hits (default: ``self.k``)
+
+        Returns:
+            ShardedSearchResult with the global top-k hits and per-shard outcomes
+        """
+        k = k or self.k
+        vector = as_matrix(query)[0]
+        selected, pruned = self.select_shards(vector)
+        result = ShardedSearchResult(hits=[], pruned=[shard.name for shard in pruned])
+        runs: List[List[SearchHit]] = []
+
+        if len(selected) == 1 and self.shard_timeout is None:
+            # Nothing to overlap; skip the thread hop
+            hits, seconds = self._timed_search(selected[0], vector, k)
+            runs.append(hits)
+            result.searched.append(selected[0].name)
+            result.shard_seconds[selected[0].name] = seconds
+        else:
+            executor = self._get_executor()
+            futures = {executor.submit(self._timed_search, shard, vector, k): shard for shard in selected}
+            done, _ = wait(futures, timeout=self.shard_timeout)
+            for future, shard in futures.items():
+                if future not in done:
+                    # A search already running cannot be interrupted; its result is discarded
+                    future.cancel()
+                    result.timed_out.append(shard.name)
+                    continue
+                try:
+                    hits, seconds = future.result()
+                except Exception as e:
+                    print(f"⚠️  Shard {shard.name} search failed: {e}")
+                    result.failed[shard.name] = str(e)
+                    continue
+                runs.append(hits)
+                result.searched.append(shard.name)
+                result.shard_seconds[shard.name] = seconds
+
+        result.hits = merge_top_k(runs, k)
+        # Queries run concurrently from request threads
+        with self._stats_lock:
+            self._stats["queries"] += 1
+            self._stats["pruned"] += len(result.pruned)
+            self._stats["timed_out"] += len(result.timed_out)
+            self._stats["failed"] += len(result.failed)
+        return result
+
+    def search(self, query: str, k: Optional[int] = None) -> ShardedSearchResult:
+        """
+        Embed a text query and search the shards.
+
+        Args:
+            query: Query text
+            k: Number of hits (default: ``self.k``)
+
+        Returns:
+            ShardedSearchResult
+        """
+        if self.embeddings is None:
+            raise ValueError("An embeddings model is required to search by text; use search_by_vector")
+        return self.search_by_vector(self.embeddings.embed_query(query), k)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self.search(query).documents
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Query count and how many shard searches were pruned, timed out or failed."""
+        with self._stats_lock:
+            return {"shards": len(self.shards), **self._stats}
+
+
+__all__ = [
+    "SearchHit",
+    "ShardedRetriever",
+    "ShardedSearchResult",
+    "VectorShard",
+    "merge_top_k",
+]
@@ -1,4 +1,22 @@
 """Tool abstractions and implementations."""
 from .base import BaseTool
+from .batching import MicroBatcher
+from .cache import CacheBackend, InMemoryCacheBackend, RedisCacheBackend, ToolResultCache
+from .executor import ToolCallTiming, ToolExecutor, ToolTimeoutError
+from .http import HTTPClientPool
+from .tavily import TavilySearchClient, TAVILY_API_URL
 
-__all__ = ["BaseTool"]
+__all__ = [
+    "BaseTool",
+    "MicroBatcher",
+    "CacheBackend",
+    "InMemoryCacheBackend",
+    "RedisCacheBackend",
+    "ToolResultCache",
+    "ToolExecutor",
+    "ToolCallTiming",
+    "ToolTimeoutError",
+    "HTTPClientPool",
+    "TavilySearchClient",
+    "TAVILY_API_URL",
+]
@@ -0,0 +1,129 @@
+"""Micro-batching of concurrent tool calls into bulk upstream requests."""
+import asyncio
+import inspect
+from typing import Any, Callable, Dict, Generic, Hashable, List, Optional, Set, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class MicroBatcher(Generic[K, V]):
+    """
+    Collects concurrent single-key lookups and resolves them with one bulk call.
+
+    Callers ``await submit(key)``. Keys submitted within ``max_wait`` seconds
+    of the first pending key (or until ``max_batch_size`` distinct keys are
+    pending) are passed together to ``batch_fn``, which must return a mapping
+    from key to result. Duplicate keys in a window share one slot.
+
+    ``batch_fn`` may be a coroutine function or a regular blocking function;
+    blocking functions run in a worker thread so the event loop stays free.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[K]], Any],
+        max_batch_size: int = 50,
+        max_wait: float = 0.01,
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            batch_fn: Function taking a list of keys and returning ``{key: result}``
+            max_batch_size: Distinct keys that trigger an immediate flush
+            max_wait: Seconds to wait for more keys after the first one arrives
+        """
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be positive")
+
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[K, List[asyncio.Future]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.requests = 0
+        self.keys = 0
+
+    async def submit(self, key: K) -> V:
+        """
+        Queue a key for the next batch and wait for its result.
+
+        Raises:
+            KeyError: If ``batch_fn`` returned no result for the key
+            Exception: Any exception raised by ``batch_fn`` for the batch
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # State from a previous event loop can never be flushed; start over
+            self._loop = loop
+            self._pending = {}
+            self._timer = None
+
+        future = loop.create_future()
+        self._pending.setdefault(key, []).append(future)
+        self.requests += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Hand all pending keys to a background task running batch_fn."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+
+        task = self._loop.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: Dict[K, List[asyncio.Future]]) -> None:
+        keys = list(batch)
+        self.batches += 1
+        self.keys += len(keys)
+
+        try:
+            if inspect.iscoroutinefunction(self.batch_fn):
+                results = await self.batch_fn(keys)
+            else:
+                results = await asyncio.to_thread(self.batch_fn, keys)
+        except Exception as e:
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for key, futures in batch.items():
+            for future in futures:
+                if future.done():
+                    continue
+                if key in results:
+                    future.set_result(results[key])
+                else:
+                    future.set_exception(KeyError(key))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batch counters."""
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "keys": self.keys,
+            "avg_batch_size": self.keys / self.batches if self.batches else 0.0,
+        }
+
+
+__all__ = ["MicroBatcher"]
@@ -0,0 +1,405 @@
+"""Tool-result caching with per-tool TTLs, bounded eviction and single-flight coalescing."""
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import pickle
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class CacheBackend(ABC):
+    """Abstract storage backend for cached tool results."""
+
+    name = "base"
+
+    @abstractmethod
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return ``(found, value)`` for the key; expired entries are not found."""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, expiring it after ``ttl`` seconds when given."""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove a single key if present."""
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every cached entry owned by this backend."""
+        pass
+
+    async def aget(self, key: str) -> Tuple[bool, Any]:
+        """Async variant of ``get``; backends doing network I/O keep it off the event loop."""
+        return self.get(key)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Async variant of ``set``."""
+        self.set(key, value, ttl)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get backend-level statistics."""
+        return {"backend": self.name}
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Thread-safe in-process LRU cache bounded by entry count."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 1024):
+        """Initialize the backend with the maximum number of entries to keep."""
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache backend for a local Redis-compatible server (Redis, Valkey, Dragonfly).
+
+    Expiry uses native key TTLs. Size bounding is delegated to the server's
+    ``maxmemory`` / ``maxmemory-policy allkeys-lru`` settings.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str = "redis://localhost:6379/0", prefix: str = "tool-cache:"):
+        """Connect to the server at ``url``; all keys are namespaced with ``prefix``."""
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("redis is required for the Redis cache backend. Install with: pip install redis")
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        raw = self._client.get(self.prefix + key)
+        if raw is None:
+            return False, None
+        return True, pickle.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        px = max(1, int(ttl * 1000)) if ttl is not None else None
+        self._client.set(self.prefix + key, pickle.dumps(value), px=px)
+
+    # The round trip and unpickling run on a worker thread, not the event loop
+    async def aget(self, key: str) -> Tuple[bool, Any]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await asyncio.to_thread(self.set, key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self.prefix + key)
+
+    def clear(self) -> None:
+        keys = list(self._client.scan_iter(match=f"{self.prefix}*"))
+        if keys:
+            self._client.delete(*keys)
+
+
+class _InFlightCall:
+    """A computation shared by concurrent callers of the same key (threaded path)."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _AsyncInFlightCall:
+    """A computation task shared by concurrent awaiting callers of the same key."""
+
+    def __init__(self, task: "asyncio.Future[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class ToolResultCache:
+    """
+    Caches tool results by tool name and arguments.
+
+    Each tool gets its own TTL (falling back to ``default_ttl``). Concurrent
+    identical calls are coalesced so only one of them reaches the upstream
+    API; the others wait for and share its result. Exceptions are propagated
+    to every waiter and are never cached.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        default_ttl: Optional[float] = 60.0,
+        ttls: Optional[Dict[str, float]] = None,
+        enabled: bool = True,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            backend: Storage backend (defaults to an in-memory LRU)
+            default_ttl: TTL in seconds for tools without an explicit TTL (None = no expiry)
+            ttls: Per-tool TTL overrides keyed by tool name
+            enabled: When False, calls pass straight through to the tool
+        """
+        self.backend = backend or InMemoryCacheBackend()
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, _InFlightCall] = {}
+        self._ainflight: Dict[str, _AsyncInFlightCall] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def from_config(cls, config: Any, ttls: Optional[Dict[str, float]] = None) -> "ToolResultCache":
+        """
+        Create a cache from a BaseConfig.
+
+        Args:
+            config: Configuration object with ``tool_cache_*`` settings
+            ttls: Per-tool TTL overrides keyed by tool name
+
+        Returns:
+            Configured ToolResultCache
+        """
+        if config.tool_cache_backend == "memory":
+            backend = InMemoryCacheBackend(max_entries=config.tool_cache_max_entries)
+        elif config.tool_cache_backend == "redis":
+            backend = RedisCacheBackend(url=config.tool_cache_redis_url)
+        else:
+            raise ValueError(f"Unsupported tool cache backend: {config.tool_cache_backend}")
+
+        return cls(
+            backend=backend,
+            default_ttl=config.tool_cache_default_ttl,
+            ttls=ttls,
+            enabled=config.tool_cache_enabled,
+        )
+
+    @staticmethod
+    def make_key(tool_name: str, args: Dict[str, Any]) -> str:
+        """Build a stable cache key from a tool name and its arguments."""
+        payload = json.dumps(args, sort_keys=True, default=str)
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+        return f"{tool_name}:{digest}"
+
+    def ttl_for(self, tool_name: str) -> Optional[float]:
+        """Get the TTL that applies to a tool."""
+        return self.ttls.get(tool_name, self.default_ttl)
+
+    def _count(self, tool_name: str, counter: str) -> None:
+        with self._lock:
+            counters = self._counters.setdefault(tool_name, {"hits": 0, "misses": 0, "coalesced": 0})
+            counters[counter] += 1
+
+    def get_or_compute(self, tool_name: str, args: Dict[str, Any], compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached result for the call, computing it at most once.
+
+        Args:
+            tool_name: Name of the tool, used for the key and TTL lookup
+            args: Tool arguments
+            compute: Zero-argument callable producing the result on a miss
+
+        Returns:
+            The cached or freshly computed result
+        """
+        if not self.enabled:
+            return compute()
+
+        key = self.make_key(tool_name, args)
+        found, value = self.backend.get(key)
+        if found:
+            self._count(tool_name, "hits")
+            return value
+
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlightCall()
+                self._inflight[key] = call
+
+        if not leader:
+            self._count(tool_name, "coalesced")
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        self._count(tool_name, "misses")
+        try:
+            call.value = compute()
+            self.backend.set(key, call.value, self.ttl_for(tool_name))
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.event.set()
+
+    async def aget_or_compute(
+        self,
+        tool_name: str,
+        args: Dict[str, Any],
+        compute: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Async variant of ``get_or_compute``; coalesces awaiting callers on the event loop."""
+        if not self.enabled:
+            return await compute()
+
+        key = self.make_key(tool_name, args)
+        found, value = await self.backend.aget(key)
+        if found:
+            self._count(tool_name, "hits")
+            return value
+
+        call = self._ainflight.get(key)
+        if call is None:
+            self._count(tool_name, "misses")
+            call = _AsyncInFlightCall(asyncio.ensure_future(self._acompute(key, tool_name, compute)))
+            self._ainflight[key] = call
+        else:
+            self._count(tool_name, "coalesced")
+
+        # The compute runs in a task the cache owns, so cancelling one caller
+        # (deadline, disconnect, dropped prefetch) does not cancel the others
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+                if self._ainflight.get(key) is call:
+                    del self._ainflight[key]
+
+    async def _acompute(self, key: str, tool_name: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await compute()
+            await self.backend.aset(key, value, self.ttl_for(tool_name))
+            return value
+        finally:
+            call = self._ainflight.get(key)
+            if call is not None and call.task is asyncio.current_task():
+                del self._ainflight[key]
+
+    def cached(self, tool_name: str) -> Callable:
+        """
+        Decorator that caches a sync or async tool implementation.
+
+        The wrapped function keeps its signature and docstring, so it can be
+        passed to ``StructuredTool.from_function`` unchanged.
+        """
+        def decorator(func: Callable) -> Callable:
+            signature = inspect.signature(func)
+
+            def bind(*args, **kwargs) -> Dict[str, Any]:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                return dict(bound.arguments)
+
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    return await self.aget_or_compute(
+                        tool_name, bind(*args, **kwargs), lambda: func(*args, **kwargs)
+                    )
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                return self.get_or_compute(tool_name, bind(*args, **kwargs), lambda: func(*args, **kwargs))
+            return wrapper
+
+        return decorator
+
+    def clear(self) -> None:
+        """Drop all cached results (counters are kept)."""
+        self.backend.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters per tool and overall.
+
+        Returns:
+            Dictionary with totals, per-tool counters and backend statistics
+        """
+        with self._lock:
+            tools = {name: dict(counters) for name, counters in self._counters.items()}
+
+        hits = sum(c["hits"] for c in tools.values())
+        misses = sum(c["misses"] for c in tools.values())
+        coalesced = sum(c["coalesced"] for c in tools.values())
+        lookups = hits + misses + coalesced
+
+        return {
+            "enabled": self.enabled,
+            "hits": hits,
+            "misses": misses,
+            "coalesced": coalesced,
+            "hit_rate": (hits + coalesced) / lookups if lookups else 0.0,
+            "tools": tools,
+            **self.backend.get_stats(),
+        }
+
+
+__all__ = ["CacheBackend", "InMemoryCacheBackend", "RedisCacheBackend", "ToolResultCache"]
@@ -0,0 +1,390 @@
+"""Bounded-concurrency tool executor with per-tool limits, deadlines and call timings."""
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from langchain_core.tools import BaseTool as LangChainTool
+from langchain_core.tools import StructuredTool
+
+from shared.observability.tracing import current_trace
+
+
+class ToolTimeoutError(TimeoutError):
+    """Raised when a tool call exceeds its timeout or the request deadline."""
+
+
+@dataclass
+class ToolCallTiming:
+    """Timing record for one tool call."""
+
+    tool: str
+    status: str  # ok, error, timeout, cancelled
+    queued_seconds: float
+    run_seconds: float
+
+    def as_log_entry(self) -> str:
+        """Format the record for a performance log."""
+        return (
+            f"[TOOLS] {self.tool} {self.status} in {self.run_seconds:.2f} seconds "
+            f"(queued {self.queued_seconds:.2f} seconds)."
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the record to a dictionary."""
+        return asdict(self)
+
+
+class _CallScope:
+    """Per-request collection of timings and an optional absolute deadline."""
+
+    def __init__(self, deadline: Optional[float]):
+        self.deadline = deadline
+        self.calls: List[ToolCallTiming] = []
+        self._lock = threading.Lock()
+
+    def record(self, timing: ToolCallTiming) -> None:
+        with self._lock:
+            self.calls.append(timing)
+
+
+# The wrapper tool built by ToolExecutor.wrap already reports start/end to
+# callbacks; the wrapped tool runs without them so events are not duplicated
+_INNER_CALL_CONFIG = {"callbacks": []}
+
+_current_scope: contextvars.ContextVar[Optional[_CallScope]] = contextvars.ContextVar(
+    "tool_executor_scope", default=None
+)
+
+
+class ToolExecutor:
+    """
+    Runs tool calls under shared concurrency limits.
+
+    One executor is meant to be shared by the whole process: a global
+    semaphore caps concurrent tool calls across all requests, optional
+    per-tool semaphores cap individual upstreams, and sync tools run on one
+    sized thread pool instead of per-request threads. Each call gets a
+    timeout (per tool, else ``default_timeout``) further clipped by the
+    deadline of the enclosing ``track()`` scope. Cancelling the awaiting task
+    (e.g. on client disconnect) cancels the in-flight tool coroutine. A sync
+    tool's thread cannot be stopped, so a call that times out or is
+    cancelled keeps its concurrency slots until the thread finishes.
+
+    Use ``wrap(tool)`` to route a LangChain tool through the executor while
+    keeping its name and schema, so it can be handed to ``ToolNode``.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        max_workers: int = 16,
+        default_timeout: Optional[float] = 30.0,
+        tool_limits: Optional[Dict[str, int]] = None,
+        tool_timeouts: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Initialize the executor.
+
+        Args:
+            max_concurrency: Maximum concurrent tool calls across all tools
+            max_workers: Threads in the shared pool used for sync tools
+            default_timeout: Timeout in seconds for tools without an override (None = no timeout)
+            tool_limits: Per-tool concurrency limits keyed by tool name
+            tool_timeouts: Per-tool timeouts in seconds keyed by tool name
+        """
+        self.max_concurrency = max_concurrency
+        self.default_timeout = default_timeout
+        self.tool_limits = dict(tool_limits or {})
+        self.tool_timeouts = dict(tool_timeouts or {})
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+
+        self._lock = threading.Lock()
+        self._sync_global = threading.BoundedSemaphore(max_concurrency)
+        self._sync_tool: Dict[str, threading.BoundedSemaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_global: Optional[asyncio.Semaphore] = None
+        self._async_tool: Dict[str, asyncio.Semaphore] = {}
+        self._listeners: List[Callable[[ToolCallTiming], None]] = []
+        self.in_flight = 0
+
+    @classmethod
+    def from_config(cls, config: Any) -> "ToolExecutor":
+        """
+        Create an executor from a BaseConfig.
+
+        Args:
+            config: Configuration object with ``tool_*`` executor settings
+
+        Returns:
+            Configured ToolExecutor
+        """
+        return cls(
+            max_concurrency=config.tool_max_concurrency,
+            max_workers=config.tool_max_workers,
+            default_timeout=config.tool_default_timeout,
+            tool_limits=config.tool_concurrency_limits,
+            tool_timeouts=config.tool_timeouts,
+        )
+
+    @contextmanager
+    def track(self, deadline: Optional[float] = None) -> Iterator[List[ToolCallTiming]]:
+        """
+        Collect timings of tool calls made within the block.
+
+        Args:
+            deadline: Absolute ``time.monotonic()`` deadline for calls in the block
+
+        Yields:
+            List that receives a ToolCallTiming per call
+        """
+        scope = _CallScope(deadline)
+        token = _current_scope.set(scope)
+        try:
+            yield scope.calls
+        finally:
+            _current_scope.reset(token)
+
+    def add_listener(self, listener: Callable[[ToolCallTiming], None]) -> None:
+        """
+        Register a callback receiving the timing of every finished call.
+
+        Unlike ``track()``, listeners see all calls, including ones made
+        outside a tracked scope (e.g. speculative prefetches).
+
+        Args:
+            listener: Function called with each ToolCallTiming
+        """
+        self._listeners.append(listener)
+
+    def _timeout_for(self, tool_name: str) -> Optional[float]:
+        timeout = self.tool_timeouts.get(tool_name, self.default_timeout)
+        scope = _current_scope.get()
+        if scope is not None and scope.deadline is not None:
+            remaining = max(0.0, scope.deadline - time.monotonic())
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        return timeout
+
+    @staticmethod
+    def _trace_parent() -> Optional[int]:
+        """Node span a call belongs to, taken at submission (speculative calls start mid-turn)."""
+        trace = current_trace()
+        return trace.open_node_id() if trace is not None else None
+
+    def _record(
+        self, tool_name: str, status: str, submitted: int, started: Optional[int], parent_id: Optional[int] = None
+    ) -> None:
+        """Record a finished call (``perf_counter_ns`` times) in the current scope and trace."""
+        now = time.perf_counter_ns()
+        started = started if started is not None else now
+
+        trace = current_trace()
+        if trace is not None:
+            trace.add_span(
+                tool_name, "tool", submitted, now,
+                status=status, parent_id=parent_id, queued_ms=(started - submitted) / 1e6,
+            )
+
+        timing = ToolCallTiming(
+            tool=tool_name,
+            status=status,
+            queued_seconds=(started - submitted) / 1e9,
+            run_seconds=(now - started) / 1e9,
+        )
+        scope = _current_scope.get()
+        if scope is not None:
+            scope.record(timing)
+        for listener in self._listeners:
+            try:
+                listener(timing)
+            except Exception as e:
+                print(f"⚠️  Tool call listener failed: {e}")
+
+    def _call_started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def _call_finished(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    @staticmethod
+    def _release(*semaphores: Any) -> None:
+        for semaphore in semaphores:
+            if semaphore is not None:
+                semaphore.release()
+
+    def _submit(self, tool: LangChainTool, args: Dict[str, Any], on_done: Callable[[], None]) -> Future:
+        """Start a sync tool on the pool; ``on_done`` runs when its thread finishes, whether or not anyone still waits."""
+        ctx = contextvars.copy_context()
+        try:
+            future = self.pool.submit(ctx.run, tool.invoke, args, _INNER_CALL_CONFIG)
+        except BaseException:
+            on_done()
+            raise
+        future.add_done_callback(lambda _: on_done())
+        return future
+
+    def _async_semaphores(self, tool_name: str):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._async_global = asyncio.Semaphore(self.max_concurrency)
+            self._async_tool = {}
+        tool_semaphore = None
+        if tool_name in self.tool_limits:
+            tool_semaphore = self._async_tool.get(tool_name)
+            if tool_semaphore is None:
+                tool_semaphore = self._async_tool[tool_name] = asyncio.Semaphore(self.tool_limits[tool_name])
+        return self._async_global, tool_semaphore
+
+    async def ainvoke(self, tool: LangChainTool, args: Dict[str, Any]) -> Any:
+        """
+        Run a tool call under the executor's limits and timeouts.
+
+        Args:
+            tool: LangChain tool to call
+            args: Tool arguments
+
+        Returns:
+            The tool result
+
+        Raises:
+            ToolTimeoutError: If the call does not finish in time
+        """
+        name = tool.name
+        submitted = time.perf_counter_ns()
+        parent_id = self._trace_parent()
+        started = None
+        global_semaphore, tool_semaphore = self._async_semaphores(name)
+
+        try:
+            if tool_semaphore is not None:
+                await tool_semaphore.acquire()
+            try:
+                await global_semaphore.acquire()
+            except BaseException:
+                self._release(tool_semaphore)
+                raise
+            started = time.perf_counter_ns()
+            self._call_started()
+            if getattr(tool, "coroutine", None) is not None:
+                try:
+                    result = await asyncio.wait_for(tool.ainvoke(args, _INNER_CALL_CONFIG), timeout=self._timeout_for(name))
+                finally:
+                    self._call_finished()
+                    self._release(global_semaphore, tool_semaphore)
+            else:
+                loop = asyncio.get_running_loop()
+
+                def done() -> None:
+                    self._call_finished()
+                    try:
+                        loop.call_soon_threadsafe(self._release, global_semaphore, tool_semaphore)
+                    except RuntimeError:
+                        # The loop is closed; its semaphores went with it
+                        pass
+
+                future = self._submit(tool, args, done)
+                result = await asyncio.wait_for(asyncio.wrap_future(future), timeout=self._timeout_for(name))
+        except asyncio.TimeoutError:
+            self._record(name, "timeout", submitted, started, parent_id)
+            raise ToolTimeoutError(f"Tool {name} timed out")
+        except asyncio.CancelledError:
+            self._record(name, "cancelled", submitted, started, parent_id)
+            raise
+        except Exception:
+            self._record(name, "error", submitted, started, parent_id)
+            raise
+
+        self._record(name, "ok", submitted, started, parent_id)
+        return result
+
+    def invoke(self, tool: LangChainTool, args: Dict[str, Any]) -> Any:
+        """Sync variant of ``ainvoke``; the call runs on the shared thread pool."""
+        name = tool.name
+        submitted = time.perf_counter_ns()
+        parent_id = self._trace_parent()
+        started = None
+
+        tool_semaphore = None
+        if name in self.tool_limits:
+            with self._lock:
+                tool_semaphore = self._sync_tool.get(name)
+                if tool_semaphore is None:
+                    tool_semaphore = self._sync_tool[name] = threading.BoundedSemaphore(self.tool_limits[name])
+
+        try:
+            if tool_semaphore is not None:
+                tool_semaphore.acquire()
+            try:
+                self._sync_global.acquire()
+            except BaseException:
+                self._release(tool_semaphore)
+                raise
+            started = time.perf_counter_ns()
+            self._call_started()
+
+            def done() -> None:
+                self._call_finished()
+                self._release(self._sync_global, tool_semaphore)
+
+            future = self._submit(tool, args, done)
+            try:
+                result = future.result(timeout=self._timeout_for(name))
+            except FutureTimeoutError:
+                future.cancel()
+                raise
+        except FutureTimeoutError:
+            self._record(name, "timeout", submitted, started, parent_id)
+            raise ToolTimeoutError(f"Tool {name} timed out")
+        except Exception:
+            self._record(name, "error", submitted, started, parent_id)
+            raise
+
+        self._record(name, "ok", submitted, started, parent_id)
+        return result
+
+    def wrap(self, tool: LangChainTool) -> StructuredTool:
+        """
+        Return a tool with the same name and schema whose calls go through this executor.
+
+        Args:
+            tool: LangChain tool to wrap
+
+        Returns:
+            StructuredTool suitable for ``ToolNode``
+        """
+        def run(**kwargs: Any) -> Any:
+            return self.invoke(tool, kwargs)
+
+        async def arun(**kwargs: Any) -> Any:
+            return await self.ainvoke(tool, kwargs)
+
+        return StructuredTool(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            func=run,
+            coroutine=arun,
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the shared thread pool."""
+        self.pool.shutdown(wait=wait, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get executor limits and current load."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "tool_limits": dict(self.tool_limits),
+        }
+
+
+__all__ = ["ToolExecutor", "ToolCallTiming", "ToolTimeoutError"]
@@ -0,0 +1,201 @@
+"""Shared keep-alive HTTP connection pool for tool implementations."""
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+
+class HTTPClientPool:
+    """
+    Process-wide sync and async HTTP clients sharing one connection policy.
+
+    Tools should issue requests through a single pool instead of building a
+    client per call, so TCP/TLS connections are reused across requests.
+    Requests are additionally capped per host (``per_host_limit`` or an entry
+    in ``host_limits``) to keep one slow upstream from monopolizing the pool.
+
+    Clients are created lazily. The async client is bound to the event loop
+    that first uses it and is recreated if a different loop asks for it;
+    the replaced client is closed on its own loop, or at ``aclose`` if that
+    loop has already shut down.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 10.0,
+        per_host_limit: Optional[int] = None,
+        host_limits: Optional[Dict[str, int]] = None,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            max_connections: Maximum open connections per client
+            max_keepalive_connections: Idle connections kept alive per client
+            keepalive_expiry: Seconds an idle connection is kept
+            timeout: Default request timeout in seconds
+            per_host_limit: Default maximum concurrent requests per host (None = unlimited)
+            host_limits: Per-host overrides of ``per_host_limit`` keyed by hostname
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout)
+        self.per_host_limit = per_host_limit
+        self.host_limits = dict(host_limits or {})
+
+        self._lock = threading.Lock()
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._retired_clients: List[httpx.AsyncClient] = []
+        self._host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._async_host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    @classmethod
+    def from_config(cls, config: Any) -> "HTTPClientPool":
+        """
+        Create a pool from a BaseConfig.
+
+        Args:
+            config: Configuration object with ``http_*`` settings
+
+        Returns:
+            Configured HTTPClientPool
+        """
+        return cls(
+            max_connections=config.http_max_connections,
+            max_keepalive_connections=config.http_max_keepalive_connections,
+            keepalive_expiry=config.http_keepalive_expiry,
+            timeout=config.http_timeout,
+            per_host_limit=config.http_per_host_limit,
+            host_limits=config.http_host_limits,
+        )
+
+    @property
+    def client(self) -> httpx.Client:
+        """The shared synchronous client."""
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(limits=self.limits, timeout=self.timeout)
+            return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """The shared asynchronous client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._async_client is None or self._async_loop is not loop:
+                if self._async_client is not None:
+                    self._retire(self._async_client, self._async_loop)
+                self._async_client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+                self._async_loop = loop
+                self._async_host_semaphores = {}
+            return self._async_client
+
+    def _retire(self, client: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """Close a client replaced by another loop's, on the loop its connections belong to."""
+        if loop is not None and not loop.is_closed():
+            try:
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+                return
+            except RuntimeError:
+                pass
+        # Its loop is gone; closed (best effort) by aclose()
+        self._retired_clients.append(client)
+
+    def _host_limit(self, host: str) -> Optional[int]:
+        return self.host_limits.get(host, self.per_host_limit)
+
+    @contextmanager
+    def _host_slot(self, host: str) -> Iterator[None]:
+        limit = self._host_limit(host)
+        if limit is None:
+            yield
+            return
+        with self._lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = self._host_semaphores[host] = threading.BoundedSemaphore(limit)
+        with semaphore:
+            yield
+
+    @asynccontextmanager
+    async def _async_host_slot(self, host: str) -> AsyncIterator[None]:
+        limit = self._host_limit(host)
+        if limit is None:
+            yield
+            return
+        semaphore = self._async_host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._async_host_semaphores[host] = asyncio.Semaphore(limit)
+        async with semaphore:
+            yield
+
+    def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request with the shared sync client, respecting per-host limits."""
+        with self._host_slot(urlsplit(url).hostname or ""):
+            return self.client.request(method, url, **kwargs)
+
+    async def arequest(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request with the shared async client, respecting per-host limits."""
+        client = self.async_client
+        async with self._async_host_slot(urlsplit(url).hostname or ""):
+            return await client.request(method, url, **kwargs)
+
+    async def warm(self, urls: List[str]) -> Dict[str, bool]:
+        """
+        Open keep-alive connections to the given URLs ahead of real traffic.
+
+        Any HTTP response (even an error status) counts as warmed since the
+        connection and TLS session are established either way.
+
+        Args:
+            urls: URLs whose hosts should be connected
+
+        Returns:
+            Dictionary mapping each URL to whether a connection was established
+        """
+        async def warm_one(url: str) -> bool:
+            try:
+                await self.arequest("HEAD", url)
+                return True
+            except httpx.HTTPError as e:
+                print(f"⚠️  Could not warm connection to {url}: {e}")
+                return False
+
+        results = await asyncio.gather(*(warm_one(url) for url in urls))
+        return dict(zip(urls, results))
+
+    def close(self) -> None:
+        """Close the sync client."""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    async def aclose(self) -> None:
+        """Close both clients."""
+        self.close()
+        with self._lock:
+            retired, self._retired_clients = self._retired_clients, []
+        for client in retired:
+            try:
+                await client.aclose()
+            except Exception as e:
+                print(f"⚠️  Could not close HTTP client of a finished event loop: {e}")
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+            self._async_loop = None
+
+
+__all__ = ["HTTPClientPool"]
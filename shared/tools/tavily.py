@@ -0,0 +1,67 @@
+"""Tavily search client that reuses pooled HTTP connections."""
+from typing import Any, Dict, List, Optional
+
+from .http import HTTPClientPool
+
+TAVILY_API_URL = "https://api.tavily.com"
+
+
+class TavilySearchClient:
+    """
+    Minimal Tavily search client built on a shared HTTPClientPool.
+
+    Returns the same result shape as LangChain's ``TavilySearchResults``
+    (``title``, ``url``, ``content``, ``score``) but, unlike it, does not open
+    a new connection or aiohttp session per call.
+    """
+
+    def __init__(
+        self,
+        pool: HTTPClientPool,
+        api_key: Optional[str],
+        max_results: int = 5,
+        search_depth: str = "advanced",
+    ):
+        """Initialize the client with a shared pool, API key and default search options."""
+        self.pool = pool
+        self.api_key = api_key
+        self.max_results = max_results
+        self.search_depth = search_depth
+
+    def _payload(self, query: str) -> Dict[str, Any]:
+        return {
+            "api_key": self.api_key,
+            "query": query,
+            "max_results": self.max_results,
+            "search_depth": self.search_depth,
+            "include_answer": False,
+            "include_raw_content": False,
+            "include_images": False,
+        }
+
+    @staticmethod
+    def _clean_results(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "title": result["title"],
+                "url": result["url"],
+                "content": result["content"],
+                "score": result["score"],
+            }
+            for result in data.get("results", [])
+        ]
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        """Run a search with the pooled sync client."""
+        response = self.pool.request("POST", f"{TAVILY_API_URL}/search", json=self._payload(query))
+        response.raise_for_status()
+        return self._clean_results(response.json())
+
+    async def asearch(self, query: str) -> List[Dict[str, Any]]:
+        """Run a search with the pooled async client."""
+        response = await self.pool.arequest("POST", f"{TAVILY_API_URL}/search", json=self._payload(query))
+        response.raise_for_status()
+        return self._clean_results(response.json())
+
+
+__all__ = ["TavilySearchClient", "TAVILY_API_URL"]